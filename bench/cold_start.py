@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Cold-start latency of the plugin-facing API routes under `wrangler dev`.
+
+Each sample starts a fresh `wrangler dev` (a new workerd isolate) on the built
+Worker, waits for the port to accept connections, and times the first request
+to one route (cold: route modules are loaded and evaluated on demand) and then
+the same request again (warm). The difference is what a cold isolate costs
+that route. Requests go without credentials unless --user-token and
+--team-token are given; the 401 still loads the route's whole module graph,
+which is the part being measured, without depending on what's in D1.
+
+Build first (`npm run build`), then save a baseline, make the change, rebuild
+and compare:
+
+    python3 bench/cold_start.py --save /tmp/cold-before.json
+    python3 bench/cold_start.py --compare /tmp/cold-before.json
+
+`wrangler dev` runs locally, so the absolute numbers are lower than on the
+edge; the before/after difference is what to read. For a CPU profile of the
+Worker's startup itself, see `npx wrangler check startup`.
+
+Usage:
+    python3 bench/cold_start.py [--runs 5] [--route check] [--save FILE | --compare FILE]
+"""
+
+import argparse
+import json
+import os
+import shlex
+import signal
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from urllib.error import HTTPError, URLError
+from urllib.request import Request, urlopen
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# name -> (method, path, body)
+ROUTES = {
+    "check": ("POST", "/api/v1/check", {"files": ["src/index.ts"]}),
+    "heartbeat": ("POST", "/api/v1/sessions/cold-start/heartbeat", {"files": ["src/index.ts"]}),
+    "start": ("POST", "/api/v1/sessions/start", {"session_id": "cold-start", "device_name": "bench"}),
+    "logs": ("POST", "/api/v1/logs", {"logs": [{"level": "INFO", "message": "cold start"}]}),
+    "version": ("GET", "/api/v1/version", None),
+}
+
+READY_TIMEOUT_SECONDS = 60
+
+
+def _wait_for_port(port: int, process: subprocess.Popen) -> None:
+    deadline = time.monotonic() + READY_TIMEOUT_SECONDS
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"wrangler dev exited with {process.returncode}")
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.2):
+                return
+        except OSError:
+            time.sleep(0.05)
+    raise RuntimeError(f"wrangler dev didn't listen on {port} within {READY_TIMEOUT_SECONDS}s")
+
+
+def _timed_request(port: int, route: tuple, headers: dict) -> tuple:
+    """(milliseconds, status) for one request."""
+    method, path, body = route
+    data = json.dumps(body).encode() if body is not None else None
+    request = Request(
+        f"http://127.0.0.1:{port}{path}",
+        data=data,
+        method=method,
+        headers={"Content-Type": "application/json", **headers},
+    )
+    started = time.perf_counter()
+    try:
+        with urlopen(request, timeout=30) as response:
+            response.read()
+            status = response.status
+    except HTTPError as e:
+        e.read()
+        status = e.code
+    return (time.perf_counter() - started) * 1000, status
+
+
+def sample(wrangler: list, port: int, route: tuple, headers: dict) -> dict:
+    """Start a fresh isolate and time a cold then a warm request to `route`."""
+    process = subprocess.Popen(
+        [*wrangler, "dev", "--port", str(port), "--ip", "127.0.0.1", "--log-level", "error"],
+        cwd=ROOT,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        start_new_session=True,
+    )
+    try:
+        _wait_for_port(port, process)
+        cold_ms, status = _timed_request(port, route, headers)
+        warm_ms, _ = _timed_request(port, route, headers)
+        return {"cold_ms": cold_ms, "warm_ms": warm_ms, "status": status}
+    finally:
+        os.killpg(process.pid, signal.SIGTERM)
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            os.killpg(process.pid, signal.SIGKILL)
+            process.wait()
+
+
+def summarize(samples: list) -> dict:
+    cold = [s["cold_ms"] for s in samples]
+    warm = [s["warm_ms"] for s in samples]
+    return {
+        "cold_median_ms": round(statistics.median(cold), 1),
+        "cold_max_ms": round(max(cold), 1),
+        "warm_median_ms": round(statistics.median(warm), 1),
+        "startup_ms": round(statistics.median(c - w for c, w in zip(cold, warm)), 1),
+        "status": samples[-1]["status"],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="Fresh isolates per route")
+    parser.add_argument("--route", action="append", choices=sorted(ROUTES), help="Route to measure (repeatable; default all)")
+    parser.add_argument("--port", type=int, default=8799)
+    parser.add_argument("--wrangler", default="npx wrangler", help="Command that runs wrangler")
+    parser.add_argument("--user-token", help="Send as Authorization: Bearer")
+    parser.add_argument("--team-token", help="Send as X-Team-Token")
+    parser.add_argument("--save", type=Path, help="Write the results as JSON")
+    parser.add_argument("--compare", type=Path, help="Results from an earlier --save to diff against")
+    args = parser.parse_args()
+
+    if not (ROOT / "dist" / "_worker.js").exists():
+        parser.error("no build found; run `npm run build` first")
+
+    headers = {}
+    if args.user_token:
+        headers["Authorization"] = f"Bearer {args.user_token}"
+    if args.team_token:
+        headers["X-Team-Token"] = args.team_token
+
+    baseline = json.loads(args.compare.read_text()) if args.compare else {}
+    wrangler = shlex.split(args.wrangler)
+    results = {}
+
+    print(f"{'route':10} {'cold p50':>9} {'cold max':>9} {'warm p50':>9} {'startup':>8} {'status':>6}"
+          + (f" {'startup before':>15}" if baseline else ""))
+    for name in args.route or list(ROUTES):
+        try:
+            samples = [sample(wrangler, args.port, ROUTES[name], headers) for _ in range(args.runs)]
+        except (RuntimeError, URLError, OSError) as e:
+            print(f"{name}: {e}", file=sys.stderr)
+            sys.exit(1)
+        result = results[name] = summarize(samples)
+        line = (f"{name:10} {result['cold_median_ms']:>7.1f}ms {result['cold_max_ms']:>7.1f}ms "
+                f"{result['warm_median_ms']:>7.1f}ms {result['startup_ms']:>6.1f}ms {result['status']:>6}")
+        if name in baseline:
+            before = baseline[name]["startup_ms"]
+            line += f" {before:>13.1f}ms ({result['startup_ms'] - before:+.1f})"
+        print(line)
+
+    if args.save:
+        args.save.write_text(json.dumps(results, indent=2) + "\n")
+        print(f"\nSaved {args.save}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+"""
+Synthetic Overlap dataset for query benchmarks.
+
+Applies every migration in migrations/ to a local SQLite database and fills it
+with a history shaped like a busy deployment: several teams, hundreds of users
+with one or two devices each, repos with their own directory trees, sessions
+that are mostly ended with a live tail of active and stale ones, bursts of
+activity per session, and plugin logs weighted towards DEBUG/INFO. Everything
+is seeded, so the same arguments always produce the same data.
+
+The first team is the largest and is the one the benchmarks query.
+
+Usage:
+    python3 bench/dataset.py --db /tmp/overlap-bench.sqlite [--sessions 50000] [--logs 500000]
+"""
+
+import argparse
+import json
+import random
+import sqlite3
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+MIGRATIONS_DIR = Path(__file__).resolve().parent.parent / "migrations"
+
+BENCH_TEAM = "team-0"
+# History ends here; the live tail of sessions sits just before it
+EPOCH = datetime(2026, 1, 1)
+HISTORY_DAYS = 180
+
+SCOPES = ["auth", "billing", "api", "frontend", "infra", "docs", "search", "payments", "onboarding", "tests"]
+BRANCHES = ["main", "develop", "fix/login", "feat/search", "feat/billing-v2", "chore/deps", "release/1.4"]
+HOOKS = ["SessionStart", "UserPromptSubmit", "PreToolUse", "PostToolUse", "Stop", "SessionEnd"]
+LOG_MESSAGES = [
+    "Heartbeat sent",
+    "Overlap check complete",
+    "Session started",
+    "Session ended",
+    "Request timed out",
+    "Retrying request",
+    "Server returned 502",
+    "Skipped check for untracked file",
+    "Queued heartbeat for retry",
+    "Classification fallback to heuristic",
+]
+
+BATCH_SIZE = 10_000
+
+
+def _ts(minutes: float) -> str:
+    """D1-style UTC datetime `minutes` after the start of the history."""
+    return (EPOCH - timedelta(days=HISTORY_DAYS) + timedelta(minutes=minutes)).strftime("%Y-%m-%d %H:%M:%S")
+
+
+def _id(rng: random.Random) -> str:
+    return f"{rng.getrandbits(128):032x}"
+
+
+def apply_migrations(conn: sqlite3.Connection) -> None:
+    for migration in sorted(MIGRATIONS_DIR.glob("*.sql")):
+        conn.executescript(migration.read_text())
+
+
+def build_database(
+    path: str = ":memory:",
+    teams: int = 4,
+    users: int = 300,
+    repos: int = 60,
+    sessions: int = 50_000,
+    activities_per_session: int = 40,
+    logs: int = 500_000,
+    seed: int = 42,
+    verbose: bool = False,
+) -> sqlite3.Connection:
+    """
+    Create a database at `path` with the full schema and synthetic history.
+
+    Users, repos and sessions are spread across `teams`, with the first team
+    taking half of them. Activity per session varies around
+    `activities_per_session`, so the defaults give roughly two million rows.
+    """
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode = OFF")
+    conn.execute("PRAGMA synchronous = OFF")
+    apply_migrations(conn)
+
+    rng = random.Random(seed)
+    started = time.perf_counter()
+
+    def log(message: str) -> None:
+        if verbose:
+            print(f"  [{time.perf_counter() - started:6.1f}s] {message}")
+
+    def team_for(i: int) -> str:
+        # Half of everything belongs to the bench team, the rest is spread out
+        return BENCH_TEAM if i % 2 == 0 or teams == 1 else f"team-{1 + (i // 2) % (teams - 1)}"
+
+    conn.executemany(
+        "INSERT INTO teams (id, name, team_token) VALUES (?, ?, ?)",
+        [(f"team-{t}", f"Team {t}", _id(rng)) for t in range(teams)],
+    )
+
+    user_rows, device_rows = [], []
+    devices_by_user: dict[str, list[str]] = {}
+    team_users: dict[str, list[str]] = {}
+    for i in range(users):
+        user_id = f"user-{i}"
+        team_id = team_for(i)
+        team_users.setdefault(team_id, []).append(user_id)
+        user_rows.append((user_id, team_id, _id(rng), f"User {i}", "admin" if i < teams else "member"))
+        devices_by_user[user_id] = []
+        for d in range(rng.choice([1, 1, 2])):
+            device_id = f"dev-{i}-{d}"
+            devices_by_user[user_id].append(device_id)
+            device_rows.append((device_id, user_id, "laptop" if d == 0 else "devbox", f"{user_id}-{d}.local", d))
+    conn.executemany("INSERT INTO users (id, team_id, user_token, name, role) VALUES (?, ?, ?, ?, ?)", user_rows)
+    conn.executemany(
+        "INSERT INTO devices (id, user_id, name, hostname, is_remote) VALUES (?, ?, ?, ?, ?)", device_rows
+    )
+
+    repo_rows = []
+    team_repos: dict[str, list[str]] = {}
+    repo_files: dict[str, list[str]] = {}
+    for i in range(repos):
+        repo_id = f"repo-{i}"
+        team_id = team_for(i)
+        team_repos.setdefault(team_id, []).append(repo_id)
+        repo_rows.append((repo_id, team_id, f"repo-{i}", f"git@example.com:org/repo-{i}.git", _id(rng)))
+        repo_files[repo_id] = [
+            f"src/{scope}/{sub}/file{n}.ts"
+            for scope in rng.sample(SCOPES, 6)
+            for sub in ("lib", "components", "routes")
+            for n in range(rng.randint(5, 25))
+        ]
+    conn.executemany("INSERT INTO repos (id, team_id, name, remote_url, repo_token) VALUES (?, ?, ?, ?, ?)", repo_rows)
+    log(f"{teams} teams, {users} users, {len(device_rows)} devices, {repos} repos")
+
+    history_minutes = HISTORY_DAYS * 24 * 60
+    session_rows, activity_rows = [], []
+    session_ids: list[str] = []
+    activity_count = 0
+
+    def flush_activity() -> None:
+        conn.executemany(
+            "INSERT INTO activity (id, session_id, files, semantic_scope, summary, created_at, "
+            "heartbeat_count, last_seen_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            activity_rows,
+        )
+        activity_rows.clear()
+
+    for i in range(sessions):
+        session_id = _id(rng)
+        session_ids.append(session_id)
+        team_id = team_for(i)
+        user_id = rng.choice(team_users.get(team_id) or team_users[BENCH_TEAM])
+        repo_id = rng.choice(team_repos.get(team_id) or team_repos[BENCH_TEAM]) if rng.random() < 0.95 else None
+        files = repo_files[repo_id] if repo_id else [f"notes/{n}.md" for n in range(20)]
+
+        # Sessions come in uniformly over the history; the last few percent are still live
+        start = rng.uniform(0, history_minutes - 60)
+        live = start > history_minutes * 0.98
+        status = rng.choices(["active", "stale"], weights=[3, 1])[0] if live else "ended"
+        speculative = 1 if rng.random() < 0.05 else 0
+
+        count = 0 if speculative else max(1, int(rng.expovariate(1 / activities_per_session)))
+        minute = start
+        latest = (None, None, None)
+        scope = rng.choice(SCOPES)
+        for _ in range(count):
+            minute += rng.uniform(0.5, 6)
+            if rng.random() < 0.2:
+                scope = rng.choice(SCOPES)
+            activity_id = _id(rng)
+            touched = json.dumps(rng.sample(files, min(len(files), rng.randint(1, 4))))
+            summary = f"Working on {scope} in {rng.choice(files).rsplit('/', 1)[0]}"
+            created = _ts(minute)
+            activity_rows.append(
+                (activity_id, session_id, touched, scope, summary, created, rng.randint(1, 12), created)
+            )
+            latest = (activity_id, scope, summary)
+        activity_count += count
+        if len(activity_rows) >= BATCH_SIZE:
+            flush_activity()
+
+        session_rows.append((
+            session_id, user_id, rng.choice(devices_by_user[user_id]), repo_id, rng.choice(BRANCHES),
+            f"/home/{user_id}/{repo_id or 'scratch'}", status, _ts(start), _ts(minute),
+            None if status != "ended" else _ts(minute + rng.uniform(1, 30)), *latest, speculative,
+        ))
+        if len(session_rows) >= BATCH_SIZE:
+            conn.executemany(
+                "INSERT INTO sessions (id, user_id, device_id, repo_id, branch, worktree, status, started_at, "
+                "last_activity_at, ended_at, latest_activity_id, latest_semantic_scope, latest_summary, speculative) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                session_rows,
+            )
+            session_rows.clear()
+            log(f"{i + 1} sessions, {activity_count} activity rows")
+
+    flush_activity()
+    if session_rows:
+        conn.executemany(
+            "INSERT INTO sessions (id, user_id, device_id, repo_id, branch, worktree, status, started_at, "
+            "last_activity_at, ended_at, latest_activity_id, latest_semantic_scope, latest_summary, speculative) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            session_rows,
+        )
+    log(f"{sessions} sessions, {activity_count} activity rows")
+
+    # What heartbeats keep in the active path index (migrations/012_active_paths.sql)
+    conn.execute(
+        "INSERT OR IGNORE INTO active_paths (repo_id, path, session_id) "
+        "SELECT s.repo_id, je.value, s.id FROM sessions s JOIN activity a ON a.session_id = s.id "
+        "JOIN json_each(a.files) je WHERE s.status = 'active' AND s.repo_id IS NOT NULL"
+    )
+
+    log_rows = []
+    for i in range(logs):
+        level = rng.choices(["DEBUG", "INFO", "WARN", "ERROR"], weights=[50, 40, 7, 3])[0]
+        message = rng.choice(LOG_MESSAGES)
+        error = json.dumps({"type": "URLError", "message": "timed out"}) if level == "ERROR" else None
+        log_rows.append((
+            _id(rng), f"user-{rng.randrange(users)}", level, rng.choice(HOOKS),
+            rng.choice(session_ids) if session_ids else None, message,
+            json.dumps({"attempt": rng.randint(1, 3), "duration_ms": rng.randint(5, 4000)}), error,
+            _ts(rng.uniform(0, history_minutes)),
+        ))
+        if len(log_rows) >= BATCH_SIZE:
+            conn.executemany(
+                "INSERT INTO plugin_logs (id, user_id, level, hook, session_id, message, data, error, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                log_rows,
+            )
+            log_rows.clear()
+    if log_rows:
+        conn.executemany(
+            "INSERT INTO plugin_logs (id, user_id, level, hook, session_id, message, data, error, created_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            log_rows,
+        )
+    log(f"{logs} plugin logs")
+
+    conn.commit()
+    conn.execute("ANALYZE")
+    conn.commit()
+    log("analyzed")
+    return conn
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    """Dataset shape flags, shared with the benchmark runner."""
+    parser.add_argument("--teams", type=int, default=4)
+    parser.add_argument("--users", type=int, default=300)
+    parser.add_argument("--repos", type=int, default=60)
+    parser.add_argument("--sessions", type=int, default=50_000)
+    parser.add_argument("--activities-per-session", type=int, default=40)
+    parser.add_argument("--logs", type=int, default=500_000)
+    parser.add_argument("--seed", type=int, default=42)
+
+
+def dataset_kwargs(args: argparse.Namespace) -> dict:
+    return {
+        "teams": args.teams,
+        "users": args.users,
+        "repos": args.repos,
+        "sessions": args.sessions,
+        "activities_per_session": args.activities_per_session,
+        "logs": args.logs,
+        "seed": args.seed,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", required=True, help="SQLite file to create (must not exist)")
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    if Path(args.db).exists():
+        parser.error(f"{args.db} already exists")
+
+    print(f"Building {args.db}...")
+    conn = build_database(args.db, verbose=True, **dataset_kwargs(args))
+    for table in ("users", "sessions", "activity", "plugin_logs"):
+        count = conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+        print(f"{table:12} {count:>10,}")
+
+
+if __name__ == "__main__":
+    main()
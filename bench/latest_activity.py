@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Benchmark: latest-activity lookup for the timeline query.
+
+Builds a synthetic history in a local SQLite database from the D1 migrations
+and times the old ROW_NUMBER() window query against the denormalized
+sessions.latest_activity_id join used by getRecentActivity().
+
+Usage:
+    python3 bench/latest_activity.py [--sessions 5000] [--activities-per-session 40]
+"""
+
+import argparse
+import json
+import random
+import sqlite3
+import time
+import uuid
+from pathlib import Path
+
+MIGRATIONS_DIR = Path(__file__).resolve().parent.parent / "migrations"
+
+WINDOW_QUERY = """
+SELECT s.*, u.name as user_name, d.name as device_name, r.name as repo_name,
+       a.id as activity_id, a.files, a.semantic_scope, a.summary, a.created_at as activity_created_at
+FROM sessions s
+JOIN users u ON s.user_id = u.id
+JOIN devices d ON s.device_id = d.id
+LEFT JOIN repos r ON s.repo_id = r.id
+LEFT JOIN (
+  SELECT session_id, id, files, semantic_scope, summary, created_at,
+         ROW_NUMBER() OVER (PARTITION BY session_id ORDER BY created_at DESC) as rn
+  FROM activity
+) a ON s.id = a.session_id AND a.rn = 1
+WHERE u.team_id = ? AND s.status IN ('active', 'stale')
+ORDER BY s.last_activity_at DESC
+LIMIT 20 OFFSET 0
+"""
+
+POINTER_QUERY = """
+SELECT s.*, u.name as user_name, d.name as device_name, r.name as repo_name,
+       a.id as activity_id, a.files, s.latest_semantic_scope as semantic_scope, s.latest_summary as summary,
+       a.created_at as activity_created_at
+FROM sessions s
+JOIN users u ON s.user_id = u.id
+JOIN devices d ON s.device_id = d.id
+LEFT JOIN repos r ON s.repo_id = r.id
+LEFT JOIN activity a ON a.id = s.latest_activity_id
+WHERE u.team_id = ? AND s.status IN ('active', 'stale')
+ORDER BY s.last_activity_at DESC
+LIMIT 20 OFFSET 0
+"""
+
+
+def build_database(num_sessions: int, activities_per_session: int) -> sqlite3.Connection:
+    """Create an in-memory database with the full schema and synthetic history."""
+    conn = sqlite3.connect(":memory:")
+    for migration in sorted(MIGRATIONS_DIR.glob("*.sql")):
+        conn.executescript(migration.read_text())
+
+    rng = random.Random(42)
+    team_id = "team-1"
+    conn.execute("INSERT INTO teams (id, name, team_token) VALUES (?, ?, ?)", (team_id, "Bench", "tt"))
+
+    users = [f"user-{i}" for i in range(100)]
+    for user_id in users:
+        conn.execute(
+            "INSERT INTO users (id, team_id, user_token, name) VALUES (?, ?, ?, ?)",
+            (user_id, team_id, uuid.uuid4().hex, user_id),
+        )
+        conn.execute(
+            "INSERT INTO devices (id, user_id, name, hostname) VALUES (?, ?, ?, ?)",
+            (f"dev-{user_id}", user_id, "laptop", f"{user_id}.local"),
+        )
+
+    repos = [f"repo-{i}" for i in range(20)]
+    for repo_id in repos:
+        conn.execute(
+            "INSERT INTO repos (id, team_id, name, remote_url, repo_token) VALUES (?, ?, ?, ?, ?)",
+            (repo_id, team_id, repo_id, f"git@example.com:{repo_id}.git", uuid.uuid4().hex),
+        )
+
+    scopes = ["auth", "billing", "api", "frontend", "infra", "docs"]
+    for i in range(num_sessions):
+        session_id = f"session-{i}"
+        user_id = rng.choice(users)
+        status = rng.choices(["active", "stale", "ended"], weights=[1, 1, 8])[0]
+        start_minute = rng.randint(0, 60 * 24 * 180)
+        latest = None
+        rows = []
+        for j in range(activities_per_session):
+            activity_id = uuid.uuid4().hex
+            created = f"datetime('2025-01-01', '+{start_minute + j} minutes')"
+            scope = rng.choice(scopes)
+            files = json.dumps([f"src/{scope}/file{rng.randint(0, 200)}.ts"])
+            rows.append((activity_id, session_id, files, scope, f"Working on {scope}", start_minute + j))
+            latest = (activity_id, scope, f"Working on {scope}")
+        conn.executemany(
+            "INSERT INTO activity (id, session_id, files, semantic_scope, summary, created_at) "
+            "VALUES (?, ?, ?, ?, ?, datetime('2025-01-01', '+' || ? || ' minutes'))",
+            rows,
+        )
+        conn.execute(
+            "INSERT INTO sessions (id, user_id, device_id, repo_id, status, started_at, last_activity_at, "
+            "latest_activity_id, latest_semantic_scope, latest_summary) "
+            "VALUES (?, ?, ?, ?, ?, datetime('2025-01-01', '+' || ? || ' minutes'), "
+            "datetime('2025-01-01', '+' || ? || ' minutes'), ?, ?, ?)",
+            (session_id, user_id, f"dev-{user_id}", rng.choice(repos), status,
+             start_minute, start_minute + activities_per_session, *latest),
+        )
+
+    conn.commit()
+    conn.execute("ANALYZE")
+    return conn
+
+
+def time_query(conn: sqlite3.Connection, sql: str, iterations: int) -> float:
+    """Return the median wall time of a query in milliseconds."""
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        conn.execute(sql, ("team-1",)).fetchall()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return samples[len(samples) // 2]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=5000)
+    parser.add_argument("--activities-per-session", type=int, default=40)
+    parser.add_argument("--iterations", type=int, default=10)
+    args = parser.parse_args()
+
+    print(f"Building {args.sessions} sessions x {args.activities_per_session} activities...")
+    conn = build_database(args.sessions, args.activities_per_session)
+
+    window_rows = conn.execute(WINDOW_QUERY, ("team-1",)).fetchall()
+    pointer_rows = conn.execute(POINTER_QUERY, ("team-1",)).fetchall()
+    assert [r[0] for r in window_rows] == [r[0] for r in pointer_rows], "queries disagree on sessions"
+
+    window_ms = time_query(conn, WINDOW_QUERY, args.iterations)
+    pointer_ms = time_query(conn, POINTER_QUERY, args.iterations)
+
+    print(f"ROW_NUMBER window:      {window_ms:9.2f} ms")
+    print(f"latest_activity_id:     {pointer_ms:9.2f} ms")
+    print(f"speedup:                {window_ms / pointer_ms:9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
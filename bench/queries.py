@@ -0,0 +1,384 @@
+#!/usr/bin/env python3
+"""
+Benchmark and query-plan regression suite for src/lib/db/queries.ts.
+
+The SQL isn't copied here: it's read out of queries.ts, with each `${...}`
+interpolation resolved the way the function would resolve it for the case
+being run. If queries.ts changes shape so a case can no longer be built, the
+suite fails and says which function to look at, rather than quietly
+measuring stale SQL.
+
+For each case it captures EXPLAIN QUERY PLAN and fails if any of the large
+tables (sessions, activity, plugin_logs) is read by a full table scan. Plans
+are compared against bench/query_plans.txt so index and schema changes show
+up as a diff; rewrite it with --update-plans once a change is intended.
+Timings are the median and p95 wall time over --iterations runs.
+
+Generating the dataset takes a couple of minutes at the default size, so pass
+--db to build it once into a file and reuse it. --extra-sql applies candidate
+DDL (e.g. a new index) on top of the migrations before measuring.
+
+Usage:
+    python3 bench/queries.py [--db /tmp/overlap-bench.sqlite] [--sessions 50000] [--logs 500000]
+    python3 bench/queries.py --db /tmp/overlap-bench.sqlite --plans-only
+    python3 bench/queries.py --db /tmp/overlap-bench.sqlite --extra-sql candidate.sql
+    python3 bench/queries.py --db /tmp/overlap-bench.sqlite --update-plans
+"""
+
+import argparse
+import difflib
+import json
+import re
+import sqlite3
+import sys
+import time
+from pathlib import Path
+from typing import NamedTuple
+
+import dataset
+
+ROOT = Path(__file__).resolve().parent.parent
+QUERIES_TS = ROOT / "src" / "lib" / "db" / "queries.ts"
+TIMELINE_TS = ROOT / "src" / "pages" / "api" / "v1" / "users" / "me" / "timeline.ts"
+PLANS_FILE = Path(__file__).resolve().parent / "query_plans.txt"
+
+# Aliases queries.ts uses for tables that grow without bound; a plain SCAN of
+# one of these reads every row
+LARGE_TABLES = {"s": "sessions", "a": "activity", "pl": "plugin_logs", "ap": "active_paths"}
+FULL_SCAN = re.compile(r"^SCAN (\w+)$")
+
+
+class SourceError(Exception):
+    """queries.ts no longer has the shape a case expects."""
+
+
+class QueriesSource:
+    """Pulls SQL literals out of queries.ts, one exported function at a time."""
+
+    def __init__(self, path: Path):
+        self.text = path.read_text()
+
+    def function(self, name: str) -> str:
+        match = re.search(rf"^export async function {name}\(.*?^}}$", self.text, re.S | re.M)
+        if not match:
+            raise SourceError(f"{name}() not found in queries.ts")
+        return match.group(0)
+
+    def template(self, name: str, marker: str) -> str:
+        """The one template literal in `name` containing `marker`."""
+        found = [t for t in re.findall(r"`((?:[^`\\]|\\.)*)`", self.function(name)) if marker in t]
+        if len(found) != 1:
+            raise SourceError(f"{name}(): expected one template containing {marker!r}, found {len(found)}")
+        return found[0]
+
+    def clause(self, name: str, variable: str, marker: str) -> str:
+        """The one string `name` assigns or appends to `variable` containing `marker`."""
+        pattern = rf"\b{variable} \+?= (['`])(.*?)\1"
+        found = [m[1] for m in re.findall(pattern, self.function(name), re.S) if marker in m[1]]
+        if len(found) != 1:
+            raise SourceError(f"{name}(): expected one {variable} string containing {marker!r}, found {len(found)}")
+        return found[0]
+
+    def constant(self, name: str) -> str:
+        match = re.search(rf"^const {name} = '([^']*)';", self.text, re.M)
+        if not match:
+            raise SourceError(f"constant {name} not found in queries.ts")
+        return match.group(1)
+
+    def render(self, template: str, values: dict) -> str:
+        """
+        Resolve each `${expr}` in a template. `values` maps an expression to
+        its text, or a variable to its truthiness for `flag ? x : y`.
+        """
+
+        def resolve(expr: str) -> str:
+            expr = expr.strip()
+            if isinstance(values.get(expr), str):
+                return values[expr]
+            ternary = re.fullmatch(r"(\w+) \? (.+?) : (.+)", expr)
+            if ternary and isinstance(values.get(ternary[1]), bool):
+                return resolve(ternary[2] if values[ternary[1]] else ternary[3])
+            literal = re.fullmatch(r"'([^']*)'", expr)
+            if literal:
+                return literal[1]
+            if re.fullmatch(r"[A-Z_]+", expr):
+                return self.constant(expr)
+            raise SourceError(f"don't know how to resolve ${{{expr}}}")
+
+        return re.sub(r"\$\{([^}]*)\}", lambda m: resolve(m[1]), template)
+
+
+class Case(NamedTuple):
+    name: str
+    sql: str
+    params: tuple
+
+
+def _pick_params(conn: sqlite3.Connection) -> dict:
+    """Realistic bind values for the bench team, chosen from the generated data."""
+    team = dataset.BENCH_TEAM
+
+    def one(sql: str, *args):
+        return conn.execute(sql, args).fetchone()
+
+    (user_id,) = one(
+        "SELECT s.user_id FROM sessions s JOIN users u ON s.user_id = u.id WHERE u.team_id = ? "
+        "GROUP BY s.user_id ORDER BY COUNT(*) DESC LIMIT 1", team)
+    (repo_id,) = one(
+        "SELECT s.repo_id FROM sessions s JOIN users u ON s.user_id = u.id WHERE u.team_id = ? "
+        "AND s.repo_id IS NOT NULL GROUP BY s.repo_id ORDER BY COUNT(*) DESC LIMIT 1", team)
+    # The overlap check runs with the files someone else is currently editing
+    files_json, scope, other_user = one(
+        "SELECT a.files, a.semantic_scope, s.user_id FROM sessions s JOIN users u ON s.user_id = u.id "
+        "JOIN activity a ON a.id = s.latest_activity_id WHERE u.team_id = ? AND s.status = 'active' "
+        "AND s.user_id != ? ORDER BY s.last_activity_at DESC LIMIT 1", team, user_id)
+    session_cursor = one(
+        "SELECT s.last_activity_at, s.id FROM sessions s JOIN users u ON s.user_id = u.id "
+        "WHERE u.team_id = ? AND s.status IN ('active', 'stale') AND s.speculative = 0 "
+        "ORDER BY s.last_activity_at DESC, s.id DESC LIMIT 1 OFFSET 100", team)
+    repo_cursor = one(
+        "SELECT s.last_activity_at, s.id FROM sessions s WHERE s.repo_id = ? AND s.status IN ('active', 'stale') "
+        "ORDER BY s.last_activity_at DESC, s.id DESC LIMIT 1 OFFSET 20", repo_id)
+    timeline_cursor = one(
+        "SELECT started_at, id FROM sessions WHERE user_id = ? AND speculative = 0 "
+        "ORDER BY started_at DESC, id DESC LIMIT 1 OFFSET 20", user_id)
+    log_cursor = one(
+        "SELECT pl.created_at, pl.id FROM plugin_logs pl JOIN users u ON pl.user_id = u.id WHERE u.team_id = ? "
+        "ORDER BY pl.created_at DESC, pl.id DESC LIMIT 1 OFFSET 1000", team)
+    (log_session,) = one(
+        "SELECT pl.session_id FROM plugin_logs pl JOIN users u ON pl.user_id = u.id WHERE u.team_id = ? "
+        "AND pl.session_id IS NOT NULL LIMIT 1", team)
+    (latest,) = one("SELECT MAX(created_at) FROM plugin_logs")
+    # The subtree check runs from one user's session against a path someone else
+    # has active in the same repo
+    active_path, path_repo, path_owner = one(
+        "SELECT ap.path, ap.repo_id, s.user_id FROM active_paths ap JOIN sessions s ON s.id = ap.session_id "
+        "JOIN users u ON s.user_id = u.id WHERE u.team_id = ? ORDER BY ap.repo_id, ap.path LIMIT 1", team)
+    check_session, check_user = one(
+        "SELECT id, user_id FROM sessions WHERE repo_id = ? AND user_id != ? LIMIT 1", path_repo, path_owner)
+
+    return {
+        "team": team,
+        "user": user_id,
+        "other_user": other_user,
+        "repo": repo_id,
+        "files": json.loads(files_json),
+        "scope": scope,
+        "session_cursor": tuple(session_cursor or ("9999-12-31 00:00:00", "")),
+        "repo_cursor": tuple(repo_cursor or ("9999-12-31 00:00:00", "")),
+        "timeline_cursor": tuple(timeline_cursor or ("9999-12-31 00:00:00", "")),
+        "log_cursor": tuple(log_cursor or ("9999-12-31 00:00:00", "")),
+        "log_session": log_session,
+        "week_ago": one("SELECT datetime(?, '-7 days')", latest)[0],
+        "active_path": active_path,
+        "check_session": check_session,
+        "check_user": check_user,
+        "latest": latest,
+    }
+
+
+def build_cases(src: QueriesSource, p: dict) -> list:
+    """Every query shape the hot paths issue, with the SQL as queries.ts would build it."""
+    cases = []
+    team, limit = p["team"], 20
+
+    # checkForOverlaps: the query is built up by appending, so stitch the pieces in order
+    name = "checkForOverlaps"
+    files = p["files"]
+    head = src.render(src.template(name, "FROM sessions s"), {"placeholders": ", ".join("?" for _ in files)})
+    scope_clause = src.clause(name, "query", "a.semantic_scope = ?")
+    tail = src.clause(name, "query", "ORDER BY")
+    cases.append(Case(f"{name}: files", head + tail, (team, p["other_user"], *files)))
+    cases.append(Case(f"{name}: files + scope", head + scope_clause + tail, (team, p["other_user"], *files, p["scope"])))
+
+    # getSessionsUnderDirectories: a file's ancestors, as runOverlapCheck asks for them
+    name = "getSessionsUnderDirectories"
+    segments = p["active_path"].split("/")
+    ancestors = ["/".join(segments[:depth]) for depth in range(len(segments) - 1, 1, -1)]
+    cases.append(Case(
+        f"{name}: file ancestors",
+        src.template(name, "FROM json_each(?) dir"),
+        (json.dumps(ancestors), p["check_session"], p["check_user"], team, p["check_user"]),
+    ))
+
+    # The session lists share a shape: count, first page, keyset page
+    def session_list(name: str, where_params: tuple, values: dict, cursor: tuple) -> None:
+        statuses = ("active", "stale")
+        count = src.render(src.template(name, "SELECT COUNT(*)"), values)
+        page = src.template(name, "LIMIT ? OFFSET ?")
+        cases.append(Case(f"{name}: count", count, (*where_params, *statuses)))
+        cases.append(Case(
+            f"{name}: page 1",
+            src.render(page, {**values, "after": False}),
+            (*where_params, *statuses, limit + 1, 0),
+        ))
+        cases.append(Case(
+            f"{name}: keyset page",
+            src.render(page, {**values, "after": True}),
+            (*where_params, *statuses, *cursor, limit + 1, 0),
+        ))
+
+    session_list("getRecentActivity", (team,), {}, p["session_cursor"])
+    session_list("getUserSessions", (team, p["user"]), {}, p["session_cursor"])
+
+    # getRepoActivity builds its WHERE clause from optional filters
+    name = "getRepoActivity"
+    base_where = src.clause(name, "whereClause", "WHERE u.team_id = ?")
+    session_list(name, (team, p["repo"]), {"whereClause": base_where}, p["repo_cursor"])
+    filtered_where = (
+        base_where
+        + src.clause(name, "whereClause", "s.user_id = ?")
+        + src.clause(name, "whereClause", "s.branch = ?")
+        + src.clause(name, "whereClause", "s.started_at >= ?")
+        + src.clause(name, "whereClause", "s.started_at <= ?")
+    )
+    cases.append(Case(
+        f"{name}: page 1, user + branch + dates",
+        src.render(src.template(name, "LIMIT ? OFFSET ?"), {"whereClause": filtered_where, "after": False}),
+        (team, p["repo"], "active", "stale", p["user"], "main", "2025-01-01", "2026-12-31T23:59:59", limit + 1, 0),
+    ))
+
+    # The personal timeline (users/me/timeline.ts) pages a user's sessions on (started_at, id)
+    timeline = QueriesSource(TIMELINE_TS).template("GET", "LIMIT ? OFFSET ?")
+    for label, after in (("page 1", False), ("keyset page", True)):
+        cursor = p["timeline_cursor"] if after else ()
+        cases.append(Case(
+            f"timeline: {label}",
+            src.render(timeline, {"updatedSince": False, "after": after}),
+            (p["user"], *cursor, limit + 1, 0),
+        ))
+
+    # getPluginLogs: a FROM clause per mode and a WHERE clause per filter
+    name = "getPluginLogs"
+    plain_from = src.template(name, "CROSS JOIN users u")
+    fts_from = src.template(name, "FROM plugin_logs_fts")
+    base_where = src.clause(name, "whereClause", "WHERE u.team_id = ?")
+    count = src.template(name, "SELECT COUNT(*)")
+    page = src.template(name, "LIMIT ? OFFSET ?")
+    log_limit = 100
+
+    def logs(label: str, from_clause: str, filters: list, params: tuple, after: bool = False) -> None:
+        where = base_where + "".join(src.clause(name, "whereClause", f) for f in filters)
+        values = {"fromClause": from_clause, "whereClause": where}
+        cursor = p["log_cursor"] if after else ()
+        if not after:
+            cases.append(Case(f"{name}: count, {label}", src.render(count, values), (team, *params)))
+        cases.append(Case(
+            f"{name}: {'keyset page' if after else 'page 1'}, {label}",
+            src.render(page, {**values, "after": after}),
+            (team, *params, *cursor, log_limit + 1, 0),
+        ))
+
+    logs("unfiltered", plain_from, [], ())
+    logs("unfiltered", plain_from, [], (), after=True)
+    logs("level", plain_from, ["pl.level = ?"], ("ERROR",))
+    logs("user", plain_from, ["pl.user_id = ?"], (p["user"],))
+    logs("hook", plain_from, ["pl.hook = ?"], ("PreToolUse",))
+    logs("session", plain_from, ["pl.session_id = ?"], (p["log_session"],))
+    logs("last 7 days", plain_from, ["pl.created_at >= ?", "pl.created_at < ?"], (p["week_ago"], p["latest"]))
+    logs("search", fts_from, ["plugin_logs_fts MATCH ?"], ('"timed"*',))
+
+    return cases
+
+
+def query_plan(conn: sqlite3.Connection, case: Case) -> list:
+    """EXPLAIN QUERY PLAN as indented lines, one per plan node."""
+    rows = conn.execute(f"EXPLAIN QUERY PLAN {case.sql}", case.params).fetchall()
+    depth = {0: -1}
+    lines = []
+    for node_id, parent, _, detail in rows:
+        depth[node_id] = depth.get(parent, -1) + 1
+        lines.append("  " * depth[node_id] + detail)
+    return lines
+
+
+def full_scans(plan: list) -> list:
+    """Large tables the plan reads without an index."""
+    scans = []
+    for line in plan:
+        match = FULL_SCAN.match(line.strip())
+        if match and match[1] in LARGE_TABLES:
+            scans.append(LARGE_TABLES[match[1]])
+    return scans
+
+
+def time_case(conn: sqlite3.Connection, case: Case, iterations: int) -> tuple:
+    """Median and p95 wall time in ms, and the row count."""
+    samples = []
+    rows = 0
+    for _ in range(iterations):
+        start = time.perf_counter()
+        rows = len(conn.execute(case.sql, case.params).fetchall())
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return samples[len(samples) // 2], samples[min(len(samples) - 1, int(len(samples) * 0.95))], rows
+
+
+def format_plans(plans: dict) -> str:
+    return "".join(f"## {name}\n" + "".join(f"{line}\n" for line in plan) + "\n" for name, plan in plans.items())
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", help="SQLite file to reuse, or to build into if it doesn't exist (default: in memory)")
+    parser.add_argument("--extra-sql", type=Path, help="Candidate DDL to apply before measuring")
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--plans-only", action="store_true", help="Check plans without timing the queries")
+    parser.add_argument("--update-plans", action="store_true", help=f"Rewrite {PLANS_FILE.name} from this run")
+    dataset.add_arguments(parser)
+    args = parser.parse_args()
+
+    if args.db and Path(args.db).exists():
+        print(f"Using {args.db}")
+        conn = sqlite3.connect(args.db)
+    else:
+        print(f"Building {args.sessions} sessions, ~{args.sessions * args.activities_per_session:,} activity rows, "
+              f"{args.logs:,} logs...")
+        conn = dataset.build_database(args.db or ":memory:", verbose=True, **dataset.dataset_kwargs(args))
+
+    if args.extra_sql:
+        conn.executescript(args.extra_sql.read_text())
+        conn.execute("ANALYZE")
+
+    try:
+        cases = build_cases(QueriesSource(QUERIES_TS), _pick_params(conn))
+    except SourceError as e:
+        print(f"queries.ts changed shape: {e}; update bench/queries.py", file=sys.stderr)
+        sys.exit(2)
+
+    plans = {}
+    failures = []
+    print()
+    for case in cases:
+        plans[case.name] = query_plan(conn, case)
+        scans = full_scans(plans[case.name])
+        if scans:
+            failures.append((case, scans))
+        if args.plans_only:
+            print(f"{'FULL SCAN' if scans else 'ok':9}  {case.name}")
+        else:
+            median, p95, rows = time_case(conn, case, args.iterations)
+            flag = f"  FULL SCAN of {', '.join(scans)}" if scans else ""
+            print(f"{median:9.2f} ms  p95 {p95:9.2f} ms  {rows:5} rows  {case.name}{flag}")
+
+    current = format_plans(plans)
+    if args.update_plans:
+        PLANS_FILE.write_text(current)
+        print(f"\nWrote {PLANS_FILE}")
+    elif PLANS_FILE.exists() and PLANS_FILE.read_text() != current:
+        print(f"\nQuery plans differ from {PLANS_FILE.name}:")
+        sys.stdout.writelines(difflib.unified_diff(
+            PLANS_FILE.read_text().splitlines(keepends=True), current.splitlines(keepends=True),
+            PLANS_FILE.name, "this run",
+        ))
+
+    for case, scans in failures:
+        print(f"\n{case.name} does a full scan of {', '.join(scans)}:", file=sys.stderr)
+        for line in plans[case.name]:
+            print(f"    {line}", file=sys.stderr)
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,467 @@
+#!/usr/bin/env python3
+"""
+Soak test for the SSE activity stream (/api/v1/stream) under `wrangler dev`.
+
+Runs the built Worker on the local Workers runtime against a throwaway D1
+(--persist-to a temp dir): applies every migration, seeds one team with
+--users members and an active session each, then
+
+  - opens --clients concurrent stream connections (ramped over --ramp),
+  - sends --heartbeat-rate heartbeats per second across the seeded sessions,
+    each touching a unique marker path,
+  - every --churn seconds drops --churn-fraction of the clients, which
+    reconnect the way the dashboard does (1s, then doubling backoff),
+
+and reports:
+
+  delivery   time from a heartbeat's response to each connected client
+             receiving the activity event carrying its marker (p50/p95/p99),
+             and markers a connected client never received
+  d1         statements per second issued by the stream loops, summed from
+             the `d1=` count in each connection's keepalive comment
+  memory     resident memory of the wrangler/workerd process tree before and
+             after the clients connect, and the difference per connection
+  reconnect  time from drop to the `connected` event (including the 1s retry
+             delay), and how many activity events the fresh connection
+             replays in its first second
+
+Numbers from the local runtime aren't edge numbers (one process, local
+SQLite), but they move when the stream's per-connection work moves, which is
+what a change to the stream should be checked against. Keepalives come every
+15s, so run for at least a minute for D1 rates.
+
+Usage:
+    npm run build
+    python3 bench/stream_soak.py [--clients 100] [--duration 120] [--heartbeat-rate 5] [--json out.json]
+"""
+
+import argparse
+import http.client
+import json
+import os
+import random
+import re
+import shlex
+import signal
+import socket
+import statistics
+import subprocess
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+MIGRATIONS_DIR = ROOT / "migrations"
+
+TEAM_ID = "soak-team"
+TEAM_TOKEN = "soak-team-token"
+READY_TIMEOUT_SECONDS = 60
+REPLAY_WINDOW_SECONDS = 1.0
+# Mirrors useSSE's backoff
+INITIAL_RETRY_SECONDS = 1.0
+MAX_RETRY_SECONDS = 30.0
+
+KEEPALIVE_D1 = re.compile(r"^: keepalive d1=(\d+)")
+
+
+def user_token(i: int) -> str:
+    return f"soak-user-token-{i}"
+
+
+def session_id(i: int) -> str:
+    return f"soak-session-{i}"
+
+
+def seed_sql(users: int) -> str:
+    """One team, `users` members each with a device and an active session in one repo."""
+    lines = [
+        f"INSERT INTO teams (id, name, team_token) VALUES ('{TEAM_ID}', 'Soak', '{TEAM_TOKEN}');",
+        f"INSERT INTO repos (id, team_id, name, remote_url, repo_token) "
+        f"VALUES ('soak-repo', '{TEAM_ID}', 'soak', 'git@example.com:org/soak.git', 'soak-repo-token');",
+    ]
+    for i in range(users):
+        lines += [
+            f"INSERT INTO users (id, team_id, user_token, name) VALUES ('soak-user-{i}', '{TEAM_ID}', "
+            f"'{user_token(i)}', 'Soak {i}');",
+            f"INSERT INTO devices (id, user_id, name, hostname) VALUES ('soak-device-{i}', 'soak-user-{i}', "
+            f"'bench', 'soak-{i}.local');",
+            f"INSERT INTO sessions (id, user_id, device_id, repo_id, branch, worktree, status, started_at, "
+            f"last_activity_at) VALUES ('{session_id(i)}', 'soak-user-{i}', 'soak-device-{i}', 'soak-repo', "
+            f"'main', '/soak', 'active', datetime('now'), datetime('now'));",
+        ]
+    return "\n".join(lines) + "\n"
+
+
+def prepare_database(wrangler: list, persist_to: str, users: int) -> None:
+    seed = Path(persist_to) / "seed.sql"
+    seed.write_text(seed_sql(users))
+    for sql in [*sorted(MIGRATIONS_DIR.glob("*.sql")), seed]:
+        subprocess.run(
+            [*wrangler, "d1", "execute", "overlap-db", "--local", "--persist-to", persist_to, f"--file={sql}"],
+            cwd=ROOT, check=True, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+        )
+
+
+def start_worker(wrangler: list, persist_to: str, port: int) -> subprocess.Popen:
+    process = subprocess.Popen(
+        [*wrangler, "dev", "--port", str(port), "--ip", "127.0.0.1", "--persist-to", persist_to,
+         "--log-level", "error"],
+        cwd=ROOT, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, start_new_session=True,
+    )
+    deadline = time.monotonic() + READY_TIMEOUT_SECONDS
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"wrangler dev exited with {process.returncode}")
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.2):
+                return process
+        except OSError:
+            time.sleep(0.1)
+    stop_worker(process)
+    raise RuntimeError(f"wrangler dev didn't listen on {port} within {READY_TIMEOUT_SECONDS}s")
+
+
+def stop_worker(process: subprocess.Popen) -> None:
+    try:
+        os.killpg(process.pid, signal.SIGTERM)
+        process.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        os.killpg(process.pid, signal.SIGKILL)
+        process.wait()
+    except ProcessLookupError:
+        pass
+
+
+def tree_rss_bytes(pid: int) -> int | None:
+    """Resident memory of a process and its descendants (Linux /proc only)."""
+    try:
+        children: dict[int, list[int]] = {}
+        for entry in os.listdir("/proc"):
+            if not entry.isdigit():
+                continue
+            try:
+                stat = Path(f"/proc/{entry}/stat").read_text()
+            except OSError:
+                continue
+            ppid = int(stat.rsplit(")", 1)[1].split()[1])
+            children.setdefault(ppid, []).append(int(entry))
+        total, pending = 0, [pid]
+        while pending:
+            current = pending.pop()
+            pending.extend(children.get(current, []))
+            try:
+                for line in Path(f"/proc/{current}/status").read_text().splitlines():
+                    if line.startswith("VmRSS:"):
+                        total += int(line.split()[1]) * 1024
+            except OSError:
+                continue
+        return total
+    except OSError:
+        return None
+
+
+class Stats:
+    """Everything the clients and the heartbeat driver record, behind one lock."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.sent: dict[str, float] = {}  # marker -> heartbeat response time
+        self.expected: dict[str, int] = {}  # marker -> clients connected when it was sent
+        self.latencies: list[float] = []
+        self.delivered: dict[str, int] = {}
+        self.connected = 0
+        self.connect_failures = 0
+        self.events = 0
+        self.heartbeats = 0
+        self.heartbeat_errors = 0
+        self.reconnect_seconds: list[float] = []
+        self.replayed: list[int] = []
+        self.d1_by_connection: dict[int, int] = {}  # connection -> latest keepalive count
+
+
+class Client(threading.Thread):
+    """One stream connection, reconnecting like the dashboard when dropped."""
+
+    _ids = iter(range(1 << 62))
+
+    def __init__(self, port: int, token: str, stats: Stats, stop: threading.Event):
+        super().__init__(daemon=True)
+        self.port = port
+        self.token = token
+        self.stats = stats
+        self.stop_event = stop
+        # http.client lets go of the socket once it sees an unbounded response
+        self.sock: socket.socket | None = None
+        self.dropped_at: float | None = None
+
+    def drop(self) -> None:
+        """Cut the connection as a network blip would."""
+        sock = self.sock
+        if sock is not None:
+            self.dropped_at = time.perf_counter()
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+    def run(self) -> None:
+        delay = INITIAL_RETRY_SECONDS
+        while not self.stop_event.is_set():
+            if self._stream():
+                delay = INITIAL_RETRY_SECONDS
+            # useSSE waits out its backoff after any error, a drop included
+            self.stop_event.wait(delay)
+            delay = min(delay * 2, MAX_RETRY_SECONDS)
+
+    def _stream(self) -> bool:
+        """Read one connection until it ends. True if it got as far as `connected`."""
+        stats = self.stats
+        connection_id = next(self._ids)
+        connection = http.client.HTTPConnection("127.0.0.1", self.port, timeout=60)
+        connected_at = None
+        reconnect = False
+        replayed = 0
+        event, data = None, []
+        try:
+            connection.request("GET", "/api/v1/stream", headers={
+                "Accept": "text/event-stream",
+                "Authorization": f"Bearer {self.token}",
+                "X-Team-Token": TEAM_TOKEN,
+            })
+            self.sock = connection.sock
+            response = connection.getresponse()
+            if response.status != 200:
+                with stats.lock:
+                    stats.connect_failures += 1
+                return False
+
+            while not self.stop_event.is_set():
+                raw = response.readline()
+                if not raw:
+                    break
+                line = raw.decode().rstrip("\r\n")
+                if line.startswith(":"):
+                    match = KEEPALIVE_D1.match(line)
+                    if match:
+                        with stats.lock:
+                            stats.d1_by_connection[connection_id] = int(match.group(1))
+                    continue
+                if line.startswith("event:"):
+                    event = line[6:].strip()
+                elif line.startswith("data:"):
+                    data.append(line[5:].strip())
+                elif line == "" and event:
+                    now = time.perf_counter()
+                    if event == "connected":
+                        connected_at = now
+                        with stats.lock:
+                            stats.connected += 1
+                            if self.dropped_at is not None:
+                                stats.reconnect_seconds.append(now - self.dropped_at)
+                        reconnect = self.dropped_at is not None
+                        self.dropped_at = None
+                    elif event == "activity":
+                        live = self._record_activity("\n".join(data), now, since=connected_at)
+                        if not live and connected_at is not None and now - connected_at <= REPLAY_WINDOW_SECONDS:
+                            replayed += 1
+                    event, data = None, []
+            return connected_at is not None
+        except (OSError, http.client.HTTPException):
+            if connected_at is None:
+                with stats.lock:
+                    stats.connect_failures += 1
+            return connected_at is not None
+        finally:
+            if connected_at is not None:
+                with stats.lock:
+                    stats.connected -= 1
+                    if reconnect:
+                        stats.replayed.append(replayed)
+            self.sock = None
+            connection.close()
+
+    def _record_activity(self, payload: str, now: float, since: float | None) -> bool:
+        """Record delivery of any markers in the event. True if one was sent after `since`."""
+        try:
+            files = (json.loads(payload).get("activity") or {}).get("files") or []
+        except json.JSONDecodeError:
+            return False
+        live = False
+        with self.stats.lock:
+            self.stats.events += 1
+            for path in files:
+                sent = self.stats.sent.get(path)
+                if sent is not None:
+                    self.stats.latencies.append(now - sent)
+                    self.stats.delivered[path] = self.stats.delivered.get(path, 0) + 1
+                    live = live or since is None or sent >= since
+        return live
+
+
+def drive_heartbeats(port: int, users: int, rate: float, stats: Stats, stop: threading.Event) -> None:
+    """Send `rate` heartbeats per second round-robin over the seeded sessions."""
+    sequence = 0
+    interval = 1.0 / rate
+    next_at = time.perf_counter()
+    while not stop.is_set():
+        i = sequence % users
+        marker = f"soak/{sequence}.ts"
+        sequence += 1
+        body = json.dumps({"files": [marker], "tool_name": "Edit"})
+        connection = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+        try:
+            connection.request("POST", f"/api/v1/sessions/{session_id(i)}/heartbeat", body=body, headers={
+                "Content-Type": "application/json",
+                "Authorization": f"Bearer {user_token(i)}",
+                "X-Team-Token": TEAM_TOKEN,
+            })
+            response = connection.getresponse()
+            response.read()
+            with stats.lock:
+                if response.status == 200:
+                    stats.heartbeats += 1
+                    stats.sent[marker] = time.perf_counter()
+                    stats.expected[marker] = stats.connected
+                else:
+                    stats.heartbeat_errors += 1
+        except (OSError, http.client.HTTPException):
+            with stats.lock:
+                stats.heartbeat_errors += 1
+        finally:
+            connection.close()
+        next_at += interval
+        stop.wait(max(0.0, next_at - time.perf_counter()))
+
+
+def percentile(values: list, p: float) -> float | None:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))]
+
+
+def ms(value: float | None) -> str:
+    return "n/a" if value is None else f"{value * 1000:.0f}ms"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=100, help="Concurrent stream connections")
+    parser.add_argument("--users", type=int, default=40, help="Seeded team members, one active session each")
+    parser.add_argument("--duration", type=float, default=120, help="Seconds to run after the ramp")
+    parser.add_argument("--ramp", type=float, default=10, help="Seconds over which clients connect")
+    parser.add_argument("--heartbeat-rate", type=float, default=5, help="Heartbeats per second")
+    parser.add_argument("--churn", type=float, default=30, help="Seconds between connection drops (0 = never)")
+    parser.add_argument("--churn-fraction", type=float, default=0.1, help="Share of clients dropped each time")
+    parser.add_argument("--port", type=int, default=8798)
+    parser.add_argument("--wrangler", default="npx wrangler", help="Command that runs wrangler")
+    parser.add_argument("--persist-to", help="Local D1 state dir to use (default: a fresh temp dir)")
+    parser.add_argument("--seed", type=int, default=1, help="Seed for picking which clients to drop")
+    parser.add_argument("--json", type=Path, help="Also write the results here")
+    args = parser.parse_args()
+
+    if not (ROOT / "dist" / "_worker.js").exists():
+        parser.error("no build found; run `npm run build` first")
+    if args.users > 50:
+        # The stream only diffs the team's 50 most recent sessions
+        parser.error("--users must be at most 50")
+
+    wrangler = shlex.split(args.wrangler)
+    persist_to = args.persist_to or tempfile.mkdtemp(prefix="overlap-soak-")
+    rng = random.Random(args.seed)
+
+    print(f"Seeding {args.users} sessions into {persist_to}...")
+    prepare_database(wrangler, persist_to, args.users)
+    worker = start_worker(wrangler, persist_to, args.port)
+    stats = Stats()
+    stop = threading.Event()
+    clients: list[Client] = []
+    try:
+        time.sleep(1)
+        rss_before = tree_rss_bytes(worker.pid)
+
+        print(f"Connecting {args.clients} clients over {args.ramp:.0f}s...")
+        for i in range(args.clients):
+            client = Client(args.port, user_token(i % args.users), stats, stop)
+            client.start()
+            clients.append(client)
+            time.sleep(args.ramp / max(args.clients, 1))
+        time.sleep(2)
+        rss_after = tree_rss_bytes(worker.pid)
+        with stats.lock:
+            connected = stats.connected
+
+        print(f"{connected} connected; running {args.duration:.0f}s at {args.heartbeat_rate:g} heartbeats/s...")
+        driver = threading.Thread(
+            target=drive_heartbeats, args=(args.port, args.users, args.heartbeat_rate, stats, stop), daemon=True
+        )
+        driver.start()
+        started = time.perf_counter()
+        next_churn = started + args.churn if args.churn else float("inf")
+        while time.perf_counter() - started < args.duration:
+            time.sleep(0.5)
+            if time.perf_counter() >= next_churn:
+                for client in rng.sample(clients, max(1, int(len(clients) * args.churn_fraction))):
+                    client.drop()
+                next_churn += args.churn
+        # Let the last events arrive before judging delivery
+        time.sleep(3)
+        elapsed = time.perf_counter() - started
+        rss_end = tree_rss_bytes(worker.pid)
+    finally:
+        stop.set()
+        for client in clients:
+            client.drop()
+        stop_worker(worker)
+
+    with stats.lock:
+        expected = sum(stats.expected.values())
+        delivered = sum(min(stats.delivered.get(m, 0), n) for m, n in stats.expected.items())
+        d1_total = sum(stats.d1_by_connection.values())
+        results = {
+            "clients": args.clients,
+            "connected": connected,
+            "connect_failures": stats.connect_failures,
+            "heartbeats": stats.heartbeats,
+            "heartbeat_errors": stats.heartbeat_errors,
+            "events": stats.events,
+            "delivery_p50_ms": round(percentile(stats.latencies, 50) * 1000) if stats.latencies else None,
+            "delivery_p95_ms": round(percentile(stats.latencies, 95) * 1000) if stats.latencies else None,
+            "delivery_p99_ms": round(percentile(stats.latencies, 99) * 1000) if stats.latencies else None,
+            "delivery_max_ms": round(max(stats.latencies) * 1000) if stats.latencies else None,
+            "deliveries_expected": expected,
+            "deliveries_missed": expected - delivered,
+            # Counts reset with each connection and arrive every 15s, so this undercounts slightly
+            "d1_statements_per_second": round(d1_total / (elapsed + args.ramp), 1) if stats.d1_by_connection else None,
+            "rss_before_mb": round(rss_before / 2**20, 1) if rss_before else None,
+            "rss_connected_mb": round(rss_after / 2**20, 1) if rss_after else None,
+            "rss_end_mb": round(rss_end / 2**20, 1) if rss_end else None,
+            "rss_per_connection_kb": (
+                round((rss_after - rss_before) / max(connected, 1) / 1024, 1) if rss_before and rss_after else None
+            ),
+            "reconnects": len(stats.reconnect_seconds),
+            "reconnect_p50_ms": round(percentile(stats.reconnect_seconds, 50) * 1000) if stats.reconnect_seconds else None,
+            "reconnect_p95_ms": round(percentile(stats.reconnect_seconds, 95) * 1000) if stats.reconnect_seconds else None,
+            "replayed_events_median": statistics.median(stats.replayed) if stats.replayed else None,
+        }
+
+    print()
+    print(f"connections  {results['connected']}/{args.clients} connected, {results['connect_failures']} failed attempts")
+    print(f"heartbeats   {results['heartbeats']} sent, {results['heartbeat_errors']} errors")
+    print(f"delivery     p50 {ms(percentile(stats.latencies, 50))}  p95 {ms(percentile(stats.latencies, 95))}  "
+          f"p99 {ms(percentile(stats.latencies, 99))}  max {ms(max(stats.latencies) if stats.latencies else None)}")
+    print(f"             {results['deliveries_missed']} of {expected} deliveries missed")
+    print(f"d1           {results['d1_statements_per_second']} statements/s from stream loops")
+    print(f"memory       {results['rss_before_mb']} MB idle, {results['rss_connected_mb']} MB connected, "
+          f"{results['rss_end_mb']} MB at end; {results['rss_per_connection_kb']} KB per connection")
+    print(f"reconnect    {results['reconnects']} reconnects, p50 {results['reconnect_p50_ms']}ms, "
+          f"p95 {results['reconnect_p95_ms']}ms; {results['replayed_events_median']} events replayed (median)")
+
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2) + "\n")
+        print(f"\nSaved {args.json}")
+
+
+if __name__ == "__main__":
+    main()
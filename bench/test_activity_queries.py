@@ -0,0 +1,95 @@
+"""
+recordActivity's SQL, read out of queries.ts and run against the migrations
+in SQLite, statement by statement in the order the function batches them.
+"""
+
+import sqlite3
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import dataset  # noqa: E402
+from queries import QUERIES_TS, QueriesSource  # noqa: E402
+
+SESSION = "session-1"
+FILES = '["src/billing/invoice.ts"]'
+
+src = QueriesSource(QUERIES_TS)
+
+
+@pytest.fixture
+def conn():
+    conn = sqlite3.connect(":memory:")
+    dataset.apply_migrations(conn)
+    conn.execute("INSERT INTO sessions (id, user_id, device_id) VALUES (?, 'user-1', 'device-1')", (SESSION,))
+    return conn
+
+
+def create_activity(conn, activity_id: str, files: str, scope: str, summary: str) -> None:
+    insert = src.template("createActivity", "INSERT INTO activity")
+    update = src.template("createActivity", "latest_activity_id = ?")
+    conn.execute(insert, (activity_id, SESSION, files, scope, summary))
+    conn.execute(update, (activity_id, scope, summary, SESSION))
+
+
+def record_activity(conn, activity_id: str, files: str, scope: str, summary: str, client_summary: bool) -> dict:
+    """What recordActivity returns, or None where it would fall through to createActivity."""
+    merge = src.template("recordActivity", "UPDATE activity")
+    session_summary = src.template("recordActivity", "latest_summary = ?")
+    new_summary = summary if client_summary else None
+
+    row = conn.execute(merge, (new_summary, SESSION, files)).fetchone()
+    conn.execute(session_summary, (new_summary, SESSION, new_summary, new_summary, files))
+    if row is None:
+        create_activity(conn, activity_id, files, scope, summary)
+        return {"activityId": activity_id, "merged": False, "summary": summary}
+    return {"activityId": row[0], "merged": True, "summary": row[2]}
+
+
+def session_summary(conn) -> tuple:
+    return conn.execute(
+        "SELECT latest_summary, classification_revision FROM sessions WHERE id = ?", (SESSION,)
+    ).fetchone()
+
+
+def test_new_client_summary_replaces_merged_summary(conn):
+    create_activity(conn, "a1", FILES, "billing", "Fix invoice totals · Edit")
+
+    recorded = record_activity(conn, "a2", FILES, "billing", "Add a currency column · Read → Edit", True)
+
+    assert recorded == {"activityId": "a1", "merged": True, "summary": "Add a currency column · Read → Edit"}
+    assert conn.execute("SELECT summary, heartbeat_count FROM activity WHERE id = 'a1'").fetchone() == (
+        "Add a currency column · Read → Edit",
+        2,
+    )
+    assert session_summary(conn) == ("Add a currency column · Read → Edit", 1)
+
+
+def test_unchanged_client_summary_doesnt_bump_revision(conn):
+    create_activity(conn, "a1", FILES, "billing", "Fix invoice totals · Edit")
+
+    record_activity(conn, "a2", FILES, "billing", "Fix invoice totals · Edit", True)
+
+    assert session_summary(conn) == ("Fix invoice totals · Edit", 0)
+
+
+def test_heuristic_summary_keeps_stored_summary(conn):
+    # The stored summary may be the LLM's; a heuristic one never replaces it
+    create_activity(conn, "a1", FILES, "billing", "Reworking invoice rounding")
+
+    recorded = record_activity(conn, "a2", FILES, "billing", "Editing invoice.ts", False)
+
+    assert recorded["summary"] == "Reworking invoice rounding"
+    assert session_summary(conn) == ("Reworking invoice rounding", 0)
+
+
+def test_different_files_start_a_new_row(conn):
+    create_activity(conn, "a1", FILES, "billing", "Fix invoice totals · Edit")
+
+    recorded = record_activity(conn, "a2", '["src/billing/tax.ts"]', "billing", "Fix tax · Edit", True)
+
+    assert recorded["merged"] is False
+    assert session_summary(conn) == ("Fix tax · Edit", 0)
@@ -0,0 +1,31 @@
+-- ============================================================================
+-- OVERLAP DATABASE MIGRATION 002
+-- Denormalized latest-activity pointer on sessions.
+--
+-- Timeline, repo and session detail queries used to compute each session's
+-- latest activity with ROW_NUMBER() over the whole activity table. Sessions
+-- now carry a pointer to their latest activity row (plus its scope/summary),
+-- maintained by createActivity() on heartbeat ingestion.
+-- ============================================================================
+
+ALTER TABLE sessions ADD COLUMN latest_activity_id TEXT;
+ALTER TABLE sessions ADD COLUMN latest_semantic_scope TEXT;
+ALTER TABLE sessions ADD COLUMN latest_summary TEXT;
+
+-- Supports the backfill below and per-session activity listings
+CREATE INDEX IF NOT EXISTS idx_activity_session_created ON activity(session_id, created_at DESC);
+
+-- Backfill pointers for existing sessions
+UPDATE sessions
+SET latest_activity_id = (
+    SELECT a.id FROM activity a
+    WHERE a.session_id = sessions.id
+    ORDER BY a.created_at DESC, a.rowid DESC
+    LIMIT 1
+)
+WHERE latest_activity_id IS NULL;
+
+UPDATE sessions
+SET latest_semantic_scope = (SELECT a.semantic_scope FROM activity a WHERE a.id = sessions.latest_activity_id),
+    latest_summary = (SELECT a.summary FROM activity a WHERE a.id = sessions.latest_activity_id)
+WHERE latest_activity_id IS NOT NULL;
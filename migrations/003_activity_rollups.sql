@@ -0,0 +1,28 @@
+-- ============================================================================
+-- OVERLAP DATABASE MIGRATION 003
+-- Activity write deduplication and rollups.
+--
+-- Heartbeats whose files and scope match the session's latest activity row are
+-- merged into it (heartbeat_count / last_seen_at) instead of inserting a new row.
+-- Old activity can be compacted into one rollup row per session.
+-- ============================================================================
+
+ALTER TABLE activity ADD COLUMN heartbeat_count INTEGER DEFAULT 1;
+ALTER TABLE activity ADD COLUMN last_seen_at TEXT;
+
+UPDATE activity SET last_seen_at = created_at WHERE last_seen_at IS NULL;
+
+-- ============================================================================
+-- ACTIVITY ROLLUPS
+-- Per-session summary of activity rows removed by compaction.
+-- ============================================================================
+CREATE TABLE IF NOT EXISTS activity_rollups (
+    session_id TEXT PRIMARY KEY REFERENCES sessions(id) ON DELETE CASCADE,
+    activity_count INTEGER NOT NULL DEFAULT 0,   -- activity rows folded in
+    heartbeat_count INTEGER NOT NULL DEFAULT 0,  -- heartbeats those rows represented
+    files TEXT NOT NULL DEFAULT '[]',            -- JSON array of distinct file paths
+    scopes TEXT NOT NULL DEFAULT '[]',           -- JSON array of distinct semantic scopes
+    first_activity_at TEXT,
+    last_activity_at TEXT,
+    updated_at TEXT DEFAULT (datetime('now'))
+);
@@ -0,0 +1,11 @@
+-- ============================================================================
+-- OVERLAP DATABASE MIGRATION 004
+-- Speculative session registration.
+--
+-- The plugin registers sessions in the background at SessionStart instead of
+-- on first tool use. Such sessions are flagged speculative and hidden from
+-- listings until their first heartbeat; ones that never see a tool use are
+-- ended after a grace period.
+-- ============================================================================
+
+ALTER TABLE sessions ADD COLUMN speculative INTEGER NOT NULL DEFAULT 0;
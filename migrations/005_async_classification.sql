@@ -0,0 +1,10 @@
+-- ============================================================================
+-- OVERLAP DATABASE MIGRATION 005
+-- Asynchronous heartbeat classification.
+--
+-- Heartbeats are recorded with a heuristic scope and reclassified by the LLM
+-- in the background. Each reclassification of a session's latest activity
+-- bumps classification_revision so the live stream notices the change.
+-- ============================================================================
+
+ALTER TABLE sessions ADD COLUMN classification_revision INTEGER NOT NULL DEFAULT 0;
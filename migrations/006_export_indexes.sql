@@ -0,0 +1,11 @@
+-- ============================================================================
+-- OVERLAP DATABASE MIGRATION 006
+-- Bulk export indexes.
+--
+-- The admin NDJSON export walks sessions by (started_at, id) and activity by
+-- (created_at, id) in ascending keyset order; these indexes let each page seek
+-- straight to its cursor instead of sorting the table.
+-- ============================================================================
+
+CREATE INDEX IF NOT EXISTS idx_sessions_started_id ON sessions(started_at, id);
+CREATE INDEX IF NOT EXISTS idx_activity_created_id ON activity(created_at, id);
@@ -0,0 +1,54 @@
+-- ============================================================================
+-- OVERLAP DATABASE MIGRATION 007
+-- Full-text search over plugin logs and activity.
+--
+-- External-content FTS5 indexes: the text lives in plugin_logs/activity and
+-- triggers keep the index in step with inserts, reclassification, retention
+-- deletes and cascades. Activity's index only updates when summary or scope
+-- change, not on every merged heartbeat.
+-- ============================================================================
+
+CREATE VIRTUAL TABLE IF NOT EXISTS plugin_logs_fts USING fts5(
+    message, data, error,
+    content='plugin_logs', content_rowid='rowid'
+);
+
+CREATE TRIGGER IF NOT EXISTS plugin_logs_fts_insert AFTER INSERT ON plugin_logs BEGIN
+    INSERT INTO plugin_logs_fts(rowid, message, data, error)
+    VALUES (new.rowid, new.message, new.data, new.error);
+END;
+
+CREATE TRIGGER IF NOT EXISTS plugin_logs_fts_delete AFTER DELETE ON plugin_logs BEGIN
+    INSERT INTO plugin_logs_fts(plugin_logs_fts, rowid, message, data, error)
+    VALUES ('delete', old.rowid, old.message, old.data, old.error);
+END;
+
+CREATE VIRTUAL TABLE IF NOT EXISTS activity_fts USING fts5(
+    summary, semantic_scope,
+    content='activity', content_rowid='rowid'
+);
+
+CREATE TRIGGER IF NOT EXISTS activity_fts_insert AFTER INSERT ON activity BEGIN
+    INSERT INTO activity_fts(rowid, summary, semantic_scope)
+    VALUES (new.rowid, new.summary, new.semantic_scope);
+END;
+
+CREATE TRIGGER IF NOT EXISTS activity_fts_delete AFTER DELETE ON activity BEGIN
+    INSERT INTO activity_fts(activity_fts, rowid, summary, semantic_scope)
+    VALUES ('delete', old.rowid, old.summary, old.semantic_scope);
+END;
+
+CREATE TRIGGER IF NOT EXISTS activity_fts_update AFTER UPDATE OF summary, semantic_scope ON activity BEGIN
+    INSERT INTO activity_fts(activity_fts, rowid, summary, semantic_scope)
+    VALUES ('delete', old.rowid, old.summary, old.semantic_scope);
+    INSERT INTO activity_fts(rowid, summary, semantic_scope)
+    VALUES (new.rowid, new.summary, new.semantic_scope);
+END;
+
+-- Index existing rows
+INSERT INTO plugin_logs_fts(plugin_logs_fts) VALUES ('rebuild');
+INSERT INTO activity_fts(activity_fts) VALUES ('rebuild');
+
+-- Filters on the logs page (hook, session, time range)
+CREATE INDEX IF NOT EXISTS idx_plugin_logs_hook_created ON plugin_logs(hook, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_plugin_logs_session_created ON plugin_logs(session_id, created_at DESC, id DESC);
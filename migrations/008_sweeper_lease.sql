@@ -0,0 +1,24 @@
+-- ============================================================================
+-- OVERLAP DATABASE MIGRATION 008
+-- Single-runner stale-session sweeper.
+--
+-- leases: named time-limited locks; the stale sweeper takes one per interval
+-- so only one isolate sweeps, however many requests or dashboards trigger it.
+-- change_feed: session status changes made outside a request for that session
+-- (stale/ended by the sweeper), so live streams notice and push them.
+-- ============================================================================
+
+CREATE TABLE IF NOT EXISTS leases (
+    name TEXT PRIMARY KEY,
+    holder TEXT NOT NULL,
+    expires_at TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS change_feed (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    kind TEXT NOT NULL,          -- 'stale' or 'ended'
+    session_ids TEXT NOT NULL,   -- JSON array
+    created_at TEXT DEFAULT (datetime('now'))
+);
+
+CREATE INDEX IF NOT EXISTS idx_change_feed_created ON change_feed(created_at);
@@ -0,0 +1,15 @@
+-- ============================================================================
+-- OVERLAP DATABASE MIGRATION 009
+-- Per-session path interning for the plugin wire format.
+--
+-- The plugin sends each file path in full once per session, numbered, and
+-- refers to it by number afterwards. Rows go with their session; if a
+-- reference is missing the plugin resends its paths in full.
+-- ============================================================================
+
+CREATE TABLE IF NOT EXISTS session_paths (
+    session_id TEXT NOT NULL REFERENCES sessions(id) ON DELETE CASCADE,
+    ref INTEGER NOT NULL,
+    path TEXT NOT NULL,
+    PRIMARY KEY (session_id, ref)
+) WITHOUT ROWID;
@@ -0,0 +1,47 @@
+-- ============================================================================
+-- OVERLAP DATABASE MIGRATION 010
+-- Incrementally maintained rollups behind the team and repo insights views.
+--
+-- Each heartbeat in a repo adds to its user's per-day counter for every
+-- directory it touched and to the repo's hourly bucket, and counts one
+-- overlap against every other user who touched one of those directories
+-- within the last 30 minutes. The insights API only reads these tables, so
+-- its cost follows the size of the window asked for rather than the amount of
+-- activity ever recorded. Counting starts when this migration is applied;
+-- existing activity isn't backfilled.
+-- ============================================================================
+
+-- Heartbeats per directory (parent directory of each file, '.' for the repo
+-- root), user and UTC day. last_activity_at is what the overlap check reads.
+CREATE TABLE IF NOT EXISTS directory_hotspots (
+    repo_id TEXT NOT NULL REFERENCES repos(id) ON DELETE CASCADE,
+    day TEXT NOT NULL,                                   -- YYYY-MM-DD
+    directory TEXT NOT NULL,
+    user_id TEXT NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    heartbeat_count INTEGER NOT NULL DEFAULT 0,
+    last_activity_at TEXT NOT NULL,
+    PRIMARY KEY (repo_id, day, directory, user_id)
+) WITHOUT ROWID;
+
+-- User x user overlap counts per directory and day. Each pair is stored once,
+-- with user_a < user_b.
+CREATE TABLE IF NOT EXISTS user_overlaps (
+    team_id TEXT NOT NULL REFERENCES teams(id),
+    day TEXT NOT NULL,                                   -- YYYY-MM-DD
+    repo_id TEXT NOT NULL REFERENCES repos(id) ON DELETE CASCADE,
+    user_a TEXT NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    user_b TEXT NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    directory TEXT NOT NULL,
+    overlap_count INTEGER NOT NULL DEFAULT 0,
+    last_overlap_at TEXT NOT NULL,
+    PRIMARY KEY (team_id, day, repo_id, user_a, user_b, directory)
+) WITHOUT ROWID;
+
+-- Heartbeats per repo, user and UTC hour
+CREATE TABLE IF NOT EXISTS repo_activity_hourly (
+    repo_id TEXT NOT NULL REFERENCES repos(id) ON DELETE CASCADE,
+    hour TEXT NOT NULL,                                  -- YYYY-MM-DD HH:00:00
+    user_id TEXT NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    heartbeat_count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (repo_id, hour, user_id)
+) WITHOUT ROWID;
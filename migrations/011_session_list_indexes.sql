@@ -0,0 +1,12 @@
+-- ============================================================================
+-- OVERLAP DATABASE MIGRATION 011
+-- Keyset pagination indexes for session listings.
+--
+-- The team and repo feeds page through sessions by status and
+-- (last_activity_at, id), newest first, and the personal timeline pages a
+-- user's sessions by (started_at, id). These indexes let each page seek
+-- straight to its cursor instead of sorting the table.
+-- ============================================================================
+
+CREATE INDEX IF NOT EXISTS idx_sessions_status_last_activity ON sessions(status, last_activity_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_sessions_user_started ON sessions(user_id, started_at DESC, id DESC);
@@ -0,0 +1,27 @@
+-- ============================================================================
+-- OVERLAP DATABASE MIGRATION 012
+-- Paths touched by active sessions, per repo, for subtree overlap checks.
+--
+-- Heartbeats add their (normalized) paths; a session's rows are dropped when
+-- it goes stale or ends, and come back with its next heartbeat. Ordered by
+-- (repo_id, path), "who is active under src/billing/ in this repo" is one
+-- index range scan, path >= 'src/billing/' AND path < 'src/billing0', that
+-- reads only the paths below that directory.
+-- ============================================================================
+
+CREATE TABLE IF NOT EXISTS active_paths (
+    repo_id TEXT NOT NULL REFERENCES repos(id) ON DELETE CASCADE,
+    path TEXT NOT NULL,
+    session_id TEXT NOT NULL REFERENCES sessions(id) ON DELETE CASCADE,
+    PRIMARY KEY (repo_id, path, session_id)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS idx_active_paths_session ON active_paths(session_id);
+
+-- Index what currently active sessions have touched
+INSERT OR IGNORE INTO active_paths (repo_id, path, session_id)
+SELECT s.repo_id, je.value, s.id
+FROM sessions s
+JOIN activity a ON a.session_id = s.id
+JOIN json_each(a.files) je
+WHERE s.status = 'active' AND s.repo_id IS NOT NULL;
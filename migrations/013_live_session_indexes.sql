@@ -0,0 +1,19 @@
+-- ============================================================================
+-- OVERLAP DATABASE MIGRATION 013
+-- Ordered indexes over live sessions for the team, user and repo feeds.
+--
+-- The feeds list sessions that aren't ended or speculative, newest activity
+-- first, paging on (last_activity_at, id). idx_sessions_status_last_activity
+-- (011) can't return them in that order for status IN ('active', 'stale'), so
+-- each page was sorted in a temp B-tree. These partial indexes cover only live
+-- sessions, already in feed order: a page is a seek to its cursor and a read
+-- of the next rows. The queries repeat the index's WHERE terms verbatim so
+-- SQLite can use them.
+-- ============================================================================
+
+CREATE INDEX IF NOT EXISTS idx_sessions_live_last_activity ON sessions(last_activity_at DESC, id DESC)
+    WHERE status != 'ended' AND speculative = 0;
+CREATE INDEX IF NOT EXISTS idx_sessions_live_user ON sessions(user_id, last_activity_at DESC, id DESC)
+    WHERE status != 'ended' AND speculative = 0;
+CREATE INDEX IF NOT EXISTS idx_sessions_live_repo ON sessions(repo_id, last_activity_at DESC, id DESC)
+    WHERE status != 'ended' AND speculative = 0;
@@ -2,20 +2,151 @@
 Overlap API client.
 
 Simple HTTP client for communicating with the Overlap server.
+
+Request bodies go out as compact JSON, gzip-compressed once the server has
+advertised that it accepts that (Accept-Encoding on its responses, remembered
+in wire.json). When the server also advertises path-refs, file lists sent
+for a session are interned: each path goes in full once, numbered, and as its
+number afterwards. If the server has lost a session's numbers it answers 409
+and the request is resent with every path in full.
 """
 
+import gzip
 import json
 import os
 import socket
 import subprocess
 import sys
 import time
+import zlib
 from typing import Optional
 from urllib.request import Request, urlopen
 from urllib.error import URLError, HTTPError
 
 from config import get_config
+from deadline import DeadlineExceeded, MIN_REQUEST_SECONDS, current as current_deadline
 import logger
+import metrics
+
+# Cap for git/system subprocesses; shortened further by the hook deadline
+SUBPROCESS_TIMEOUT_SECONDS = 2
+
+# Smaller bodies aren't worth compressing
+COMPRESS_MIN_BYTES = 512
+
+# How long, at most, a hook waits for a registration another process has in
+# flight, and how often it looks
+REGISTRATION_WAIT_SECONDS = 2
+REGISTRATION_POLL_SECONDS = 0.1
+
+# Sent by the server (409) when a request refers to a path number it doesn't have
+UNKNOWN_PATH_REF_ERROR = "Unknown path reference"
+
+_wire_support: Optional[dict] = None
+
+
+class PathsOutOfSync(Exception):
+    """The server doesn't know a path number this session sent."""
+
+
+def _server_url() -> str:
+    return (get_config().get("server_url") or "").rstrip("/")
+
+
+def wire_support() -> dict:
+    """Request encodings and features the server last advertised (cached per process)."""
+    global _wire_support
+    if _wire_support is None:
+        from config import get_wire_support
+        _wire_support = get_wire_support(_server_url())
+    return _wire_support
+
+
+def record_wire_support(headers) -> None:
+    """Remember what a response from the server says it accepts."""
+    global _wire_support
+    if headers is None:
+        return
+
+    def tokens(name: str) -> list:
+        return [t.strip().lower() for t in (headers.get(name) or "").split(",") if t.strip()]
+
+    encodings, features = tokens("Accept-Encoding"), tokens("X-Overlap-Features")
+    current = wire_support()
+    if current.get("encodings", []) == encodings and current.get("features", []) == features:
+        return
+    from config import save_wire_support
+    save_wire_support(_server_url(), encodings, features)
+    _wire_support = {"encodings": encodings, "features": features}
+
+
+def encode_body(data: dict, endpoint: str, raw_size: Optional[int] = None) -> tuple[bytes, dict]:
+    """
+    Compact JSON body for `data`, compressed if the server accepts it. Returns
+    (body, extra headers). Counts the bytes before (raw_size, if the data was
+    already shrunk by interning) and after encoding.
+    """
+    body = json.dumps(data, separators=(",", ":")).encode()
+    if raw_size is None:
+        raw_size = len(body)
+    headers = {}
+    if len(body) >= COMPRESS_MIN_BYTES:
+        encodings = wire_support().get("encodings", [])
+        if "gzip" in encodings:
+            body, headers = gzip.compress(body, mtime=0), {"Content-Encoding": "gzip"}
+        elif "deflate" in encodings:
+            body, headers = zlib.compress(body), {"Content-Encoding": "deflate"}
+
+    labels = {"endpoint": metrics.endpoint_label(endpoint)}
+    metrics.inc("overlap_api_request_body_bytes_total", labels, raw_size)
+    metrics.inc("overlap_api_request_wire_bytes_total", labels, len(body))
+    return body, headers
+
+
+def _intern_files(data: Optional[dict], paths_session: Optional[str]) -> Optional[dict]:
+    """`data` with its files interned for paths_session, if the server supports it."""
+    if not paths_session or not data or not data.get("files") or "path-refs" not in wire_support().get("features", []):
+        return data
+    from config import intern_paths
+    try:
+        files, defs = intern_paths(paths_session, data["files"])
+    except DeadlineExceeded:
+        return data  # No time to wait for the table; send paths in full
+    interned = {**data, "files": files}
+    if defs:
+        interned["path_defs"] = defs
+    return interned
+
+
+def _build_request(
+    method: str,
+    endpoint: str,
+    data: Optional[dict] = None,
+    headers: Optional[dict] = None,
+    raw_size: Optional[int] = None,
+) -> Request:
+    """Authenticated request for an API endpoint, its body encoded by encode_body."""
+    config = get_config()
+
+    if not config.get("server_url"):
+        logger.warn("API request skipped - no server_url configured", endpoint=endpoint)
+        raise Exception("Overlap server URL not configured")
+
+    url = f"{config['server_url'].rstrip('/')}{endpoint}"
+
+    request_headers = {
+        "Content-Type": "application/json",
+        "Authorization": f"Bearer {config.get('user_token', '')}",
+        "X-Team-Token": config.get("team_token", ""),
+        "User-Agent": "Overlap-Plugin/1.0 (Claude Code; +https://github.com/overlapcode/overlap)",
+        **(headers or {}),
+    }
+
+    body = None
+    if data:
+        body, encoding_headers = encode_body(data, endpoint, raw_size)
+        request_headers.update(encoding_headers)
+    return Request(url, data=body, headers=request_headers, method=method)
 
 
 def api_request(
@@ -25,6 +156,7 @@ def api_request(
     timeout: int = 5,
     retries: int = 0,
     backoff_base: float = 0.5,
+    paths_session: Optional[str] = None,
 ) -> dict:
     """
     Make an API request to the Overlap server.
@@ -33,65 +165,168 @@ def api_request(
         method: HTTP method (GET, POST, etc.)
         endpoint: API endpoint (e.g., /api/v1/sessions/start)
         data: JSON data to send (for POST/PUT)
-        timeout: Request timeout in seconds
+        timeout: Request timeout in seconds, capped by the hook deadline
         retries: Number of retry attempts (0 = single attempt)
         backoff_base: Base delay for exponential backoff
+        paths_session: Server session ID to intern data["files"] for
 
     Returns:
         Response data as dict
 
     Raises:
+        DeadlineExceeded: If the hook deadline leaves no time for the request,
+            or for a retry after a failed attempt
         Exception: If request fails after all attempts
     """
-    config = get_config()
-
-    if not config.get("server_url"):
-        logger.warn("API request skipped - no server_url configured", endpoint=endpoint)
-        raise Exception("Overlap server URL not configured")
-
-    url = f"{config['server_url'].rstrip('/')}{endpoint}"
+    try:
+        return _send_request(method, endpoint, data, timeout, retries, backoff_base, paths_session)
+    except PathsOutOfSync:
+        from config import forget_paths
+        logger.info("Server lost interned paths, resending in full", overlap_session_id=paths_session)
+        metrics.inc("overlap_path_resyncs_total")
+        forget_paths(paths_session)
+        return _send_request(method, endpoint, data, timeout, retries, backoff_base, paths_session)
 
-    headers = {
-        "Content-Type": "application/json",
-        "Authorization": f"Bearer {config.get('user_token', '')}",
-        "X-Team-Token": config.get("team_token", ""),
-        "User-Agent": "Overlap-Plugin/1.0 (Claude Code; +https://github.com/overlapcode/overlap)",
-    }
 
-    body = json.dumps(data).encode() if data else None
-    request = Request(url, data=body, headers=headers, method=method)
+def _send_request(
+    method: str,
+    endpoint: str,
+    data: Optional[dict],
+    timeout: int,
+    retries: int,
+    backoff_base: float,
+    paths_session: Optional[str],
+) -> dict:
+    """One api_request: attempts with backoff. Raises PathsOutOfSync for a resync."""
+    raw_size = len(json.dumps(data, separators=(",", ":"))) if data else 0
+    request = _build_request(method, endpoint, _intern_files(data, paths_session), raw_size=raw_size)
+    url, body = request.full_url, request.data
 
+    deadline = current_deadline()
+    endpoint_label = metrics.endpoint_label(endpoint)
     last_error = None
     for attempt in range(retries + 1):
         if attempt > 0:
-            time.sleep(backoff_base * (2 ** (attempt - 1)))
+            metrics.inc("overlap_api_retries_total", {"endpoint": endpoint_label})
+            delay = backoff_base * (2 ** (attempt - 1))
+            if not deadline.has(delay + MIN_REQUEST_SECONDS):
+                logger.warn("Retry skipped, hook deadline too close",
+                            endpoint=endpoint, remaining_s=round(deadline.remaining(), 2))
+                raise DeadlineExceeded(f"No time left to retry: {last_error}")
+            time.sleep(delay)
+
+        attempt_timeout = deadline.timeout(timeout)
 
-        req_ctx = logger.log_request(method, url, len(body) if body else 0)
+        req_ctx = logger.log_request(method, url, raw_size, len(body) if body else 0)
         req_ctx.log_start()
+        started_at = time.monotonic()
+
+        def record_attempt(status: int) -> None:
+            labels = {"endpoint": endpoint_label, "status": status}
+            metrics.inc("overlap_api_requests_total", labels)
+            metrics.observe("overlap_api_request_duration_seconds", time.monotonic() - started_at,
+                            {"endpoint": endpoint_label})
 
         try:
-            with urlopen(request, timeout=timeout) as response:
+            with urlopen(request, timeout=attempt_timeout) as response:
                 response_data = json.loads(response.read().decode())
-                req_ctx.log_success(response.status)
+                record_attempt(response.status)
+                record_wire_support(response.headers)
+                req_ctx.log_success(response.status, response.headers.get("Server-Timing"))
                 return response_data
         except HTTPError as e:
             error_body = e.read().decode()
-            req_ctx.log_error(e.code)
+            record_attempt(e.code)
+            record_wire_support(e.headers)
+            req_ctx.log_error(e.code, server_timing=e.headers.get("Server-Timing"))
             # Don't retry on client errors (4xx)
             if 400 <= e.code < 500:
                 try:
                     error_data = json.loads(error_body)
-                    raise Exception(error_data.get("error", f"HTTP {e.code}"))
                 except json.JSONDecodeError:
                     raise Exception(f"HTTP {e.code}: {error_body}")
+                if e.code == 409 and paths_session and error_data.get("error") == UNKNOWN_PATH_REF_ERROR:
+                    raise PathsOutOfSync()
+                raise Exception(error_data.get("error", f"HTTP {e.code}"))
             last_error = Exception(f"HTTP {e.code}: {error_body}")
         except (URLError, socket.timeout) as e:
+            record_attempt(0)
             req_ctx.log_error(0, exc=e)
             last_error = Exception(f"Connection error: {e}")
+            if attempt_timeout < timeout:
+                # Would likely have succeeded with its full timeout; let the caller defer it
+                raise DeadlineExceeded(f"Request cut short by hook deadline: {last_error}")
 
     raise last_error
 
 
+def api_stream(endpoint: str, timeout: int = 60, headers: Optional[dict] = None):
+    """
+    Open a GET request whose body the caller reads incrementally (e.g. NDJSON).
+    Returns the open response; use it as a context manager. Not retried.
+
+    Raises:
+        Exception: On HTTP errors, with the server's error message for 4xx
+    """
+    request = _build_request("GET", endpoint, headers=headers)
+    try:
+        return urlopen(request, timeout=timeout)
+    except HTTPError as e:
+        error_body = e.read().decode(errors="replace")
+        try:
+            raise Exception(json.loads(error_body).get("error", f"HTTP {e.code}"))
+        except json.JSONDecodeError:
+            raise Exception(f"HTTP {e.code}: {error_body}")
+
+
+def replay_deferred_requests(transcript_path: Optional[str] = None, reserve_seconds: float = 0) -> int:
+    """
+    Send requests earlier hooks deferred past their deadline, oldest first,
+    while the current hook's budget allows, keeping reserve_seconds of it for
+    the caller's own work. Requests that aren't sent are put back. Returns the
+    number sent.
+    """
+    from config import get_session_for_transcript, restore_deferred_requests, take_deferred_requests
+
+    try:
+        pending = take_deferred_requests(transcript_path)
+    except DeadlineExceeded:
+        return 0
+
+    deadline = current_deadline()
+    sent = 0
+    for index, request in enumerate(pending):
+        if not deadline.has(reserve_seconds + MIN_REQUEST_SECONDS):
+            restore_deferred_requests(pending[index:])
+            break
+
+        endpoint = request["endpoint"]
+        overlap_session_id = None
+        if "{overlap_session_id}" in endpoint:
+            overlap_session_id = get_session_for_transcript(request.get("transcript_path") or "")
+            if not overlap_session_id:
+                # Session not re-registered yet; keep it for a later hook
+                restore_deferred_requests([request])
+                continue
+            endpoint = endpoint.replace("{overlap_session_id}", overlap_session_id)
+
+        try:
+            api_request(request["method"], endpoint, request.get("data"),
+                        timeout=min(3, deadline.remaining() - reserve_seconds), retries=0,
+                        paths_session=overlap_session_id)
+            sent += 1
+        except DeadlineExceeded:
+            restore_deferred_requests(pending[index:])
+            break
+        except Exception as e:
+            # Server rejected or unreachable: drop it rather than retry forever
+            logger.warn("Deferred request failed, dropping", endpoint=endpoint, error=str(e))
+
+    if sent:
+        logger.info("Replayed deferred requests", count=sent)
+    return sent
+
+
 def get_hostname() -> str:
     """Get the current machine's hostname."""
     return socket.gethostname()
@@ -106,11 +341,11 @@ def get_device_name() -> str:
             ["scutil", "--get", "ComputerName"],
             capture_output=True,
             text=True,
-            timeout=2
+            timeout=current_deadline().timeout(SUBPROCESS_TIMEOUT_SECONDS, minimum=0.1)
         )
         if result.returncode == 0 and result.stdout.strip():
             return result.stdout.strip()
-    except (subprocess.TimeoutExpired, FileNotFoundError):
+    except (subprocess.TimeoutExpired, FileNotFoundError, DeadlineExceeded):
         pass
     return hostname
 
@@ -130,7 +365,7 @@ def get_git_info(cwd: str) -> dict:
             capture_output=True,
             text=True,
             cwd=cwd,
-            timeout=2
+            timeout=current_deadline().timeout(SUBPROCESS_TIMEOUT_SECONDS, minimum=0.1)
         )
         if result.returncode == 0:
             info["remote_url"] = result.stdout.strip()
@@ -148,14 +383,14 @@ def get_git_info(cwd: str) -> dict:
             capture_output=True,
             text=True,
             cwd=cwd,
-            timeout=2
+            timeout=current_deadline().timeout(SUBPROCESS_TIMEOUT_SECONDS, minimum=0.1)
         )
         if result.returncode == 0:
             info["branch"] = result.stdout.strip()
         else:
             logger.debug("Git branch not found", cwd=cwd, stderr=result.stderr.strip())
 
-    except subprocess.TimeoutExpired:
+    except (subprocess.TimeoutExpired, DeadlineExceeded):
         logger.warn("Git command timed out", cwd=cwd)
     except FileNotFoundError:
         logger.debug("Git not installed or not in PATH")
@@ -173,15 +408,102 @@ def is_remote_session() -> bool:
     return False
 
 
-def register_pending_session(transcript_path: str) -> str | None:
+def register_pending_session(
+    transcript_path: str,
+    speculative: bool = False,
+    claim: Optional[str] = None,
+) -> str | None:
     """
     Register a pending session with the server.
 
-    This is called lazily on first tool use (PreToolUse or PostToolUse)
-    to filter out ghost sessions that never do actual work.
+    Normally called from the background process spawned at SessionStart with
+    speculative=True: the server hides the session until its first heartbeat
+    and ends it if that never comes, which filters out ghost sessions that
+    never do actual work. Tool-use hooks fall back to registering it
+    themselves if the background registration hasn't started, and wait for it
+    if it's in flight. `claim` is the registration claim the spawning hook took.
+    """
+    overlap_session_id, _ = _register_pending_session(transcript_path, speculative=speculative, claim=claim)
+    return overlap_session_id
+
+
+def spawn_background_registration(transcript_path: str) -> None:
+    """
+    Register the pending session in a detached process so SessionStart returns
+    immediately and the first tool use doesn't pay for the round trip.
+
+    The registration is claimed before spawning, so a tool-use hook that runs
+    before the detached process gets going waits for it instead of sending a
+    second /sessions/start.
+    """
+    from config import claim_pending_registration, release_pending_registration
+
+    try:
+        claim = claim_pending_registration(transcript_path)
+    except DeadlineExceeded as e:
+        logger.warn("Registration not claimed, leaving it to the first tool use", error=str(e))
+        return
+    if claim is None:
+        logger.info("Registration already in flight", transcript_path=transcript_path)
+        return
+
+    script = os.path.join(os.path.dirname(os.path.abspath(__file__)), "session-register.py")
+    try:
+        subprocess.Popen(
+            [sys.executable, script, transcript_path, claim],
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            start_new_session=True,
+        )
+        logger.info("Spawned background registration", transcript_path=transcript_path)
+    except OSError as e:
+        logger.warn("Failed to spawn background registration", error=str(e))
+        release_pending_registration(transcript_path, claim)
+
+
+def _await_registration(transcript_path: str) -> Optional[str]:
+    """
+    Wait, as long as the hook deadline allows, for the registration another
+    process has claimed to finish. Returns its session ID, or None if it
+    failed or is still in flight.
+    """
+    from config import get_session_entry
+
+    deadline = current_deadline()
+    give_up_at = time.monotonic() + REGISTRATION_WAIT_SECONDS
+    while time.monotonic() < give_up_at and deadline.has(MIN_REQUEST_SECONDS + REGISTRATION_POLL_SECONDS):
+        time.sleep(REGISTRATION_POLL_SECONDS)
+        entry = get_session_entry(transcript_path) or {}
+        if entry.get("overlap_session_id"):
+            return entry["overlap_session_id"]
+        if "registering" not in entry:
+            return None
+    logger.info("Registration still in flight, skipping", transcript_path=transcript_path)
+    return None
+
+
+def _register_pending_session(
+    transcript_path: str,
+    check_files: Optional[list] = None,
+    speculative: bool = False,
+    claim: Optional[str] = None,
+) -> tuple[Optional[str], Optional[dict]]:
+    """
+    Register a pending session, optionally running the overlap check for
+    check_files in the same request. Only the holder of the entry's
+    registration claim sends /sessions/start; anyone else waits for it.
+
+    Returns (overlap_session_id, check_result). check_result is the server's
+    /check payload, or None if no check ran in this call.
+
+    Raises DeadlineExceeded if the hook deadline leaves no time to register;
+    the entry stays pending for a later hook.
     """
     from config import (
+        claim_pending_registration,
         get_session_entry,
+        release_pending_registration,
         save_session_for_transcript,
         get_session_for_transcript,
     )
@@ -190,13 +512,18 @@ def register_pending_session(transcript_path: str) -> str | None:
     existing = get_session_for_transcript(transcript_path)
     if existing:
         logger.info("Session already registered", overlap_session_id=existing)
-        return existing
+        return existing, None
 
     # Get session entry (unified store)
     entry = get_session_entry(transcript_path)
     if not entry or entry.get("status") != "pending":
         logger.debug("No pending session found", transcript_path=transcript_path)
-        return None
+        return None, None
+
+    claim = claim_pending_registration(transcript_path, claim)
+    if claim is None:
+        logger.info("Registration already in flight, waiting for it", transcript_path=transcript_path)
+        return _await_registration(transcript_path), None
 
     session_info = entry.get("session_info", {})
     logger.info("Registering pending session", transcript_path=transcript_path)
@@ -214,10 +541,15 @@ def register_pending_session(transcript_path: str) -> str | None:
         for field in ("repo_name", "remote_url", "branch"):
             if session_info.get(field):
                 request_data[field] = session_info[field]
+        if check_files:
+            request_data["check_files"] = check_files
+        if speculative:
+            request_data["speculative"] = True
 
         response = api_request("POST", "/api/v1/sessions/start", request_data)
 
-        overlap_session_id = response.get("data", {}).get("session_id")
+        result = response.get("data", {})
+        overlap_session_id = result.get("session_id")
         if overlap_session_id:
             # Upgrade from pending to active
             save_session_for_transcript(
@@ -227,15 +559,21 @@ def register_pending_session(transcript_path: str) -> str | None:
             logger.info("Session registered successfully",
                         overlap_session_id=overlap_session_id)
             logger.stderr_log(f"Session started: {overlap_session_id}")
-            return overlap_session_id
+            return overlap_session_id, result.get("check")
         else:
             logger.warn("No session_id in server response")
-            return None
+            return None, None
+
+    except DeadlineExceeded:
+        raise
 
     except Exception as e:
         logger.error("Failed to register pending session", exc=e)
         logger.stderr_log(f"Failed to register session: {e}")
-        return None
+        return None, None
+
+    finally:
+        release_pending_registration(transcript_path, claim)
 
 
 def ensure_session_registered(transcript_path: str, session_id: str, cwd: str) -> str | None:
@@ -246,6 +584,28 @@ def ensure_session_registered(transcript_path: str, session_id: str, cwd: str) -
     1. Already registered (active) session
     2. Pending session (register it)
     3. Fresh registration (if transcript file exists)
+
+    Raises DeadlineExceeded if the hook deadline leaves no time to register;
+    callers defer their request until a later hook has registered the session.
+    """
+    overlap_session_id, _ = ensure_session_registered_with_check(transcript_path, session_id, cwd)
+    return overlap_session_id
+
+
+def ensure_session_registered_with_check(
+    transcript_path: str,
+    session_id: str,
+    cwd: str,
+    check_files: Optional[list] = None,
+) -> tuple[Optional[str], Optional[dict]]:
+    """
+    Like ensure_session_registered, but if registration happens in this call the
+    overlap check for check_files rides along on the same /sessions/start request.
+
+    Returns (overlap_session_id, check_result). check_result is None when the
+    session was already registered (or no check ran) - callers then fall back
+    to a separate /check request. Raises DeadlineExceeded like
+    ensure_session_registered.
     """
     from config import (
         get_session_for_transcript,
@@ -256,17 +616,17 @@ def ensure_session_registered(transcript_path: str, session_id: str, cwd: str) -
     # 1. Check if already registered
     existing = get_session_for_transcript(transcript_path)
     if existing:
-        return existing
+        return existing, None
 
     # 2. Check for pending session in unified store
     entry = get_session_entry(transcript_path)
     if entry and entry.get("status") == "pending":
-        return register_pending_session(transcript_path)
+        return _register_pending_session(transcript_path, check_files)
 
     # 3. Check if transcript file exists now (lazy check)
     if not os.path.exists(transcript_path):
         logger.debug("Transcript file still does not exist", transcript_path=transcript_path)
-        return None
+        return None, None
 
     # Transcript exists but no entry - gather fresh info and register
     logger.info("Transcript exists, gathering session info for registration",
@@ -293,5 +653,4 @@ def ensure_session_registered(transcript_path: str, session_id: str, cwd: str) -
         transcript_path, overlap_session_id=None,
         worktree=cwd, status="pending", session_info=session_info,
     )
-    return register_pending_session(transcript_path)
-
+    return _register_pending_session(transcript_path, check_files)
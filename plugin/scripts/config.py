@@ -6,23 +6,39 @@ This module loads configuration from:
 2. Config file (~/.claude/overlap/config.json)
 
 Sessions are stored in a unified sessions.json with a status field:
-- "pending": saved at SessionStart, not yet registered with server
+- "pending": saved at SessionStart, not yet registered with server (a background
+  registration is usually in flight, recorded as the entry's "registering" claim)
 - "active": registered with server, has an overlap_session_id
+
+Requests a hook had no time left for are queued in deferred.json and replayed
+by a later hook (see deadline.py).
+
+What the server accepts on the wire (request encodings, path interning) is
+remembered in wire.json, and the numbers paths were interned as per server
+session in paths.json (see api.py).
 """
 
 import fcntl
 import hashlib
 import json
 import os
+import time
+import uuid
 from contextlib import contextmanager
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Optional
 
+from deadline import DeadlineExceeded, current as current_deadline
+import metrics
+
 # Store in ~/.claude/overlap/ as recommended by Claude Code docs
 CONFIG_DIR = Path.home() / ".claude" / "overlap"
 CONFIG_FILE = CONFIG_DIR / "config.json"
 SESSIONS_FILE = CONFIG_DIR / "sessions.json"  # Unified session store
+DEFERRED_FILE = CONFIG_DIR / "deferred.json"  # Requests deferred past a hook's deadline
+WIRE_FILE = CONFIG_DIR / "wire.json"  # Request encodings and features the server advertised
+PATHS_FILE = CONFIG_DIR / "paths.json"  # Interned path numbers per server session
 
 
 def _log(level: str, message: str, **kwargs) -> None:
@@ -40,6 +56,9 @@ def get_config() -> dict:
         "server_url": None,
         "team_token": None,
         "user_token": None,
+        # Send the latest request and recent tool names from the transcript with
+        # heartbeats (opt-in)
+        "share_intent": False,
     }
 
     # Load from config file
@@ -60,6 +79,8 @@ def get_config() -> dict:
         config["team_token"] = os.environ["OVERLAP_TEAM_TOKEN"]
     if os.environ.get("OVERLAP_USER_TOKEN"):
         config["user_token"] = os.environ["OVERLAP_USER_TOKEN"]
+    if os.environ.get("OVERLAP_SHARE_INTENT"):
+        config["share_intent"] = os.environ["OVERLAP_SHARE_INTENT"].lower() not in ("0", "false", "no")
 
     return config
 
@@ -86,24 +107,83 @@ def _get_transcript_key(transcript_path: str) -> str:
 
 
 LOCK_FILE = CONFIG_DIR / "sessions.lock"
+DEFERRED_LOCK_FILE = CONFIG_DIR / "deferred.lock"
+PATHS_LOCK_FILE = CONFIG_DIR / "paths.lock"
 
+LOCK_POLL_SECONDS = 0.02
 
-def _load_sessions() -> dict:
-    """Load all sessions from file (caller should hold lock for read-modify-write)."""
-    if SESSIONS_FILE.exists():
+# A pending entry's registration claim is given up on after this long (its
+# holder most likely died before releasing it)
+REGISTRATION_CLAIM_SECONDS = 30
+
+# Deferred requests older than this, or beyond this many, are dropped
+MAX_DEFERRED_AGE_SECONDS = 3600
+MAX_DEFERRED_REQUESTS = 100
+
+# Per session, at most this many paths are interned (the rest are sent in
+# full), at most this many new ones per request (the server's limit), and
+# tables unused for this long are dropped
+MAX_INTERNED_PATHS = 2000
+MAX_NEW_PATHS_PER_REQUEST = 200
+MAX_PATHS_AGE_SECONDS = 48 * 3600
+
+
+def _load_json(path: Path) -> dict:
+    if path.exists():
         try:
-            with open(SESSIONS_FILE) as f:
+            with open(path) as f:
                 return json.load(f)
         except (json.JSONDecodeError, IOError):
             pass
     return {}
 
 
+def _save_json(path: Path, data: dict) -> None:
+    """Write via a temp file and rename, so a killed process never leaves a partial file."""
+    CONFIG_DIR.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def _load_sessions() -> dict:
+    """Load all sessions from file (caller should hold lock for read-modify-write)."""
+    return _load_json(SESSIONS_FILE)
+
+
 def _save_sessions(sessions: dict) -> None:
     """Save all sessions to file (caller should hold lock for read-modify-write)."""
+    _save_json(SESSIONS_FILE, sessions)
+
+
+def _acquire_lock(lock_fd) -> None:
+    """Take an exclusive lock, waiting only as long as the hook deadline allows."""
+    deadline = current_deadline()
+    started_at = time.monotonic()
+    lock_label = {"lock": os.path.basename(lock_fd.name)}
+    while True:
+        try:
+            fcntl.flock(lock_fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            metrics.observe("overlap_lock_wait_seconds", time.monotonic() - started_at, lock_label)
+            return
+        except BlockingIOError:
+            if not deadline.has(LOCK_POLL_SECONDS):
+                metrics.observe("overlap_lock_wait_seconds", time.monotonic() - started_at, lock_label)
+                raise DeadlineExceeded(f"Timed out waiting for {lock_fd.name}")
+            time.sleep(LOCK_POLL_SECONDS)
+
+
+@contextmanager
+def _locked(lock_path: Path):
     CONFIG_DIR.mkdir(parents=True, exist_ok=True)
-    with open(SESSIONS_FILE, "w") as f:
-        json.dump(sessions, f, indent=2)
+    lock_fd = open(lock_path, "w")
+    try:
+        _acquire_lock(lock_fd)
+        yield
+    finally:
+        fcntl.flock(lock_fd, fcntl.LOCK_UN)
+        lock_fd.close()
 
 
 @contextmanager
@@ -114,16 +194,11 @@ def _locked_sessions():
         with _locked_sessions() as (sessions, save):
             sessions["key"] = value
             save(sessions)
+
+    Raises DeadlineExceeded if the lock isn't free before the hook deadline.
     """
-    CONFIG_DIR.mkdir(parents=True, exist_ok=True)
-    lock_fd = open(LOCK_FILE, "w")
-    try:
-        fcntl.flock(lock_fd, fcntl.LOCK_EX)
-        sessions = _load_sessions()
-        yield sessions, _save_sessions
-    finally:
-        fcntl.flock(lock_fd, fcntl.LOCK_UN)
-        lock_fd.close()
+    with _locked(LOCK_FILE):
+        yield _load_sessions(), _save_sessions
 
 
 def get_session_for_transcript(transcript_path: str) -> Optional[str]:
@@ -199,23 +274,69 @@ def clear_session_for_transcript(transcript_path: str) -> None:
         _log("warn", "Failed to clear session", transcript_path=transcript_path, error=str(e))
 
 
-def update_session_heartbeat_time(transcript_path: str, is_write: bool = True) -> None:
+def claim_pending_registration(transcript_path: str, claim: Optional[str] = None) -> Optional[str]:
+    """Claim a pending session's registration so only one process sends /sessions/start.
+
+    Returns the claim (a new one unless `claim` is given), or None if the entry
+    isn't pending or another live claim holds it. A process passing the claim
+    it was spawned with takes it over.
+    Raises DeadlineExceeded if the lock isn't free before the hook deadline.
+    """
+    with _locked_sessions() as (sessions, save):
+        entry = sessions.get(_get_transcript_key(transcript_path))
+        if not entry or entry.get("status") != "pending":
+            return None
+        held = entry.get("registering")
+        if held and held.get("claim") != claim and time.time() - held.get("at", 0) < REGISTRATION_CLAIM_SECONDS:
+            return None
+        claim = claim or uuid.uuid4().hex
+        entry["registering"] = {"claim": claim, "at": time.time()}
+        save(sessions)
+        return claim
+
+
+def release_pending_registration(transcript_path: str, claim: str) -> None:
+    """Drop a registration claim taken by claim_pending_registration, if still held."""
+    try:
+        with _locked_sessions() as (sessions, save):
+            entry = sessions.get(_get_transcript_key(transcript_path))
+            if entry and entry.get("registering", {}).get("claim") == claim:
+                del entry["registering"]
+                save(sessions)
+    except DeadlineExceeded as e:
+        _log("warn", "Registration claim not released", error=str(e))
+
+
+def update_session_heartbeat_time(
+    transcript_path: str,
+    is_write: bool = True,
+    transcript_state: Optional[dict] = None,
+) -> None:
     """Update the last heartbeat timestamp for client-side throttling.
 
     Option C dual throttle: tracks read and write timestamps separately.
     Write tools update last_write_heartbeat_at, read tools update last_read_heartbeat_at.
+    transcript_state (offset and derived summary from transcript.tail) is saved
+    in the same write.
+    Skipped if the sessions lock isn't free before the hook deadline; the only
+    cost is that the next heartbeat isn't throttled.
     """
-    with _locked_sessions() as (sessions, save):
-        key = _get_transcript_key(transcript_path)
-        if key in sessions:
-            now = datetime.now(timezone.utc).isoformat()
-            if is_write:
-                sessions[key]["last_write_heartbeat_at"] = now
-            else:
-                sessions[key]["last_read_heartbeat_at"] = now
-            # Keep legacy field for backward compat
-            sessions[key]["last_heartbeat_at"] = now
-            save(sessions)
+    try:
+        with _locked_sessions() as (sessions, save):
+            key = _get_transcript_key(transcript_path)
+            if key in sessions:
+                now = datetime.now(timezone.utc).isoformat()
+                if is_write:
+                    sessions[key]["last_write_heartbeat_at"] = now
+                else:
+                    sessions[key]["last_read_heartbeat_at"] = now
+                # Keep legacy field for backward compat
+                sessions[key]["last_heartbeat_at"] = now
+                if transcript_state is not None:
+                    sessions[key]["transcript"] = transcript_state
+                save(sessions)
+    except DeadlineExceeded as e:
+        _log("warn", "Heartbeat time not saved", error=str(e))
 
 
 def gc_stale_sessions(max_age_hours: int = 48) -> int:
@@ -244,6 +365,38 @@ def gc_stale_sessions(max_age_hours: int = 48) -> int:
         return len(to_remove)
 
 
+# Per session, the repository roots of at most this many working directories are cached
+MAX_CACHED_REPO_ROOTS = 8
+
+
+def get_repo_root(transcript_path: str, cwd: str) -> dict:
+    """
+    utils.resolve_repo_root(cwd), cached in the session entry so each working
+    directory is resolved once per session rather than on every hook.
+    """
+    from utils import resolve_repo_root
+
+    key = _get_transcript_key(transcript_path)
+    entry = _load_sessions().get(key)
+    cached = (entry or {}).get("repo_roots", {}).get(cwd)
+    if cached is not None:
+        return cached
+
+    repo = resolve_repo_root(cwd)
+    if entry is None:
+        return repo
+    try:
+        with _locked_sessions() as (sessions, save):
+            if key in sessions:
+                roots = sessions[key].get("repo_roots", {})
+                roots[cwd] = repo
+                sessions[key]["repo_roots"] = dict(list(roots.items())[-MAX_CACHED_REPO_ROOTS:])
+                save(sessions)
+    except DeadlineExceeded as e:
+        _log("warn", "Repo root not cached", error=str(e))
+    return repo
+
+
 def is_configured() -> bool:
     """Check if the plugin is properly configured."""
     config = get_config()
@@ -252,3 +405,137 @@ def is_configured() -> bool:
         config.get("team_token"),
         config.get("user_token"),
     ])
+
+
+def defer_request(
+    method: str,
+    endpoint: str,
+    data: Optional[dict] = None,
+    transcript_path: Optional[str] = None,
+) -> None:
+    """Queue an API request for a later hook to send.
+
+    `endpoint` may contain "{overlap_session_id}", filled in from
+    transcript_path's session when replayed (e.g. after re-registration).
+    """
+    try:
+        with _locked(DEFERRED_LOCK_FILE):
+            queue = _load_json(DEFERRED_FILE).get("requests", [])
+            queue.append({
+                "method": method,
+                "endpoint": endpoint,
+                "data": data,
+                "transcript_path": transcript_path,
+                "deferred_at": datetime.now(timezone.utc).isoformat(),
+            })
+            _save_json(DEFERRED_FILE, {"requests": queue[-MAX_DEFERRED_REQUESTS:]})
+        metrics.inc("overlap_deferred_requests_total", {"endpoint": metrics.endpoint_label(endpoint)})
+        _log("info", "Request deferred", method=method, endpoint=endpoint)
+    except Exception as e:
+        _log("warn", "Failed to defer request", endpoint=endpoint, error=str(e))
+
+
+def take_deferred_requests(transcript_path: Optional[str] = None) -> list:
+    """Remove and return queued requests, oldest first, dropping expired ones.
+
+    With transcript_path, only that transcript's requests are taken.
+    """
+    now = datetime.now(timezone.utc)
+
+    def expired(request: dict) -> bool:
+        try:
+            deferred_at = datetime.fromisoformat(request.get("deferred_at", ""))
+        except ValueError:
+            return True
+        return (now - deferred_at).total_seconds() > MAX_DEFERRED_AGE_SECONDS
+
+    with _locked(DEFERRED_LOCK_FILE):
+        queue = _load_json(DEFERRED_FILE).get("requests", [])
+        if not queue:
+            return []
+        taken, kept = [], []
+        for request in queue:
+            if transcript_path is None or request.get("transcript_path") == transcript_path:
+                taken.append(request)
+            else:
+                kept.append(request)
+        _save_json(DEFERRED_FILE, {"requests": kept})
+
+    return [request for request in taken if not expired(request)]
+
+
+def restore_deferred_requests(requests: list) -> None:
+    """Put requests that weren't sent back at the front of the queue."""
+    if not requests:
+        return
+    try:
+        with _locked(DEFERRED_LOCK_FILE):
+            queue = _load_json(DEFERRED_FILE).get("requests", [])
+            _save_json(DEFERRED_FILE, {"requests": (requests + queue)[-MAX_DEFERRED_REQUESTS:]})
+    except Exception as e:
+        _log("warn", "Failed to restore deferred requests", count=len(requests), error=str(e))
+
+
+def get_wire_support(server_url: str) -> dict:
+    """What the server at server_url last advertised: {"encodings": [...], "features": [...]}."""
+    support = _load_json(WIRE_FILE)
+    if support.get("server_url") != server_url:
+        return {}
+    return support
+
+
+def save_wire_support(server_url: str, encodings: list, features: list) -> None:
+    """Remember what the server advertised; only writes when it changed."""
+    support = get_wire_support(server_url)
+    if support.get("encodings") == encodings and support.get("features") == features:
+        return
+    try:
+        _save_json(WIRE_FILE, {"server_url": server_url, "encodings": encodings, "features": features})
+    except OSError as e:
+        _log("warn", "Failed to save wire support", error=str(e))
+
+
+def intern_paths(overlap_session_id: str, paths: list) -> tuple[list, dict]:
+    """Replace paths with the numbers they're interned as for a server session.
+
+    Returns (files, defs): files has a number for every interned path, and
+    defs maps the numbers first used in this call to their paths, to send
+    along. Numbers are never reused for another path within a session, even
+    after forget_paths, so a late request can't redefine one.
+
+    Raises DeadlineExceeded if the lock isn't free before the hook deadline.
+    """
+    now = time.time()
+    with _locked(PATHS_LOCK_FILE):
+        tables = {
+            session: table for session, table in _load_json(PATHS_FILE).items()
+            if now - table.get("used_at", 0) < MAX_PATHS_AGE_SECONDS
+        }
+        table = tables.setdefault(overlap_session_id, {"refs": {}, "next": 0})
+        refs = table["refs"]
+
+        files, defs = [], {}
+        for path in paths:
+            ref = refs.get(path)
+            if ref is None:
+                if len(refs) >= MAX_INTERNED_PATHS or len(defs) >= MAX_NEW_PATHS_PER_REQUEST:
+                    files.append(path)
+                    continue
+                ref = table["next"]
+                table["next"] += 1
+                refs[path] = ref
+                defs[str(ref)] = path
+            files.append(ref)
+
+        table["used_at"] = now
+        _save_json(PATHS_FILE, tables)
+    return files, defs
+
+
+def forget_paths(overlap_session_id: str) -> None:
+    """Drop a session's interned paths after the server lost them; the next request sends them in full."""
+    with _locked(PATHS_LOCK_FILE):
+        tables = _load_json(PATHS_FILE)
+        if overlap_session_id in tables:
+            tables[overlap_session_id]["refs"] = {}
+            _save_json(PATHS_FILE, tables)
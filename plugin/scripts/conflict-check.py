@@ -16,9 +16,11 @@ import os
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 import logger
-from config import is_configured
-from api import api_request, ensure_session_registered
-from utils import extract_file_paths, make_relative
+import deadline
+import metrics
+from config import get_repo_root, is_configured
+from api import api_request, ensure_session_registered_with_check
+from utils import canonical_path, extract_file_paths
 
 
 def format_overlap_warning(overlaps: list) -> str:
@@ -55,9 +57,28 @@ def format_overlap_warning(overlaps: list) -> str:
     return "\n".join(lines)
 
 
+def format_directory_notice(directory_overlaps: list) -> str:
+    """Format subtree overlaps (others active in the same directory) into a notice."""
+    if not directory_overlaps:
+        return ""
+
+    lines = ["[Overlap] Others are working nearby:"]
+    for overlap in directory_overlaps[:3]:
+        user_name = overlap.get("user_name", "Someone")
+        directory = overlap.get("directory")
+        where = f"{directory}/" if directory and directory != "." else "the repo root"
+        files = overlap.get("files", [])
+        file_count = f" ({len(files)} file{'s' if len(files) != 1 else ''})" if files else ""
+        lines.append(f"  {user_name} is active under {where}{file_count}")
+
+    return "\n".join(lines)
+
+
 def main():
-    # Set up logging context
+    # Set up logging context and this invocation's time budget
     logger.set_context(hook="PreToolUse")
+    deadline.start("PreToolUse")
+    metrics.start_hook("PreToolUse")
 
     # Read hook input from stdin
     try:
@@ -84,8 +105,27 @@ def main():
     session_id = input_data.get("session_id", "")
     cwd = input_data.get("cwd", os.getcwd())
 
-    # Ensure session is registered (lazy registration on first tool use)
-    overlap_session_id = ensure_session_registered(transcript_path, session_id, cwd)
+    # Extract ALL file paths from tool input
+    tool_name = input_data.get("tool_name", "")
+    tool_input = input_data.get("tool_input", {})
+
+    file_paths = extract_file_paths(tool_input, tool_name)
+
+    # Report paths relative to the repository root, for privacy and so they
+    # match what other sessions report for the same file
+    repo = get_repo_root(transcript_path, cwd)
+    relative_paths = [canonical_path(p, cwd, repo) for p in file_paths]
+
+    # Ensure session is registered (lazy registration on first tool use).
+    # On first use the overlap check rides along on the registration request.
+    # Out of time to register: the edit goes ahead unchecked and a later hook registers.
+    try:
+        overlap_session_id, check = ensure_session_registered_with_check(
+            transcript_path, session_id, cwd, check_files=relative_paths or None
+        )
+    except deadline.DeadlineExceeded as e:
+        logger.warn("Session registration deferred, skipping conflict check", reason=str(e))
+        sys.exit(0)
     logger.set_context(hook="PreToolUse", session_id=overlap_session_id)
 
     # Conflict check requires a registered session
@@ -93,33 +133,31 @@ def main():
         logger.debug("No Overlap session for this transcript, skipping")
         sys.exit(0)
 
-    # Extract ALL file paths from tool input
-    tool_name = input_data.get("tool_name", "")
-    tool_input = input_data.get("tool_input", {})
-
-    file_paths = extract_file_paths(tool_input, tool_name)
     if not file_paths:
         logger.debug("No file path in tool input", tool_name=tool_name)
         sys.exit(0)
 
-    # Make paths relative to cwd for privacy
-    cwd = input_data.get("cwd", os.getcwd())
-    relative_paths = [make_relative(p, cwd) for p in file_paths]
-
     logger.info("Checking for conflicts",
                 tool_name=tool_name,
-                file_paths=relative_paths)
+                file_paths=relative_paths,
+                with_registration=check is not None)
 
     try:
-        # Check with NO retry (budget: 5s hook timeout, informational only)
-        response = api_request("POST", "/api/v1/check", {
-            "files": relative_paths,
-        }, timeout=3, retries=0)
-
-        overlaps = response.get("data", {}).get("overlaps", [])
+        if check is None:
+            # Check with NO retry (informational only). If registration used up the
+            # hook's budget this raises DeadlineExceeded and the edit goes ahead unchecked.
+            response = api_request("POST", "/api/v1/check", {
+                "files": relative_paths,
+                "session_id": overlap_session_id,
+            }, timeout=3, retries=0, paths_session=overlap_session_id)
+            check = response.get("data", {})
+
+        overlaps = check.get("overlaps", [])
+        directory_overlaps = check.get("directory_overlaps", [])
         logger.info("Conflict check complete",
                     file_paths=relative_paths,
-                    overlap_count=len(overlaps))
+                    overlap_count=len(overlaps),
+                    directory_overlap_count=len(directory_overlaps))
 
         if overlaps:
             # Log overlap details
@@ -145,6 +183,16 @@ def main():
             }
             print(json.dumps(output))
 
+        elif directory_overlaps:
+            # Same subtree but no shared file: informational only, don't ask
+            output = {
+                "hookSpecificOutput": {
+                    "hookEventName": "PreToolUse",
+                    "additionalContext": format_directory_notice(directory_overlaps),
+                }
+            }
+            print(json.dumps(output))
+
     except Exception as e:
         logger.error("Conflict check failed", exc=e, file_paths=relative_paths)
         logger.stderr_log(f"Check failed: {e}")
@@ -0,0 +1,99 @@
+"""
+Overlap hook deadlines.
+
+Claude Code kills a hook once the timeout configured for it in hooks.json has
+passed. Each hook starts a Deadline from that timeout as its first step, and
+everything that can block - API requests, retry backoff, git subprocesses,
+lock waits, the log sync at exit - takes its timeout from the deadline rather
+than a fixed per-call value. Work that no longer fits is not started; hooks
+defer it to the on-disk queue in config.py instead, and a later hook replays it.
+
+Scripts that aren't hooks (slash commands) never call start(), so current()
+returns an unbounded deadline and per-call timeouts apply unchanged.
+"""
+
+import json
+import math
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Optional
+
+HOOKS_FILE = Path(__file__).resolve().parent.parent / "hooks" / "hooks.json"
+
+# Used when hooks.json can't be read or doesn't list the hook
+DEFAULT_HOOK_TIMEOUT_SECONDS = 5.0
+
+# Held back from the configured timeout for interpreter startup (already spent
+# before start() runs), local state writes and exit
+RESERVE_SECONDS = 1.0
+
+# A request given less time than this would almost certainly time out
+MIN_REQUEST_SECONDS = 0.5
+
+
+class DeadlineExceeded(Exception):
+    """Raised instead of starting work the remaining hook budget can't cover."""
+
+
+class Deadline:
+    """Monotonic point in time by which the current hook must be finished."""
+
+    def __init__(self, seconds: float):
+        self.budget = seconds
+        self.expires_at = time.monotonic() + seconds
+
+    def remaining(self) -> float:
+        return max(self.expires_at - time.monotonic(), 0.0)
+
+    def has(self, seconds: float) -> bool:
+        """Whether at least `seconds` of budget is left."""
+        return self.remaining() >= seconds
+
+    def timeout(self, cap: float, minimum: float = MIN_REQUEST_SECONDS) -> float:
+        """
+        Timeout for the next blocking call: `cap`, shortened to the remaining
+        budget. Raises DeadlineExceeded if less than `minimum` is left.
+        """
+        remaining = self.remaining()
+        if remaining < minimum:
+            raise DeadlineExceeded(f"{remaining:.2f}s of hook budget left, need {minimum:.2f}s")
+        return min(cap, remaining)
+
+
+_UNBOUNDED = Deadline(math.inf)
+_current: Optional[Deadline] = None
+
+
+def hook_timeout(event: str, script: Optional[str] = None) -> float:
+    """
+    Timeout configured in hooks.json for `script` under hook `event` (e.g.
+    PostToolUse). Defaults to the running script.
+    """
+    script = os.path.basename(script or sys.argv[0])
+    try:
+        with open(HOOKS_FILE) as f:
+            hooks = json.load(f).get("hooks", {})
+    except (OSError, json.JSONDecodeError):
+        return DEFAULT_HOOK_TIMEOUT_SECONDS
+
+    timeouts = [
+        hook["timeout"]
+        for matcher in hooks.get(event, [])
+        for hook in matcher.get("hooks", [])
+        if script in hook.get("command", "") and isinstance(hook.get("timeout"), (int, float))
+    ]
+    return float(min(timeouts)) if timeouts else DEFAULT_HOOK_TIMEOUT_SECONDS
+
+
+def start(event: str) -> Deadline:
+    """Start the deadline for this hook invocation from its configured timeout."""
+    global _current
+    _current = Deadline(max(hook_timeout(event) - RESERVE_SECONDS, 0.0))
+    return _current
+
+
+def current() -> Deadline:
+    """The running hook's deadline, or an unbounded one outside hooks."""
+    return _current or _UNBOUNDED
@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Overlap bulk export (admin only).
+
+Streams the team's sessions and activity from /api/v1/admin/export into
+NDJSON files, one per kind, e.g. for loading into a warehouse:
+
+    python3 export.py --out /data/overlap --since 2026-01-01
+
+The response is read line by line (gzip-decoded on the fly), so memory stays
+constant however much history is exported. After each page the server sends a
+checkpoint; the output file is synced and its size and cursor are recorded in
+export-state.json in the output directory. A failed or interrupted run resumes
+from the last checkpoint, truncating any rows written after it.
+
+A finished export keeps its cursor, so running the same command again (e.g.
+nightly from cron) appends only rows added since. Session rows reflect the
+session when it was exported; load them as upserts by id.
+"""
+
+import argparse
+import json
+import sys
+import os
+import time
+import zlib
+from pathlib import Path
+from urllib.parse import urlencode
+
+# Add scripts directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import logger
+from config import is_configured
+from api import api_stream
+
+KINDS = ("sessions", "activity")
+STATE_FILE = "export-state.json"
+
+READ_CHUNK_BYTES = 64 * 1024
+STREAM_TIMEOUT_SECONDS = 60
+# Consecutive failed requests before giving up; progress since the last checkpoint resets the count
+MAX_ATTEMPTS = 5
+BACKOFF_BASE_SECONDS = 2
+
+
+class ExportError(Exception):
+    """The server reported a failure mid-stream."""
+
+
+def _load_state(out_dir: Path) -> dict:
+    try:
+        with open(out_dir / STATE_FILE) as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+
+def _save_state(out_dir: Path, state: dict) -> None:
+    path = out_dir / STATE_FILE
+    tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(state, f, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def _iter_lines(response):
+    """Decoded NDJSON records from a response, gzip-decoding on the fly if needed."""
+    decompressor = None
+    if "gzip" in (response.headers.get("Content-Encoding") or ""):
+        decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+
+    pending = b""
+    while True:
+        chunk = response.read(READ_CHUNK_BYTES)
+        if not chunk:
+            break
+        if decompressor:
+            chunk = decompressor.decompress(chunk)
+        pending += chunk
+        *lines, pending = pending.split(b"\n")
+        for line in lines:
+            if line:
+                yield json.loads(line)
+    if decompressor:
+        pending += decompressor.flush()
+    if pending.strip():
+        yield json.loads(pending)
+
+
+def _export_request(out, progress: dict, kind: str, since, until, out_dir: Path, state: dict) -> bool:
+    """
+    Run one export request, appending rows to `out` and checkpointing as the
+    server does. Returns True if the server has more rows for another request.
+    """
+    params = {"kind": kind}
+    if since:
+        params["since"] = since
+    if until:
+        params["until"] = until
+    if progress.get("cursor"):
+        params["cursor"] = progress["cursor"]
+
+    unsaved_rows = 0
+
+    def checkpoint(cursor) -> None:
+        nonlocal unsaved_rows
+        out.flush()
+        os.fsync(out.fileno())
+        progress.update(cursor=cursor, bytes=out.tell(), rows=progress.get("rows", 0) + unsaved_rows)
+        unsaved_rows = 0
+        _save_state(out_dir, state)
+
+    with api_stream(f"/api/v1/admin/export?{urlencode(params)}", timeout=STREAM_TIMEOUT_SECONDS,
+                    headers={"Accept-Encoding": "gzip"}) as response:
+        for record in _iter_lines(response):
+            record_type = record.pop("type", None)
+            if record_type == "checkpoint":
+                checkpoint(record["cursor"])
+            elif record_type == "end":
+                checkpoint(record.get("cursor") or progress.get("cursor"))
+                return bool(record.get("more"))
+            elif record_type == "error":
+                raise ExportError(record.get("error", "Export failed"))
+            else:
+                out.write(json.dumps(record, separators=(",", ":")).encode() + b"\n")
+                unsaved_rows += 1
+
+    # Connection closed without an end line
+    raise ExportError("Export stream ended early")
+
+
+def export_kind(out_dir: Path, kind: str, since, until, state: dict) -> int:
+    """Export one kind to <out_dir>/<kind>.ndjson, resuming from state. Returns rows written this run."""
+    progress = state.setdefault(kind, {})
+    if progress and (progress.get("since"), progress.get("until")) != (since, until):
+        raise SystemExit(
+            f"{out_dir / STATE_FILE} holds an export of {kind} with a different --since/--until; "
+            "use a new --out directory or pass --restart"
+        )
+    progress.update(since=since, until=until)
+
+    path = out_dir / f"{kind}.ndjson"
+    path.touch()
+    rows_before = progress.get("rows", 0)
+
+    with open(path, "r+b") as out:
+        # Drop rows written after the last checkpoint; they'll be streamed again
+        out.truncate(progress.get("bytes", 0))
+        out.seek(0, os.SEEK_END)
+
+        failures = 0
+        more = True
+        while more:
+            cursor_before = progress.get("cursor")
+            try:
+                more = _export_request(out, progress, kind, since, until, out_dir, state)
+                failures = 0
+            except (ExportError, OSError, ValueError, zlib.error) as e:
+                if progress.get("cursor") != cursor_before:
+                    failures = 0  # Made progress before failing
+                failures += 1
+                logger.warn("Export request failed", kind=kind, attempt=failures, error=str(e))
+                if failures >= MAX_ATTEMPTS:
+                    raise
+                # Resume from the last checkpoint
+                out.truncate(progress.get("bytes", 0))
+                out.seek(0, os.SEEK_END)
+                time.sleep(BACKOFF_BASE_SECONDS * (2 ** (failures - 1)))
+            print(f"{kind}: {progress.get('rows', 0)} rows", file=sys.stderr)
+
+    return progress.get("rows", 0) - rows_before
+
+
+def main():
+    logger.set_context(hook="Export")
+
+    parser = argparse.ArgumentParser(description="Export Overlap team sessions and activity as NDJSON (admin only)")
+    parser.add_argument("--out", required=True, help="Output directory for <kind>.ndjson and export-state.json")
+    parser.add_argument("--kind", choices=KINDS + ("all",), default="all", help="What to export (default: all)")
+    parser.add_argument("--since", help="Only rows at or after this UTC date/time (YYYY-MM-DD[ HH:MM:SS])")
+    parser.add_argument("--until", help="Only rows before this UTC date/time")
+    parser.add_argument("--restart", action="store_true", help="Discard saved progress and export from the start")
+    args = parser.parse_args()
+
+    if not is_configured():
+        print("Not configured - run /overlap:config first", file=sys.stderr)
+        sys.exit(1)
+
+    out_dir = Path(args.out)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    kinds = KINDS if args.kind == "all" else (args.kind,)
+
+    state = _load_state(out_dir)
+    if args.restart:
+        for kind in kinds:
+            state.pop(kind, None)
+            (out_dir / f"{kind}.ndjson").unlink(missing_ok=True)
+
+    for kind in kinds:
+        try:
+            written = export_kind(out_dir, kind, args.since, args.until, state)
+        except Exception as e:
+            logger.error("Export failed", exc=e, kind=kind)
+            print(f"Export of {kind} failed: {e} (rerun to resume from the last checkpoint)", file=sys.stderr)
+            sys.exit(1)
+        logger.info("Export finished", kind=kind, rows=written)
+        print(f"{kind}: {written} new rows -> {out_dir / f'{kind}.ndjson'}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -7,8 +7,16 @@ activity to the Overlap server. Collects files being worked on for classificatio
 
 Lazily registers the session on first invocation.
 
+Each heartbeat also carries a summary derived locally from the transcript (the
+latest user request and recent tools), tailed incrementally from the offset
+saved with the session (see transcript.py).
+
 2-second client-side throttle per tool category. Throttle check runs BEFORE any
 expensive work (session registration, API calls) so throttled invocations exit fast.
+
+All network work draws from the hook's deadline (see deadline.py). A heartbeat
+that can't be sent in time is deferred and replayed by a later invocation before
+its own heartbeat, budget permitting.
 """
 
 import json
@@ -19,13 +27,30 @@ import os
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 import logger
-from config import is_configured, get_session_entry, update_session_heartbeat_time, clear_session_for_transcript
-from api import api_request, ensure_session_registered
-from utils import extract_file_paths, make_relative, is_write_tool
+import deadline
+import metrics
+import transcript
+from config import (
+    get_config,
+    is_configured,
+    get_session_entry,
+    get_repo_root,
+    update_session_heartbeat_time,
+    clear_session_for_transcript,
+    defer_request,
+)
+from api import api_request, ensure_session_registered, replay_deferred_requests
+from deadline import DeadlineExceeded
+from utils import canonical_path, extract_file_paths, is_write_tool
+
+HEARTBEAT_TIMEOUT_SECONDS = 4
+
 
 def main():
-    # Set up logging context
+    # Set up logging context and this invocation's time budget
     logger.set_context(hook="PostToolUse")
+    budget = deadline.start("PostToolUse")
+    metrics.start_hook("PostToolUse")
 
     # Read hook input from stdin
     try:
@@ -73,6 +98,7 @@ def main():
                 elapsed = (datetime.now(timezone.utc) - last_dt).total_seconds()
                 if elapsed < THROTTLE_SECONDS:
                     logger.debug("Heartbeat throttled", elapsed=elapsed, tool=tool_name)
+                    metrics.inc("overlap_heartbeat_throttled_total")
                     sys.exit(0)
             except (ValueError, TypeError):
                 pass
@@ -81,34 +107,65 @@ def main():
     # Only runs after throttle check passes.
     session_id = input_data.get("session_id", "")
     cwd = input_data.get("cwd", os.getcwd())
-    overlap_session_id = ensure_session_registered(transcript_path, session_id, cwd)
+    registration_deferred = None
+    try:
+        overlap_session_id = ensure_session_registered(transcript_path, session_id, cwd)
+    except DeadlineExceeded as e:
+        # The heartbeat is deferred below and sent once a later hook has registered the session
+        overlap_session_id, registration_deferred = None, str(e)
     logger.set_context(hook="PostToolUse", session_id=overlap_session_id)
 
-    if not overlap_session_id:
+    if not overlap_session_id and not registration_deferred:
         logger.debug("No Overlap session for this transcript, skipping")
         sys.exit(0)
 
-    # Make paths relative to cwd for privacy
+    # Report paths relative to the repository root, for privacy and so every
+    # session keys the same file the same way
     cwd = input_data.get("cwd", os.getcwd())
-    relative_paths = [make_relative(p, cwd) for p in file_paths]
+    repo = get_repo_root(transcript_path, cwd)
+    relative_paths = [canonical_path(p, cwd, repo) for p in file_paths]
 
     logger.info("Sending heartbeat",
                 tool_name=tool_name,
                 file_paths=relative_paths,
                 is_write=is_write)
 
+    # Only read what was appended to the transcript since the last heartbeat
+    entry = get_session_entry(transcript_path) or {}
+    tail_state = transcript.tail(transcript_path, entry.get("transcript"))
+
+    heartbeat_endpoint = "/api/v1/sessions/{overlap_session_id}/heartbeat"
+    heartbeat_data = {
+        "files": relative_paths,
+        "tool_name": tool_name,
+    }
+    context = transcript.summary_context(tail_state, include_intent=get_config().get("share_intent", False))
+    if context:
+        heartbeat_data["context"] = context
+
+    def defer_heartbeat(reason: str) -> None:
+        logger.warn("Heartbeat deferred", reason=reason, remaining_s=round(budget.remaining(), 2))
+        defer_request("POST", heartbeat_endpoint, heartbeat_data, transcript_path=transcript_path)
+
+    if registration_deferred:
+        defer_heartbeat(f"session not registered: {registration_deferred}")
+        sys.exit(0)
+
+    # Requests earlier invocations had to defer go first so activity stays in
+    # order, keeping enough budget for one full attempt at this heartbeat
+    replay_deferred_requests(reserve_seconds=HEARTBEAT_TIMEOUT_SECONDS + deadline.MIN_REQUEST_SECONDS)
+
     try:
-        # Send heartbeat with retry (budget: 10s hook timeout)
-        response = api_request("POST", f"/api/v1/sessions/{overlap_session_id}/heartbeat", {
-            "files": relative_paths,
-            "tool_name": tool_name,
-        }, timeout=4, retries=1)
+        # Send heartbeat with retry; timeouts and the retry are capped by the hook deadline
+        response = api_request("POST", f"/api/v1/sessions/{overlap_session_id}/heartbeat",
+                               heartbeat_data, timeout=HEARTBEAT_TIMEOUT_SECONDS, retries=1,
+                               paths_session=overlap_session_id)
 
         result = response.get("data", {})
         if result.get("throttled"):
             logger.debug("Heartbeat throttled (server-side)", retry_after=result.get("retry_after"))
         else:
-            update_session_heartbeat_time(transcript_path, is_write=is_write)
+            update_session_heartbeat_time(transcript_path, is_write=is_write, transcript_state=tail_state)
             if result.get("reactivated"):
                 logger.info("Session reactivated via heartbeat", session_id=overlap_session_id)
                 logger.stderr_log(f"Session reactivated: {overlap_session_id}")
@@ -116,6 +173,9 @@ def main():
                         file_paths=relative_paths,
                         scope=result.get("semantic_scope"))
 
+    except DeadlineExceeded as e:
+        defer_heartbeat(str(e))
+
     except Exception as e:
         error_msg = str(e)
         logger.error("Heartbeat failed", exc=e, file_paths=relative_paths)
@@ -127,21 +187,30 @@ def main():
             logger.warn("Session not found on server, clearing local entry for re-registration",
                         overlap_session_id=overlap_session_id)
             clear_session_for_transcript(transcript_path)
-            # Try to re-register immediately
-            new_id = ensure_session_registered(transcript_path, session_id, cwd)
+            # Try to re-register immediately (needs time for two round trips)
+            new_id = None
+            if budget.has(2 * deadline.MIN_REQUEST_SECONDS):
+                try:
+                    new_id = ensure_session_registered(transcript_path, session_id, cwd)
+                except DeadlineExceeded as reregister_err:
+                    logger.warn("Re-registration deferred", reason=str(reregister_err))
             if new_id:
                 logger.info("Re-registered session after 404", new_session_id=new_id)
+                metrics.inc("overlap_session_reregistrations_total")
                 logger.stderr_log(f"Session re-registered: {new_id}")
                 # Retry the heartbeat with the new session ID
                 try:
-                    api_request("POST", f"/api/v1/sessions/{new_id}/heartbeat", {
-                        "files": relative_paths,
-                        "tool_name": tool_name,
-                    }, timeout=4, retries=0)
-                    update_session_heartbeat_time(transcript_path, is_write=is_write)
+                    api_request("POST", f"/api/v1/sessions/{new_id}/heartbeat",
+                                heartbeat_data, timeout=HEARTBEAT_TIMEOUT_SECONDS, retries=0,
+                                paths_session=new_id)
+                    update_session_heartbeat_time(transcript_path, is_write=is_write, transcript_state=tail_state)
+                except DeadlineExceeded as retry_err:
+                    defer_heartbeat(str(retry_err))
                 except Exception as retry_err:
                     logger.error("Retry heartbeat after re-register failed", exc=retry_err)
             else:
+                # Sent once the next tool use has re-registered the session
+                defer_heartbeat("session not re-registered")
                 logger.stderr_log("Session lost - will re-register on next tool use")
         else:
             logger.stderr_log(f"Heartbeat failed: {e}")
@@ -0,0 +1,470 @@
+#!/usr/bin/env python3
+"""
+Overlap personal history.
+
+Used by /overlap:history. Keeps a local SQLite mirror of the user's sessions
+and activity (~/.claude/overlap/history.db) and answers history and search
+queries from it, rendered as markdown.
+
+Syncing is incremental: the first sync pages back through
+/api/v1/users/me/timeline by following the server's keyset cursors (newest
+first); later syncs only ask for sessions with activity or an end since the
+newest timestamp already mirrored (`updated_since`). Activity rows are upserted,
+so the mirror keeps activity the timeline no longer returns (it only includes
+each session's latest 10). Summaries, scopes and file paths are indexed with
+FTS5 for search.
+"""
+
+import argparse
+import hashlib
+import json
+import sqlite3
+import sys
+import os
+import time
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import Iterator, Optional
+from urllib.parse import urlencode
+
+# Add scripts directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import logger
+from config import CONFIG_DIR, get_config, is_configured
+from api import api_request
+
+HISTORY_DB = CONFIG_DIR / "history.db"
+
+PAGE_SIZE = 50
+MAX_PAGES = 20  # First sync stops after 1000 sessions
+MAX_INCREMENTAL_PAGES = 100
+
+# Queries within this long of the last sync don't hit the server
+SYNC_INTERVAL_SECONDS = 60
+
+MAX_SEARCH_RESULTS = 50
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS sessions (
+    id TEXT PRIMARY KEY,
+    device_name TEXT,
+    device_is_remote INTEGER NOT NULL DEFAULT 0,
+    repo_name TEXT,
+    branch TEXT,
+    status TEXT,
+    started_at TEXT NOT NULL,
+    last_activity_at TEXT,
+    ended_at TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_sessions_started ON sessions(started_at DESC);
+CREATE TABLE IF NOT EXISTS activity (
+    id TEXT PRIMARY KEY,
+    session_id TEXT NOT NULL,
+    files TEXT NOT NULL DEFAULT '[]',
+    -- Space-separated paths, for the full-text index
+    file_terms TEXT NOT NULL DEFAULT '',
+    semantic_scope TEXT,
+    summary TEXT,
+    created_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_activity_session ON activity(session_id, created_at DESC);
+"""
+
+# External-content index over activity, kept current by triggers
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS activity_fts USING fts5(
+    summary, semantic_scope, file_terms,
+    content='activity', content_rowid='rowid'
+);
+CREATE TRIGGER IF NOT EXISTS activity_fts_insert AFTER INSERT ON activity BEGIN
+    INSERT INTO activity_fts(rowid, summary, semantic_scope, file_terms)
+    VALUES (new.rowid, new.summary, new.semantic_scope, new.file_terms);
+END;
+CREATE TRIGGER IF NOT EXISTS activity_fts_delete AFTER DELETE ON activity BEGIN
+    INSERT INTO activity_fts(activity_fts, rowid, summary, semantic_scope, file_terms)
+    VALUES ('delete', old.rowid, old.summary, old.semantic_scope, old.file_terms);
+END;
+CREATE TRIGGER IF NOT EXISTS activity_fts_update AFTER UPDATE ON activity BEGIN
+    INSERT INTO activity_fts(activity_fts, rowid, summary, semantic_scope, file_terms)
+    VALUES ('delete', old.rowid, old.summary, old.semantic_scope, old.file_terms);
+    INSERT INTO activity_fts(rowid, summary, semantic_scope, file_terms)
+    VALUES (new.rowid, new.summary, new.semantic_scope, new.file_terms);
+END;
+"""
+
+
+def _parse_timestamp(value: str) -> Optional[datetime]:
+    """Parse a D1 datetime ('YYYY-MM-DD HH:MM:SS', UTC) or ISO timestamp."""
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
+
+def _d1_datetime(value: datetime) -> str:
+    return value.astimezone(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+
+
+def iter_timeline(
+    page_size: int = PAGE_SIZE,
+    max_pages: int = MAX_PAGES,
+    updated_since: Optional[str] = None,
+) -> Iterator[dict]:
+    """Yield the user's sessions newest first, following nextCursor between pages."""
+    cursor = None
+    for _ in range(max_pages):
+        params = {"limit": page_size}
+        if updated_since:
+            params["updated_since"] = updated_since
+        if cursor:
+            params["cursor"] = cursor
+        response = api_request("GET", f"/api/v1/users/me/timeline?{urlencode(params)}", timeout=10)
+        data = response.get("data", {})
+
+        for session in data.get("sessions", []):
+            yield session
+
+        cursor = data.get("nextCursor")
+        if not data.get("hasMore") or not cursor:
+            return
+
+
+# ----------------------------------------------------------------------------
+# Mirror
+# ----------------------------------------------------------------------------
+
+def _mirror_owner() -> str:
+    """Identifies whose history the mirror holds; a different server or user starts over."""
+    config = get_config()
+    key = f"{config.get('server_url')}\n{config.get('user_token')}"
+    return hashlib.sha256(key.encode()).hexdigest()[:16]
+
+
+def _get_meta(conn: sqlite3.Connection, key: str) -> Optional[str]:
+    row = conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+    return row[0] if row else None
+
+
+def _set_meta(conn: sqlite3.Connection, key: str, value) -> None:
+    conn.execute(
+        "INSERT INTO meta (key, value) VALUES (?, ?) ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+        (key, None if value is None else str(value)),
+    )
+
+
+def open_mirror() -> sqlite3.Connection:
+    """Open (creating if needed) the history mirror for the configured user."""
+    CONFIG_DIR.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(HISTORY_DB, timeout=5)
+    conn.row_factory = sqlite3.Row
+    conn.executescript(SCHEMA)
+
+    if _get_meta(conn, "fts") is None:
+        try:
+            conn.executescript(FTS_SCHEMA)
+            fts = 1
+        except sqlite3.OperationalError:
+            fts = 0  # SQLite built without FTS5: search falls back to LIKE
+        with conn:
+            _set_meta(conn, "fts", fts)
+
+    owner = _mirror_owner()
+    if _get_meta(conn, "owner") != owner:
+        with conn:
+            conn.execute("DELETE FROM activity")
+            conn.execute("DELETE FROM sessions")
+            conn.execute("DELETE FROM meta WHERE key NOT IN ('fts')")
+            _set_meta(conn, "owner", owner)
+    return conn
+
+
+def _has_fts(conn: sqlite3.Connection) -> bool:
+    return _get_meta(conn, "fts") == "1"
+
+
+def _store_session(conn: sqlite3.Connection, session: dict) -> None:
+    device = session.get("device") or {}
+    repo = session.get("repo") or {}
+    conn.execute(
+        """INSERT INTO sessions (id, device_name, device_is_remote, repo_name, branch, status,
+                                 started_at, last_activity_at, ended_at)
+           VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+           ON CONFLICT(id) DO UPDATE SET
+             device_name = excluded.device_name, device_is_remote = excluded.device_is_remote,
+             repo_name = excluded.repo_name, branch = excluded.branch, status = excluded.status,
+             started_at = excluded.started_at, last_activity_at = excluded.last_activity_at,
+             ended_at = excluded.ended_at""",
+        (
+            session["id"], device.get("name"), 1 if device.get("is_remote") else 0,
+            repo.get("name"), session.get("branch"), session.get("status"),
+            session.get("started_at"), session.get("last_activity_at"), session.get("ended_at"),
+        ),
+    )
+    for activity in session.get("activities", []):
+        files = activity.get("files") or []
+        conn.execute(
+            """INSERT INTO activity (id, session_id, files, file_terms, semantic_scope, summary, created_at)
+               VALUES (?, ?, ?, ?, ?, ?, ?)
+               ON CONFLICT(id) DO UPDATE SET
+                 files = excluded.files, file_terms = excluded.file_terms,
+                 semantic_scope = excluded.semantic_scope, summary = excluded.summary,
+                 created_at = excluded.created_at""",
+            (
+                activity["id"], session["id"], json.dumps(files), " ".join(files),
+                activity.get("semantic_scope"), activity.get("summary"), activity.get("created_at"),
+            ),
+        )
+
+
+def sync(conn: sqlite3.Connection, force: bool = False) -> int:
+    """
+    Pull sessions changed since the last sync into the mirror. Returns the
+    number of sessions received; 0 without a request inside SYNC_INTERVAL_SECONDS.
+    """
+    last_sync = float(_get_meta(conn, "last_sync_at") or 0)
+    if not force and time.time() - last_sync < SYNC_INTERVAL_SECONDS:
+        return 0
+
+    watermark = _get_meta(conn, "watermark")
+    max_pages = MAX_INCREMENTAL_PAGES if watermark else MAX_PAGES
+    newest = watermark
+    received = 0
+
+    # One transaction: an interrupted sync leaves the previous mirror intact
+    with conn:
+        for session in iter_timeline(max_pages=max_pages, updated_since=watermark):
+            _store_session(conn, session)
+            received += 1
+            for value in (session.get("last_activity_at"), session.get("ended_at")):
+                if value and (newest is None or value > newest):
+                    newest = value
+        # updated_since is inclusive, so a session updated in the same second
+        # as the watermark is fetched again rather than missed
+        _set_meta(conn, "watermark", newest)
+        _set_meta(conn, "last_sync_at", time.time())
+
+    logger.debug("History mirror synced", sessions=received, watermark=newest)
+    return received
+
+
+def _fts_query(text: str) -> str:
+    """Quote each term so paths and punctuation can't be read as FTS5 syntax; prefix-match the last."""
+    terms = ['"' + term.replace('"', '""') + '"' for term in text.split()]
+    if terms:
+        terms[-1] += "*"
+    return " ".join(terms)
+
+
+def _activities_for(conn: sqlite3.Connection, session_ids: list) -> dict:
+    by_session = {}
+    if not session_ids:
+        return by_session
+    placeholders = ",".join("?" * len(session_ids))
+    rows = conn.execute(
+        f"""SELECT session_id, files, semantic_scope, summary, created_at FROM activity
+            WHERE session_id IN ({placeholders}) ORDER BY created_at DESC""",
+        session_ids,
+    )
+    for row in rows:
+        activity = dict(row)
+        activity["files"] = json.loads(activity["files"])
+        by_session.setdefault(row["session_id"], []).append(activity)
+    return by_session
+
+
+def query_history(conn: sqlite3.Connection, days: int, repo: Optional[str] = None) -> list:
+    """Mirrored sessions started within the last `days` days, newest first, with their activity."""
+    cutoff = _d1_datetime(datetime.now(timezone.utc) - timedelta(days=days))
+    sql = "SELECT * FROM sessions WHERE started_at >= ?"
+    params = [cutoff]
+    if repo:
+        sql += " AND repo_name = ?"
+        params.append(repo)
+    sessions = [dict(row) for row in conn.execute(sql + " ORDER BY started_at DESC, id DESC", params)]
+
+    activities = _activities_for(conn, [s["id"] for s in sessions])
+    for session in sessions:
+        session["activities"] = activities.get(session["id"], [])
+    return sessions
+
+
+def search(conn: sqlite3.Connection, text: str, days: Optional[int] = None,
+           repo: Optional[str] = None, limit: int = MAX_SEARCH_RESULTS) -> list:
+    """Activity matching `text` in summaries, scopes or file paths, best matches first."""
+    filters, params = [], []
+    if days:
+        filters.append("a.created_at >= ?")
+        params.append(_d1_datetime(datetime.now(timezone.utc) - timedelta(days=days)))
+    if repo:
+        filters.append("s.repo_name = ?")
+        params.append(repo)
+    where = "".join(f" AND {f}" for f in filters)
+
+    columns = """a.files, a.semantic_scope, a.summary, a.created_at,
+                 s.repo_name, s.branch, s.device_name"""
+    if _has_fts(conn):
+        sql = f"""SELECT {columns} FROM activity_fts
+                  JOIN activity a ON a.rowid = activity_fts.rowid
+                  JOIN sessions s ON s.id = a.session_id
+                  WHERE activity_fts MATCH ?{where}
+                  ORDER BY bm25(activity_fts), a.created_at DESC LIMIT ?"""
+        params = [_fts_query(text)] + params
+    else:
+        # Every term must appear somewhere in the row
+        terms = text.split()
+        term_filter = " AND ".join(
+            "(a.summary LIKE ? OR a.semantic_scope LIKE ? OR a.file_terms LIKE ?)" for _ in terms
+        ) or "1"
+        sql = f"""SELECT {columns} FROM activity a
+                  JOIN sessions s ON s.id = a.session_id
+                  WHERE {term_filter}{where}
+                  ORDER BY a.created_at DESC LIMIT ?"""
+        params = [f"%{term}%" for term in terms for _ in range(3)] + params
+
+    results = []
+    for row in conn.execute(sql, params + [limit]):
+        result = dict(row)
+        result["files"] = json.loads(result["files"])
+        results.append(result)
+    return results
+
+
+# ----------------------------------------------------------------------------
+# Rendering
+# ----------------------------------------------------------------------------
+
+def _local(value: Optional[str]) -> Optional[datetime]:
+    parsed = _parse_timestamp(value or "")
+    return parsed.astimezone() if parsed else None
+
+
+def _duration(session: dict) -> str:
+    start = _parse_timestamp(session.get("started_at") or "")
+    end = _parse_timestamp(session.get("ended_at") or session.get("last_activity_at") or "")
+    if not start or not end or end < start:
+        return "unknown"
+    minutes = int((end - start).total_seconds() // 60)
+    if minutes < 60:
+        return f"{minutes}m"
+    return f"{minutes // 60}h {minutes % 60}m"
+
+
+def _session_heading(started: datetime, repo: Optional[str], branch: Optional[str]) -> str:
+    where = repo or "(no repo)"
+    if branch:
+        where += f" ({branch})"
+    return f"### {started:%H:%M} - {where}"
+
+
+def render_history(sessions: list, days: int) -> str:
+    if not sessions:
+        return f"No sessions in the last {days} days."
+
+    lines = []
+    current_date = None
+    for session in sessions:
+        started = _local(session["started_at"])
+        if started.date() != current_date:
+            current_date = started.date()
+            lines += ["", f"## {current_date:%A, %B %d, %Y}", ""]
+        lines.append(_session_heading(started, session["repo_name"], session["branch"]))
+
+        summaries = [a["summary"] for a in session["activities"] if a["summary"]]
+        lines.append(summaries[0] if summaries else "(no summary)")
+        files = []
+        for activity in session["activities"]:
+            files += [f for f in activity["files"] if f not in files]
+        if files:
+            shown = ", ".join(files[:8])
+            lines.append(f"Files: {shown}" + (f" (+{len(files) - 8} more)" if len(files) > 8 else ""))
+        lines += [f"Duration: {_duration(session)}" + (f" ({session['status']})" if session["status"] == "active" else ""), ""]
+
+    repos = Counter(s["repo_name"] or "(no repo)" for s in sessions)
+    scopes = Counter(a["semantic_scope"] for s in sessions for a in s["activities"] if a["semantic_scope"])
+    lines += [
+        "---",
+        "",
+        f"**{len(sessions)} sessions** in the last {days} days",
+        "Most active repos: " + ", ".join(f"{name} ({count})" for name, count in repos.most_common(3)),
+    ]
+    if scopes:
+        lines.append("Common work areas: " + ", ".join(f"{name} ({count})" for name, count in scopes.most_common(5)))
+    return "\n".join(lines).strip() + "\n"
+
+
+def render_search(results: list, text: str) -> str:
+    if not results:
+        return f'No activity matching "{text}".'
+
+    noun = "match" if len(results) == 1 else "matches"
+    lines = [f'# {len(results)} {noun} for "{text}"', ""]
+    for result in results:
+        created = _local(result["created_at"])
+        where = result["repo_name"] or "(no repo)"
+        if result["branch"]:
+            where += f" ({result['branch']})"
+        scope = f" [{result['semantic_scope']}]" if result["semantic_scope"] else ""
+        lines.append(f"- **{created:%Y-%m-%d %H:%M}** {where}{scope}: {result['summary'] or '(no summary)'}")
+        files = result["files"]
+        if files:
+            lines.append(f"  Files: {', '.join(files[:8])}" + (f" (+{len(files) - 8} more)" if len(files) > 8 else ""))
+    return "\n".join(lines) + "\n"
+
+
+def main():
+    logger.set_context(hook="History")
+
+    parser = argparse.ArgumentParser(description="Show or search your Overlap session history")
+    parser.add_argument("terms", nargs="*",
+                        help="Days of history (default: 7), or 'search' followed by search terms")
+    parser.add_argument("--days", type=int, help="Limit search results to the last N days")
+    parser.add_argument("--repo", help="Only sessions in this repo")
+    parser.add_argument("--offline", action="store_true", help="Answer from the local mirror without syncing")
+    parser.add_argument("--refresh", action="store_true", help="Sync even if the mirror was synced recently")
+    parser.add_argument("--json", action="store_true", help="Print JSON instead of markdown")
+    args = parser.parse_args()
+
+    searching = bool(args.terms) and args.terms[0] == "search"
+    if searching:
+        text = " ".join(args.terms[1:]).strip()
+        if not text:
+            parser.error("search needs at least one term")
+    else:
+        try:
+            days = max(int(args.terms[0]), 1) if args.terms else 7
+        except ValueError:
+            parser.error(f"expected a number of days or 'search', got {args.terms[0]!r}")
+
+    if not is_configured():
+        print("Not configured - run /overlap:config first")
+        sys.exit(1)
+
+    conn = open_mirror()
+    if not args.offline:
+        try:
+            sync(conn, force=args.refresh)
+        except Exception as e:
+            # Stale results beat no results
+            logger.warn("History sync failed, answering from the local mirror", exc=e)
+            print(f"(Sync failed, showing local history: {e})\n")
+
+    if searching:
+        results = search(conn, text, days=args.days, repo=args.repo)
+        print(json.dumps({"query": text, "results": results}, indent=2) if args.json else render_search(results, text))
+    else:
+        sessions = query_history(conn, days, repo=args.repo)
+        print(json.dumps({"days": days, "sessions": sessions}, indent=2) if args.json else render_history(sessions, days))
+
+
+if __name__ == "__main__":
+    main()
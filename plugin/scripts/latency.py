@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Overlap local latency report.
+
+Used by /overlap:latency. Reads the plugin's local log files and summarizes
+API latency per endpoint: client-side elapsed time, how much of it the server
+spent (from the Server-Timing header) broken down by phase, D1 query counts,
+Worker cold starts, and the remainder attributed to the network.
+"""
+
+import argparse
+import json
+import re
+import sys
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+# Add scripts directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from logger import LOG_DIR, LOG_FILE, MAX_LOG_FILES
+
+# Collapse per-session endpoints, e.g. /api/v1/sessions/<id>/heartbeat
+_SESSION_PATH = re.compile(r"^/api/v1/sessions/[^/]+/")
+
+# Server-Timing keys that aren't phases
+_NON_PHASE_KEYS = ("total", "d1", "d1_queries", "cold")
+
+
+def _log_files() -> list:
+    """Current log plus rotated ones, oldest first."""
+    rotated = [LOG_DIR / f"overlap.log.{i}" for i in range(MAX_LOG_FILES, 0, -1)]
+    return [p for p in rotated + [LOG_FILE] if p.exists()]
+
+
+def _percentile(values: list, pct: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(int(round(pct / 100 * (len(ordered) - 1))), len(ordered) - 1)
+    return round(ordered[index], 1)
+
+
+def _mean(values: list) -> Optional[float]:
+    return round(sum(values) / len(values), 1) if values else None
+
+
+def collect(since: datetime) -> dict:
+    """Group HTTP response log entries since `since` by endpoint."""
+    endpoints: dict = {}
+    for path in _log_files():
+        try:
+            with open(path) as f:
+                lines = f.readlines()
+        except OSError:
+            continue
+        for line in lines:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if entry.get("msg") not in ("HTTP response", "HTTP error response"):
+                continue
+            data = entry.get("data") or {}
+            if "endpoint" not in data or "elapsed_ms" not in data:
+                continue
+            try:
+                ts = datetime.fromisoformat(entry.get("ts", ""))
+            except ValueError:
+                continue
+            if ts < since:
+                continue
+
+            endpoint = f"{data.get('method', '')} {_SESSION_PATH.sub('/api/v1/sessions/:id/', data['endpoint'])}"
+            stats = endpoints.setdefault(endpoint, {
+                "elapsed": [], "server": [], "network": [], "d1_ms": [], "d1_queries": [],
+                "phases": {}, "cold": 0, "errors": 0,
+            })
+            stats["elapsed"].append(data["elapsed_ms"])
+            if entry.get("msg") == "HTTP error response":
+                stats["errors"] += 1
+
+            timing = data.get("server_timing") or {}
+            if "total" in timing:
+                stats["server"].append(timing["total"])
+            if "network_ms" in data:
+                stats["network"].append(data["network_ms"])
+            if "d1" in timing:
+                stats["d1_ms"].append(timing["d1"])
+            if "d1_queries" in timing:
+                stats["d1_queries"].append(timing["d1_queries"])
+            if timing.get("cold"):
+                stats["cold"] += 1
+            for phase, ms in timing.items():
+                if phase not in _NON_PHASE_KEYS and isinstance(ms, (int, float)):
+                    stats["phases"].setdefault(phase, []).append(ms)
+    return endpoints
+
+
+def summarize(endpoints: dict) -> list:
+    report = []
+    for endpoint, stats in sorted(endpoints.items(), key=lambda kv: -len(kv[1]["elapsed"])):
+        report.append({
+            "endpoint": endpoint,
+            "requests": len(stats["elapsed"]),
+            "errors": stats["errors"],
+            "cold_starts": stats["cold"],
+            "client_p50_ms": _percentile(stats["elapsed"], 50),
+            "client_p95_ms": _percentile(stats["elapsed"], 95),
+            "server_p50_ms": _percentile(stats["server"], 50),
+            "server_p95_ms": _percentile(stats["server"], 95),
+            "network_p50_ms": _percentile(stats["network"], 50),
+            "d1_mean_ms": _mean(stats["d1_ms"]),
+            "d1_mean_queries": _mean(stats["d1_queries"]),
+            "phase_mean_ms": {
+                phase: _mean(values)
+                for phase, values in sorted(stats["phases"].items(), key=lambda kv: -sum(kv[1]))
+            },
+        })
+    return report
+
+
+def _fmt(value: Optional[float]) -> str:
+    return "-" if value is None else f"{value:g}"
+
+
+def print_report(report: list, hours: int) -> None:
+    if not report:
+        print(f"No API requests logged in the last {hours}h.")
+        return
+
+    print(f"API latency over the last {hours}h (ms)\n")
+    for row in report:
+        print(f"{row['endpoint']}  ({row['requests']} requests, "
+              f"{row['errors']} errors, {row['cold_starts']} cold starts)")
+        print(f"  client   p50 {_fmt(row['client_p50_ms'])}  p95 {_fmt(row['client_p95_ms'])}")
+        print(f"  server   p50 {_fmt(row['server_p50_ms'])}  p95 {_fmt(row['server_p95_ms'])}")
+        print(f"  network  p50 {_fmt(row['network_p50_ms'])}")
+        print(f"  d1       mean {_fmt(row['d1_mean_ms'])} over {_fmt(row['d1_mean_queries'])} queries")
+        if row["phase_mean_ms"]:
+            phases = ", ".join(f"{name} {_fmt(ms)}" for name, ms in row["phase_mean_ms"].items())
+            print(f"  phases   mean {phases}")
+        print()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarize Overlap API latency from local logs")
+    parser.add_argument("hours", nargs="?", type=int, default=24,
+                        help="How many hours of logs to include (default: 24)")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args()
+
+    since = datetime.now(timezone.utc) - timedelta(hours=max(args.hours, 1))
+    report = summarize(collect(since))
+
+    if args.json:
+        print(json.dumps({"hours": args.hours, "endpoints": report}, indent=2))
+    else:
+        print_report(report, args.hours)
+
+
+if __name__ == "__main__":
+    main()
@@ -7,20 +7,37 @@ Provides structured logging with:
 - File rotation (5 files, 1MB each)
 - Sensitive data sanitization
 - Server sync (sends logs to Overlap server for admin viewing)
+
+The local file always gets every entry in full. The stream shipped to the
+server is reduced first: INFO entries repeating a level/hook/message already
+shipped within the dedup window are held back and later sent as one entry
+with a count and time span, and new INFO entries are subject to a sampling
+rate and an hourly token budget (which summaries also spend from); entries
+failing either aren't shipped at all. WARN and ERROR are always shipped as-is. Hooks are
+separate processes, so the dedup and budget state lives in a small locked
+file next to the logs.
 """
 
 from __future__ import annotations
 
 import atexit
+import fcntl
 import json
 import os
+import random
 import sys
+import time
 import traceback
+from contextlib import contextmanager
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any, Optional
 from urllib.request import Request, urlopen
 from urllib.error import URLError
+from urllib.parse import urlparse
+
+from deadline import DeadlineExceeded, current as current_deadline
+import metrics
 
 # Log storage - same directory as other plugin data
 LOG_DIR = Path.home() / ".claude" / "overlap" / "logs"
@@ -31,8 +48,19 @@ MAX_LOG_FILES = 5
 # Server sync settings
 LOG_BUFFER: list[dict] = []
 MAX_BUFFER_SIZE = 50  # Send when buffer reaches this size
+MAX_REQUEST_LOGS = 100  # Server limit per request
 _syncing = False  # Prevent recursion when sending logs
 
+# Shipping reduction (see module docstring); each can be overridden in
+# config.json as log_sample_rates, log_budgets and log_dedup_seconds
+SHIP_STATE_FILE = LOG_DIR / "ship-state.json"
+SHIP_LOCK_FILE = LOG_DIR / "ship.lock"
+SHIP_LOCK_WAIT_SECONDS = 0.25
+LOCK_POLL_SECONDS = 0.01
+DEFAULT_SAMPLE_RATES = {"INFO": 1.0}  # Fraction of new INFO entries shipped
+DEFAULT_BUDGETS = {"INFO": 120}  # Entries shipped per hour, refilled continuously
+DEFAULT_DEDUP_SECONDS = 600
+
 # Log levels
 DEBUG = 10
 INFO = 20
@@ -108,6 +136,128 @@ def _rotate_logs() -> None:
         pass
 
 
+@contextmanager
+def _ship_state():
+    """Read-modify-write the shipping state under a lock. Yields the state dict."""
+    lock_fd = open(SHIP_LOCK_FILE, "w")
+    try:
+        wait = min(SHIP_LOCK_WAIT_SECONDS, current_deadline().remaining())
+        started_at = time.monotonic()
+        while True:
+            try:
+                fcntl.flock(lock_fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                break
+            except BlockingIOError:
+                if time.monotonic() - started_at >= wait:
+                    raise
+                time.sleep(LOCK_POLL_SECONDS)
+
+        try:
+            with open(SHIP_STATE_FILE) as f:
+                state = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            state = {}
+        state.setdefault("buckets", {})
+        state.setdefault("repeats", {})
+        yield state
+
+        tmp_path = SHIP_STATE_FILE.with_name(f"{SHIP_STATE_FILE.name}.{os.getpid()}.tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(state, f)
+        os.replace(tmp_path, SHIP_STATE_FILE)
+    finally:
+        lock_fd.close()
+
+
+def _take_token(state: dict, level: str, budget: float, now: float) -> bool:
+    """Spend one token from the level's hourly bucket, if it has one."""
+    bucket = state["buckets"].setdefault(level, {"tokens": budget, "at": now})
+    tokens = min(budget, bucket["tokens"] + (now - bucket["at"]) * budget / 3600)
+    bucket["at"] = now
+    if tokens < 1:
+        bucket["tokens"] = tokens
+        return False
+    bucket["tokens"] = tokens - 1
+    return True
+
+
+def _summary(repeat: dict) -> dict:
+    """One entry standing in for the held-back repeats of a message."""
+    return {
+        "ts": repeat["last"],
+        "level": repeat["level"],
+        "msg": repeat["msg"],
+        "hook": repeat["hook"],
+        "session_id": repeat["session_id"],
+        "data": {"repeated": repeat["held"], "first_ts": repeat["first"], "last_ts": repeat["last"]},
+    }
+
+
+def _reduce(entries: list[dict], config: dict, now: float) -> list[dict]:
+    """
+    Apply dedup, sampling and budgets to buffered entries, returning what to
+    ship. Sampled-out and over-budget entries are dropped. Repeats within the
+    dedup window are held back and shipped as one summary when the window
+    closes, which spends a token like any other entry.
+    """
+    sample_rates = {**DEFAULT_SAMPLE_RATES, **(config.get("log_sample_rates") or {})}
+    budgets = {**DEFAULT_BUDGETS, **(config.get("log_budgets") or {})}
+    dedup_seconds = config.get("log_dedup_seconds", DEFAULT_DEDUP_SECONDS)
+
+    try:
+        with _ship_state() as state:
+            repeats = state["repeats"]
+            shipped = []
+
+            def ship_summary(repeat: dict) -> None:
+                level = repeat["level"]
+                if _take_token(state, level, budgets.get(level, float("inf")), now):
+                    shipped.append(_summary(repeat))
+                else:
+                    metrics.inc("overlap_log_entries_held_total", {"level": level, "reason": "budget"})
+
+            for entry in entries:
+                level = entry.get("level", "INFO")
+                if level in ("WARN", "ERROR"):
+                    shipped.append(entry)
+                    continue
+
+                key = "\x1f".join((level, entry.get("hook") or "", entry.get("msg", "")))
+                repeat = repeats.get(key)
+                if repeat and now - repeat["since"] < dedup_seconds:
+                    repeat.update(held=repeat["held"] + 1, last=entry["ts"], session_id=entry.get("session_id"))
+                    metrics.inc("overlap_log_entries_held_total", {"level": level, "reason": "dedup"})
+                    continue
+                if repeat and repeat["held"]:
+                    ship_summary(repeat)
+
+                # The window opens whether or not this entry ships, so its
+                # repeats are deduplicated either way
+                repeats[key] = {
+                    "level": level, "hook": entry.get("hook"), "msg": entry.get("msg", ""),
+                    "session_id": entry.get("session_id"), "since": now,
+                    "first": entry["ts"], "last": entry["ts"], "held": 0,
+                }
+                if random.random() >= sample_rates.get(level, 1.0):
+                    metrics.inc("overlap_log_entries_held_total", {"level": level, "reason": "sampled"})
+                elif not _take_token(state, level, budgets.get(level, float("inf")), now):
+                    metrics.inc("overlap_log_entries_held_total", {"level": level, "reason": "budget"})
+                else:
+                    shipped.append(entry)
+
+            # Close windows nobody has repeated into since
+            for key, repeat in list(repeats.items()):
+                if now - repeat["since"] >= dedup_seconds:
+                    if repeat["held"]:
+                        ship_summary(repeat)
+                    del repeats[key]
+
+            return shipped
+    except (OSError, ValueError, KeyError):
+        # No shared state (lock busy or unreadable): ship only what must never be dropped
+        return [entry for entry in entries if entry.get("level") in ("WARN", "ERROR")]
+
+
 def _sync_to_server() -> None:
     """Send buffered logs to the server."""
     global LOG_BUFFER, _syncing
@@ -125,6 +275,10 @@ def _sync_to_server() -> None:
         if not all([config.get("server_url"), config.get("user_token"), config.get("team_token")]):
             return
 
+        logs_to_send = _reduce(logs_to_send, config, time.time())
+        if not logs_to_send:
+            return
+
         url = f"{config['server_url'].rstrip('/')}/api/v1/logs"
         headers = {
             "Content-Type": "application/json",
@@ -132,7 +286,7 @@ def _sync_to_server() -> None:
             "X-Team-Token": config["team_token"],
         }
 
-        # Transform logs for API
+        # Transform logs for API, leaving out empty fields
         api_logs = []
         for log in logs_to_send:
             api_log = {
@@ -144,16 +298,21 @@ def _sync_to_server() -> None:
                 "error": log.get("error"),
                 "timestamp": log.get("ts"),
             }
-            api_logs.append(api_log)
+            api_logs.append({k: v for k, v in api_log.items() if v is not None})
+
+        # api imports this module, so import it here rather than at the top
+        from api import encode_body, record_wire_support
 
-        body = json.dumps({"logs": api_logs}).encode()
-        request = Request(url, data=body, headers=headers, method="POST")
+        for start in range(0, len(api_logs), MAX_REQUEST_LOGS):
+            body, encoding_headers = encode_body({"logs": api_logs[start:start + MAX_REQUEST_LOGS]}, "/api/v1/logs")
+            request = Request(url, data=body, headers={**headers, **encoding_headers}, method="POST")
 
-        with urlopen(request, timeout=5) as response:
-            pass  # Success - don't log (would cause recursion)
+            # Runs at exit too, so it must fit in what's left of the hook deadline
+            with urlopen(request, timeout=current_deadline().timeout(5)) as response:
+                record_wire_support(response.headers)  # Success - don't log (would cause recursion)
 
-    except (URLError, OSError, json.JSONDecodeError):
-        # Failed to send - logs are still in local file
+    except (URLError, OSError, json.JSONDecodeError, DeadlineExceeded):
+        # Failed to send (or no time left) - logs are still in local file
         pass
     finally:
         _syncing = False
@@ -183,6 +342,10 @@ def _write_log(level: int, message: str, data: Optional[dict] = None,
                 "traceback": traceback.format_exc()
             }
 
+        if level >= WARN:
+            metrics.inc("overlap_log_messages_total",
+                        {"hook": _context.get("hook") or "", "level": entry["level"]})
+
         # Write to local file
         with open(LOG_FILE, "a") as f:
             f.write(json.dumps(entry) + "\n")
@@ -236,14 +399,47 @@ def error(message: str, exc: Optional[Exception] = None, **data) -> None:
     _write_log(ERROR, message, data if data else None, exc)
 
 
+def parse_server_timing(header: Optional[str]) -> Optional[dict]:
+    """
+    Parse a Server-Timing header into {phase: ms}.
+
+    The server reports D1 usage as `d1;dur=<ms>;desc="<queries>"`, which becomes
+    d1 (ms) and d1_queries, and Worker cold starts as `cold;desc="1"`.
+    """
+    if not header:
+        return None
+
+    timing: dict[str, Any] = {}
+    for metric in header.split(","):
+        parts = [p.strip() for p in metric.split(";")]
+        name = parts[0]
+        if not name:
+            continue
+        params = {}
+        for param in parts[1:]:
+            key, _, value = param.partition("=")
+            params[key.strip()] = value.strip().strip('"')
+        try:
+            if "dur" in params:
+                timing[name] = round(float(params["dur"]), 2)
+            if name == "d1" and params.get("desc"):
+                timing["d1_queries"] = int(params["desc"])
+            elif name == "cold":
+                timing["cold"] = True
+        except ValueError:
+            continue
+    return timing or None
+
+
 class RequestContext:
     """Context manager for tracking HTTP request timing."""
 
-    def __init__(self, method: str, url: str, payload_size: int = 0):
+    def __init__(self, method: str, url: str, payload_size: int = 0, wire_size: Optional[int] = None):
         self.request_id = datetime.now(timezone.utc).strftime("%H%M%S%f")[:12]
         self.method = method
         self.url = url.split("?")[0]  # Strip query params
         self.payload_size = payload_size
+        self.wire_size = payload_size if wire_size is None else wire_size
         self.start_time = datetime.now(timezone.utc)
 
     def log_start(self) -> None:
@@ -252,18 +448,23 @@ class RequestContext:
              request_id=self.request_id,
              method=self.method,
              url=self.url,
-             payload_size=self.payload_size)
+             payload_size=self.payload_size,
+             wire_size=self.wire_size)
 
-    def log_success(self, status: int) -> None:
-        """Log a successful response."""
+    def log_success(self, status: int, server_timing: Optional[str] = None) -> None:
+        """Log a successful response, with the server's phase breakdown if sent."""
         elapsed_ms = self._elapsed_ms()
         info("HTTP response",
              request_id=self.request_id,
+             method=self.method,
+             endpoint=self._endpoint(),
              status=status,
-             elapsed_ms=elapsed_ms)
+             elapsed_ms=elapsed_ms,
+             **self._timing_fields(elapsed_ms, server_timing))
 
     def log_error(self, status: int, error_msg: Optional[str] = None,
-                  exc: Optional[Exception] = None) -> None:
+                  exc: Optional[Exception] = None,
+                  server_timing: Optional[str] = None) -> None:
         """Log a failed response."""
         elapsed_ms = self._elapsed_ms()
         if exc:
@@ -274,20 +475,41 @@ class RequestContext:
         else:
             warn("HTTP error response",
                  request_id=self.request_id,
+                 method=self.method,
+                 endpoint=self._endpoint(),
                  status=status,
                  error_msg=error_msg,
-                 elapsed_ms=elapsed_ms)
+                 elapsed_ms=elapsed_ms,
+                 **self._timing_fields(elapsed_ms, server_timing))
+
+    def _endpoint(self) -> str:
+        """URL path without the server origin, e.g. /api/v1/check."""
+        return urlparse(self.url).path
+
+    @staticmethod
+    def _timing_fields(elapsed_ms: float, server_timing: Optional[str]) -> dict:
+        """Server phases plus network_ms: client elapsed time not spent in the Worker."""
+        timing = parse_server_timing(server_timing)
+        if not timing:
+            return {}
+        fields: dict[str, Any] = {"server_timing": timing}
+        if "total" in timing:
+            fields["network_ms"] = round(max(elapsed_ms - timing["total"], 0), 2)
+        return fields
 
     def _elapsed_ms(self) -> float:
         """Calculate elapsed time in milliseconds."""
         return round((datetime.now(timezone.utc) - self.start_time).total_seconds() * 1000, 2)
 
 
-def log_request(method: str, url: str, payload_size: int = 0) -> RequestContext:
+def log_request(method: str, url: str, payload_size: int = 0,
+                wire_size: Optional[int] = None) -> RequestContext:
     """
     Start logging an HTTP request.
 
     Returns a RequestContext that should be used to log the response.
+    `wire_size` is the body size as sent, if compression or path interning
+    made it smaller than `payload_size`.
 
     Usage:
         ctx = logger.log_request("POST", url, len(body))
@@ -298,4 +520,4 @@ def log_request(method: str, url: str, payload_size: int = 0) -> RequestContext:
         except Exception as e:
             ctx.log_error(0, exc=e)
     """
-    return RequestContext(method, url, payload_size)
+    return RequestContext(method, url, payload_size, wire_size)
@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+Overlap plugin metrics.
+
+Hooks count events (invocations, API requests, retries, throttle hits,
+re-registrations, deferrals, lock waits) in memory and append them to
+~/.claude/overlap/metrics/events.jsonl as a single line when the process exits.
+Writes are one O_APPEND write each, so concurrent hooks never interleave and
+no lock is taken on the hot path.
+
+Run as a script to fold new events into a snapshot and export everything in
+Prometheus text format, e.g. from cron for node_exporter's textfile collector:
+
+    python3 metrics.py --textfile-dir /var/lib/node_exporter/textfile_collector
+
+Without --textfile-dir the metrics are printed to stdout. No server requests
+are made either way.
+"""
+
+import argparse
+import atexit
+import fcntl
+import json
+import os
+import re
+import sys
+import time
+from pathlib import Path
+from typing import Optional
+
+METRICS_DIR = Path.home() / ".claude" / "overlap" / "metrics"
+EVENTS_FILE = METRICS_DIR / "events.jsonl"
+SNAPSHOT_FILE = METRICS_DIR / "snapshot.json"
+EXPORT_LOCK_FILE = METRICS_DIR / "export.lock"
+TEXTFILE_NAME = "overlap.prom"
+
+# The exporter starts a new events file once this much has been folded in
+MAX_EVENTS_BYTES = 1_000_000
+
+# Seconds
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# name -> (type, help)
+METRICS = {
+    "overlap_hook_invocations_total": ("counter", "Hook invocations"),
+    "overlap_hook_duration_seconds": ("histogram", "Hook wall time from start to exit"),
+    "overlap_log_messages_total": ("counter", "Warnings and errors logged"),
+    "overlap_log_entries_held_total": ("counter", "INFO log entries kept local by dedup, sampling or budget"),
+    "overlap_api_requests_total": ("counter", "API request attempts by endpoint and status (0 = no response)"),
+    "overlap_api_request_duration_seconds": ("histogram", "API request attempt latency"),
+    "overlap_api_retries_total": ("counter", "API request retries"),
+    "overlap_api_request_body_bytes_total": ("counter", "Request body bytes before interning and compression"),
+    "overlap_api_request_wire_bytes_total": ("counter", "Request body bytes as sent"),
+    "overlap_path_resyncs_total": ("counter", "Requests resent with full paths after the server lost a session's path table"),
+    "overlap_heartbeat_throttled_total": ("counter", "Heartbeats skipped by the client-side throttle"),
+    "overlap_session_reregistrations_total": ("counter", "Sessions re-registered after the server returned 404"),
+    "overlap_deferred_requests_total": ("counter", "Requests deferred past a hook deadline"),
+    "overlap_lock_wait_seconds": ("histogram", "Time spent waiting for a local store lock"),
+}
+
+# Collapse per-session endpoints, e.g. /api/v1/sessions/<id>/heartbeat
+_SESSION_PATH = re.compile(r"^/api/v1/sessions/[^/]+/")
+
+_counters: dict = {}
+_observations: dict = {}
+_hook: Optional[str] = None
+_hook_started_at: Optional[float] = None
+
+
+def _labels_key(labels: Optional[dict]) -> str:
+    """Render labels in Prometheus syntax; also the storage key."""
+    if not labels:
+        return ""
+    def escape(value) -> str:
+        return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    return ",".join(f'{k}="{escape(v)}"' for k, v in sorted(labels.items()))
+
+
+def inc(name: str, labels: Optional[dict] = None, value: float = 1) -> None:
+    """Increment a counter for this process."""
+    series = _counters.setdefault(name, {})
+    key = _labels_key(labels)
+    series[key] = series.get(key, 0) + value
+
+
+def observe(name: str, seconds: float, labels: Optional[dict] = None) -> None:
+    """Record one histogram observation for this process."""
+    _observations.setdefault(name, {}).setdefault(_labels_key(labels), []).append(round(seconds, 6))
+
+
+def endpoint_label(endpoint: str) -> str:
+    """Low-cardinality label for an API endpoint: no query string or session IDs."""
+    return _SESSION_PATH.sub("/api/v1/sessions/:id/", endpoint.split("?", 1)[0])
+
+
+def start_hook(hook: str) -> None:
+    """Count a hook invocation; its duration is recorded when the process exits."""
+    global _hook, _hook_started_at
+    _hook = hook
+    _hook_started_at = time.monotonic()
+    inc("overlap_hook_invocations_total", {"hook": hook})
+
+
+def flush() -> None:
+    """Append this process's metrics as one line. Runs at exit."""
+    if _hook_started_at is not None:
+        observe("overlap_hook_duration_seconds", time.monotonic() - _hook_started_at, {"hook": _hook})
+    if not _counters and not _observations:
+        return
+
+    line = (json.dumps({"c": _counters, "h": _observations}, separators=(",", ":")) + "\n").encode()
+    try:
+        METRICS_DIR.mkdir(parents=True, exist_ok=True)
+        fd = os.open(EVENTS_FILE, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600)
+        try:
+            os.write(fd, line)
+        finally:
+            os.close(fd)
+    except OSError:
+        pass  # Metrics are best-effort
+    _counters.clear()
+    _observations.clear()
+
+
+atexit.register(flush)
+
+
+# ----------------------------------------------------------------------------
+# Exporter
+# ----------------------------------------------------------------------------
+
+def _empty_histogram() -> dict:
+    return {"buckets": [0] * len(BUCKETS), "sum": 0.0, "count": 0}
+
+
+def _fold(snapshot: dict, record: dict) -> None:
+    for name, series in record.get("c", {}).items():
+        totals = snapshot["counters"].setdefault(name, {})
+        for key, value in series.items():
+            totals[key] = totals.get(key, 0) + value
+
+    for name, series in record.get("h", {}).items():
+        histograms = snapshot["histograms"].setdefault(name, {})
+        for key, values in series.items():
+            histogram = histograms.setdefault(key, _empty_histogram())
+            for value in values:
+                histogram["sum"] += value
+                histogram["count"] += 1
+                for i, bound in enumerate(BUCKETS):
+                    if value <= bound:
+                        histogram["buckets"][i] += 1
+
+
+def _read_events(path: Path, offset: int) -> tuple:
+    """Records appended to path since offset, and the offset after the last complete line."""
+    records = []
+    try:
+        with open(path, "rb") as f:
+            f.seek(offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # Still being written
+                offset += len(line)
+                try:
+                    records.append(json.loads(line))
+                except json.JSONDecodeError:
+                    continue
+    except FileNotFoundError:
+        pass
+    return records, offset
+
+
+def collect() -> dict:
+    """Fold events appended since the last export into the snapshot and return it."""
+    METRICS_DIR.mkdir(parents=True, exist_ok=True)
+    with open(EXPORT_LOCK_FILE, "w") as lock_fd:
+        fcntl.flock(lock_fd, fcntl.LOCK_EX)
+
+        snapshot = {"offset": 0, "counters": {}, "histograms": {}}
+        try:
+            with open(SNAPSHOT_FILE) as f:
+                snapshot.update(json.load(f))
+        except (OSError, json.JSONDecodeError):
+            pass
+
+        records, offset = _read_events(EVENTS_FILE, snapshot["offset"])
+        if offset > MAX_EVENTS_BYTES:
+            # Start a new events file. The old one's tail is re-read after the
+            # rename; a hook that opened it before the rename but appends after
+            # that second read loses its line.
+            rotated = EVENTS_FILE.with_suffix(".old")
+            os.replace(EVENTS_FILE, rotated)
+            tail, _ = _read_events(rotated, offset)
+            records.extend(tail)
+            rotated.unlink()
+            offset = 0
+
+        for record in records:
+            _fold(snapshot, record)
+        snapshot["offset"] = offset
+
+        tmp_path = SNAPSHOT_FILE.with_suffix(".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(snapshot, f)
+        os.replace(tmp_path, SNAPSHOT_FILE)
+
+    return snapshot
+
+
+def _series(name: str, labels: str, value) -> str:
+    return f"{name}{{{labels}}} {value}" if labels else f"{name} {value}"
+
+
+def render(snapshot: dict) -> str:
+    """Prometheus text exposition format."""
+    lines = []
+    for name, (metric_type, help_text) in METRICS.items():
+        if metric_type == "counter":
+            series = snapshot["counters"].get(name, {})
+            if not series:
+                continue
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} counter"]
+            for labels, value in sorted(series.items()):
+                lines.append(_series(name, labels, value))
+        else:
+            series = snapshot["histograms"].get(name, {})
+            if not series:
+                continue
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+            for labels, histogram in sorted(series.items()):
+                prefix = f"{labels}," if labels else ""
+                # Bucket counts are stored cumulative (le semantics)
+                for bound, count in zip(BUCKETS, histogram["buckets"]):
+                    lines.append(_series(f"{name}_bucket", f'{prefix}le="{bound}"', count))
+                lines.append(_series(f"{name}_bucket", f'{prefix}le="+Inf"', histogram["count"]))
+                lines.append(_series(f"{name}_sum", labels, round(histogram["sum"], 6)))
+                lines.append(_series(f"{name}_count", labels, histogram["count"]))
+    return "\n".join(lines) + "\n"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export Overlap plugin metrics in Prometheus text format")
+    parser.add_argument("--textfile-dir", help="Write overlap.prom here (node_exporter textfile collector) "
+                                               "instead of printing to stdout")
+    args = parser.parse_args()
+
+    text = render(collect())
+
+    if not args.textfile_dir:
+        sys.stdout.write(text)
+        return
+
+    # The collector may read at any time, so write to a temp file and rename
+    directory = Path(args.textfile_dir)
+    tmp_path = directory / f".{TEXTFILE_NAME}.{os.getpid()}"
+    with open(tmp_path, "w") as f:
+        f.write(text)
+    os.replace(tmp_path, directory / TEXTFILE_NAME)
+
+
+if __name__ == "__main__":
+    main()
@@ -5,7 +5,9 @@ Overlap SessionEnd hook.
 Called when a Claude Code session ends. Notifies the server that the session
 has ended so it can be marked as inactive.
 
-Uses transcript_path to look up the Overlap session ID.
+Uses transcript_path to look up the Overlap session ID. Requests earlier hooks
+deferred for this session are sent first if the deadline allows, and dropped
+otherwise so they can't reactivate the session after it ends.
 """
 
 import json
@@ -16,13 +18,24 @@ import os
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 import logger
-from config import is_configured, get_session_for_transcript, clear_session_for_transcript
-from api import api_request
+import deadline
+import metrics
+from config import (
+    is_configured,
+    get_session_for_transcript,
+    clear_session_for_transcript,
+    defer_request,
+    take_deferred_requests,
+)
+from api import api_request, replay_deferred_requests
+from deadline import DeadlineExceeded
 
 
 def main():
-    # Set up logging context
+    # Set up logging context and this invocation's time budget
     logger.set_context(hook="SessionEnd")
+    deadline.start("SessionEnd")
+    metrics.start_hook("SessionEnd")
     logger.info("Hook started")
 
     # Read hook input from stdin
@@ -61,6 +74,16 @@ def main():
 
     logger.set_context(hook="SessionEnd", session_id=overlap_session_id)
 
+    # Flush this session's deferred heartbeats before ending it; whatever doesn't
+    # fit is discarded, since a heartbeat after the end would reactivate the session
+    replay_deferred_requests(transcript_path)
+    try:
+        dropped = take_deferred_requests(transcript_path)
+        if dropped:
+            logger.info("Dropped deferred requests for ending session", count=len(dropped))
+    except DeadlineExceeded:
+        pass
+
     try:
         # End session on server
         logger.info("Ending session on server", overlap_session_id=overlap_session_id)
@@ -71,6 +94,10 @@ def main():
         # Only clear local state on success
         clear_session_for_transcript(transcript_path)
         logger.info("Local session mapping cleared", transcript_path=transcript_path)
+    except DeadlineExceeded as e:
+        # Sent by the next hook that has budget to spare
+        logger.warn("Session end deferred", reason=str(e))
+        defer_request("POST", f"/api/v1/sessions/{overlap_session_id}/end", {})
     except Exception as e:
         logger.error("Failed to end session on server", exc=e)
         logger.stderr_log(f"Failed to end session (server will auto-expire): {e}")
@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+Overlap background session registration.
+
+Spawned detached by the SessionStart hook with the transcript path and the
+registration claim it took as arguments. Registers the pending session as speculative, so it's usually active
+before the first edit and PreToolUse doesn't have to register it inline.
+
+The server keeps speculative sessions out of the dashboard until their first
+heartbeat and ends them if no tool use follows, so ghost sessions stay invisible.
+"""
+
+import sys
+import os
+
+# Add scripts directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import logger
+import metrics
+from api import register_pending_session
+
+
+def main():
+    logger.set_context(hook="SessionRegister")
+    metrics.start_hook("SessionRegister")
+
+    if len(sys.argv) < 2:
+        logger.warn("No transcript_path argument, skipping")
+        sys.exit(0)
+
+    transcript_path = sys.argv[1]
+    claim = sys.argv[2] if len(sys.argv) > 2 else None
+    overlap_session_id = register_pending_session(transcript_path, speculative=True, claim=claim)
+    logger.info("Background registration finished",
+                transcript_path=transcript_path,
+                overlap_session_id=overlap_session_id)
+
+    sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
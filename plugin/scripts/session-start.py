@@ -2,9 +2,13 @@
 """
 Overlap SessionStart hook.
 
-Called when a Claude Code session starts. Saves session info locally for
-lazy registration - the actual server registration happens on first tool use
-(PreToolUse or PostToolUse), which filters out ghost/transient sessions.
+Called when a Claude Code session starts. Saves session info locally as a
+pending session and registers it with the server in a detached background
+process, so the first edit doesn't wait on registration. The background
+registration is speculative: the server hides the session until its first
+heartbeat and ends it if no tool use follows, which filters out ghost/transient
+sessions. If it hasn't finished by the first tool use, PreToolUse/PostToolUse
+register the pending session themselves.
 
 Sessions are keyed by transcript_path (Claude's session file) to:
 - Uniquely identify each Claude session (even multiple in same repo)
@@ -21,6 +25,9 @@ from pathlib import Path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 import logger
+import deadline
+import metrics
+from deadline import DeadlineExceeded
 from config import (
     is_configured,
     get_session_for_transcript,
@@ -28,12 +35,20 @@ from config import (
     save_session_for_transcript,
     gc_stale_sessions,
 )
-from api import get_hostname, get_device_name, get_git_info, is_remote_session
+from api import (
+    get_hostname,
+    get_device_name,
+    get_git_info,
+    is_remote_session,
+    spawn_background_registration,
+)
 
 
 def main():
-    # Set up logging context
+    # Set up logging context and this invocation's time budget
     logger.set_context(hook="SessionStart")
+    deadline.start("SessionStart")
+    metrics.start_hook("SessionStart")
     logger.info("Hook started",
                 python=sys.executable,
                 script=__file__,
@@ -66,9 +81,13 @@ def main():
     logger.info("Configuration OK")
 
     # GC stale local sessions (older than 48h)
-    removed = gc_stale_sessions(max_age_hours=48)
-    if removed:
-        logger.info("GC'd stale sessions", count=removed)
+    try:
+        removed = gc_stale_sessions(max_age_hours=48)
+        if removed:
+            logger.info("GC'd stale sessions", count=removed)
+    except DeadlineExceeded as e:
+        # Another hook holds the lock; GC runs again next session
+        logger.warn("Skipped stale session GC", error=str(e))
 
     # Get transcript_path - this is our primary key for session tracking
     transcript_path = input_data.get("transcript_path", "")
@@ -106,6 +125,7 @@ def main():
     existing_entry = get_session_entry(transcript_path)
     if existing_entry and existing_entry.get("status") == "pending":
         logger.info("Pending session already exists for transcript", transcript_path=transcript_path)
+        spawn_background_registration(transcript_path)
         sys.exit(0)
 
     # Get session info from Claude Code
@@ -126,8 +146,7 @@ def main():
                 git_repo=git_info.get("repo_name"),
                 git_branch=git_info.get("branch"))
 
-    # Save session info locally for lazy registration on first tool use
-    # This filters out ghost sessions - they never trigger tool use
+    # Save session info locally, then register it speculatively in the background
     session_info = {
         "session_id": session_id,
         "device_name": device_name,
@@ -150,7 +169,8 @@ def main():
         status="pending",
         session_info=session_info,
     )
-    logger.info("Pending session saved for lazy registration", transcript_path=transcript_path)
+    logger.info("Pending session saved", transcript_path=transcript_path)
+    spawn_background_registration(transcript_path)
 
     # Output context for Claude (shown in SessionStart)
     working_in = git_info.get("repo_name") or os.path.basename(cwd) or cwd
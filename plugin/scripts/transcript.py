@@ -0,0 +1,133 @@
+"""
+Overlap incremental transcript tailer.
+
+Reads only what Claude Code appended to a session's transcript (JSONL) since
+the last heartbeat, using a byte offset kept in the session's entry in
+sessions.json, and derives a compact local summary of what the session is
+doing: the latest user request and the recent tool sequence. Heartbeats send
+it along so the server can describe activity without an LLM call.
+
+Each call reads at most MAX_READ_BYTES. If more than that was appended, the
+older part is skipped; the summary only needs the most recent entries.
+"""
+
+import json
+import os
+from typing import Optional
+
+MAX_READ_BYTES = 256 * 1024
+MAX_TOOLS = 10
+MAX_INTENT_CHARS = 160
+
+
+def _message_text(content) -> Optional[str]:
+    """Text typed by the user, or None for tool results and injected content."""
+    if isinstance(content, str):
+        text = content
+    elif isinstance(content, list):
+        if any(isinstance(c, dict) and c.get("type") == "tool_result" for c in content):
+            return None
+        text = "\n".join(
+            c.get("text", "") for c in content if isinstance(c, dict) and c.get("type") == "text"
+        )
+    else:
+        return None
+
+    text = text.strip()
+    # Slash command wrappers, command output and interruption markers aren't requests
+    if not text or text.startswith("<") or text.startswith("[Request interrupted"):
+        return None
+    return text
+
+
+def _intent(text: str) -> str:
+    """First line of the request, shortened."""
+    line = text.splitlines()[0].strip()
+    if len(line) > MAX_INTENT_CHARS:
+        line = line[:MAX_INTENT_CHARS - 1].rstrip() + "…"
+    return line
+
+
+def _apply(entry: dict, state: dict) -> None:
+    if entry.get("isSidechain") or entry.get("isMeta"):
+        return
+    message = entry.get("message")
+    if not isinstance(message, dict):
+        return
+
+    if entry.get("type") == "user":
+        text = _message_text(message.get("content"))
+        if text:
+            state["intent"] = _intent(text)
+            # Tool sequence restarts with each new request
+            state["tools"] = []
+    elif entry.get("type") == "assistant":
+        content = message.get("content")
+        if isinstance(content, list):
+            for item in content:
+                if isinstance(item, dict) and item.get("type") == "tool_use" and item.get("name"):
+                    state["tools"] = (state.get("tools", []) + [item["name"]])[-MAX_TOOLS:]
+
+
+def tail(transcript_path: str, state: Optional[dict] = None) -> dict:
+    """
+    Advance `state` (the session's stored tail state: offset, intent, tools)
+    over lines appended since its offset. Returns the new state; the caller
+    persists it. Never raises for unreadable or malformed transcripts.
+    """
+    state = dict(state or {})
+    offset = state.get("offset", 0)
+
+    try:
+        size = os.path.getsize(transcript_path)
+    except OSError:
+        return state
+
+    if size < offset:
+        # Transcript was replaced or truncated: start over
+        offset = 0
+        state = {}
+
+    skipped = size - offset > MAX_READ_BYTES
+    if skipped:
+        offset = size - MAX_READ_BYTES
+
+    try:
+        with open(transcript_path, "rb") as f:
+            f.seek(offset)
+            data = f.read(size - offset)
+    except OSError:
+        return state
+
+    if skipped:
+        # Landed mid-line: drop the partial first line
+        newline = data.find(b"\n")
+        offset += newline + 1 if newline >= 0 else len(data)
+        data = data[newline + 1:] if newline >= 0 else b""
+
+    # Only complete lines; a trailing partial line is re-read next time
+    end = data.rfind(b"\n") + 1
+    for line in data[:end].splitlines():
+        try:
+            entry = json.loads(line)
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            continue
+        if isinstance(entry, dict):
+            _apply(entry, state)
+
+    state["offset"] = offset + end
+    return state
+
+
+def summary_context(state: dict, include_intent: bool = True) -> Optional[dict]:
+    """
+    Heartbeat `context` payload from a tail state, or None if there's nothing to
+    send. The server only builds a summary around an intent, so the tool
+    sequence isn't sent without one.
+    """
+    if not include_intent or not state.get("intent"):
+        return None
+    context = {"intent": state["intent"]}
+    if state.get("tools"):
+        context["tools"] = state["tools"]
+    return context
@@ -1,6 +1,7 @@
 """Shared utilities for Overlap plugin hooks."""
 
 import os
+from typing import Optional
 
 
 def extract_file_paths(tool_input: dict, tool_name: str) -> list[str]:
@@ -57,3 +58,68 @@ def make_relative(file_path: str, cwd: str) -> str:
     except ValueError:
         pass  # Different drive on Windows
     return file_path
+
+
+def resolve_repo_root(cwd: str) -> dict:
+    """
+    The git toplevel containing cwd, symlinks resolved, and whether its
+    filesystem ignores case: {"root": str or None, "casefold": bool}.
+
+    Found by walking up to the nearest .git (see worktree.find_git_dir), so a
+    linked worktree resolves to its own toplevel and no git process is forked.
+    Callers cache the result per session (config.get_repo_root).
+    """
+    from worktree import find_git_dir
+
+    found = find_git_dir(cwd)
+    if not found:
+        return {"root": None, "casefold": False}
+    root = str(found[0])
+    swapped = root.swapcase()
+    try:
+        casefold = swapped != root and os.path.samefile(root, swapped)
+    except OSError:
+        casefold = False
+    return {"root": root, "casefold": casefold}
+
+
+def _disk_case(root: str, relative: str) -> str:
+    """`relative` spelled the way it is on disk, on a case-insensitive filesystem."""
+    parts = relative.split(os.sep)
+    current = root
+    for i, part in enumerate(parts):
+        try:
+            names = os.listdir(current)
+        except OSError:
+            break  # Not created yet; keep the rest as given
+        if part not in names:
+            folded = part.casefold()
+            parts[i] = next((name for name in names if name.casefold() == folded), part)
+        current = os.path.join(current, parts[i])
+    return os.sep.join(parts)
+
+
+def canonical_path(file_path: str, cwd: str, repo: Optional[dict] = None) -> str:
+    """
+    The key a file is reported under: relative to the repository root, with
+    symlinks resolved, on-disk case on case-insensitive filesystems and "/"
+    separators, so the same file gets the same key whichever subdirectory
+    or symlinked path a session refers to it from.
+
+    `repo` is resolve_repo_root(cwd). Paths outside the repository (or with
+    no repository) fall back to make_relative.
+    """
+    root = (repo or {}).get("root")
+    if root:
+        path = os.path.realpath(os.path.join(cwd, file_path))
+        try:
+            relative = os.path.relpath(path, root)
+        except ValueError:
+            relative = os.pardir  # Different drive on Windows
+        if repo.get("casefold") and path.casefold().startswith(root.casefold() + os.sep):
+            relative = path[len(root) + 1:]
+        if relative != os.pardir and not relative.startswith(os.pardir + os.sep):
+            if repo.get("casefold"):
+                relative = _disk_case(root, relative)
+            return relative.replace(os.sep, "/")
+    return make_relative(file_path, cwd)
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Overlap PostToolUse worktree snapshot hook.
+
+Called after Bash tool use. Edits made by shell commands (sed, codegen,
+git checkout) carry no file paths, so the heartbeat hook never reports them.
+At most every SNAPSHOT_INTERVAL_SECONDS this hook snapshots the worktree's
+modified tracked files from .git/index (see worktree.py) and reports files
+that became dirty since the previous snapshot in one coalesced heartbeat.
+
+Invocations inside the interval exit after a single stat of the snapshot cache.
+"""
+
+import json
+import sys
+import os
+
+# Add scripts directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import logger
+import deadline
+import metrics
+import worktree
+from config import is_configured, defer_request
+from api import api_request, ensure_session_registered
+from deadline import DeadlineExceeded
+
+SNAPSHOT_INTERVAL_SECONDS = 30
+
+# The server classifies at most this many files per heartbeat
+MAX_FILES = 50
+
+
+def main():
+    # Set up logging context and this invocation's time budget
+    logger.set_context(hook="WorktreeSnapshot")
+    deadline.start("PostToolUse")
+    metrics.start_hook("WorktreeSnapshot")
+
+    # Read hook input from stdin
+    try:
+        input_data = json.load(sys.stdin)
+    except json.JSONDecodeError as e:
+        logger.warn("Failed to parse stdin JSON", error=str(e))
+        sys.exit(0)
+
+    cwd = input_data.get("cwd", os.getcwd())
+
+    # Interval check BEFORE anything else, so most Bash calls cost one stat
+    age = worktree.last_snapshot_age(cwd)
+    if age is not None and age < SNAPSHOT_INTERVAL_SECONDS:
+        sys.exit(0)
+
+    if not is_configured():
+        logger.debug("Not configured, skipping")
+        sys.exit(0)
+
+    transcript_path = input_data.get("transcript_path", "")
+    if not transcript_path:
+        logger.debug("No transcript_path in input, skipping")
+        sys.exit(0)
+    transcript_path = os.path.expanduser(transcript_path)
+
+    result = worktree.snapshot(cwd)
+    if result is None:
+        logger.debug("No readable git index for cwd", cwd=cwd)
+        sys.exit(0)
+    if not result["added"]:
+        sys.exit(0)
+
+    # Index paths are already relative to the worktree root, which is the key
+    # the heartbeat hook reports files under
+    relative_paths = result["added"][:MAX_FILES]
+
+    session_id = input_data.get("session_id", "")
+    heartbeat_endpoint = "/api/v1/sessions/{overlap_session_id}/heartbeat"
+    heartbeat_data = {"files": relative_paths, "tool_name": "Bash"}
+    try:
+        overlap_session_id = ensure_session_registered(transcript_path, session_id, cwd)
+    except DeadlineExceeded as e:
+        logger.warn("Worktree snapshot heartbeat deferred", reason=f"session not registered: {e}")
+        defer_request("POST", heartbeat_endpoint, heartbeat_data, transcript_path=transcript_path)
+        sys.exit(0)
+    logger.set_context(hook="WorktreeSnapshot", session_id=overlap_session_id)
+    if not overlap_session_id:
+        logger.debug("No Overlap session for this transcript, skipping")
+        sys.exit(0)
+
+    logger.info("Sending worktree snapshot heartbeat",
+                file_paths=relative_paths,
+                dirty_count=len(result["dirty"]),
+                complete=result["complete"])
+
+    try:
+        api_request("POST", f"/api/v1/sessions/{overlap_session_id}/heartbeat",
+                    heartbeat_data, timeout=4, retries=0, paths_session=overlap_session_id)
+    except DeadlineExceeded as e:
+        logger.warn("Worktree snapshot heartbeat deferred", reason=str(e))
+        defer_request("POST", heartbeat_endpoint, heartbeat_data, transcript_path=transcript_path)
+    except Exception as e:
+        # The snapshot already moved on; these files are reported again only if
+        # they're reverted and modified again
+        logger.error("Worktree snapshot heartbeat failed", exc=e, file_paths=relative_paths)
+
+    sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,284 @@
+"""
+Overlap worktree dirty-file snapshots.
+
+Finds tracked files modified in a git worktree by reading .git/index directly
+and comparing each entry's cached stat data with the file on disk, the same
+check `git status` starts with, but without forking git. Only files whose stat
+data changed are hashed to confirm the change. Untracked files aren't reported.
+
+Snapshots are incremental: each run re-checks the previously dirty files and
+stats the next window of index entries (MAX_STATS_PER_RUN), picking up where
+the last run stopped, so the cost per run stays bounded on huge repos. Runs
+are cached per git directory under ~/.claude/overlap/snapshots/; when the
+index itself changes (add, commit, checkout) the scan starts over.
+"""
+
+import hashlib
+import json
+import os
+import stat
+import struct
+import time
+from pathlib import Path
+from typing import Optional
+
+SNAPSHOT_DIR = Path.home() / ".claude" / "overlap" / "snapshots"
+
+MAX_STATS_PER_RUN = 20_000
+# Files with changed stat data but the same size are hashed up to this many bytes per run
+MAX_HASH_BYTES_PER_RUN = 8 * 1024 * 1024
+
+_ENTRY = struct.Struct(">10I20sH")
+_FLAG_ASSUME_VALID = 0x8000
+_FLAG_EXTENDED = 0x4000
+_EXT_FLAG_SKIP_WORKTREE = 0x4000
+_EXT_FLAG_INTENT_TO_ADD = 0x2000
+_MODE_GITLINK = 0o160000
+
+
+class IndexEntry:
+    __slots__ = ("path", "mtime_s", "mtime_ns", "ino", "mode", "size", "sha", "stage")
+
+    def __init__(self, path, mtime_s, mtime_ns, ino, mode, size, sha, stage):
+        self.path = path
+        self.mtime_s = mtime_s
+        self.mtime_ns = mtime_ns
+        self.ino = ino
+        self.mode = mode
+        self.size = size
+        self.sha = sha
+        self.stage = stage
+
+
+def find_git_dir(cwd: str) -> Optional[tuple]:
+    """(worktree root, git dir) for the repository containing cwd, or None."""
+    path = Path(cwd).resolve()
+    for directory in (path, *path.parents):
+        dot_git = directory / ".git"
+        if dot_git.is_dir():
+            return directory, dot_git
+        if dot_git.is_file():
+            # Linked worktree or submodule: ".git" is a file pointing at the git dir
+            try:
+                content = dot_git.read_text().strip()
+            except OSError:
+                return None
+            if content.startswith("gitdir:"):
+                git_dir = Path(content[len("gitdir:"):].strip())
+                if not git_dir.is_absolute():
+                    git_dir = (directory / git_dir).resolve()
+                return directory, git_dir
+            return None
+    return None
+
+
+def _read_varint(data: bytes, pos: int) -> tuple:
+    """Index v4 offset varint."""
+    byte = data[pos]
+    pos += 1
+    value = byte & 0x7F
+    while byte & 0x80:
+        value += 1
+        byte = data[pos]
+        pos += 1
+        value = (value << 7) + (byte & 0x7F)
+    return value, pos
+
+
+def read_index(index_path: Path) -> Optional[list]:
+    """
+    Parse a git index (versions 2-4) into entries. Returns None for indexes
+    this reader can't interpret (split index, unknown version, corrupt data).
+    """
+    try:
+        data = index_path.read_bytes()
+    except OSError:
+        return None
+    if len(data) < 32 or data[:4] != b"DIRC":
+        return None
+
+    version, count = struct.unpack_from(">II", data, 4)
+    if version not in (2, 3, 4):
+        return None
+
+    entries = []
+    pos = 12
+    previous_path = b""
+    try:
+        for _ in range(count):
+            (_, _, mtime_s, mtime_ns, _, ino, mode, _, _, size, sha, flags) = _ENTRY.unpack_from(data, pos)
+            entry_start = pos
+            pos += _ENTRY.size
+            extended_flags = 0
+            if version >= 3 and flags & _FLAG_EXTENDED:
+                (extended_flags,) = struct.unpack_from(">H", data, pos)
+                pos += 2
+
+            if version == 4:
+                strip, pos = _read_varint(data, pos)
+                end = data.index(b"\0", pos)
+                path = previous_path[:len(previous_path) - strip] + data[pos:end]
+                pos = end + 1
+            else:
+                end = data.index(b"\0", pos)
+                path = data[pos:end]
+                # Entries are NUL-padded to a multiple of 8 bytes
+                pos = entry_start + ((end - entry_start + 8) & ~7)
+            previous_path = path
+
+            if flags & _FLAG_ASSUME_VALID or extended_flags & (_EXT_FLAG_SKIP_WORKTREE | _EXT_FLAG_INTENT_TO_ADD):
+                continue
+            if stat.S_ISDIR(mode) or mode == _MODE_GITLINK:
+                continue  # Sparse-index directories and submodules
+            entries.append(IndexEntry(
+                path.decode("utf-8", "surrogateescape"), mtime_s, mtime_ns, ino, mode, size,
+                sha, (flags >> 12) & 0x3,
+            ))
+
+        # Extensions: a split index keeps most entries in a shared index we don't read
+        while pos + 8 <= len(data) - 20:
+            signature = data[pos:pos + 4]
+            (length,) = struct.unpack_from(">I", data, pos + 4)
+            if signature == b"link":
+                return None
+            pos += 8 + length
+    except (struct.error, ValueError, IndexError):
+        return None
+
+    return entries
+
+
+def _blob_sha(path: str, size: int) -> bytes:
+    sha = hashlib.sha1(b"blob %d\0" % size)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            sha.update(chunk)
+    return sha.digest()
+
+
+class _Checker:
+    """Decides whether index entries differ from the worktree, within a hashing budget."""
+
+    def __init__(self, root: Path, index_mtime: float):
+        self.root = root
+        self.index_mtime = index_mtime
+        self.hash_budget = MAX_HASH_BYTES_PER_RUN
+
+    def is_dirty(self, entry: IndexEntry) -> bool:
+        if entry.stage:
+            return True  # Unmerged
+        path = os.path.join(self.root, entry.path)
+        try:
+            st = os.lstat(path)
+        except OSError:
+            return True  # Deleted
+        if st.st_size != entry.size or (st.st_mode & 0o100) != (entry.mode & 0o100):
+            return True
+
+        stat_changed = int(st.st_mtime) != entry.mtime_s or bool(
+            entry.mtime_ns and st.st_mtime_ns % 1_000_000_000 != entry.mtime_ns
+        )
+        # "Racy" entries: written in the same instant the index was, so matching
+        # stat data doesn't prove the content matches
+        racy = st.st_mtime >= self.index_mtime
+        if not stat_changed and not racy:
+            return False
+
+        if stat.S_ISLNK(st.st_mode) or entry.size > self.hash_budget:
+            return stat_changed
+        self.hash_budget -= entry.size
+        try:
+            return _blob_sha(path, st.st_size) != entry.sha
+        except OSError:
+            return True
+
+
+def _cache_path(git_dir: Path) -> Path:
+    key = hashlib.sha256(str(git_dir).encode()).hexdigest()[:16]
+    return SNAPSHOT_DIR / f"{key}.json"
+
+
+def last_snapshot_age(cwd: str) -> Optional[float]:
+    """Seconds since the last snapshot of cwd's worktree, None if never taken."""
+    found = find_git_dir(cwd)
+    if not found:
+        return None
+    try:
+        return time.time() - os.path.getmtime(_cache_path(found[1]))
+    except OSError:
+        return None
+
+
+def snapshot(cwd: str) -> Optional[dict]:
+    """
+    Update the cached dirty-file snapshot for cwd's worktree.
+
+    Returns {"root", "dirty", "added", "complete"}: all tracked files currently
+    known to be modified (repo-relative), those not dirty in the previous
+    snapshot, and whether the whole index has been scanned since it last
+    changed. None outside a git worktree or for an unreadable index.
+    """
+    found = find_git_dir(cwd)
+    if not found:
+        return None
+    root, git_dir = found
+    index_path = git_dir / "index"
+
+    try:
+        index_stat = index_path.stat()
+    except OSError:
+        return None
+    index_signature = [index_stat.st_mtime_ns, index_stat.st_size]
+
+    cache_path = _cache_path(git_dir)
+    try:
+        with open(cache_path) as f:
+            cache = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        cache = {}
+
+    entries = read_index(index_path)
+    if entries is None:
+        return None
+
+    previous_dirty = set(cache.get("dirty", []))
+    if cache.get("index") != index_signature:
+        # Index rewritten: cursor positions no longer line up, rescan from the start
+        cursor, scanned = 0, 0
+    else:
+        cursor, scanned = cache.get("cursor", 0), cache.get("scanned", 0)
+
+    checker = _Checker(root, index_stat.st_mtime)
+    by_path = {entry.path: entry for entry in entries}
+
+    # Files dirty last time may have been reverted or staged
+    # (paths no longer in the index aren't tracked anymore and drop out)
+    dirty = {path for path in previous_dirty if path in by_path and checker.is_dirty(by_path[path])}
+
+    window = min(MAX_STATS_PER_RUN, len(entries))
+    for i in range(window):
+        entry = entries[(cursor + i) % len(entries)]
+        if entry.path not in dirty and checker.is_dirty(entry):
+            dirty.add(entry.path)
+    if entries:
+        cursor = (cursor + window) % len(entries)
+    scanned = min(scanned + window, len(entries))
+
+    SNAPSHOT_DIR.mkdir(parents=True, exist_ok=True)
+    tmp_path = cache_path.with_suffix(f".{os.getpid()}.tmp")
+    with open(tmp_path, "w") as f:
+        json.dump({
+            "root": str(root),
+            "index": index_signature,
+            "cursor": cursor,
+            "scanned": scanned,
+            "dirty": sorted(dirty),
+        }, f)
+    os.replace(tmp_path, cache_path)
+
+    return {
+        "root": str(root),
+        "dirty": sorted(dirty),
+        "added": sorted(dirty - previous_dirty),
+        "complete": scanned >= len(entries),
+    }
@@ -0,0 +1,78 @@
+"""Shipping reduction in logger._reduce: sampling, budgets and dedup summaries."""
+
+import random
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scripts"))
+
+import logger  # noqa: E402
+import metrics  # noqa: E402
+
+NOW = 1_000_000.0
+WINDOW = 600
+
+
+@pytest.fixture
+def held(tmp_path, monkeypatch):
+    """Ship state in a temp dir; returns the held-entry counts by reason."""
+    monkeypatch.setattr(logger, "SHIP_STATE_FILE", tmp_path / "ship-state.json")
+    monkeypatch.setattr(logger, "SHIP_LOCK_FILE", tmp_path / "ship.lock")
+    counts: dict[str, int] = {}
+
+    def inc(name, labels=None, value=1):
+        if name == "overlap_log_entries_held_total":
+            counts[labels["reason"]] = counts.get(labels["reason"], 0) + value
+
+    monkeypatch.setattr(metrics, "inc", inc)
+    return counts
+
+
+def entries(count: int, msg: str = "event {}", level: str = "INFO") -> list[dict]:
+    return [{"ts": f"t{i}", "level": level, "msg": msg.format(i), "data": {"i": i}} for i in range(count)]
+
+
+def config(rate: float = 1.0, budget: float = 1000) -> dict:
+    return {"log_sample_rates": {"INFO": rate}, "log_budgets": {"INFO": budget}, "log_dedup_seconds": WINDOW}
+
+
+def test_sampled_and_over_budget_entries_are_dropped(held):
+    assert logger._reduce(entries(50), config(rate=0, budget=0), NOW) == []
+    # Nothing resurfaces when the dedup windows close
+    assert logger._reduce([], config(rate=0, budget=0), NOW + WINDOW + 1) == []
+    assert held == {"sampled": 50}
+
+
+def test_budget_caps_shipped_entries(held):
+    shipped = logger._reduce(entries(50), config(budget=10), NOW)
+    assert len(shipped) == 10
+    assert logger._reduce([], config(budget=10), NOW + 1) == []
+    assert held == {"budget": 40}
+
+
+def test_sample_rate_bounds_shipped_entries(held):
+    random.seed(1)
+    shipped = logger._reduce(entries(1000), config(rate=0.25), NOW)
+    assert 180 <= len(shipped) <= 320
+    assert held["sampled"] == 1000 - len(shipped)
+
+
+def test_repeats_ship_one_summary_that_spends_a_token(held):
+    repeated = entries(5, msg="same")
+    assert logger._reduce(repeated, config(budget=2), NOW) == repeated[:1]
+
+    [summary] = logger._reduce([], config(budget=2), NOW + WINDOW + 1)
+    assert summary["data"]["repeated"] == 4
+    assert held == {"dedup": 4}
+
+    # The bucket is empty now: the next new message and its summary are both dropped
+    assert logger._reduce(entries(3, msg="other"), config(budget=2), NOW + WINDOW + 1) == []
+    assert logger._reduce([], config(budget=2), NOW + 2 * WINDOW + 2) == []
+    assert held == {"dedup": 6, "budget": 2}
+
+
+def test_warnings_and_errors_always_ship(held):
+    urgent = entries(5, level="WARN") + entries(5, level="ERROR")
+    assert logger._reduce(urgent, config(rate=0, budget=0), NOW) == urgent
@@ -0,0 +1,76 @@
+"""Pending-session registration: only the holder of the claim sends /sessions/start."""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scripts"))
+
+import api  # noqa: E402
+import config  # noqa: E402
+from deadline import DeadlineExceeded  # noqa: E402
+
+TRANSCRIPT = "/tmp/transcript.jsonl"
+
+
+@pytest.fixture
+def starts(tmp_path, monkeypatch):
+    """Session store in a temp dir with one pending entry; returns the /sessions/start bodies sent."""
+    monkeypatch.setattr(config, "CONFIG_DIR", tmp_path)
+    monkeypatch.setattr(config, "SESSIONS_FILE", tmp_path / "sessions.json")
+    monkeypatch.setattr(config, "LOCK_FILE", tmp_path / "sessions.lock")
+    monkeypatch.setattr(api, "REGISTRATION_POLL_SECONDS", 0.01)
+    monkeypatch.setattr(api, "REGISTRATION_WAIT_SECONDS", 0.05)
+    sent = []
+
+    def api_request(method, endpoint, data=None, **kwargs):
+        sent.append(data)
+        return {"data": {"session_id": f"server-{len(sent)}"}}
+
+    monkeypatch.setattr(api, "api_request", api_request)
+    config.save_session_for_transcript(
+        TRANSCRIPT, None, "/repo", status="pending", session_info={"session_id": "claude-1"}
+    )
+    return sent
+
+
+def test_inline_registration_waits_for_claimed_one(starts):
+    claim = config.claim_pending_registration(TRANSCRIPT)
+
+    assert api._register_pending_session(TRANSCRIPT, ["a.ts"]) == (None, None)
+    assert starts == []
+
+    assert api.register_pending_session(TRANSCRIPT, speculative=True, claim=claim) == "server-1"
+    assert len(starts) == 1
+    assert "registering" not in config.get_session_entry(TRANSCRIPT)
+
+
+def test_claim_is_released_after_a_failed_registration(starts, monkeypatch):
+    def fail(*args, **kwargs):
+        raise Exception("HTTP 500")
+
+    monkeypatch.setattr(api, "api_request", fail)
+    assert api.register_pending_session(TRANSCRIPT) is None
+
+    assert config.claim_pending_registration(TRANSCRIPT) is not None
+
+
+def test_stale_claim_is_taken_over(starts, monkeypatch):
+    config.claim_pending_registration(TRANSCRIPT)
+    monkeypatch.setattr(config, "REGISTRATION_CLAIM_SECONDS", 0)
+
+    assert api._register_pending_session(TRANSCRIPT) == ("server-1", None)
+
+
+def test_deadline_propagates_and_keeps_entry_pending(starts, monkeypatch):
+    def out_of_time(*args, **kwargs):
+        raise DeadlineExceeded("0.10s of hook budget left, need 0.50s")
+
+    monkeypatch.setattr(api, "api_request", out_of_time)
+    with pytest.raises(DeadlineExceeded):
+        api.ensure_session_registered(TRANSCRIPT, "claude-1", "/repo")
+
+    entry = config.get_session_entry(TRANSCRIPT)
+    assert entry["status"] == "pending"
+    assert "registering" not in entry
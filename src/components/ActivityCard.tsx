@@ -1,4 +1,4 @@
-import { memo, useState } from 'react';
+import { memo, useState, useEffect } from 'react';
 import { useRelativeTime, formatRelativeTime } from '@lib/utils/time';
 import { parseGitHubUrl, getRelativeFilePath, getStatusLabel, getFileUrl, getBranchUrl } from '@lib/utils/github';
 import { fetchWithTimeout } from '@lib/utils/fetch';
@@ -61,39 +61,58 @@ type ActivityCardProps = {
       files: string[];
     } | null;
   };
+  // Controlled expansion, for lists that unmount off-screen cards
+  expanded?: boolean;
+  onExpandedChange?: (sessionId: string, expanded: boolean) => void;
 };
 
-export const ActivityCard = memo(function ActivityCard({ session }: ActivityCardProps) {
+export const ActivityCard = memo(function ActivityCard({
+  session,
+  expanded: expandedProp,
+  onExpandedChange,
+}: ActivityCardProps) {
   const { user, device, repo, branch, worktree, status, last_activity_at, activity } = session;
   const relativeTime = useRelativeTime(last_activity_at);
 
-  const [expanded, setExpanded] = useState(false);
+  const [localExpanded, setLocalExpanded] = useState(false);
   const [recentActivities, setRecentActivities] = useState<CompactActivity[] | null>(null);
   const [loadingActivities, setLoadingActivities] = useState(false);
+  const expanded = expandedProp ?? localExpanded;
 
   // GitHub URL helpers
   const githubBaseUrl = parseGitHubUrl(repo?.remote_url ?? null);
   const branchUrl = getBranchUrl(githubBaseUrl, branch);
 
-  const handleToggleExpand = async () => {
-    const willExpand = !expanded;
-    setExpanded(willExpand);
+  const handleToggleExpand = () => {
+    if (onExpandedChange) {
+      onExpandedChange(session.id, !expanded);
+    } else {
+      setLocalExpanded(!expanded);
+    }
+  };
 
-    if (willExpand && recentActivities === null) {
-      setLoadingActivities(true);
+  // Recent activities load on first expand (or on remount while expanded)
+  useEffect(() => {
+    if (!expanded || recentActivities !== null) return;
+    let cancelled = false;
+    setLoadingActivities(true);
+    (async () => {
       try {
         const res = await fetchWithTimeout(`/api/v1/sessions/${session.id}/activities?limit=5`);
-        if (res.ok) {
+        if (res.ok && !cancelled) {
           const json = (await res.json()) as { data: { activities: CompactActivity[] } };
-          setRecentActivities(json.data.activities);
+          if (!cancelled) setRecentActivities(json.data.activities);
         }
       } catch {
-        setRecentActivities([]);
+        if (!cancelled) setRecentActivities([]);
       } finally {
-        setLoadingActivities(false);
+        if (!cancelled) setLoadingActivities(false);
       }
-    }
-  };
+    })();
+    return () => {
+      cancelled = true;
+    };
+  }, [expanded, recentActivities, session.id]);
 
   return (
     <div className="card" style={{ marginBottom: 'var(--space-md)' }}>
@@ -0,0 +1,293 @@
+import { useState, useEffect, useMemo } from 'react';
+import { fetchWithTimeout } from '@lib/utils/fetch';
+
+type RepoRef = { id: string; name: string };
+type UserRef = { id: string; name: string };
+
+type InsightsData = {
+  days: number;
+  since: string;
+  hotspots: { repo: RepoRef; directory: string; heartbeats: number; users: number }[];
+  pairs: {
+    user_a: UserRef;
+    user_b: UserRef;
+    overlaps: number;
+    last_overlap_at: string;
+    directories: { repo: RepoRef; directory: string; overlaps: number }[];
+  }[];
+  hourly: { hour: string; heartbeats: number; users: number }[];
+};
+
+type InsightsProps = {
+  // Scope to one repo; team-wide without it
+  repoId?: string;
+};
+
+const DAY_OPTIONS = [1, 7, 30];
+// Members shown in the overlap matrix, most-overlapping first
+const MATRIX_USERS = 8;
+const TOP_PAIRS = 5;
+const HOUR_MS = 60 * 60 * 1000;
+
+// Rollup hours are UTC 'YYYY-MM-DD HH:00:00'
+function hourKey(date: Date): string {
+  return `${date.toISOString().slice(0, 13).replace('T', ' ')}:00:00`;
+}
+
+function cellColor(count: number, max: number): string {
+  if (count === 0 || max === 0) return 'transparent';
+  const alpha = 0.15 + 0.85 * (count / max);
+  return `rgba(217, 119, 87, ${alpha.toFixed(2)})`;
+}
+
+const sectionTitle: React.CSSProperties = {
+  fontSize: '0.75rem',
+  textTransform: 'uppercase',
+  letterSpacing: '0.05em',
+  color: 'var(--text-muted)',
+  margin: 'var(--space-lg) 0 var(--space-sm) 0',
+};
+
+/**
+ * Who overlaps with whom, where, and when: overlap counts between members,
+ * the busiest directories and heartbeats per hour, from the rollups the
+ * heartbeat endpoint maintains.
+ */
+export function Insights({ repoId }: InsightsProps) {
+  const [days, setDays] = useState(7);
+  const [data, setData] = useState<InsightsData | null>(null);
+  const [isLoading, setIsLoading] = useState(true);
+  const [fetchError, setFetchError] = useState<string | null>(null);
+
+  useEffect(() => {
+    const controller = new AbortController();
+    setIsLoading(true);
+
+    const url = repoId ? `/api/v1/repos/${repoId}/insights` : '/api/v1/insights';
+    fetchWithTimeout(`${url}?days=${days}`, { signal: controller.signal })
+      .then(async (response) => {
+        if (!response.ok) {
+          const body = (await response.json()) as { error?: string };
+          throw new Error(body.error || 'Failed to fetch insights');
+        }
+        const body = (await response.json()) as { data: InsightsData };
+        setData(body.data);
+        setFetchError(null);
+      })
+      .catch((err) => {
+        if (err instanceof DOMException && err.name === 'AbortError') return;
+        setFetchError(err instanceof Error ? err.message : 'Failed to load insights');
+      })
+      .finally(() => {
+        if (!controller.signal.aborted) setIsLoading(false);
+      });
+
+    return () => controller.abort();
+  }, [repoId, days]);
+
+  // One bar per hour of the window, including hours with no heartbeats
+  const hours = useMemo(() => {
+    if (!data) return [];
+    const counts = new Map(data.hourly.map((bucket) => [bucket.hour, bucket]));
+    const bars: { date: Date; heartbeats: number; users: number }[] = [];
+    const end = Date.now();
+    for (let t = Date.parse(`${data.since}T00:00:00Z`); t <= end; t += HOUR_MS) {
+      const date = new Date(t);
+      const bucket = counts.get(hourKey(date));
+      bars.push({ date, heartbeats: bucket?.heartbeats ?? 0, users: bucket?.users ?? 0 });
+    }
+    return bars;
+  }, [data]);
+
+  const matrix = useMemo(() => {
+    if (!data) return null;
+    const totals = new Map<string, { user: UserRef; overlaps: number }>();
+    const counts = new Map<string, number>();
+    for (const pair of data.pairs) {
+      for (const user of [pair.user_a, pair.user_b]) {
+        const entry = totals.get(user.id) ?? { user, overlaps: 0 };
+        entry.overlaps += pair.overlaps;
+        totals.set(user.id, entry);
+      }
+      counts.set(`${pair.user_a.id}\0${pair.user_b.id}`, pair.overlaps);
+      counts.set(`${pair.user_b.id}\0${pair.user_a.id}`, pair.overlaps);
+    }
+    const users = [...totals.values()]
+      .sort((a, b) => b.overlaps - a.overlaps)
+      .slice(0, MATRIX_USERS)
+      .map((entry) => entry.user);
+    const max = Math.max(0, ...data.pairs.map((pair) => pair.overlaps));
+    return { users, max, count: (a: string, b: string) => counts.get(`${a}\0${b}`) ?? 0 };
+  }, [data]);
+
+  const maxHourly = Math.max(1, ...hours.map((bar) => bar.heartbeats));
+  const maxHotspot = Math.max(1, ...(data?.hotspots ?? []).map((spot) => spot.heartbeats));
+
+  return (
+    <div className="card" style={{ marginBottom: 'var(--space-lg)' }}>
+      <div style={{ display: 'flex', alignItems: 'center', justifyContent: 'space-between' }}>
+        <h2 style={{ fontSize: '1rem', margin: 0 }}>Overlap insights</h2>
+        <div style={{ display: 'flex', gap: 'var(--space-sm)', fontSize: '0.8rem' }}>
+          {DAY_OPTIONS.map((option) => (
+            <button
+              key={option}
+              onClick={() => setDays(option)}
+              aria-pressed={days === option}
+              style={{
+                background: 'none',
+                border: 'none',
+                padding: 0,
+                cursor: 'pointer',
+                color: days === option ? 'var(--text-primary)' : 'var(--text-muted)',
+              }}
+            >
+              {option === 1 ? 'Today' : `${option}d`}
+            </button>
+          ))}
+        </div>
+      </div>
+
+      {isLoading && !data ? (
+        <div style={{ textAlign: 'center', padding: 'var(--space-lg)' }}>
+          <img src="/loading.gif" alt="Loading" width={32} height={32} style={{ opacity: 0.8 }} />
+        </div>
+      ) : fetchError ? (
+        <p style={{ color: 'var(--accent-orange)', marginTop: 'var(--space-md)', fontSize: '0.875rem' }}>
+          {fetchError}
+        </p>
+      ) : data && matrix ? (
+        <div style={{ opacity: isLoading ? 0.6 : 1 }}>
+          <h3 style={sectionTitle}>Activity by hour</h3>
+          <div style={{ display: 'flex', alignItems: 'flex-end', gap: 1, height: 48 }}>
+            {hours.map((bar) => (
+              <div
+                key={bar.date.getTime()}
+                title={`${bar.date.toLocaleString([], { weekday: 'short', hour: 'numeric' })}: ${bar.heartbeats} heartbeat${bar.heartbeats !== 1 ? 's' : ''}, ${bar.users} member${bar.users !== 1 ? 's' : ''}`}
+                style={{
+                  flex: 1,
+                  minWidth: 1,
+                  height: `${Math.max(bar.heartbeats > 0 ? 8 : 2, (bar.heartbeats / maxHourly) * 100)}%`,
+                  background: bar.heartbeats > 0 ? 'var(--accent-blue)' : 'var(--border-subtle)',
+                  borderRadius: 1,
+                }}
+              />
+            ))}
+          </div>
+
+          <h3 style={sectionTitle}>Who overlaps</h3>
+          {matrix.users.length < 2 ? (
+            <p className="text-muted" style={{ fontSize: '0.875rem' }}>
+              No overlaps recorded in this period
+            </p>
+          ) : (
+            <>
+              <div style={{ overflowX: 'auto' }}>
+                <table style={{ borderCollapse: 'collapse', fontSize: '0.75rem' }}>
+                  <thead>
+                    <tr>
+                      <th />
+                      {matrix.users.map((user) => (
+                        <th
+                          key={user.id}
+                          className="text-secondary"
+                          style={{ fontWeight: 'normal', padding: '2px 6px', whiteSpace: 'nowrap' }}
+                        >
+                          {user.name}
+                        </th>
+                      ))}
+                    </tr>
+                  </thead>
+                  <tbody>
+                    {matrix.users.map((row) => (
+                      <tr key={row.id}>
+                        <th
+                          className="text-secondary"
+                          style={{ fontWeight: 'normal', padding: '2px 6px', textAlign: 'right', whiteSpace: 'nowrap' }}
+                        >
+                          {row.name}
+                        </th>
+                        {matrix.users.map((col) => {
+                          const count = row.id === col.id ? 0 : matrix.count(row.id, col.id);
+                          return (
+                            <td
+                              key={col.id}
+                              title={count > 0 ? `${row.name} & ${col.name}: ${count}` : undefined}
+                              style={{
+                                width: 32,
+                                height: 24,
+                                textAlign: 'center',
+                                border: '1px solid var(--border-subtle)',
+                                background: row.id === col.id ? 'var(--bg-elevated)' : cellColor(count, matrix.max),
+                                color: 'var(--text-primary)',
+                              }}
+                            >
+                              {count > 0 ? count : ''}
+                            </td>
+                          );
+                        })}
+                      </tr>
+                    ))}
+                  </tbody>
+                </table>
+              </div>
+
+              <ul style={{ listStyle: 'none', marginTop: 'var(--space-sm)', fontSize: '0.8rem' }}>
+                {data.pairs.slice(0, TOP_PAIRS).map((pair) => (
+                  <li key={`${pair.user_a.id}-${pair.user_b.id}`} style={{ padding: '2px 0' }}>
+                    <span>
+                      {pair.user_a.name} & {pair.user_b.name}
+                    </span>
+                    <span className="text-muted"> · {pair.overlaps} · </span>
+                    <span className="mono text-secondary">
+                      {pair.directories
+                        .map((dir) => (repoId ? dir.directory : `${dir.repo.name}:${dir.directory}`))
+                        .join(', ')}
+                    </span>
+                  </li>
+                ))}
+              </ul>
+            </>
+          )}
+
+          <h3 style={sectionTitle}>Hotspots</h3>
+          {data.hotspots.length === 0 ? (
+            <p className="text-muted" style={{ fontSize: '0.875rem' }}>
+              No file activity recorded in this period
+            </p>
+          ) : (
+            <ul style={{ listStyle: 'none', fontSize: '0.8rem' }}>
+              {data.hotspots.map((spot) => (
+                <li
+                  key={`${spot.repo.id}:${spot.directory}`}
+                  style={{ display: 'flex', alignItems: 'center', gap: 'var(--space-sm)', padding: '2px 0' }}
+                >
+                  <span
+                    className="mono"
+                    style={{ flex: '0 1 50%', overflow: 'hidden', textOverflow: 'ellipsis', whiteSpace: 'nowrap' }}
+                    title={spot.directory}
+                  >
+                    {repoId ? spot.directory : `${spot.repo.name}:${spot.directory}`}
+                  </span>
+                  <span style={{ flex: 1, height: 6, background: 'var(--bg-elevated)', borderRadius: 3 }}>
+                    <span
+                      style={{
+                        display: 'block',
+                        height: '100%',
+                        width: `${(spot.heartbeats / maxHotspot) * 100}%`,
+                        background: 'var(--accent-orange)',
+                        borderRadius: 3,
+                      }}
+                    />
+                  </span>
+                  <span className="text-muted" style={{ whiteSpace: 'nowrap' }}>
+                    {spot.heartbeats} · {spot.users} member{spot.users !== 1 ? 's' : ''}
+                  </span>
+                </li>
+              ))}
+            </ul>
+          )}
+        </div>
+      ) : null}
+    </div>
+  );
+}
@@ -1,6 +1,9 @@
 import { useState, useEffect, useCallback, useRef } from 'react';
 import { ActivityCard } from './ActivityCard';
+import { VirtualList } from './VirtualList';
+import { useSessionWindow, useExpandedSet } from '@lib/hooks/useSessionWindow';
 import { fetchWithTimeout } from '@lib/utils/fetch';
+import type { Cursor } from '@lib/utils/cursor';
 
 type Session = {
   id: string;
@@ -29,13 +32,25 @@ type RepoActivityProps = {
 };
 
 const PAGE_SIZE = 20;
+// Typical height of a collapsed ActivityCard
+const ESTIMATED_CARD_PX = 160;
+
+// The keyset /api/v1/repos/:id/activity pages by
+const sortKey = (session: Session): Cursor => [session.last_activity_at, session.id];
 
 export function RepoActivity({ repoId }: RepoActivityProps) {
-  const [sessions, setSessions] = useState<Session[]>([]);
+  const {
+    items: sessions,
+    hasMore,
+    nextCursor,
+    replace,
+    append: appendPage,
+    evict,
+  } = useSessionWindow<Session>({ sortKey });
+  const { expanded, setRowExpanded } = useExpandedSet();
   const [filterMeta, setFilterMeta] = useState<FilterMeta>({ branches: [], users: [] });
   const [isLoading, setIsLoading] = useState(true);
   const [isLoadingMore, setIsLoadingMore] = useState(false);
-  const [hasMore, setHasMore] = useState(false);
   const [total, setTotal] = useState(0);
   const [fetchError, setFetchError] = useState<string | null>(null);
 
@@ -51,7 +66,7 @@ export function RepoActivity({ repoId }: RepoActivityProps) {
   const hasActiveFilters = userId || branch || startDate || endDate;
 
   const fetchSessions = useCallback(
-    async (currentOffset: number, append: boolean = false) => {
+    async (cursor: string | null, append: boolean = false) => {
       abortRef.current?.abort();
       const controller = new AbortController();
       abortRef.current = controller;
@@ -65,10 +80,10 @@ export function RepoActivity({ repoId }: RepoActivityProps) {
       try {
         const params = new URLSearchParams({
           limit: String(PAGE_SIZE),
-          offset: String(currentOffset),
           includeStale: String(includeStale),
         });
 
+        if (cursor) params.set('cursor', cursor);
         if (userId) params.set('userId', userId);
         if (branch) params.set('branch', branch);
         if (startDate) params.set('startDate', startDate);
@@ -87,17 +102,17 @@ export function RepoActivity({ repoId }: RepoActivityProps) {
           data: {
             sessions: Session[];
             hasMore: boolean;
+            nextCursor: string | null;
             total: number;
             filters: FilterMeta;
           };
         };
 
         if (append) {
-          setSessions((prev) => [...prev, ...data.data.sessions]);
+          appendPage(data.data.sessions, data.data.hasMore, data.data.nextCursor);
         } else {
-          setSessions(data.data.sessions);
+          replace(data.data.sessions, data.data.hasMore, data.data.nextCursor);
         }
-        setHasMore(data.data.hasMore);
         setTotal(data.data.total);
         setFilterMeta(data.data.filters);
         setFetchError(null);
@@ -109,16 +124,16 @@ export function RepoActivity({ repoId }: RepoActivityProps) {
         setIsLoadingMore(false);
       }
     },
-    [repoId, userId, branch, startDate, endDate, includeStale]
+    [repoId, userId, branch, startDate, endDate, includeStale, replace, appendPage]
   );
 
   useEffect(() => {
-    fetchSessions(0);
+    fetchSessions(null);
     return () => abortRef.current?.abort();
   }, [fetchSessions]);
 
   const handleLoadMore = () => {
-    fetchSessions(sessions.length, true);
+    fetchSessions(nextCursor, true);
   };
 
   const clearFilters = () => {
@@ -275,9 +290,18 @@ export function RepoActivity({ repoId }: RepoActivityProps) {
         </div>
       ) : (
         <>
-          {sessions.map((session) => (
-            <ActivityCard key={session.id} session={session} />
-          ))}
+          <VirtualList
+            items={sessions}
+            estimateSize={ESTIMATED_CARD_PX}
+            onRangeChange={evict}
+            renderItem={(session) => (
+              <ActivityCard
+                session={session}
+                expanded={expanded.has(session.id)}
+                onExpandedChange={setRowExpanded}
+              />
+            )}
+          />
 
           {hasMore && (
             <button
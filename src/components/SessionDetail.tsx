@@ -172,11 +172,12 @@ export function SessionDetail({ sessionId }: SessionDetailProps) {
   const [activities, setActivities] = useState<ActivityItem[]>([]);
   const [total, setTotal] = useState(0);
   const [hasMore, setHasMore] = useState(false);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
   const [isLoading, setIsLoading] = useState(true);
   const [isLoadingMore, setIsLoadingMore] = useState(false);
   const [error, setError] = useState<string | null>(null);
 
-  const fetchActivities = useCallback(async (offset: number, append: boolean = false) => {
+  const fetchActivities = useCallback(async (cursor: string | null, append: boolean = false) => {
     if (append) {
       setIsLoadingMore(true);
     } else {
@@ -186,8 +187,8 @@ export function SessionDetail({ sessionId }: SessionDetailProps) {
     try {
       const params = new URLSearchParams({
         limit: String(PAGE_SIZE),
-        offset: String(offset),
       });
+      if (cursor) params.set('cursor', cursor);
 
       const res = await fetchWithTimeout(`/api/v1/sessions/${sessionId}/activities?${params}`);
       if (!res.ok) {
@@ -205,6 +206,7 @@ export function SessionDetail({ sessionId }: SessionDetailProps) {
           activities: ActivityItem[];
           total: number;
           hasMore: boolean;
+          nextCursor: string | null;
         };
       };
 
@@ -216,6 +218,7 @@ export function SessionDetail({ sessionId }: SessionDetailProps) {
       }
       setTotal(json.data.total);
       setHasMore(json.data.hasMore);
+      setNextCursor(json.data.nextCursor);
       setError(null);
     } catch (err) {
       setError(err instanceof Error ? err.message : 'Failed to load session');
@@ -226,11 +229,11 @@ export function SessionDetail({ sessionId }: SessionDetailProps) {
   }, [sessionId]);
 
   useEffect(() => {
-    fetchActivities(0);
+    fetchActivities(null);
   }, [fetchActivities]);
 
   const handleLoadMore = () => {
-    fetchActivities(activities.length, true);
+    fetchActivities(nextCursor, true);
   };
 
   if (isLoading) {
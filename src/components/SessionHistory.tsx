@@ -1,7 +1,10 @@
-import { useState, useEffect, useCallback } from 'react';
+import { memo, useState, useEffect, useCallback } from 'react';
+import { VirtualList } from './VirtualList';
+import { useSessionWindow, useExpandedSet } from '@lib/hooks/useSessionWindow';
 import { formatRelativeTime } from '@lib/utils/time';
 import { getStatusLabel } from '@lib/utils/github';
 import { fetchWithTimeout } from '@lib/utils/fetch';
+import type { Cursor } from '@lib/utils/cursor';
 
 type ActivityItem = {
   id: string;
@@ -24,11 +27,20 @@ type HistorySession = {
 };
 
 const PAGE_SIZE = 20;
+// Typical height of a collapsed HistoryCard
+const ESTIMATED_CARD_PX = 150;
 
-function HistoryCard({ session }: { session: HistorySession }) {
-  const [expanded, setExpanded] = useState(false);
+// The keyset /api/v1/users/me/timeline pages by
+const sortKey = (session: HistorySession): Cursor => [session.started_at, session.id];
 
-  const handleToggle = () => setExpanded(!expanded);
+type HistoryCardProps = {
+  session: HistorySession;
+  expanded: boolean;
+  onExpandedChange: (sessionId: string, expanded: boolean) => void;
+};
+
+const HistoryCard = memo(function HistoryCard({ session, expanded, onExpandedChange }: HistoryCardProps) {
+  const handleToggle = () => onExpandedChange(session.id, !expanded);
 
   return (
     <div className="card" style={{ marginBottom: 'var(--space-md)' }}>
@@ -214,16 +226,23 @@ function HistoryCard({ session }: { session: HistorySession }) {
       )}
     </div>
   );
-}
+});
 
 export function SessionHistory() {
-  const [sessions, setSessions] = useState<HistorySession[]>([]);
-  const [hasMore, setHasMore] = useState(false);
+  const {
+    items: sessions,
+    hasMore,
+    nextCursor,
+    replace,
+    append: appendPage,
+    evict,
+  } = useSessionWindow<HistorySession>({ sortKey });
+  const { expanded, setRowExpanded } = useExpandedSet();
   const [isLoading, setIsLoading] = useState(true);
   const [isLoadingMore, setIsLoadingMore] = useState(false);
   const [error, setError] = useState<string | null>(null);
 
-  const fetchSessions = useCallback(async (offset: number, append: boolean = false) => {
+  const fetchSessions = useCallback(async (cursor: string | null, append: boolean = false) => {
     if (append) {
       setIsLoadingMore(true);
     } else {
@@ -233,8 +252,8 @@ export function SessionHistory() {
     try {
       const params = new URLSearchParams({
         limit: String(PAGE_SIZE),
-        offset: String(offset),
       });
+      if (cursor) params.set('cursor', cursor);
 
       const res = await fetchWithTimeout(`/api/v1/users/me/timeline?${params}`);
       if (!res.ok) {
@@ -246,15 +265,15 @@ export function SessionHistory() {
         data: {
           sessions: HistorySession[];
           hasMore: boolean;
+          nextCursor: string | null;
         };
       };
 
       if (append) {
-        setSessions((prev) => [...prev, ...json.data.sessions]);
+        appendPage(json.data.sessions, json.data.hasMore, json.data.nextCursor);
       } else {
-        setSessions(json.data.sessions);
+        replace(json.data.sessions, json.data.hasMore, json.data.nextCursor);
       }
-      setHasMore(json.data.hasMore);
       setError(null);
     } catch (err) {
       setError(err instanceof Error ? err.message : 'Failed to load history');
@@ -262,14 +281,14 @@ export function SessionHistory() {
       setIsLoading(false);
       setIsLoadingMore(false);
     }
-  }, []);
+  }, [replace, appendPage]);
 
   useEffect(() => {
-    fetchSessions(0);
+    fetchSessions(null);
   }, [fetchSessions]);
 
   const handleLoadMore = () => {
-    fetchSessions(sessions.length, true);
+    fetchSessions(nextCursor, true);
   };
 
   if (isLoading) {
@@ -312,9 +331,18 @@ export function SessionHistory() {
         My Sessions
       </div>
 
-      {sessions.map((session) => (
-        <HistoryCard key={session.id} session={session} />
-      ))}
+      <VirtualList
+        items={sessions}
+        estimateSize={ESTIMATED_CARD_PX}
+        onRangeChange={evict}
+        renderItem={(session) => (
+          <HistoryCard
+            session={session}
+            expanded={expanded.has(session.id)}
+            onExpandedChange={setRowExpanded}
+          />
+        )}
+      />
 
       {/* Load more */}
       {hasMore && (
@@ -1,9 +1,12 @@
-import { useState, useEffect, useCallback, useRef } from 'react';
+import { useState, useEffect, useCallback, useRef, useMemo } from 'react';
 import { ActivityCard } from './ActivityCard';
 import { ViewToggle } from './ViewToggle';
 import { UserActivityList } from './UserActivityList';
+import { VirtualList } from './VirtualList';
 import { useSSE } from '@lib/hooks/useSSE';
+import { useSessionWindow, useExpandedSet } from '@lib/hooks/useSessionWindow';
 import { fetchWithTimeout } from '@lib/utils/fetch';
+import type { Cursor } from '@lib/utils/cursor';
 
 type ViewMode = 'timeline' | 'byUser';
 
@@ -25,6 +28,11 @@ type Session = {
 };
 
 const PAGE_SIZE = 20;
+// Typical height of a collapsed ActivityCard
+const ESTIMATED_CARD_PX = 160;
+
+// The keyset /api/v1/activity pages by
+const sortKey = (session: Session): Cursor => [session.last_activity_at, session.id];
 
 function getInitialViewMode(): ViewMode {
   if (typeof window === 'undefined') return 'timeline';
@@ -33,36 +41,31 @@ function getInitialViewMode(): ViewMode {
 }
 
 export function Timeline() {
-  const [sessions, setSessions] = useState<Session[]>([]);
+  const {
+    items: sessions,
+    hasMore,
+    nextCursor,
+    replace,
+    append: appendPage,
+    upsert,
+    evict,
+  } = useSessionWindow<Session>({ sortKey });
+  const { expanded, setRowExpanded } = useExpandedSet();
   const [fetchError, setFetchError] = useState<string | null>(null);
   const [isLoading, setIsLoading] = useState(true);
   const [isLoadingMore, setIsLoadingMore] = useState(false);
   const [showStale, setShowStale] = useState(false);
   const [viewMode, setViewMode] = useState<ViewMode>(getInitialViewMode);
-  const [hasMore, setHasMore] = useState(false);
   const abortRef = useRef<AbortController | null>(null);
 
-  // SSE hook for real-time updates
+  // SSE hook for real-time updates; each event patches just its session
   const handleSSEEvent = useCallback((event: MessageEvent) => {
     try {
-      const newSession = JSON.parse(event.data) as Session;
-      setSessions((prev) => {
-        const existing = prev.findIndex((s) => s.id === newSession.id);
-        if (existing >= 0) {
-          const updated = [...prev];
-          updated[existing] = newSession;
-          updated.sort(
-            (a, b) =>
-              new Date(b.last_activity_at).getTime() - new Date(a.last_activity_at).getTime()
-          );
-          return updated;
-        }
-        return [newSession, ...prev];
-      });
+      upsert(JSON.parse(event.data) as Session);
     } catch (err) {
       console.error('Failed to parse SSE event:', err);
     }
-  }, []);
+  }, [upsert]);
 
   const { connectionState, error: sseError, reconnect } = useSSE({
     url: '/api/v1/stream',
@@ -72,7 +75,7 @@ export function Timeline() {
   });
 
   const fetchSessions = useCallback(
-    async (currentOffset: number, append: boolean = false) => {
+    async (cursor: string | null, append: boolean = false) => {
       // Abort previous request
       abortRef.current?.abort();
       const controller = new AbortController();
@@ -87,9 +90,9 @@ export function Timeline() {
       try {
         const params = new URLSearchParams({
           limit: String(PAGE_SIZE),
-          offset: String(currentOffset),
           includeStale: String(showStale),
         });
+        if (cursor) params.set('cursor', cursor);
 
         const response = await fetchWithTimeout(`/api/v1/activity?${params}`, {
           signal: controller.signal,
@@ -101,15 +104,14 @@ export function Timeline() {
         }
 
         const data = (await response.json()) as {
-          data: { sessions: Session[]; hasMore: boolean; total: number };
+          data: { sessions: Session[]; hasMore: boolean; nextCursor: string | null; total: number };
         };
 
         if (append) {
-          setSessions((prev) => [...prev, ...data.data.sessions]);
+          appendPage(data.data.sessions, data.data.hasMore, data.data.nextCursor);
         } else {
-          setSessions(data.data.sessions);
+          replace(data.data.sessions, data.data.hasMore, data.data.nextCursor);
         }
-        setHasMore(data.data.hasMore);
         setFetchError(null);
       } catch (err) {
         if (err instanceof DOMException && err.name === 'AbortError') return;
@@ -119,13 +121,13 @@ export function Timeline() {
         setIsLoadingMore(false);
       }
     },
-    [showStale]
+    [showStale, replace, appendPage]
   );
 
   // Fetch when viewMode, showStale, or fetchSessions identity changes
   useEffect(() => {
     if (viewMode === 'timeline') {
-      fetchSessions(0);
+      fetchSessions(null);
     }
     return () => abortRef.current?.abort();
   }, [viewMode, fetchSessions]);
@@ -140,9 +142,14 @@ export function Timeline() {
   };
 
   const handleLoadMore = () => {
-    fetchSessions(sessions.length, true);
+    fetchSessions(nextCursor, true);
   };
 
+  const displayedSessions = useMemo(
+    () => (showStale ? sessions : sessions.filter((s) => s.status !== 'stale')),
+    [sessions, showStale]
+  );
+
   const isConnected = connectionState === 'connected';
   const displayError = fetchError || sseError;
 
@@ -207,9 +214,6 @@ export function Timeline() {
       ) : (
         <>
           {(() => {
-            const activeSessions = sessions.filter((s) => s.status !== 'stale');
-            const displayedSessions = showStale ? sessions : activeSessions;
-
             if (isLoading) {
               return (
                 <div
@@ -252,9 +256,18 @@ export function Timeline() {
 
             return (
               <>
-                {displayedSessions.map((session) => (
-                  <ActivityCard key={session.id} session={session} />
-                ))}
+                <VirtualList
+                  items={displayedSessions}
+                  estimateSize={ESTIMATED_CARD_PX}
+                  onRangeChange={evict}
+                  renderItem={(session) => (
+                    <ActivityCard
+                      session={session}
+                      expanded={expanded.has(session.id)}
+                      onExpandedChange={setRowExpanded}
+                    />
+                  )}
+                />
 
                 {hasMore && (
                   <button
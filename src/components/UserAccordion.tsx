@@ -41,12 +41,12 @@ export function UserAccordion({ user, showStale, isExpanded, onToggle }: UserAcc
   const [isLoading, setIsLoading] = useState(false);
   const [isLoadingMore, setIsLoadingMore] = useState(false);
   const [hasMore, setHasMore] = useState(false);
-  const [offset, setOffset] = useState(0);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
   const [error, setError] = useState<string | null>(null);
   const hasFetched = useRef(false);
 
   const fetchSessions = useCallback(
-    async (currentOffset: number, append: boolean = false) => {
+    async (cursor: string | null, append: boolean = false) => {
       if (append) {
         setIsLoadingMore(true);
       } else {
@@ -58,9 +58,9 @@ export function UserAccordion({ user, showStale, isExpanded, onToggle }: UserAcc
           view: 'byUser',
           userId: user.userId,
           limit: String(PAGE_SIZE),
-          offset: String(currentOffset),
           includeStale: String(showStale),
         });
+        if (cursor) params.set('cursor', cursor);
 
         const response = await fetchWithTimeout(`/api/v1/activity?${params}`);
         if (!response.ok) {
@@ -69,7 +69,7 @@ export function UserAccordion({ user, showStale, isExpanded, onToggle }: UserAcc
         }
 
         const data = (await response.json()) as {
-          data: { sessions: Session[]; hasMore: boolean };
+          data: { sessions: Session[]; hasMore: boolean; nextCursor: string | null };
         };
 
         if (append) {
@@ -78,7 +78,7 @@ export function UserAccordion({ user, showStale, isExpanded, onToggle }: UserAcc
           setSessions(data.data.sessions);
         }
         setHasMore(data.data.hasMore);
-        setOffset(currentOffset + data.data.sessions.length);
+        setNextCursor(data.data.nextCursor);
         setError(null);
       } catch (err) {
         setError(err instanceof Error ? err.message : 'Failed to load sessions');
@@ -93,20 +93,20 @@ export function UserAccordion({ user, showStale, isExpanded, onToggle }: UserAcc
   const handleToggle = () => {
     const willExpand = !isExpanded;
     if (willExpand && !hasFetched.current) {
-      fetchSessions(0);
+      fetchSessions(null);
       hasFetched.current = true;
     }
     onToggle(user.userId, willExpand);
   };
 
   const handleLoadMore = () => {
-    fetchSessions(offset, true);
+    fetchSessions(nextCursor, true);
   };
 
   // Fetch on mount if already expanded (e.g. first user auto-expanded)
   useEffect(() => {
     if (isExpanded && !hasFetched.current) {
-      fetchSessions(0);
+      fetchSessions(null);
       hasFetched.current = true;
     }
   }, [isExpanded, fetchSessions]);
@@ -117,8 +117,8 @@ export function UserAccordion({ user, showStale, isExpanded, onToggle }: UserAcc
     if (prevShowStale.current !== showStale) {
       prevShowStale.current = showStale;
       if (isExpanded) {
-        setOffset(0);
-        fetchSessions(0);
+        setNextCursor(null);
+        fetchSessions(null);
       }
     }
   }, [showStale, isExpanded, fetchSessions]);
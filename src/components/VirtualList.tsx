@@ -0,0 +1,43 @@
+import { useEffect, useMemo, type ReactNode } from 'react';
+import { useVirtualList } from '@lib/hooks/useVirtualList';
+
+type VirtualListProps<T extends { id: string }> = {
+  items: T[];
+  // Typical rendered height of a collapsed row, in px
+  estimateSize: number;
+  renderItem: (item: T) => ReactNode;
+  // Called with the id of the last row currently rendered (null if none)
+  onRangeChange?: (lastRenderedId: string | null) => void;
+};
+
+/**
+ * Page-scrolling list that only mounts rows near the viewport (see
+ * useVirtualList). Rows are keyed by id, so a patched row re-renders alone.
+ */
+export function VirtualList<T extends { id: string }>({
+  items,
+  estimateSize,
+  renderItem,
+  onRangeChange,
+}: VirtualListProps<T>) {
+  const keys = useMemo(() => items.map((item) => item.id), [items]);
+  const { containerRef, measure, start, end, paddingTop, paddingBottom } = useVirtualList({
+    keys,
+    estimateSize,
+  });
+
+  const lastRenderedId = end > start ? keys[end - 1] : null;
+  useEffect(() => {
+    onRangeChange?.(lastRenderedId);
+  }, [lastRenderedId, keys.length, onRangeChange]);
+
+  return (
+    <div ref={containerRef} style={{ paddingTop, paddingBottom }}>
+      {items.slice(start, end).map((item) => (
+        <div key={item.id} data-key={item.id} ref={measure} style={{ display: 'flow-root' }}>
+          {renderItem(item)}
+        </div>
+      ))}
+    </div>
+  );
+}
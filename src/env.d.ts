@@ -9,6 +9,7 @@ type Runtime = import('@astrojs/cloudflare').Runtime<{
   SESSION: KVNamespace;
   ENVIRONMENT: string;
   TEAM_ENCRYPTION_KEY?: string;
+  AUTH_CACHE?: KVNamespace;
 }>;
 
 declare namespace App {
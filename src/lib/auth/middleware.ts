@@ -1,16 +1,30 @@
-import type { D1Database } from '@cloudflare/workers-types';
+import type { D1Database, KVNamespace } from '@cloudflare/workers-types';
 import { getUserByToken, getTeam, getUserById } from '@lib/db/queries';
 import type { User, Team } from '@lib/db/types';
+import { principalKey, getCachedPrincipal, cachePrincipal } from './principal-cache';
 
+/**
+ * Who a request is authenticated as. This is what the principal cache stores
+ * (in KV too), so it holds only ids, role, the active flag and the team's LLM
+ * settings: tokens, the dashboard password hash and the LLM API key stay in D1.
+ * Routes that need other columns load them.
+ */
 export type AuthContext = {
-  user: User;
-  team: Team;
+  user: Pick<User, 'id' | 'team_id' | 'role' | 'is_active'>;
+  team: Pick<Team, 'id' | 'llm_provider' | 'llm_model'>;
 };
 
 export type AuthResult =
   | { success: true; context: AuthContext }
   | { success: false; error: string; status: number };
 
+function toAuthContext(user: User, team: Team): AuthContext {
+  return {
+    user: { id: user.id, team_id: user.team_id, role: user.role, is_active: user.is_active },
+    team: { id: team.id, llm_provider: team.llm_provider, llm_model: team.llm_model },
+  };
+}
+
 /**
  * Authenticate a request using web session cookie.
  * Used by the web dashboard for browser-based access.
@@ -71,16 +85,21 @@ export async function authenticateWebSession(
     return { success: false, error: 'Team not configured', status: 500 };
   }
 
-  return { success: true, context: { user, team } };
+  return { success: true, context: toAuthContext(user, team) };
 }
 
 /**
  * Authenticate a request using Bearer token (user_token) and X-Team-Token header.
  * Used by the Claude Code plugin to authenticate API calls.
+ *
+ * Successful lookups are cached briefly (see principal-cache.ts), so repeat calls
+ * with the same tokens cost no D1 queries. Pass the AUTH_CACHE binding as `kv` to
+ * share the cache across isolates.
  */
 export async function authenticateRequest(
   request: Request,
-  db: D1Database
+  db: D1Database,
+  kv?: KVNamespace
 ): Promise<AuthResult> {
   // Get user token from Authorization header
   const authHeader = request.headers.get('Authorization');
@@ -96,6 +115,12 @@ export async function authenticateRequest(
     return { success: false, error: 'Missing X-Team-Token header', status: 401 };
   }
 
+  const cacheKey = await principalKey(teamToken, userToken);
+  const cached = await getCachedPrincipal(cacheKey, kv);
+  if (cached) {
+    return { success: true, context: cached };
+  }
+
   // Validate team
   const team = await getTeam(db);
   if (!team) {
@@ -120,7 +145,10 @@ export async function authenticateRequest(
     return { success: false, error: 'User does not belong to this team', status: 403 };
   }
 
-  return { success: true, context: { user, team } };
+  const principal = toAuthContext(user, team);
+  await cachePrincipal(cacheKey, principal, kv);
+
+  return { success: true, context: principal };
 }
 
 /**
@@ -129,7 +157,8 @@ export async function authenticateRequest(
  */
 export async function authenticateAny(
   request: Request,
-  db: D1Database
+  db: D1Database,
+  kv?: KVNamespace
 ): Promise<AuthResult> {
   // Try web session first
   const webResult = await authenticateWebSession(request, db);
@@ -138,7 +167,7 @@ export async function authenticateAny(
   }
 
   // Try API token auth
-  const apiResult = await authenticateRequest(request, db);
+  const apiResult = await authenticateRequest(request, db, kv);
   return apiResult;
 }
 
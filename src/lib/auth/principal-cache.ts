@@ -0,0 +1,121 @@
+import type { KVNamespace } from '@cloudflare/workers-types';
+import type { AuthContext } from './middleware';
+
+// Plugin calls (heartbeat, check, logs, session start) authenticate with the same
+// team/user token pair thousands of times an hour. The resolved principal is cached
+// per isolate, and optionally in KV so fresh isolates skip D1 as well.
+//
+// A principal is an AuthContext, which carries no tokens or other secrets, so
+// nothing sensitive is written to KV.
+//
+// Explicit invalidation only reaches this isolate and KV; other isolates may serve
+// a principal for up to PRINCIPAL_TTL_MS after a change.
+
+const PRINCIPAL_TTL_MS = 30_000;
+const MAX_ENTRIES = 500;
+
+// KV's minimum expiration is 60 seconds
+const KV_TTL_SECONDS = 60;
+const KV_PREFIX = 'auth:principal:';
+
+type Entry = { context: AuthContext; expiresAt: number };
+
+// Map iteration order is insertion order, so re-inserting on hit gives LRU eviction
+const entries = new Map<string, Entry>();
+
+/**
+ * Cache key for a (team token, user token) pair. Tokens are never stored as keys.
+ */
+export async function principalKey(teamToken: string, userToken: string): Promise<string> {
+  const data = new TextEncoder().encode(`${teamToken}\n${userToken}`);
+  const hash = await crypto.subtle.digest('SHA-256', data);
+  return Array.from(new Uint8Array(hash), (b) => b.toString(16).padStart(2, '0')).join('');
+}
+
+export async function getCachedPrincipal(key: string, kv?: KVNamespace): Promise<AuthContext | null> {
+  const entry = entries.get(key);
+  if (entry) {
+    entries.delete(key);
+    if (entry.expiresAt > Date.now()) {
+      entries.set(key, entry);
+      return entry.context;
+    }
+  }
+
+  if (kv) {
+    try {
+      const stored = await kv.get<Entry>(KV_PREFIX + key, 'json');
+      if (stored && stored.expiresAt > Date.now()) {
+        remember(key, stored);
+        return stored.context;
+      }
+    } catch (error) {
+      console.error('Principal cache KV read failed:', error);
+    }
+  }
+
+  return null;
+}
+
+export async function cachePrincipal(key: string, context: AuthContext, kv?: KVNamespace): Promise<void> {
+  const entry = { context, expiresAt: Date.now() + PRINCIPAL_TTL_MS };
+  remember(key, entry);
+
+  if (kv) {
+    try {
+      await kv.put(KV_PREFIX + key, JSON.stringify(entry), { expirationTtl: KV_TTL_SECONDS });
+    } catch (error) {
+      console.error('Principal cache KV write failed:', error);
+    }
+  }
+}
+
+/**
+ * Drop the cached principal for a token pair. Call after rotating a user's token,
+ * deactivating, changing or deleting a user.
+ */
+export async function invalidatePrincipal(
+  teamToken: string,
+  userToken: string,
+  kv?: KVNamespace
+): Promise<void> {
+  const key = await principalKey(teamToken, userToken);
+  entries.delete(key);
+
+  if (kv) {
+    try {
+      await kv.delete(KV_PREFIX + key);
+    } catch (error) {
+      console.error('Principal cache KV delete failed:', error);
+    }
+  }
+}
+
+/**
+ * Drop every cached principal. Call after LLM config changes, since each cached
+ * principal carries the team's LLM provider and model.
+ */
+export async function clearPrincipalCache(kv?: KVNamespace): Promise<void> {
+  entries.clear();
+
+  if (kv) {
+    try {
+      let cursor: string | undefined;
+      do {
+        const page = await kv.list({ prefix: KV_PREFIX, cursor });
+        await Promise.all(page.keys.map((k) => kv.delete(k.name)));
+        cursor = page.list_complete ? undefined : page.cursor;
+      } while (cursor);
+    } catch (error) {
+      console.error('Principal cache KV clear failed:', error);
+    }
+  }
+}
+
+function remember(key: string, entry: Entry): void {
+  entries.delete(key);
+  entries.set(key, entry);
+  if (entries.size > MAX_ENTRIES) {
+    entries.delete(entries.keys().next().value as string);
+  }
+}
@@ -0,0 +1,91 @@
+import type { D1Database } from '@cloudflare/workers-types';
+import type { AuthContext } from '@lib/auth/middleware';
+import { applyClassifications, getTeamLLMKey } from '@lib/db/queries';
+import { classifyActivityBatch } from '@lib/llm';
+
+// Heartbeats respond with a heuristic classification and queue the activity for
+// LLM classification. Queued activities are collected per team for a short
+// window and classified with a single LLM call, then written back.
+//
+// Batches live in the isolate that received the heartbeats. The request that
+// opens a batch owns it: its ctx.waitUntil keeps the batch window open, and the
+// key lookup, LLM call and writes all run in that request's context. Later
+// requests only append to the open batch, so no request waits on timers or I/O
+// another request started (which Workers doesn't allow). A full batch is closed
+// to new items and still flushed when its window ends. Heartbeats landing in
+// different isolates are classified in separate batches.
+
+const BATCH_WINDOW_MS = 500;
+const MAX_BATCH_SIZE = 20;
+
+export type PendingClassification = {
+  activityId: string;
+  sessionId: string;
+  files: string[];
+  toolName?: string;
+  // Provisional result stored with the activity; unchanged results aren't rewritten
+  provisional: { scope: string; summary: string };
+};
+
+type Batch = {
+  team: AuthContext['team'];
+  db: D1Database;
+  encryptionKey?: string;
+  items: PendingClassification[];
+};
+
+// Open batch per team ID
+const openBatches = new Map<string, Batch>();
+
+/**
+ * Queue an activity for LLM classification. Pass the returned promise to
+ * ctx.waitUntil: for the request that opened the batch it settles once the
+ * batch has been classified and written, for the others it's already settled.
+ * Never rejects.
+ */
+export function enqueueClassification(
+  db: D1Database,
+  team: AuthContext['team'],
+  item: PendingClassification,
+  encryptionKey?: string
+): Promise<void> {
+  const open = openBatches.get(team.id);
+  if (open) {
+    open.items.push(item);
+    if (open.items.length >= MAX_BATCH_SIZE) {
+      openBatches.delete(team.id);
+    }
+    return Promise.resolve();
+  }
+
+  const batch: Batch = { team, db, encryptionKey, items: [item] };
+  openBatches.set(team.id, batch);
+  return new Promise<void>((resolve) => setTimeout(resolve, BATCH_WINDOW_MS)).then(() => flush(batch));
+}
+
+async function flush(batch: Batch): Promise<void> {
+  if (openBatches.get(batch.team.id) === batch) {
+    openBatches.delete(batch.team.id);
+  }
+
+  try {
+    const apiKey = await getTeamLLMKey(batch.db, batch.team.id);
+    const results = await classifyActivityBatch(
+      { ...batch.team, llm_api_key_encrypted: apiKey },
+      batch.items.map((item) => ({ files: item.files, toolName: item.toolName })),
+      batch.encryptionKey
+    );
+
+    const updates = batch.items.flatMap((item, i) => {
+      const result = results[i];
+      if (!result || (result.scope === item.provisional.scope && result.summary === item.provisional.summary)) {
+        return [];
+      }
+      return [{ activityId: item.activityId, sessionId: item.sessionId, semantic_scope: result.scope, summary: result.summary }];
+    });
+
+    await applyClassifications(batch.db, updates);
+  } catch (error) {
+    console.error('Background classification failed:', error instanceof Error ? error.message : error);
+  }
+}
@@ -111,6 +111,81 @@ CREATE TABLE IF NOT EXISTS plugin_logs (
   created_at TEXT NOT NULL DEFAULT (datetime('now'))
 );
 
+-- Activity rollups table (compacted activity, one row per session)
+CREATE TABLE IF NOT EXISTS activity_rollups (
+  session_id TEXT PRIMARY KEY REFERENCES sessions(id) ON DELETE CASCADE,
+  activity_count INTEGER NOT NULL DEFAULT 0,
+  heartbeat_count INTEGER NOT NULL DEFAULT 0,
+  files TEXT NOT NULL DEFAULT '[]',
+  scopes TEXT NOT NULL DEFAULT '[]',
+  first_activity_at TEXT,
+  last_activity_at TEXT,
+  updated_at TEXT DEFAULT (datetime('now'))
+);
+
+-- Named time-limited locks (single-runner background jobs)
+CREATE TABLE IF NOT EXISTS leases (
+  name TEXT PRIMARY KEY,
+  holder TEXT NOT NULL,
+  expires_at TEXT NOT NULL
+);
+
+-- Session status changes made by background jobs, for live streams
+CREATE TABLE IF NOT EXISTS change_feed (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  kind TEXT NOT NULL,
+  session_ids TEXT NOT NULL,
+  created_at TEXT NOT NULL DEFAULT (datetime('now'))
+);
+
+-- File paths the plugin has numbered within a session (wire format interning)
+CREATE TABLE IF NOT EXISTS session_paths (
+  session_id TEXT NOT NULL REFERENCES sessions(id) ON DELETE CASCADE,
+  ref INTEGER NOT NULL,
+  path TEXT NOT NULL,
+  PRIMARY KEY (session_id, ref)
+) WITHOUT ROWID;
+
+-- Paths touched by active sessions, per repo (subtree overlap checks). Filled
+-- by heartbeats; migrations/012_active_paths.sql also backfills active sessions.
+CREATE TABLE IF NOT EXISTS active_paths (
+  repo_id TEXT NOT NULL REFERENCES repos(id) ON DELETE CASCADE,
+  path TEXT NOT NULL,
+  session_id TEXT NOT NULL REFERENCES sessions(id) ON DELETE CASCADE,
+  PRIMARY KEY (repo_id, path, session_id)
+) WITHOUT ROWID;
+
+-- Insights rollups, maintained on heartbeat (per-directory/day, user-pair overlaps, per-hour)
+CREATE TABLE IF NOT EXISTS directory_hotspots (
+  repo_id TEXT NOT NULL REFERENCES repos(id) ON DELETE CASCADE,
+  day TEXT NOT NULL,
+  directory TEXT NOT NULL,
+  user_id TEXT NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+  heartbeat_count INTEGER NOT NULL DEFAULT 0,
+  last_activity_at TEXT NOT NULL,
+  PRIMARY KEY (repo_id, day, directory, user_id)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS user_overlaps (
+  team_id TEXT NOT NULL REFERENCES teams(id),
+  day TEXT NOT NULL,
+  repo_id TEXT NOT NULL REFERENCES repos(id) ON DELETE CASCADE,
+  user_a TEXT NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+  user_b TEXT NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+  directory TEXT NOT NULL,
+  overlap_count INTEGER NOT NULL DEFAULT 0,
+  last_overlap_at TEXT NOT NULL,
+  PRIMARY KEY (team_id, day, repo_id, user_a, user_b, directory)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS repo_activity_hourly (
+  repo_id TEXT NOT NULL REFERENCES repos(id) ON DELETE CASCADE,
+  hour TEXT NOT NULL,
+  user_id TEXT NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+  heartbeat_count INTEGER NOT NULL DEFAULT 0,
+  PRIMARY KEY (repo_id, hour, user_id)
+) WITHOUT ROWID;
+
 -- Indexes
 CREATE INDEX IF NOT EXISTS idx_users_team_id ON users(team_id);
 CREATE INDEX IF NOT EXISTS idx_users_token ON users(user_token);
@@ -119,14 +194,128 @@ CREATE INDEX IF NOT EXISTS idx_repos_team_id ON repos(team_id);
 CREATE INDEX IF NOT EXISTS idx_sessions_user_id ON sessions(user_id);
 CREATE INDEX IF NOT EXISTS idx_sessions_repo_id ON sessions(repo_id);
 CREATE INDEX IF NOT EXISTS idx_sessions_status ON sessions(status);
+CREATE INDEX IF NOT EXISTS idx_sessions_status_last_activity ON sessions(status, last_activity_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_sessions_user_started ON sessions(user_id, started_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_sessions_started_id ON sessions(started_at, id);
 CREATE INDEX IF NOT EXISTS idx_activity_session_id ON activity(session_id);
+CREATE INDEX IF NOT EXISTS idx_activity_session_created ON activity(session_id, created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_activity_created_id ON activity(created_at, id);
 CREATE INDEX IF NOT EXISTS idx_magic_links_token ON magic_links(token);
 CREATE INDEX IF NOT EXISTS idx_web_sessions_token ON web_sessions(token_hash);
 CREATE INDEX IF NOT EXISTS idx_plugin_logs_user ON plugin_logs(user_id);
 CREATE INDEX IF NOT EXISTS idx_plugin_logs_level ON plugin_logs(level);
 CREATE INDEX IF NOT EXISTS idx_plugin_logs_created ON plugin_logs(created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_change_feed_created ON change_feed(created_at);
+CREATE INDEX IF NOT EXISTS idx_plugin_logs_hook_created ON plugin_logs(hook, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_plugin_logs_session_created ON plugin_logs(session_id, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_active_paths_session ON active_paths(session_id);
 `;
 
+/**
+ * Columns added after the initial schema. SQLite has no ADD COLUMN IF NOT EXISTS,
+ * so each ALTER is attempted and "duplicate column" errors are ignored. The
+ * backfill only runs when the column was actually added.
+ */
+const COLUMN_MIGRATIONS: { alter: string; backfill?: string }[] = [
+  {
+    alter: 'ALTER TABLE sessions ADD COLUMN latest_activity_id TEXT',
+    backfill: `UPDATE sessions
+      SET latest_activity_id = (
+        SELECT a.id FROM activity a
+        WHERE a.session_id = sessions.id
+        ORDER BY a.created_at DESC, a.rowid DESC
+        LIMIT 1
+      )
+      WHERE latest_activity_id IS NULL`,
+  },
+  {
+    alter: 'ALTER TABLE sessions ADD COLUMN latest_semantic_scope TEXT',
+    backfill: `UPDATE sessions
+      SET latest_semantic_scope = (SELECT a.semantic_scope FROM activity a WHERE a.id = sessions.latest_activity_id)
+      WHERE latest_activity_id IS NOT NULL`,
+  },
+  {
+    alter: 'ALTER TABLE sessions ADD COLUMN latest_summary TEXT',
+    backfill: `UPDATE sessions
+      SET latest_summary = (SELECT a.summary FROM activity a WHERE a.id = sessions.latest_activity_id)
+      WHERE latest_activity_id IS NOT NULL`,
+  },
+  {
+    alter: 'ALTER TABLE activity ADD COLUMN heartbeat_count INTEGER DEFAULT 1',
+  },
+  {
+    alter: 'ALTER TABLE activity ADD COLUMN last_seen_at TEXT',
+    backfill: 'UPDATE activity SET last_seen_at = created_at WHERE last_seen_at IS NULL',
+  },
+  {
+    alter: 'ALTER TABLE sessions ADD COLUMN speculative INTEGER NOT NULL DEFAULT 0',
+  },
+  {
+    alter: 'ALTER TABLE sessions ADD COLUMN classification_revision INTEGER NOT NULL DEFAULT 0',
+  },
+];
+
+/**
+ * Indexes on columns COLUMN_MIGRATIONS adds, created once those exist: the
+ * live-session feed indexes (migrations/013_live_session_indexes.sql).
+ */
+const COLUMN_INDEXES = [
+  `CREATE INDEX IF NOT EXISTS idx_sessions_live_last_activity ON sessions(last_activity_at DESC, id DESC)
+    WHERE status != 'ended' AND speculative = 0`,
+  `CREATE INDEX IF NOT EXISTS idx_sessions_live_user ON sessions(user_id, last_activity_at DESC, id DESC)
+    WHERE status != 'ended' AND speculative = 0`,
+  `CREATE INDEX IF NOT EXISTS idx_sessions_live_repo ON sessions(repo_id, last_activity_at DESC, id DESC)
+    WHERE status != 'ended' AND speculative = 0`,
+];
+
+/**
+ * Full-text indexes (migrations/007_search_index.sql). Trigger bodies contain
+ * semicolons, so these can't go through SCHEMA's split. Each index is built
+ * from its content table when it's first created; the triggers keep it current.
+ */
+const FTS_MIGRATIONS: { table: string; statements: string[] }[] = [
+  {
+    table: 'plugin_logs_fts',
+    statements: [
+      `CREATE VIRTUAL TABLE IF NOT EXISTS plugin_logs_fts USING fts5(
+        message, data, error,
+        content='plugin_logs', content_rowid='rowid'
+      )`,
+      `CREATE TRIGGER IF NOT EXISTS plugin_logs_fts_insert AFTER INSERT ON plugin_logs BEGIN
+        INSERT INTO plugin_logs_fts(rowid, message, data, error)
+        VALUES (new.rowid, new.message, new.data, new.error);
+      END`,
+      `CREATE TRIGGER IF NOT EXISTS plugin_logs_fts_delete AFTER DELETE ON plugin_logs BEGIN
+        INSERT INTO plugin_logs_fts(plugin_logs_fts, rowid, message, data, error)
+        VALUES ('delete', old.rowid, old.message, old.data, old.error);
+      END`,
+    ],
+  },
+  {
+    table: 'activity_fts',
+    statements: [
+      `CREATE VIRTUAL TABLE IF NOT EXISTS activity_fts USING fts5(
+        summary, semantic_scope,
+        content='activity', content_rowid='rowid'
+      )`,
+      `CREATE TRIGGER IF NOT EXISTS activity_fts_insert AFTER INSERT ON activity BEGIN
+        INSERT INTO activity_fts(rowid, summary, semantic_scope)
+        VALUES (new.rowid, new.summary, new.semantic_scope);
+      END`,
+      `CREATE TRIGGER IF NOT EXISTS activity_fts_delete AFTER DELETE ON activity BEGIN
+        INSERT INTO activity_fts(activity_fts, rowid, summary, semantic_scope)
+        VALUES ('delete', old.rowid, old.summary, old.semantic_scope);
+      END`,
+      `CREATE TRIGGER IF NOT EXISTS activity_fts_update AFTER UPDATE OF summary, semantic_scope ON activity BEGIN
+        INSERT INTO activity_fts(activity_fts, rowid, summary, semantic_scope)
+        VALUES ('delete', old.rowid, old.summary, old.semantic_scope);
+        INSERT INTO activity_fts(rowid, summary, semantic_scope)
+        VALUES (new.rowid, new.summary, new.semantic_scope);
+      END`,
+    ],
+  },
+];
+
 export async function ensureMigrated(db: D1Database): Promise<void> {
   // Always run CREATE TABLE IF NOT EXISTS statements - they're idempotent
   // This ensures new tables are created even for existing deployments
@@ -145,4 +334,52 @@ export async function ensureMigrated(db: D1Database): Promise<void> {
       }
     }
   }
+
+  for (const migration of COLUMN_MIGRATIONS) {
+    try {
+      await db.prepare(migration.alter).run();
+    } catch (error) {
+      const msg = error instanceof Error ? error.message : String(error);
+      if (!msg.includes('duplicate column')) {
+        console.error('Migration error:', msg, 'Statement:', migration.alter);
+      }
+      continue;
+    }
+
+    if (migration.backfill) {
+      try {
+        await db.prepare(migration.backfill).run();
+      } catch (error) {
+        const msg = error instanceof Error ? error.message : String(error);
+        console.error('Backfill error:', msg, 'Statement:', migration.alter);
+      }
+    }
+  }
+
+  for (const statement of COLUMN_INDEXES) {
+    try {
+      await db.prepare(statement).run();
+    } catch (error) {
+      const msg = error instanceof Error ? error.message : String(error);
+      console.error('Migration error:', msg, 'Statement:', statement.substring(0, 80));
+    }
+  }
+
+  for (const fts of FTS_MIGRATIONS) {
+    try {
+      const existing = await db
+        .prepare("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?")
+        .bind(fts.table)
+        .first();
+      for (const statement of fts.statements) {
+        await db.prepare(statement).run();
+      }
+      if (!existing) {
+        await db.prepare(`INSERT INTO ${fts.table}(${fts.table}) VALUES ('rebuild')`).run();
+      }
+    } catch (error) {
+      const msg = error instanceof Error ? error.message : String(error);
+      console.error('Migration error:', msg, 'Statement:', `FTS ${fts.table}`);
+    }
+  }
 }
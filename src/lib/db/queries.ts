@@ -11,6 +11,42 @@ import type {
   PluginLog,
   PluginLogWithUser,
 } from './types';
+import { encodeCursor, type Cursor } from '@lib/utils/cursor';
+
+/**
+ * Split a limit+1 result set into a page, and build the cursor for the next page
+ * from the sort key of the page's last row.
+ */
+function keysetPage<T>(
+  rows: T[],
+  limit: number,
+  sortKey: (row: T) => Cursor
+): { page: T[]; hasMore: boolean; nextCursor: string | null } {
+  const hasMore = rows.length > limit;
+  const page = hasMore ? rows.slice(0, limit) : rows;
+  const last = page[page.length - 1];
+  return {
+    page,
+    hasMore,
+    nextCursor: hasMore && last ? encodeCursor(sortKey(last)) : null,
+  };
+}
+
+/**
+ * FTS5 query for free text typed by a user: each term is quoted so paths and
+ * punctuation aren't read as query syntax, all terms must match, and the last
+ * one matches as a prefix while the user is still typing.
+ */
+function ftsQuery(text: string): string {
+  const terms = text
+    .split(/\s+/)
+    .filter(Boolean)
+    .map((term) => `"${term.replace(/"/g, '""')}"`);
+  if (terms.length > 0) {
+    terms[terms.length - 1] += '*';
+  }
+  return terms.join(' ');
+}
 
 function safeParseFiles(raw: string): string[] {
   try {
@@ -30,6 +66,18 @@ export async function getTeam(db: D1Database): Promise<Team | null> {
   return db.prepare('SELECT * FROM teams LIMIT 1').first<Team>();
 }
 
+/**
+ * The team's encrypted LLM API key. Kept out of the cached principal, so it's
+ * loaded here only when a classification is about to use it.
+ */
+export async function getTeamLLMKey(db: D1Database, teamId: string): Promise<string | null> {
+  const row = await db
+    .prepare('SELECT llm_api_key_encrypted FROM teams WHERE id = ?')
+    .bind(teamId)
+    .first<{ llm_api_key_encrypted: string | null }>();
+  return row?.llm_api_key_encrypted ?? null;
+}
+
 export async function createTeam(
   db: D1Database,
   data: Pick<Team, 'id' | 'name' | 'team_token' | 'dashboard_password_hash'>
@@ -129,6 +177,7 @@ export async function deleteUser(db: D1Database, userId: string): Promise<void>
     db.prepare('DELETE FROM web_sessions WHERE user_id = ?').bind(userId),
     db.prepare('DELETE FROM magic_links WHERE user_id = ?').bind(userId),
     db.prepare('DELETE FROM activity WHERE session_id IN (SELECT id FROM sessions WHERE user_id = ?)').bind(userId),
+    db.prepare('DELETE FROM activity_rollups WHERE session_id IN (SELECT id FROM sessions WHERE user_id = ?)').bind(userId),
     db.prepare('DELETE FROM sessions WHERE user_id = ?').bind(userId),
     db.prepare('DELETE FROM devices WHERE user_id = ?').bind(userId),
     db.prepare('DELETE FROM users WHERE id = ?').bind(userId),
@@ -224,7 +273,7 @@ export async function getUserRepos(db: D1Database, teamId: string, userId: strin
       `SELECT DISTINCT r.*
        FROM repos r
        JOIN sessions s ON s.repo_id = r.id
-       WHERE r.team_id = ? AND s.user_id = ?
+       WHERE r.team_id = ? AND s.user_id = ? AND s.speculative = 0
        ORDER BY r.name`
     )
     .bind(teamId, userId)
@@ -251,6 +300,123 @@ export async function createSession(
   return db.prepare('SELECT * FROM sessions WHERE id = ?').bind(data.id).first<Session>() as Promise<Session>;
 }
 
+/**
+ * Register a session in a single D1 round trip: upsert the device, get-or-create
+ * the repo and insert the session in one batch (which D1 runs as a transaction).
+ * Re-sending a start for a session the user already owns reactivates it, so
+ * plugin retries are idempotent. Returns null if the session ID belongs to
+ * another user.
+ *
+ * Speculative starts (sent in the background at SessionStart) stay hidden from
+ * listings until the session's first heartbeat or a non-speculative start
+ * confirms them; unconfirmed ones are ended by markStaleSessions.
+ */
+export async function startSession(
+  db: D1Database,
+  data: {
+    sessionId: string;
+    userId: string;
+    teamId: string;
+    hostname: string;
+    isRemote: boolean;
+    deviceName: string;
+    repoName: string | null;
+    remoteUrl: string | null;
+    branch: string | null;
+    worktree: string | null;
+    speculative?: boolean;
+  }
+): Promise<{ session_id: string; device_id: string; repo_id: string | null } | null> {
+  const isRemote = data.isRemote ? 1 : 0;
+  const statements = [
+    db
+      .prepare(
+        `INSERT INTO devices (id, user_id, name, hostname, is_remote, last_seen_at)
+         SELECT ?, ?, ?, ?, ?, datetime('now')
+         WHERE NOT EXISTS (SELECT 1 FROM devices WHERE user_id = ? AND hostname = ? AND is_remote = ?)`
+      )
+      .bind(crypto.randomUUID(), data.userId, data.deviceName, data.hostname, isRemote, data.userId, data.hostname, isRemote),
+    db
+      .prepare(
+        "UPDATE devices SET last_seen_at = datetime('now'), name = ? WHERE user_id = ? AND hostname = ? AND is_remote = ?"
+      )
+      .bind(data.deviceName, data.userId, data.hostname, isRemote),
+  ];
+
+  // Repos without a remote URL can't be matched, so each new session gets its own
+  // row (as in getOrCreateRepo). A retried or reactivated start keeps the
+  // session's existing repo_id, so no row is inserted for it.
+  const newRepoId = crypto.randomUUID();
+  let repoIdExpr = 'NULL';
+  const repoIdParams: unknown[] = [];
+  if (data.repoName) {
+    statements.push(
+      db
+        .prepare(
+          `INSERT INTO repos (id, team_id, name, remote_url, repo_token)
+           SELECT ?, ?, ?, ?, ?
+           WHERE CASE WHEN ? IS NULL
+             THEN NOT EXISTS (SELECT 1 FROM sessions WHERE id = ?)
+             ELSE NOT EXISTS (SELECT 1 FROM repos WHERE team_id = ? AND remote_url = ?)
+           END`
+        )
+        .bind(
+          newRepoId,
+          data.teamId,
+          data.repoName,
+          data.remoteUrl,
+          crypto.randomUUID(),
+          data.remoteUrl,
+          data.sessionId,
+          data.teamId,
+          data.remoteUrl
+        )
+    );
+    if (data.remoteUrl) {
+      repoIdExpr = '(SELECT id FROM repos WHERE team_id = ? AND remote_url = ? LIMIT 1)';
+      repoIdParams.push(data.teamId, data.remoteUrl);
+    } else {
+      repoIdExpr = '?';
+      repoIdParams.push(newRepoId);
+    }
+  }
+
+  statements.push(
+    db
+      .prepare(
+        `INSERT INTO sessions (id, user_id, device_id, repo_id, branch, worktree, speculative)
+         VALUES (
+           ?, ?,
+           (SELECT id FROM devices WHERE user_id = ? AND hostname = ? AND is_remote = ? LIMIT 1),
+           ${repoIdExpr},
+           ?, ?, ?
+         )
+         ON CONFLICT(id) DO UPDATE SET
+           status = 'active', ended_at = NULL, last_activity_at = datetime('now'),
+           speculative = MIN(sessions.speculative, excluded.speculative)
+         WHERE sessions.user_id = excluded.user_id
+         RETURNING id, device_id, repo_id`
+      )
+      .bind(
+        data.sessionId,
+        data.userId,
+        data.userId,
+        data.hostname,
+        isRemote,
+        ...repoIdParams,
+        data.branch,
+        data.worktree,
+        data.speculative ? 1 : 0
+      )
+  );
+
+  const results = await db.batch(statements);
+  const row = (results[results.length - 1].results as { id: string; device_id: string; repo_id: string | null }[])[0];
+  if (!row) return null;
+
+  return { session_id: row.id, device_id: row.device_id, repo_id: row.repo_id };
+}
+
 export async function updateSessionActivity(db: D1Database, sessionId: string): Promise<void> {
   await db
     .prepare("UPDATE sessions SET last_activity_at = datetime('now'), status = 'active', ended_at = NULL WHERE id = ?")
@@ -259,10 +425,10 @@ export async function updateSessionActivity(db: D1Database, sessionId: string):
 }
 
 export async function endSession(db: D1Database, sessionId: string): Promise<void> {
-  await db
-    .prepare("UPDATE sessions SET status = 'ended', ended_at = datetime('now') WHERE id = ?")
-    .bind(sessionId)
-    .run();
+  await db.batch([
+    db.prepare("UPDATE sessions SET status = 'ended', ended_at = datetime('now') WHERE id = ?").bind(sessionId),
+    db.prepare('DELETE FROM active_paths WHERE session_id = ?').bind(sessionId),
+  ]);
 }
 
 export async function getActiveSessionsForUser(db: D1Database, userId: string): Promise<Session[]> {
@@ -277,6 +443,54 @@ export async function getSessionById(db: D1Database, sessionId: string): Promise
   return db.prepare('SELECT * FROM sessions WHERE id = ?').bind(sessionId).first<Session>();
 }
 
+/**
+ * Store newly numbered paths for a session and look up the numbers it refers
+ * to, in one round trip. Only the session's own user can write or read its
+ * table. Returns ref -> path for every ref found; the caller decides whether
+ * anything is missing.
+ */
+export async function resolveSessionPaths(
+  db: D1Database,
+  sessionId: string,
+  userId: string,
+  defs: Map<number, string>,
+  refs: number[]
+): Promise<Map<number, string>> {
+  const owned = 'EXISTS (SELECT 1 FROM sessions WHERE id = ? AND user_id = ?)';
+  const statements = [...defs].map(([ref, path]) =>
+    db
+      .prepare(
+        `INSERT INTO session_paths (session_id, ref, path)
+         SELECT ?, ?, ? WHERE ${owned}
+         ON CONFLICT (session_id, ref) DO UPDATE SET path = excluded.path`
+      )
+      .bind(sessionId, ref, path, sessionId, userId)
+  );
+
+  const lookup = refs.filter((ref) => !defs.has(ref));
+  if (lookup.length > 0) {
+    statements.push(
+      db
+        .prepare(
+          `SELECT ref, path FROM session_paths
+           WHERE session_id = ? AND ref IN (${lookup.map(() => '?').join(', ')}) AND ${owned}`
+        )
+        .bind(sessionId, ...lookup, sessionId, userId)
+    );
+  }
+
+  const resolved = new Map(defs);
+  if (statements.length === 0) return resolved;
+
+  const results = await db.batch(statements);
+  if (lookup.length > 0) {
+    for (const row of results[results.length - 1].results as { ref: number; path: string }[]) {
+      resolved.set(row.ref, row.path);
+    }
+  }
+  return resolved;
+}
+
 // ============================================================================
 // ACTIVITY QUERIES
 // ============================================================================
@@ -292,36 +506,132 @@ export async function createActivity(
     )
     .bind(data.id, data.session_id, data.files, data.semantic_scope, data.summary);
 
-  // Reactivate session: set active, update timestamp, clear ended_at (handles stale/ended → active)
+  // Reactivate session: set active, update timestamp, clear ended_at (handles stale/ended → active).
+  // A heartbeat also confirms a speculatively started session. Also move the
+  // session's latest-activity pointer so read paths can join by primary key.
   const updateStmt = db
     .prepare(
-      "UPDATE sessions SET last_activity_at = datetime('now'), status = 'active', ended_at = NULL WHERE id = ?"
+      `UPDATE sessions
+       SET last_activity_at = datetime('now'), status = 'active', ended_at = NULL, speculative = 0,
+           latest_activity_id = ?, latest_semantic_scope = ?, latest_summary = ?
+       WHERE id = ?`
     )
-    .bind(data.session_id);
+    .bind(data.id, data.semantic_scope, data.summary, data.session_id);
 
   await db.batch([insertStmt, updateStmt]);
 
   return db.prepare('SELECT * FROM activity WHERE id = ?').bind(data.id).first<Activity>() as Promise<Activity>;
 }
 
+/**
+ * Record a heartbeat's activity. If the files match the session's latest
+ * activity row, that row is merged into (heartbeat_count / last_seen_at) and
+ * its stored classification is returned; scope isn't compared, since a row may
+ * have been reclassified by the LLM after the heartbeat that created it.
+ * Otherwise a new activity row is created. Either way the session is reactivated.
+ * `files` should be a normalized (deduplicated, sorted) JSON array.
+ *
+ * Set `clientSummary` when `data.summary` was derived by the plugin from the
+ * transcript: a merged row then takes it over (with the session's latest summary,
+ * bumping classification_revision for the stream), since a new request against
+ * the same files is new work. Heuristic summaries never replace a stored one,
+ * which may be the LLM's.
+ */
+export async function recordActivity(
+  db: D1Database,
+  data: Pick<Activity, 'id' | 'session_id' | 'files' | 'semantic_scope' | 'summary'>,
+  options: { clientSummary?: boolean } = {}
+): Promise<{ activityId: string; merged: boolean; semantic_scope: string | null; summary: string | null }> {
+  const newSummary = options.clientSummary ? data.summary : null;
+  const [mergeResult] = await db.batch([
+    db
+      .prepare(
+        `UPDATE activity
+         SET heartbeat_count = COALESCE(heartbeat_count, 1) + 1, last_seen_at = datetime('now'),
+             summary = COALESCE(?, summary)
+         WHERE id = (SELECT latest_activity_id FROM sessions WHERE id = ?)
+         AND files = ?
+         RETURNING id, semantic_scope, summary`
+      )
+      .bind(newSummary, data.session_id, data.files),
+    db
+      .prepare(
+        `UPDATE sessions
+         SET latest_summary = ?, classification_revision = classification_revision + 1
+         WHERE id = ? AND ? IS NOT NULL AND latest_summary IS NOT ?
+         AND EXISTS (SELECT 1 FROM activity a WHERE a.id = sessions.latest_activity_id AND a.files = ?)`
+      )
+      .bind(newSummary, data.session_id, newSummary, newSummary, data.files),
+    db
+      .prepare(
+        "UPDATE sessions SET last_activity_at = datetime('now'), status = 'active', ended_at = NULL, speculative = 0 WHERE id = ?"
+      )
+      .bind(data.session_id),
+  ]);
+
+  const merged = (mergeResult.results as Pick<Activity, 'id' | 'semantic_scope' | 'summary'>[])[0];
+  if (merged) {
+    return { activityId: merged.id, merged: true, semantic_scope: merged.semantic_scope, summary: merged.summary };
+  }
+
+  await createActivity(db, data);
+  return { activityId: data.id, merged: false, semantic_scope: data.semantic_scope, summary: data.summary };
+}
+
+/**
+ * Replace provisional classifications with final ones. Each activity row is
+ * updated; the session's denormalized latest scope/summary only if that row is
+ * still its latest activity, bumping classification_revision for the stream.
+ */
+export async function applyClassifications(
+  db: D1Database,
+  updates: { activityId: string; sessionId: string; semantic_scope: string; summary: string }[]
+): Promise<void> {
+  if (updates.length === 0) return;
+
+  await db.batch(
+    updates.flatMap((update) => [
+      db
+        .prepare('UPDATE activity SET semantic_scope = ?, summary = ? WHERE id = ?')
+        .bind(update.semantic_scope, update.summary, update.activityId),
+      db
+        .prepare(
+          `UPDATE sessions
+           SET latest_semantic_scope = ?, latest_summary = ?, classification_revision = classification_revision + 1
+           WHERE id = ? AND latest_activity_id = ?`
+        )
+        .bind(update.semantic_scope, update.summary, update.sessionId, update.activityId),
+    ])
+  );
+}
+
 export type PaginatedSessions = {
   sessions: SessionWithDetails[];
   total: number;
   limit: number;
   offset: number;
   hasMore: boolean;
+  nextCursor: string | null;
 };
 
+// Keyset pagination: session listings page on (last_activity_at, id), activity
+// and log listings on (created_at, id). When `after` is given, offset is ignored.
+// Session listings also filter on status != 'ended' AND speculative = 0, spelled
+// exactly as the partial indexes in migrations/013_live_session_indexes.sql are,
+// so pages are read from one of those indexes in order rather than sorted.
+const SESSION_KEYSET_CLAUSE = ' AND (s.last_activity_at, s.id) < (?, ?)';
+
 export async function getRecentActivity(
   db: D1Database,
   teamId: string,
   options: {
     limit?: number;
     offset?: number;
+    after?: Cursor;
     includeStale?: boolean;
   } = {}
 ): Promise<PaginatedSessions> {
-  const { limit = 20, offset = 0, includeStale = true } = options;
+  const { limit = 20, offset = 0, after, includeStale = true } = options;
 
   const statusA = 'active';
   const statusB = includeStale ? 'stale' : 'active';
@@ -333,7 +643,8 @@ export async function getRecentActivity(
        FROM sessions s
        JOIN users u ON s.user_id = u.id
        WHERE u.team_id = ?
-       AND s.status IN (?, ?)`
+       AND s.status != 'ended' AND s.status IN (?, ?)
+       AND s.speculative = 0`
     )
     .bind(teamId, statusA, statusB)
     .first<{ count: number }>();
@@ -348,25 +659,29 @@ export async function getRecentActivity(
         u.id as user_id, u.name as user_name,
         d.id as device_id, d.name as device_name, d.is_remote as device_is_remote,
         r.id as repo_id, r.name as repo_name, r.remote_url as repo_remote_url,
-        a.id as activity_id, a.files, a.semantic_scope, a.summary, a.created_at as activity_created_at
+        a.id as activity_id, a.files, s.latest_semantic_scope as semantic_scope, s.latest_summary as summary,
+        a.created_at as activity_created_at
       FROM sessions s
-      JOIN users u ON s.user_id = u.id
+      CROSS JOIN users u ON s.user_id = u.id
       JOIN devices d ON s.device_id = d.id
       LEFT JOIN repos r ON s.repo_id = r.id
-      LEFT JOIN (
-        SELECT session_id, id, files, semantic_scope, summary, created_at,
-               ROW_NUMBER() OVER (PARTITION BY session_id ORDER BY created_at DESC) as rn
-        FROM activity
-      ) a ON s.id = a.session_id AND a.rn = 1
+      LEFT JOIN activity a ON a.id = s.latest_activity_id
       WHERE u.team_id = ?
-      AND s.status IN (?, ?)
-      ORDER BY s.last_activity_at DESC
+      AND s.status != 'ended' AND s.status IN (?, ?)
+      AND s.speculative = 0${after ? SESSION_KEYSET_CLAUSE : ''}
+      ORDER BY s.last_activity_at DESC, s.id DESC
       LIMIT ? OFFSET ?`
     )
-    .bind(teamId, statusA, statusB, limit, offset)
+    .bind(teamId, statusA, statusB, ...(after ? [after[0], after[1]] : []), limit + 1, after ? 0 : offset)
     .all();
 
-  const sessions = result.results.map((row: Record<string, unknown>) => ({
+  const { page, hasMore, nextCursor } = keysetPage(
+    result.results as Record<string, unknown>[],
+    limit,
+    (row) => [row.last_activity_at as string, row.id as string]
+  );
+
+  const sessions = page.map((row: Record<string, unknown>) => ({
     id: row.id as string,
     user_id: row.user_id as string,
     device_id: row.device_id as string,
@@ -410,7 +725,8 @@ export async function getRecentActivity(
     total,
     limit,
     offset,
-    hasMore: offset + sessions.length < total,
+    hasMore,
+    nextCursor,
   };
 }
 
@@ -440,6 +756,7 @@ export async function getActivityByUser(
       JOIN sessions s ON s.user_id = u.id
       WHERE u.team_id = ?
       AND s.status IN (?, ?)
+      AND s.speculative = 0
       GROUP BY u.id, u.name
       ORDER BY latest_activity DESC`
     )
@@ -461,10 +778,11 @@ export async function getUserSessions(
   options: {
     limit?: number;
     offset?: number;
+    after?: Cursor;
     includeStale?: boolean;
   } = {}
 ): Promise<PaginatedSessions> {
-  const { limit = 20, offset = 0, includeStale = true } = options;
+  const { limit = 20, offset = 0, after, includeStale = true } = options;
 
   const statusA = 'active';
   const statusB = includeStale ? 'stale' : 'active';
@@ -477,7 +795,8 @@ export async function getUserSessions(
        JOIN users u ON s.user_id = u.id
        WHERE u.team_id = ?
        AND s.user_id = ?
-       AND s.status IN (?, ?)`
+       AND s.status != 'ended' AND s.status IN (?, ?)
+       AND s.speculative = 0`
     )
     .bind(teamId, userId, statusA, statusB)
     .first<{ count: number }>();
@@ -492,26 +811,30 @@ export async function getUserSessions(
         u.id as user_id, u.name as user_name,
         d.id as device_id, d.name as device_name, d.is_remote as device_is_remote,
         r.id as repo_id, r.name as repo_name, r.remote_url as repo_remote_url,
-        a.id as activity_id, a.files, a.semantic_scope, a.summary, a.created_at as activity_created_at
+        a.id as activity_id, a.files, s.latest_semantic_scope as semantic_scope, s.latest_summary as summary,
+        a.created_at as activity_created_at
       FROM sessions s
       JOIN users u ON s.user_id = u.id
       JOIN devices d ON s.device_id = d.id
       LEFT JOIN repos r ON s.repo_id = r.id
-      LEFT JOIN (
-        SELECT session_id, id, files, semantic_scope, summary, created_at,
-               ROW_NUMBER() OVER (PARTITION BY session_id ORDER BY created_at DESC) as rn
-        FROM activity
-      ) a ON s.id = a.session_id AND a.rn = 1
+      LEFT JOIN activity a ON a.id = s.latest_activity_id
       WHERE u.team_id = ?
       AND s.user_id = ?
-      AND s.status IN (?, ?)
-      ORDER BY s.last_activity_at DESC
+      AND s.status != 'ended' AND s.status IN (?, ?)
+      AND s.speculative = 0${after ? SESSION_KEYSET_CLAUSE : ''}
+      ORDER BY s.last_activity_at DESC, s.id DESC
       LIMIT ? OFFSET ?`
     )
-    .bind(teamId, userId, statusA, statusB, limit, offset)
+    .bind(teamId, userId, statusA, statusB, ...(after ? [after[0], after[1]] : []), limit + 1, after ? 0 : offset)
     .all();
 
-  const sessions = result.results.map((row: Record<string, unknown>) => ({
+  const { page, hasMore, nextCursor } = keysetPage(
+    result.results as Record<string, unknown>[],
+    limit,
+    (row) => [row.last_activity_at as string, row.id as string]
+  );
+
+  const sessions = page.map((row: Record<string, unknown>) => ({
     id: row.id as string,
     user_id: row.user_id as string,
     device_id: row.device_id as string,
@@ -555,7 +878,8 @@ export async function getUserSessions(
     total,
     limit,
     offset,
-    hasMore: offset + sessions.length < total,
+    hasMore,
+    nextCursor,
   };
 }
 
@@ -570,7 +894,7 @@ export async function getRepoBranches(db: D1Database, repoId: string): Promise<s
   const result = await db
     .prepare(
       `SELECT DISTINCT branch FROM sessions
-       WHERE repo_id = ? AND branch IS NOT NULL
+       WHERE repo_id = ? AND branch IS NOT NULL AND speculative = 0
        ORDER BY branch`
     )
     .bind(repoId)
@@ -590,7 +914,7 @@ export async function getRepoUsers(
       `SELECT DISTINCT u.id, u.name
        FROM users u
        JOIN sessions s ON s.user_id = u.id
-       WHERE s.repo_id = ?
+       WHERE s.repo_id = ? AND s.speculative = 0
        ORDER BY u.name`
     )
     .bind(repoId)
@@ -608,6 +932,7 @@ export async function getRepoActivity(
   options: {
     limit?: number;
     offset?: number;
+    after?: Cursor;
     includeStale?: boolean;
     userId?: string;
     branch?: string;
@@ -615,13 +940,13 @@ export async function getRepoActivity(
     endDate?: string;
   } = {}
 ): Promise<PaginatedSessions> {
-  const { limit = 20, offset = 0, includeStale = true, userId, branch, startDate, endDate } = options;
+  const { limit = 20, offset = 0, after, includeStale = true, userId, branch, startDate, endDate } = options;
 
   const statusA = 'active';
   const statusB = includeStale ? 'stale' : 'active';
 
   // Build dynamic WHERE clause
-  let whereClause = `WHERE u.team_id = ? AND s.repo_id = ? AND s.status IN (?, ?)`;
+  let whereClause = `WHERE u.team_id = ? AND s.repo_id = ? AND s.status != 'ended' AND s.status IN (?, ?) AND s.speculative = 0`;
   const params: unknown[] = [teamId, repoId, statusA, statusB];
 
   if (userId) {
@@ -662,24 +987,27 @@ export async function getRepoActivity(
         u.id as user_id, u.name as user_name,
         d.id as device_id, d.name as device_name, d.is_remote as device_is_remote,
         r.id as repo_id, r.name as repo_name, r.remote_url as repo_remote_url,
-        a.id as activity_id, a.files, a.semantic_scope, a.summary, a.created_at as activity_created_at
+        a.id as activity_id, a.files, s.latest_semantic_scope as semantic_scope, s.latest_summary as summary,
+        a.created_at as activity_created_at
       FROM sessions s
       JOIN users u ON s.user_id = u.id
       JOIN devices d ON s.device_id = d.id
       LEFT JOIN repos r ON s.repo_id = r.id
-      LEFT JOIN (
-        SELECT session_id, id, files, semantic_scope, summary, created_at,
-               ROW_NUMBER() OVER (PARTITION BY session_id ORDER BY created_at DESC) as rn
-        FROM activity
-      ) a ON s.id = a.session_id AND a.rn = 1
-      ${whereClause}
-      ORDER BY s.last_activity_at DESC
+      LEFT JOIN activity a ON a.id = s.latest_activity_id
+      ${whereClause}${after ? SESSION_KEYSET_CLAUSE : ''}
+      ORDER BY s.last_activity_at DESC, s.id DESC
       LIMIT ? OFFSET ?`
     )
-    .bind(...params, limit, offset)
+    .bind(...params, ...(after ? [after[0], after[1]] : []), limit + 1, after ? 0 : offset)
     .all();
 
-  const sessions = result.results.map((row: Record<string, unknown>) => ({
+  const { page, hasMore, nextCursor } = keysetPage(
+    result.results as Record<string, unknown>[],
+    limit,
+    (row) => [row.last_activity_at as string, row.id as string]
+  );
+
+  const sessions = page.map((row: Record<string, unknown>) => ({
     id: row.id as string,
     user_id: row.user_id as string,
     device_id: row.device_id as string,
@@ -723,7 +1051,8 @@ export async function getRepoActivity(
     total,
     limit,
     offset,
-    hasMore: offset + sessions.length < total,
+    hasMore,
+    nextCursor,
   };
 }
 
@@ -819,49 +1148,420 @@ export async function checkForOverlaps(
   }));
 }
 
+export type ActiveSessionPaths = {
+  session_id: string;
+  user_name: string;
+  device_name: string;
+  is_remote: boolean;
+  semantic_scope: string | null;
+  summary: string | null;
+  last_activity_at: string;
+  started_at: string;
+  // The session's paths under the directory
+  paths: string[];
+};
+
+/**
+ * Add a heartbeat's paths to the active path index (migrations/012_active_paths.sql).
+ * `paths` should be normalized repo-relative paths.
+ */
+export async function indexActivePaths(
+  db: D1Database,
+  sessionId: string,
+  repoId: string,
+  paths: string[]
+): Promise<void> {
+  if (paths.length === 0) return;
+  await db
+    .prepare(
+      `INSERT OR IGNORE INTO active_paths (repo_id, path, session_id)
+       SELECT ?, value, ? FROM json_each(?)`
+    )
+    .bind(repoId, sessionId, JSON.stringify(paths))
+    .run();
+}
+
+/**
+ * For each of `directories` (normalized, '' for the repo root), the other users'
+ * active sessions with paths below it in the checking session's repo, with those
+ * paths. Each directory is one range scan of the active path index (CROSS JOIN
+ * keeps the directories as the outer loop): '/' sorts just before '0', so
+ * `dir/` <= path < `dir0` is exactly the paths below `dir`. Directories with no
+ * sessions are left out.
+ */
+export async function getSessionsUnderDirectories(
+  db: D1Database,
+  teamId: string,
+  userId: string,
+  sessionId: string,
+  directories: string[]
+): Promise<Map<string, ActiveSessionPaths[]>> {
+  const byDirectory = new Map<string, ActiveSessionPaths[]>();
+  if (directories.length === 0) return byDirectory;
+
+  const result = await db
+    .prepare(
+      `SELECT
+        dir.value as directory, ap.path,
+        s.id as session_id, s.last_activity_at, s.started_at,
+        s.latest_semantic_scope as semantic_scope, s.latest_summary as summary,
+        u.name as user_name, d.name as device_name, d.is_remote as device_is_remote
+      FROM json_each(?) dir
+      CROSS JOIN active_paths ap
+        ON ap.repo_id = (SELECT repo_id FROM sessions WHERE id = ? AND user_id = ?)
+        AND ap.path >= CASE dir.value WHEN '' THEN '' ELSE dir.value || '/' END
+        AND ap.path < CASE dir.value WHEN '' THEN char(1114111) ELSE dir.value || '0' END
+      JOIN sessions s ON s.id = ap.session_id
+      JOIN users u ON s.user_id = u.id
+      JOIN devices d ON s.device_id = d.id
+      WHERE u.team_id = ?
+      AND s.user_id != ?
+      AND s.status = 'active'`
+    )
+    .bind(JSON.stringify(directories), sessionId, userId, teamId, userId)
+    .all();
+
+  const entries = new Map<string, ActiveSessionPaths>();
+  for (const row of result.results as Record<string, unknown>[]) {
+    const directory = row.directory as string;
+    const key = `${directory}\0${row.session_id as string}`;
+    let entry = entries.get(key);
+    if (!entry) {
+      entry = {
+        session_id: row.session_id as string,
+        user_name: row.user_name as string,
+        device_name: row.device_name as string,
+        is_remote: row.device_is_remote === 1,
+        semantic_scope: row.semantic_scope as string | null,
+        summary: row.summary as string | null,
+        last_activity_at: row.last_activity_at as string,
+        started_at: row.started_at as string,
+        paths: [],
+      };
+      entries.set(key, entry);
+      if (!byDirectory.has(directory)) byDirectory.set(directory, []);
+      byDirectory.get(directory)!.push(entry);
+    }
+    entry.paths.push(row.path as string);
+  }
+  return byDirectory;
+}
+
 // ============================================================================
-// STALE SESSION CLEANUP (on-demand, since Pages doesn't support cron)
+// INSIGHTS ROLLUPS
 // ============================================================================
 
+// Another user counts as overlapping if they touched the same directory this recently
+const INSIGHTS_OVERLAP_WINDOW_MINUTES = 30;
+
 /**
- * Mark sessions as stale if they haven't had activity within the configured timeout.
- * This runs on-demand when fetching activity, rather than via cron.
- * Returns the number of sessions marked as stale.
+ * Fold one heartbeat into the insights rollups (migrations/010_insights_rollups.sql):
+ * an overlap for each other user active in one of `directories` within the
+ * overlap window, the user's per-day directory counters, and the repo's hourly
+ * bucket. Overlaps are counted before the batch writes this heartbeat's own
+ * hotspot rows. `directories` should be distinct.
  */
-export async function markStaleSessions(db: D1Database): Promise<number> {
-  const team = await db
-    .prepare('SELECT stale_timeout_hours FROM teams LIMIT 1')
-    .first<{ stale_timeout_hours: number }>();
+export async function recordInsights(
+  db: D1Database,
+  data: { teamId: string; repoId: string; userId: string; directories: string[] }
+): Promise<void> {
+  const { teamId, repoId, userId, directories } = data;
+  const statements = [
+    db
+      .prepare(
+        `INSERT INTO repo_activity_hourly (repo_id, hour, user_id, heartbeat_count)
+         VALUES (?, strftime('%Y-%m-%d %H:00:00', 'now'), ?, 1)
+         ON CONFLICT (repo_id, hour, user_id) DO UPDATE SET heartbeat_count = heartbeat_count + 1`
+      )
+      .bind(repoId, userId),
+  ];
+
+  if (directories.length > 0) {
+    const dirs = JSON.stringify(directories);
+    statements.push(
+      // Grouped because a user active either side of midnight has a row for both days
+      db
+        .prepare(
+          `INSERT INTO user_overlaps (team_id, day, repo_id, user_a, user_b, directory, overlap_count, last_overlap_at)
+           SELECT ?, date('now'), h.repo_id, MIN(h.user_id, ?), MAX(h.user_id, ?), h.directory, 1, datetime('now')
+           FROM directory_hotspots h
+           WHERE h.repo_id = ?
+           AND h.day IN (date('now'), date('now', '-' || ? || ' minutes'))
+           AND h.directory IN (SELECT value FROM json_each(?))
+           AND h.user_id != ?
+           AND h.last_activity_at >= datetime('now', '-' || ? || ' minutes')
+           GROUP BY h.directory, h.user_id
+           ON CONFLICT (team_id, day, repo_id, user_a, user_b, directory) DO UPDATE SET
+             overlap_count = overlap_count + 1,
+             last_overlap_at = excluded.last_overlap_at`
+        )
+        .bind(
+          teamId,
+          userId,
+          userId,
+          repoId,
+          INSIGHTS_OVERLAP_WINDOW_MINUTES,
+          dirs,
+          userId,
+          INSIGHTS_OVERLAP_WINDOW_MINUTES
+        ),
+      db
+        .prepare(
+          `INSERT INTO directory_hotspots (repo_id, day, directory, user_id, heartbeat_count, last_activity_at)
+           SELECT ?, date('now'), value, ?, 1, datetime('now') FROM json_each(?) WHERE true
+           ON CONFLICT (repo_id, day, directory, user_id) DO UPDATE SET
+             heartbeat_count = heartbeat_count + 1,
+             last_activity_at = excluded.last_activity_at`
+        )
+        .bind(repoId, userId, dirs)
+    );
+  }
 
-  const timeout = team?.stale_timeout_hours ?? 8;
+  await db.batch(statements);
+}
 
-  const result = await db
+export type DirectoryHotspot = {
+  repo: { id: string; name: string };
+  directory: string;
+  heartbeats: number;
+  users: number;
+};
+
+export type UserOverlapPair = {
+  user_a: { id: string; name: string };
+  user_b: { id: string; name: string };
+  overlaps: number;
+  last_overlap_at: string;
+  // Where they overlapped most, busiest first
+  directories: { repo: { id: string; name: string }; directory: string; overlaps: number }[];
+};
+
+export type HourlyActivity = {
+  hour: string;
+  heartbeats: number;
+  users: number;
+};
+
+export type Insights = {
+  since: string;
+  hotspots: DirectoryHotspot[];
+  pairs: UserOverlapPair[];
+  hourly: HourlyActivity[];
+};
+
+const INSIGHTS_HOTSPOT_LIMIT = 20;
+const INSIGHTS_PAIR_LIMIT = 50;
+const INSIGHTS_PAIR_DIRECTORIES = 3;
+
+/**
+ * Overlap pairs, directory hotspots and hourly activity for the last `days`
+ * UTC days (today included), team-wide or for one repo. Reads only the
+ * rollups, so the cost is bounded by the rows in the window rather than by
+ * the team's activity history.
+ */
+export async function getInsights(
+  db: D1Database,
+  teamId: string,
+  options: { repoId?: string; days?: number } = {}
+): Promise<Insights> {
+  const { repoId, days = 7 } = options;
+  // Rollup days are UTC dates, as SQLite's date('now') gives them
+  const since = new Date(Date.now() - (days - 1) * 24 * 60 * 60 * 1000).toISOString().slice(0, 10);
+
+  // Hotspot and hourly rows carry no team; a team-wide read goes through the team's repos
+  const hourlyJoin = repoId ? '' : ' JOIN repos r ON r.id = h.repo_id';
+  const scopeClause = repoId ? 'h.repo_id = ?' : 'r.team_id = ?';
+  const scopeParam = repoId ?? teamId;
+
+  const [hotspotResult, pairResult, hourlyResult] = await db.batch([
+    db
+      .prepare(
+        `SELECT h.repo_id, r.name as repo_name, h.directory,
+                SUM(h.heartbeat_count) as heartbeats, COUNT(DISTINCT h.user_id) as users
+         FROM directory_hotspots h
+         JOIN repos r ON r.id = h.repo_id
+         WHERE ${scopeClause} AND h.day >= ?
+         GROUP BY h.repo_id, h.directory
+         ORDER BY heartbeats DESC, h.directory
+         LIMIT ?`
+      )
+      .bind(scopeParam, since, INSIGHTS_HOTSPOT_LIMIT),
+    db
+      .prepare(
+        `SELECT o.user_a, ua.name as user_a_name, o.user_b, ub.name as user_b_name,
+                o.repo_id, rn.name as repo_name, o.directory, o.overlaps, o.last_overlap_at
+         FROM (
+           SELECT user_a, user_b, repo_id, directory,
+                  SUM(overlap_count) as overlaps, MAX(last_overlap_at) as last_overlap_at
+           FROM user_overlaps
+           WHERE team_id = ?${repoId ? ' AND repo_id = ?' : ''} AND day >= ?
+           GROUP BY user_a, user_b, repo_id, directory
+         ) o
+         JOIN users ua ON ua.id = o.user_a
+         JOIN users ub ON ub.id = o.user_b
+         JOIN repos rn ON rn.id = o.repo_id
+         ORDER BY o.overlaps DESC`
+      )
+      .bind(teamId, ...(repoId ? [repoId] : []), since),
+    db
+      .prepare(
+        `SELECT h.hour, SUM(h.heartbeat_count) as heartbeats, COUNT(DISTINCT h.user_id) as users
+         FROM repo_activity_hourly h${hourlyJoin}
+         WHERE ${scopeClause} AND h.hour >= ?
+         GROUP BY h.hour
+         ORDER BY h.hour`
+      )
+      .bind(scopeParam, since),
+  ]);
+
+  // Rows arrive busiest first, so each pair's directories are already in order
+  const pairs = new Map<string, UserOverlapPair>();
+  for (const row of pairResult.results as Record<string, unknown>[]) {
+    const key = `${row.user_a}\0${row.user_b}`;
+    let pair = pairs.get(key);
+    if (!pair) {
+      pair = {
+        user_a: { id: row.user_a as string, name: row.user_a_name as string },
+        user_b: { id: row.user_b as string, name: row.user_b_name as string },
+        overlaps: 0,
+        last_overlap_at: row.last_overlap_at as string,
+        directories: [],
+      };
+      pairs.set(key, pair);
+    }
+    pair.overlaps += row.overlaps as number;
+    if ((row.last_overlap_at as string) > pair.last_overlap_at) {
+      pair.last_overlap_at = row.last_overlap_at as string;
+    }
+    if (pair.directories.length < INSIGHTS_PAIR_DIRECTORIES) {
+      pair.directories.push({
+        repo: { id: row.repo_id as string, name: row.repo_name as string },
+        directory: row.directory as string,
+        overlaps: row.overlaps as number,
+      });
+    }
+  }
+
+  return {
+    since,
+    hotspots: (hotspotResult.results as Record<string, unknown>[]).map((row) => ({
+      repo: { id: row.repo_id as string, name: row.repo_name as string },
+      directory: row.directory as string,
+      heartbeats: row.heartbeats as number,
+      users: row.users as number,
+    })),
+    pairs: [...pairs.values()].sort((a, b) => b.overlaps - a.overlaps).slice(0, INSIGHTS_PAIR_LIMIT),
+    hourly: (hourlyResult.results as Record<string, unknown>[]).map((row) => ({
+      hour: row.hour as string,
+      heartbeats: row.heartbeats as number,
+      users: row.users as number,
+    })),
+  };
+}
+
+// ============================================================================
+// STALE SESSION CLEANUP (on-demand, since Pages doesn't support cron)
+// ============================================================================
+
+// How long a speculatively started session may go without a heartbeat before it's ended as a ghost
+const GHOST_SESSION_GRACE_MINUTES = 30;
+
+// Sweeper status changes are kept this long for streams to pick up
+const CHANGE_FEED_RETENTION_HOURS = 24;
+
+/**
+ * Take the named lease for ttlSeconds if it's free or expired. Returns whether
+ * `holder` got it. A single upsert, so concurrent callers can't both win.
+ */
+export async function acquireLease(
+  db: D1Database,
+  name: string,
+  holder: string,
+  ttlSeconds: number
+): Promise<boolean> {
+  const row = await db
     .prepare(
+      `INSERT INTO leases (name, holder, expires_at)
+       VALUES (?, ?, datetime('now', '+' || ? || ' seconds'))
+       ON CONFLICT(name) DO UPDATE SET holder = excluded.holder, expires_at = excluded.expires_at
+       WHERE leases.expires_at <= datetime('now')
+       RETURNING holder`
+    )
+    .bind(name, holder, ttlSeconds)
+    .first<{ holder: string }>();
+
+  return row?.holder === holder;
+}
+
+/**
+ * Mark idle sessions stale, end ghost sessions and long-stale ones, and
+ * publish the changed session IDs to change_feed for live streams. Every
+ * predicate leads with status, so each update seeks the
+ * (status, last_activity_at) index. Callers should go through the
+ * lease-guarded sweeper (lib/stale-sweeper.ts) rather than call this directly.
+ * Returns the number of sessions marked stale.
+ */
+export async function markStaleSessions(db: D1Database): Promise<number> {
+  const [staleResult, ghostResult, endedResult] = await db.batch<{ id: string }>([
+    db.prepare(
       `UPDATE sessions
        SET status = 'stale'
        WHERE status = 'active'
-       AND last_activity_at < datetime('now', '-' || ? || ' hours')`
-    )
-    .bind(timeout)
-    .run();
-
-  // Also end sessions that have been stale for 24+ hours
-  await db
-    .prepare(
+       AND last_activity_at < datetime('now', '-' || COALESCE((SELECT stale_timeout_hours FROM teams LIMIT 1), 8) || ' hours')
+       RETURNING id`
+    ),
+    // End ghost sessions: started speculatively at SessionStart but never used a tool
+    db
+      .prepare(
+        `UPDATE sessions
+         SET status = 'ended', ended_at = datetime('now')
+         WHERE status = 'active'
+         AND speculative = 1
+         AND started_at < datetime('now', '-' || ? || ' minutes')
+         RETURNING id`
+      )
+      .bind(GHOST_SESSION_GRACE_MINUTES),
+    // Also end sessions that have been stale for 24+ hours
+    db.prepare(
       `UPDATE sessions
        SET status = 'ended', ended_at = datetime('now')
        WHERE status = 'stale'
-       AND last_activity_at < datetime('now', '-24 hours')`
-    )
-    .run();
+       AND last_activity_at < datetime('now', '-24 hours')
+       RETURNING id`
+    ),
+  ]);
 
-  return result.meta.changes ?? 0;
+  const staleIds = staleResult.results.map((r) => r.id);
+  const endedIds = [...ghostResult.results, ...endedResult.results].map((r) => r.id);
+
+  const feed = [
+    db
+      .prepare(`DELETE FROM change_feed WHERE created_at < datetime('now', '-' || ? || ' hours')`)
+      .bind(CHANGE_FEED_RETENTION_HOURS),
+  ];
+  if (staleIds.length > 0) {
+    feed.push(
+      db.prepare("INSERT INTO change_feed (kind, session_ids) VALUES ('stale', ?)").bind(JSON.stringify(staleIds))
+    );
+  }
+  if (endedIds.length > 0) {
+    feed.push(
+      db.prepare("INSERT INTO change_feed (kind, session_ids) VALUES ('ended', ?)").bind(JSON.stringify(endedIds))
+    );
+  }
+  // Only active sessions are indexed for subtree overlaps
+  if (staleIds.length > 0 || endedIds.length > 0) {
+    feed.push(
+      db
+        .prepare('DELETE FROM active_paths WHERE session_id IN (SELECT value FROM json_each(?))')
+        .bind(JSON.stringify([...staleIds, ...endedIds]))
+    );
+  }
+  await db.batch(feed);
+
+  return staleIds.length;
 }
 
-/**
- * Clean up expired magic links and web sessions.
- * Call this periodically (e.g., when fetching activity).
- */
 export async function cleanupExpiredTokens(db: D1Database): Promise<void> {
   // Clean up old magic links
   await db
@@ -941,15 +1641,35 @@ export async function getPluginLogs(
   options: {
     userId?: string;
     level?: string;
+    hook?: string;
+    sessionId?: string;
+    since?: string;
+    until?: string;
+    query?: string;
     limit?: number;
     offset?: number;
+    after?: Cursor;
   } = {}
-): Promise<{ logs: PluginLogWithUser[]; total: number }> {
-  const { userId, level, limit = 100, offset = 0 } = options;
+): Promise<{ logs: PluginLogWithUser[]; total: number; hasMore: boolean; nextCursor: string | null }> {
+  const { userId, level, hook, sessionId, since, until, query, limit = 100, offset = 0, after } = options;
+
+  // Full-text matches come from the index; every other filter has an index
+  // starting with its column, with (created_at, id) after it for the ordering
+  const fromClause = query
+    ? `FROM plugin_logs_fts
+       JOIN plugin_logs pl ON pl.rowid = plugin_logs_fts.rowid
+       JOIN users u ON pl.user_id = u.id`
+    : `FROM plugin_logs pl
+       CROSS JOIN users u ON pl.user_id = u.id`;
 
   let whereClause = 'WHERE u.team_id = ?';
   const params: unknown[] = [teamId];
 
+  if (query) {
+    whereClause += ' AND plugin_logs_fts MATCH ?';
+    params.push(ftsQuery(query));
+  }
+
   if (userId) {
     whereClause += ' AND pl.user_id = ?';
     params.push(userId);
@@ -960,12 +1680,31 @@ export async function getPluginLogs(
     params.push(level);
   }
 
+  if (hook) {
+    whereClause += ' AND pl.hook = ?';
+    params.push(hook);
+  }
+
+  if (sessionId) {
+    whereClause += ' AND pl.session_id = ?';
+    params.push(sessionId);
+  }
+
+  if (since) {
+    whereClause += ' AND pl.created_at >= ?';
+    params.push(since);
+  }
+
+  if (until) {
+    whereClause += ' AND pl.created_at < ?';
+    params.push(until);
+  }
+
   // Get total count
   const countResult = await db
     .prepare(
       `SELECT COUNT(*) as count
-       FROM plugin_logs pl
-       JOIN users u ON pl.user_id = u.id
+       ${fromClause}
        ${whereClause}`
     )
     .bind(...params)
@@ -977,16 +1716,17 @@ export async function getPluginLogs(
   const result = await db
     .prepare(
       `SELECT pl.*, u.name as user_name
-       FROM plugin_logs pl
-       JOIN users u ON pl.user_id = u.id
-       ${whereClause}
-       ORDER BY pl.created_at DESC
+       ${fromClause}
+       ${whereClause}${after ? ' AND (pl.created_at, pl.id) < (?, ?)' : ''}
+       ORDER BY pl.created_at DESC, pl.id DESC
        LIMIT ? OFFSET ?`
     )
-    .bind(...params, limit, offset)
+    .bind(...params, ...(after ? [after[0], after[1]] : []), limit + 1, after ? 0 : offset)
     .all<PluginLogWithUser>();
 
-  return { logs: result.results, total };
+  const { page, hasMore, nextCursor } = keysetPage(result.results, limit, (log) => [log.created_at, log.id]);
+
+  return { logs: page, total, hasMore, nextCursor };
 }
 
 export async function deleteOldPluginLogs(db: D1Database, daysToKeep: number = 30): Promise<number> {
@@ -1001,6 +1741,160 @@ export async function deleteOldPluginLogs(db: D1Database, daysToKeep: number = 3
   return result.meta.changes ?? 0;
 }
 
+// ============================================================================
+// BULK EXPORT
+// ============================================================================
+
+export type ExportKind = 'sessions' | 'activity';
+
+export type ExportRow = Record<string, unknown>;
+
+const EXPORT_QUERIES: Record<ExportKind, { sql: string; sortColumn: string; idColumn: string }> = {
+  sessions: {
+    sql: `SELECT s.id, s.user_id, u.name as user_name, s.device_id, d.name as device_name,
+                 d.is_remote as device_is_remote, s.repo_id, r.name as repo_name, s.branch, s.worktree,
+                 s.status, s.started_at, s.last_activity_at, s.ended_at
+          FROM sessions s
+          CROSS JOIN users u ON s.user_id = u.id
+          LEFT JOIN devices d ON s.device_id = d.id
+          LEFT JOIN repos r ON s.repo_id = r.id`,
+    sortColumn: 's.started_at',
+    idColumn: 's.id',
+  },
+  activity: {
+    sql: `SELECT a.id, a.session_id, s.user_id, s.repo_id, a.files, a.semantic_scope, a.summary,
+                 a.heartbeat_count, a.created_at, a.last_seen_at
+          FROM activity a
+          CROSS JOIN sessions s ON a.session_id = s.id
+          CROSS JOIN users u ON s.user_id = u.id`,
+    sortColumn: 'a.created_at',
+    idColumn: 'a.id',
+  },
+};
+
+/**
+ * One page of a team's sessions (by started_at) or activity (by created_at) in
+ * ascending keyset order, for the NDJSON export. `since`/`until` bound the sort
+ * column (inclusive/exclusive). Speculative sessions and their rows are excluded.
+ * CROSS JOIN pins the exported table as the outer loop, so pages walk the
+ * (sort, id) index instead of sorting every team row per page (migration 006).
+ *
+ * `cursor` is the sort key of the page's last row (or `after` for an empty
+ * page), so a finished export can be resumed later to pick up new rows.
+ */
+export async function getExportPage(
+  db: D1Database,
+  teamId: string,
+  kind: ExportKind,
+  options: { after?: Cursor; since?: string; until?: string; limit?: number } = {}
+): Promise<{ rows: ExportRow[]; hasMore: boolean; cursor: string | null }> {
+  const { after, since, until, limit = 500 } = options;
+  const { sql, sortColumn, idColumn } = EXPORT_QUERIES[kind];
+
+  let whereClause = 'WHERE u.team_id = ? AND s.speculative = 0';
+  const params: unknown[] = [teamId];
+
+  if (since) {
+    whereClause += ` AND ${sortColumn} >= ?`;
+    params.push(since);
+  }
+  if (until) {
+    whereClause += ` AND ${sortColumn} < ?`;
+    params.push(until);
+  }
+  if (after) {
+    // Row-value comparison seeks the (sort, id) index directly
+    whereClause += ` AND (${sortColumn}, ${idColumn}) > (?, ?)`;
+    params.push(after[0], after[1]);
+  }
+
+  const result = await db
+    .prepare(`${sql} ${whereClause} ORDER BY ${sortColumn} ASC, ${idColumn} ASC LIMIT ?`)
+    .bind(...params, limit + 1)
+    .all<ExportRow>();
+
+  const hasMore = result.results.length > limit;
+  const page = hasMore ? result.results.slice(0, limit) : result.results;
+  const sortField = kind === 'sessions' ? 'started_at' : 'created_at';
+  const last = page[page.length - 1];
+
+  const rows =
+    kind === 'activity' ? page.map((row) => ({ ...row, files: safeParseFiles(row.files as string) })) : page;
+
+  return {
+    rows,
+    hasMore,
+    cursor: last ? encodeCursor([last[sortField] as string, last.id as string]) : after ? encodeCursor(after) : null,
+  };
+}
+
+// ============================================================================
+// ACTIVITY COMPACTION
+// ============================================================================
+
+/**
+ * Activity rows (aliased as `alias`) older than the cutoff, excluding each
+ * session's latest row, which sessions.latest_activity_id still references.
+ */
+function compactableActivity(alias: string): string {
+  return `${alias}.created_at < datetime('now', '-' || ? || ' days')
+    AND ${alias}.id IS NOT (SELECT s.latest_activity_id FROM sessions s WHERE s.id = ${alias}.session_id)`;
+}
+
+/**
+ * Roll activity older than `daysToKeep` into one activity_rollups row per
+ * session (counts, distinct files and scopes, time span), then delete it.
+ * Both steps run in one batch so rows are never counted twice or lost.
+ */
+export async function compactOldActivity(
+  db: D1Database,
+  daysToKeep: number = 90
+): Promise<{ sessions: number; deleted: number; dbSizeBytes: number | null }> {
+  const [rollupResult, deleteResult] = await db.batch([
+    db
+      .prepare(
+        `INSERT INTO activity_rollups
+           (session_id, activity_count, heartbeat_count, files, scopes, first_activity_at, last_activity_at)
+         SELECT
+           a.session_id,
+           COUNT(*),
+           SUM(COALESCE(a.heartbeat_count, 1)),
+           (SELECT json_group_array(DISTINCT je.value)
+            FROM activity a2, json_each(a2.files) je
+            WHERE a2.session_id = a.session_id AND ${compactableActivity('a2')}),
+           (SELECT json_group_array(DISTINCT a3.semantic_scope)
+            FROM activity a3
+            WHERE a3.session_id = a.session_id AND a3.semantic_scope IS NOT NULL
+            AND ${compactableActivity('a3')}),
+           MIN(a.created_at),
+           MAX(COALESCE(a.last_seen_at, a.created_at))
+         FROM activity a
+         WHERE ${compactableActivity('a')}
+         GROUP BY a.session_id
+         ON CONFLICT(session_id) DO UPDATE SET
+           activity_count = activity_rollups.activity_count + excluded.activity_count,
+           heartbeat_count = activity_rollups.heartbeat_count + excluded.heartbeat_count,
+           files = (SELECT json_group_array(DISTINCT value) FROM (
+             SELECT value FROM json_each(activity_rollups.files)
+             UNION SELECT value FROM json_each(excluded.files))),
+           scopes = (SELECT json_group_array(DISTINCT value) FROM (
+             SELECT value FROM json_each(activity_rollups.scopes)
+             UNION SELECT value FROM json_each(excluded.scopes))),
+           first_activity_at = MIN(COALESCE(activity_rollups.first_activity_at, excluded.first_activity_at), excluded.first_activity_at),
+           last_activity_at = MAX(COALESCE(activity_rollups.last_activity_at, excluded.last_activity_at), excluded.last_activity_at),
+           updated_at = datetime('now')`
+      )
+      .bind(daysToKeep, daysToKeep, daysToKeep),
+    db.prepare(`DELETE FROM activity AS a WHERE ${compactableActivity('a')}`).bind(daysToKeep),
+  ]);
+
+  return {
+    sessions: rollupResult.meta.changes ?? 0,
+    deleted: deleteResult.meta.changes ?? 0,
+    dbSizeBytes: deleteResult.meta.size_after ?? null,
+  };
+}
+
 // ============================================================================
 // SESSION DETAIL QUERIES
 // ============================================================================
@@ -1011,6 +1905,7 @@ export type PaginatedActivities = {
   limit: number;
   offset: number;
   hasMore: boolean;
+  nextCursor: string | null;
 };
 
 /**
@@ -1019,9 +1914,9 @@ export type PaginatedActivities = {
 export async function getSessionActivities(
   db: D1Database,
   sessionId: string,
-  options: { limit?: number; offset?: number } = {}
+  options: { limit?: number; offset?: number; after?: Cursor } = {}
 ): Promise<PaginatedActivities> {
-  const { limit = 50, offset = 0 } = options;
+  const { limit = 50, offset = 0, after } = options;
 
   const countResult = await db
     .prepare('SELECT COUNT(*) as count FROM activity WHERE session_id = ?')
@@ -1033,14 +1928,16 @@ export async function getSessionActivities(
   const result = await db
     .prepare(
       `SELECT * FROM activity
-       WHERE session_id = ?
-       ORDER BY created_at DESC
+       WHERE session_id = ?${after ? ' AND (created_at < ? OR (created_at = ? AND id < ?))' : ''}
+       ORDER BY created_at DESC, id DESC
        LIMIT ? OFFSET ?`
     )
-    .bind(sessionId, limit, offset)
+    .bind(sessionId, ...(after ? [after[0], after[0], after[1]] : []), limit + 1, after ? 0 : offset)
     .all<Activity>();
 
-  const activities = result.results.map((a) => ({
+  const { page, hasMore, nextCursor } = keysetPage(result.results, limit, (a) => [a.created_at, a.id]);
+
+  const activities = page.map((a) => ({
     ...a,
     files: safeParseFiles(a.files),
   }));
@@ -1050,10 +1947,100 @@ export async function getSessionActivities(
     total,
     limit,
     offset,
-    hasMore: offset + activities.length < total,
+    hasMore,
+    nextCursor,
   };
 }
 
+export type ActivitySearchResult = ParsedActivity & {
+  user: { id: string; name: string };
+  repo: { id: string; name: string } | null;
+  branch: string | null;
+};
+
+/**
+ * Full-text search over a team's activity summaries and scopes, newest first.
+ * Optional filters narrow by session, user, repo and created_at range.
+ */
+export async function searchActivity(
+  db: D1Database,
+  teamId: string,
+  query: string,
+  options: {
+    sessionId?: string;
+    userId?: string;
+    repoId?: string;
+    since?: string;
+    until?: string;
+    limit?: number;
+    after?: Cursor;
+  } = {}
+): Promise<{ results: ActivitySearchResult[]; hasMore: boolean; nextCursor: string | null }> {
+  const { sessionId, userId, repoId, since, until, limit = 50, after } = options;
+
+  let whereClause = 'WHERE activity_fts MATCH ? AND u.team_id = ? AND s.speculative = 0';
+  const params: unknown[] = [ftsQuery(query), teamId];
+
+  if (sessionId) {
+    whereClause += ' AND a.session_id = ?';
+    params.push(sessionId);
+  }
+  if (userId) {
+    whereClause += ' AND s.user_id = ?';
+    params.push(userId);
+  }
+  if (repoId) {
+    whereClause += ' AND s.repo_id = ?';
+    params.push(repoId);
+  }
+  if (since) {
+    whereClause += ' AND a.created_at >= ?';
+    params.push(since);
+  }
+  if (until) {
+    whereClause += ' AND a.created_at < ?';
+    params.push(until);
+  }
+  if (after) {
+    whereClause += ' AND (a.created_at, a.id) < (?, ?)';
+    params.push(after[0], after[1]);
+  }
+
+  const result = await db
+    .prepare(
+      `SELECT a.*, s.user_id, u.name as user_name, s.repo_id, r.name as repo_name, s.branch
+       FROM activity_fts
+       JOIN activity a ON a.rowid = activity_fts.rowid
+       JOIN sessions s ON a.session_id = s.id
+       JOIN users u ON s.user_id = u.id
+       LEFT JOIN repos r ON s.repo_id = r.id
+       ${whereClause}
+       ORDER BY a.created_at DESC, a.id DESC
+       LIMIT ?`
+    )
+    .bind(...params, limit + 1)
+    .all<Record<string, unknown>>();
+
+  const { page, hasMore, nextCursor } = keysetPage(result.results, limit, (r) => [
+    r.created_at as string,
+    r.id as string,
+  ]);
+
+  const results = page.map((r) => ({
+    id: r.id as string,
+    session_id: r.session_id as string,
+    files: safeParseFiles(r.files as string),
+    semantic_scope: r.semantic_scope as string | null,
+    summary: r.summary as string | null,
+    created_at: r.created_at as string,
+    user: { id: r.user_id as string, name: r.user_name as string },
+    repo: r.repo_id ? { id: r.repo_id as string, name: r.repo_name as string } : null,
+    branch: r.branch as string | null,
+  }));
+
+  return { results, hasMore, nextCursor };
+}
+
 /**
  * Get a single session with full details (user, device, repo, latest activity).
  * Verifies the session belongs to the given team.
@@ -1070,16 +2057,13 @@ export async function getSessionWithDetails(
         u.id as user_id, u.name as user_name,
         d.id as device_id, d.name as device_name, d.is_remote as device_is_remote,
         r.id as repo_id, r.name as repo_name, r.remote_url as repo_remote_url,
-        a.id as activity_id, a.files, a.semantic_scope, a.summary, a.created_at as activity_created_at
+        a.id as activity_id, a.files, s.latest_semantic_scope as semantic_scope, s.latest_summary as summary,
+        a.created_at as activity_created_at
       FROM sessions s
       JOIN users u ON s.user_id = u.id
       JOIN devices d ON s.device_id = d.id
       LEFT JOIN repos r ON s.repo_id = r.id
-      LEFT JOIN (
-        SELECT session_id, id, files, semantic_scope, summary, created_at,
-               ROW_NUMBER() OVER (PARTITION BY session_id ORDER BY created_at DESC) as rn
-        FROM activity
-      ) a ON s.id = a.session_id AND a.rn = 1
+      LEFT JOIN activity a ON a.id = s.latest_activity_id
       WHERE s.id = ?
       AND u.team_id = ?`
     )
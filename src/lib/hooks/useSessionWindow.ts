@@ -0,0 +1,118 @@
+import { useState, useCallback } from 'react';
+import { encodeCursor, type Cursor } from '@lib/utils/cursor';
+
+type WindowOptions<T> = {
+  // The keyset the server pages by, e.g. [last_activity_at, id]; rows are kept
+  // in descending order of it, like the API returns them
+  sortKey: (item: T) => Cursor;
+  // Rows kept in memory; history beyond this is dropped once it's off-screen
+  maxItems?: number;
+};
+
+type WindowState<T> = {
+  items: T[];
+  hasMore: boolean;
+  nextCursor: string | null;
+};
+
+export const DEFAULT_MAX_ITEMS = 200;
+
+function compareKeys(a: Cursor, b: Cursor): number {
+  if (a[0] !== b[0]) return a[0] > b[0] ? -1 : 1;
+  if (a[1] !== b[1]) return a[1] > b[1] ? -1 : 1;
+  return 0;
+}
+
+/**
+ * A bounded, keyed window over a paginated session list.
+ *
+ * Pages replace or extend the window (rows already present, e.g. pushed by
+ * SSE, aren't duplicated). `upsert` patches a single row in place, moving it
+ * to its sorted position, so every other row keeps its object identity and
+ * memoized cards skip re-rendering. `evict` drops rows beyond `maxItems`
+ * when none of them are visible, and rewinds `nextCursor` so "Load more"
+ * fetches them again.
+ */
+export function useSessionWindow<T extends { id: string }>({
+  sortKey,
+  maxItems = DEFAULT_MAX_ITEMS,
+}: WindowOptions<T>) {
+  const [state, setState] = useState<WindowState<T>>({ items: [], hasMore: false, nextCursor: null });
+
+  const replace = useCallback((items: T[], hasMore: boolean, nextCursor: string | null) => {
+    setState({ items, hasMore, nextCursor });
+  }, []);
+
+  const append = useCallback((page: T[], hasMore: boolean, nextCursor: string | null) => {
+    setState((prev) => {
+      const present = new Set(prev.items.map((item) => item.id));
+      return {
+        items: [...prev.items, ...page.filter((item) => !present.has(item.id))],
+        hasMore,
+        nextCursor,
+      };
+    });
+  }, []);
+
+  const upsert = useCallback(
+    (item: T) => {
+      setState((prev) => {
+        const items = prev.items.filter((existing) => existing.id !== item.id);
+        const key = sortKey(item);
+        let low = 0;
+        let high = items.length;
+        while (low < high) {
+          const mid = (low + high) >> 1;
+          if (compareKeys(sortKey(items[mid]), key) <= 0) low = mid + 1;
+          else high = mid;
+        }
+        // Sorts after everything loaded: it belongs to a page not fetched yet
+        if (low === items.length && prev.hasMore) {
+          return items.length === prev.items.length ? prev : { ...prev, items };
+        }
+        items.splice(low, 0, item);
+        return { ...prev, items };
+      });
+    },
+    [sortKey]
+  );
+
+  const evict = useCallback(
+    (lastVisibleId: string | null) => {
+      setState((prev) => {
+        if (prev.items.length <= maxItems) return prev;
+        const lastVisible = lastVisibleId ? prev.items.findIndex((item) => item.id === lastVisibleId) : -1;
+        if (lastVisible >= maxItems) return prev;
+        const items = prev.items.slice(0, maxItems);
+        return {
+          items,
+          hasMore: true,
+          nextCursor: encodeCursor(sortKey(items[items.length - 1])),
+        };
+      });
+    },
+    [sortKey, maxItems]
+  );
+
+  return { ...state, replace, append, upsert, evict };
+}
+
+/**
+ * Which rows are expanded, kept outside the cards so it survives a card
+ * being unmounted by list virtualization.
+ */
+export function useExpandedSet() {
+  const [expanded, setExpanded] = useState<ReadonlySet<string>>(() => new Set());
+
+  const setRowExpanded = useCallback((id: string, isExpanded: boolean) => {
+    setExpanded((prev) => {
+      if (prev.has(id) === isExpanded) return prev;
+      const next = new Set(prev);
+      if (isExpanded) next.add(id);
+      else next.delete(id);
+      return next;
+    });
+  }, []);
+
+  return { expanded, setRowExpanded };
+}
@@ -0,0 +1,146 @@
+import { useState, useEffect, useLayoutEffect, useRef, useCallback, useMemo } from 'react';
+
+type VirtualListOptions = {
+  // Stable key per row, in display order
+  keys: string[];
+  // Height assumed for rows that haven't been rendered yet
+  estimateSize: number;
+  // Extra distance above and below the viewport to keep rendered
+  overscanPx?: number;
+};
+
+type Range = { start: number; end: number };
+
+const DEFAULT_OVERSCAN_PX = 800;
+// Viewport assumed before the first measurement (and on the server)
+const INITIAL_VIEWPORT_PX = 1000;
+
+/** Index of the row containing `y`, given row start offsets (length = rows + 1). */
+function rowAt(offsets: number[], y: number): number {
+  let low = 0;
+  let high = offsets.length - 2;
+  while (low < high) {
+    const mid = (low + high + 1) >> 1;
+    if (offsets[mid] <= y) low = mid;
+    else high = mid - 1;
+  }
+  return Math.max(low, 0);
+}
+
+/**
+ * Window a list that scrolls with the page: only rows within `overscanPx` of
+ * the viewport are rendered, with padding standing in for the rest. Row
+ * heights are measured as rows render (ResizeObserver) and remembered by key,
+ * so expanding a card or scrolling back keeps the layout stable.
+ *
+ * Usage:
+ *   const { containerRef, measure, start, end, paddingTop, paddingBottom } = useVirtualList({ keys, estimateSize: 140 });
+ *   <div ref={containerRef} style={{ paddingTop, paddingBottom }}>
+ *     {items.slice(start, end).map((item) => (
+ *       <div key={item.id} data-key={item.id} ref={measure} style={{ display: 'flow-root' }}>...</div>
+ *     ))}
+ *   </div>
+ *
+ * The row wrapper is a flow root so the card's margins count towards its height.
+ */
+export function useVirtualList({ keys, estimateSize, overscanPx = DEFAULT_OVERSCAN_PX }: VirtualListOptions) {
+  const containerRef = useRef<HTMLDivElement | null>(null);
+  const sizesRef = useRef(new Map<string, number>());
+  const observerRef = useRef<ResizeObserver | null>(null);
+  const frameRef = useRef(0);
+  const [measureVersion, setMeasureVersion] = useState(0);
+  const [range, setRange] = useState<Range>({
+    start: 0,
+    end: Math.min(keys.length, Math.ceil((INITIAL_VIEWPORT_PX + overscanPx) / estimateSize)),
+  });
+
+  const offsets = useMemo(() => {
+    const sizes = sizesRef.current;
+    // Forget rows that left the list once the cache is mostly stale
+    if (sizes.size > keys.length * 2 + 100) {
+      const live = new Set(keys);
+      for (const key of sizes.keys()) {
+        if (!live.has(key)) sizes.delete(key);
+      }
+    }
+    const result = new Array<number>(keys.length + 1);
+    result[0] = 0;
+    for (let i = 0; i < keys.length; i++) {
+      result[i + 1] = result[i] + (sizes.get(keys[i]) ?? estimateSize);
+    }
+    return result;
+    // measureVersion: recompute when a row's measured height changes
+  }, [keys, estimateSize, measureVersion]);
+
+  const offsetsRef = useRef(offsets);
+  offsetsRef.current = offsets;
+
+  const updateRange = useCallback(() => {
+    frameRef.current = 0;
+    const container = containerRef.current;
+    const current = offsetsRef.current;
+    const count = current.length - 1;
+    if (!container) return;
+    if (count === 0) {
+      setRange((prev) => (prev.start === 0 && prev.end === 0 ? prev : { start: 0, end: 0 }));
+      return;
+    }
+    const top = -container.getBoundingClientRect().top;
+    const start = rowAt(current, top - overscanPx);
+    const end = Math.min(rowAt(current, top + window.innerHeight + overscanPx) + 1, count);
+    setRange((prev) => (prev.start === start && prev.end === end ? prev : { start, end }));
+  }, [overscanPx]);
+
+  // Scrolling only re-renders the list when the set of rendered rows changes
+  useEffect(() => {
+    const schedule = () => {
+      if (!frameRef.current) frameRef.current = requestAnimationFrame(updateRange);
+    };
+    window.addEventListener('scroll', schedule, { passive: true });
+    window.addEventListener('resize', schedule);
+    return () => {
+      window.removeEventListener('scroll', schedule);
+      window.removeEventListener('resize', schedule);
+      cancelAnimationFrame(frameRef.current);
+      frameRef.current = 0;
+    };
+  }, [updateRange]);
+
+  // Rows added, removed or resized: recompute before paint
+  useLayoutEffect(updateRange, [offsets, updateRange]);
+
+  useEffect(() => () => observerRef.current?.disconnect(), []);
+
+  const measure = useCallback((element: HTMLElement | null) => {
+    if (!element) return;
+    if (!observerRef.current) {
+      observerRef.current = new ResizeObserver((entries) => {
+        let changed = false;
+        for (const entry of entries) {
+          const key = (entry.target as HTMLElement).dataset.key;
+          if (!key) continue;
+          const height = entry.borderBoxSize?.[0]?.blockSize ?? (entry.target as HTMLElement).offsetHeight;
+          if (height > 0 && sizesRef.current.get(key) !== height) {
+            sizesRef.current.set(key, height);
+            changed = true;
+          }
+        }
+        if (changed) setMeasureVersion((version) => version + 1);
+      });
+    }
+    const observer = observerRef.current;
+    observer.observe(element);
+    return () => observer.unobserve(element);
+  }, []);
+
+  const start = Math.min(range.start, keys.length);
+  const end = Math.min(range.end, keys.length);
+  return {
+    containerRef,
+    measure,
+    start,
+    end,
+    paddingTop: offsets[start],
+    paddingBottom: offsets[keys.length] - offsets[end],
+  };
+}
@@ -1,4 +1,4 @@
-import type { ClassificationResult, LLMProvider } from './types';
+import type { ClassificationRequest, ClassificationResult, LLMProvider } from './types';
 
 // Path-based heuristic patterns for classification
 const SCOPE_PATTERNS: [RegExp, string, string][] = [
@@ -93,4 +93,8 @@ export const heuristicProvider: LLMProvider = {
   async classify(files: string[], _apiKey: string, _model?: string, toolName?: string): Promise<ClassificationResult> {
     return classifyByPath(files, toolName);
   },
+
+  async classifyBatch(items: ClassificationRequest[]): Promise<ClassificationResult[]> {
+    return items.map((item) => classifyByPath(item.files, item.toolName));
+  },
 };
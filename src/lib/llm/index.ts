@@ -1,37 +1,73 @@
 import type { Team } from '@lib/db/types';
 import { decrypt } from '@lib/utils/crypto';
-import type { ClassificationResult, LLMProvider, LLMProviderName } from './types';
+import type { ClassificationRequest, ClassificationResult, LLMProvider, LLMProviderName } from './types';
 import { heuristicProvider } from './heuristic';
-import { anthropicProvider } from './anthropic';
-import { openaiProvider } from './openai';
-import { xaiProvider } from './xai';
-import { googleProvider } from './google';
-
-export type { ClassificationResult, LLMProvider, LLMProviderName };
-
-const providers: Record<LLMProviderName, LLMProvider> = {
-  heuristic: heuristicProvider,
-  anthropic: anthropicProvider,
-  openai: openaiProvider,
-  xai: xaiProvider,
-  google: googleProvider,
+
+export type { ClassificationRequest, ClassificationResult, LLMProvider, LLMProviderName };
+
+// The team's LLM settings. The encrypted API key isn't part of the cached
+// principal; callers load it (getTeamLLMKey) once usesLLMClassification holds.
+type LLMTeam = Pick<Team, 'llm_provider' | 'llm_model' | 'llm_api_key_encrypted'>;
+
+// LLM providers are imported on first use, so an isolate only loads the one
+// its team is configured with (and none for heuristic-only teams)
+const providerLoaders: Record<Exclude<LLMProviderName, 'heuristic'>, () => Promise<LLMProvider>> = {
+  anthropic: () => import('./anthropic').then((m) => m.anthropicProvider),
+  openai: () => import('./openai').then((m) => m.openaiProvider),
+  xai: () => import('./xai').then((m) => m.xaiProvider),
+  google: () => import('./google').then((m) => m.googleProvider),
 };
 
-export function getProvider(name: LLMProviderName): LLMProvider {
-  const provider = providers[name];
-  if (!provider) {
+const loadedProviders = new Map<LLMProviderName, Promise<LLMProvider>>();
+
+export function getProvider(name: LLMProviderName): Promise<LLMProvider> {
+  if (name === 'heuristic') return Promise.resolve(heuristicProvider);
+  const load = providerLoaders[name];
+  if (!load) {
     console.warn(`Unknown LLM provider: ${name}, falling back to heuristic`);
-    return heuristicProvider;
+    return Promise.resolve(heuristicProvider);
+  }
+  let provider = loadedProviders.get(name);
+  if (!provider) {
+    provider = load();
+    // A failed import is retried on the next call rather than cached
+    provider.catch(() => loadedProviders.delete(name));
+    loadedProviders.set(name, provider);
   }
   return provider;
 }
 
+/**
+ * Whether classification for this team goes to an LLM (as opposed to the
+ * heuristic), i.e. a provider is configured and API keys can be decrypted.
+ * A team that turns out to have no API key still gets the heuristic.
+ */
+export function usesLLMClassification(team: Pick<Team, 'llm_provider'>, encryptionKey?: string): boolean {
+  return team.llm_provider !== 'heuristic' && !!encryptionKey;
+}
+
+/**
+ * Classify files with the path heuristic only. Never makes a network call.
+ */
+export function classifyHeuristically(files: string[], toolName?: string): Promise<ClassificationResult> {
+  return heuristicProvider.classify(files, '', undefined, toolName);
+}
+
+function sanitizeErrorMessage(error: unknown, fallback: string): string {
+  return error instanceof Error
+    ? error.message
+        // Redact common API key patterns: sk-xxx, xai-xxx, key-xxx, Bearer tokens
+        .replace(/\b(sk-|xai-|key-|AIza)[A-Za-z0-9_\-]{10,}\b/g, '[REDACTED_KEY]')
+        .replace(/\bBearer\s+[A-Za-z0-9_\-.]{10,}\b/g, 'Bearer [REDACTED_KEY]')
+    : fallback;
+}
+
 /**
  * Classify files using the team's configured LLM provider.
  * Falls back to heuristic if LLM fails or is not configured.
  */
 export async function classifyActivity(
-  team: Team,
+  team: LLMTeam,
   files: string[],
   encryptionKey?: string,
   toolName?: string
@@ -52,18 +88,43 @@ export async function classifyActivity(
   try {
     // Decrypt API key
     const apiKey = await decrypt(team.llm_api_key_encrypted, encryptionKey);
-    const provider = getProvider(providerName);
+    const provider = await getProvider(providerName);
 
     // Try LLM classification
     return await provider.classify(files, apiKey, team.llm_model ?? undefined, toolName);
   } catch (error) {
-    const sanitizedError = error instanceof Error
-      ? error.message
-          // Redact common API key patterns: sk-xxx, xai-xxx, key-xxx, Bearer tokens
-          .replace(/\b(sk-|xai-|key-|AIza)[A-Za-z0-9_\-]{10,}\b/g, '[REDACTED_KEY]')
-          .replace(/\bBearer\s+[A-Za-z0-9_\-.]{10,}\b/g, 'Bearer [REDACTED_KEY]')
-      : 'Classification failed';
+    const sanitizedError = sanitizeErrorMessage(error, 'Classification failed');
     console.error('LLM classification failed, falling back to heuristic:', sanitizedError);
     return heuristicProvider.classify(files, '', undefined, toolName);
   }
 }
+
+/**
+ * Classify several activities with one call to the team's LLM provider.
+ * Results are in input order. Items the model didn't classify, or the whole
+ * batch if the call fails, fall back to the heuristic.
+ */
+export async function classifyActivityBatch(
+  team: LLMTeam,
+  items: ClassificationRequest[],
+  encryptionKey?: string
+): Promise<ClassificationResult[]> {
+  const heuristic = () => heuristicProvider.classifyBatch(items, '');
+
+  if (items.length === 0) return [];
+  if (!usesLLMClassification(team, encryptionKey) || !team.llm_api_key_encrypted) {
+    return heuristic();
+  }
+
+  try {
+    const apiKey = await decrypt(team.llm_api_key_encrypted, encryptionKey!);
+    const provider = await getProvider(team.llm_provider as LLMProviderName);
+    const results = await provider.classifyBatch(items, apiKey, team.llm_model ?? undefined);
+    const fallback = await heuristic();
+    return results.map((result, i) => (result.scope === 'unknown' ? fallback[i] : result));
+  } catch (error) {
+    const sanitizedError = sanitizeErrorMessage(error, 'Batch classification failed');
+    console.error('LLM batch classification failed, falling back to heuristic:', sanitizedError);
+    return heuristic();
+  }
+}
@@ -5,9 +5,16 @@ export type ClassificationResult = {
   summary: string;
 };
 
+export type ClassificationRequest = {
+  files: string[];
+  toolName?: string;
+};
+
 export type LLMProvider = {
   name: string;
   classify(files: string[], apiKey: string, model?: string, toolName?: string): Promise<ClassificationResult>;
+  // Classify several activities with one LLM call; results are in input order
+  classifyBatch(items: ClassificationRequest[], apiKey: string, model?: string): Promise<ClassificationResult[]>;
 };
 
 export type LLMProviderName = 'anthropic' | 'openai' | 'xai' | 'google' | 'heuristic';
@@ -26,6 +33,17 @@ Respond with a JSON object containing:
 
 Respond ONLY with valid JSON, no markdown or explanation.`;
 
+// Multi-item variant: one prompt classifying several activities at once
+export const BATCH_CLASSIFICATION_PROMPT = `Each numbered item below is a set of file paths someone on a software team is working with. For each item, classify what area of the codebase is being worked on.
+
+{items}
+
+Respond with a JSON array containing exactly one object per item, in the same order, each with:
+- scope: A short lowercase label for the work area (e.g., "authentication", "payments", "api-endpoints", "testing", "frontend", "database")
+- summary: A brief one-sentence description of what's being done. Use verbs appropriate to the item's operation (e.g., "Reading..." for reads, "Editing..." for edits, "Searching..." for searches, "Running..." for commands).
+
+Respond ONLY with valid JSON, no markdown or explanation.`;
+
 /**
  * Map a tool name to a human-readable operation label for the LLM prompt.
  */
@@ -51,14 +69,57 @@ function getOperationLabel(toolName?: string): string {
 }
 
 export function buildPrompt(files: string[], toolName?: string): string {
-  const sanitized = files
-    .slice(0, 50)
-    .map(f => f.replace(/[\x00-\x1f\x7f]/g, '').substring(0, 500));
+  const sanitized = sanitizeFiles(files);
   return CLASSIFICATION_PROMPT
     .replace('{operation}', getOperationLabel(toolName))
     .replace('{files}', sanitized.map((f) => `- ${f}`).join('\n'));
 }
 
+function sanitizeFiles(files: string[]): string[] {
+  return files
+    .slice(0, 50)
+    .map(f => f.replace(/[\x00-\x1f\x7f]/g, '').substring(0, 500));
+}
+
+export function buildBatchPrompt(items: ClassificationRequest[]): string {
+  const sections = items.map((item, i) =>
+    [`Item ${i + 1} (${getOperationLabel(item.toolName)}):`, ...sanitizeFiles(item.files).map((f) => `- ${f}`)].join('\n')
+  );
+  return BATCH_CLASSIFICATION_PROMPT.replace('{items}', sections.join('\n\n'));
+}
+
+/**
+ * Output token budget for a batch: ~64 tokens per item plus slack for the array.
+ */
+export function batchMaxTokens(itemCount: number): number {
+  return 64 * itemCount + 64;
+}
+
+/**
+ * Parse a batch response into one result per item. Items the model skipped or
+ * mangled come back as 'unknown' so callers can keep their provisional scope.
+ */
+export function parseBatchClassificationResponse(response: string, itemCount: number): ClassificationResult[] {
+  let parsed: unknown[] = [];
+  try {
+    const jsonMatch = response.match(/\[[\s\S]*\]/);
+    if (jsonMatch) {
+      const value = JSON.parse(jsonMatch[0]);
+      if (Array.isArray(value)) parsed = value;
+    }
+  } catch {
+    parsed = [];
+  }
+
+  return Array.from({ length: itemCount }, (_, i) => {
+    const item = parsed[i] as { scope?: unknown; summary?: unknown } | undefined;
+    return {
+      scope: String(item?.scope || 'unknown').toLowerCase(),
+      summary: String(item?.summary || 'Working on code'),
+    };
+  });
+}
+
 export function parseClassificationResponse(response: string): ClassificationResult {
   try {
     // Try to extract JSON from response
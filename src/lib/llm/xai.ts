@@ -1,45 +1,60 @@
-import type { ClassificationResult, LLMProvider } from './types';
-import { buildPrompt, parseClassificationResponse } from './types';
+import type { ClassificationRequest, ClassificationResult, LLMProvider } from './types';
+import {
+  batchMaxTokens,
+  buildBatchPrompt,
+  buildPrompt,
+  parseBatchClassificationResponse,
+  parseClassificationResponse,
+} from './types';
 
 const API_URL = 'https://api.x.ai/v1/chat/completions';
 const DEFAULT_MODEL = 'grok-2-latest';
 
+async function complete(prompt: string, apiKey: string, model: string | undefined, maxTokens: number): Promise<string> {
+  const response = await fetch(API_URL, {
+    method: 'POST',
+    headers: {
+      'Content-Type': 'application/json',
+      Authorization: `Bearer ${apiKey}`,
+    },
+    body: JSON.stringify({
+      model: model || DEFAULT_MODEL,
+      max_tokens: maxTokens,
+      messages: [
+        {
+          role: 'user',
+          content: prompt,
+        },
+      ],
+    }),
+  });
+
+  if (!response.ok) {
+    console.error('xAI API error: status', response.status);
+    throw new Error(`xAI API error: ${response.status}`);
+  }
+
+  const data = await response.json() as {
+    choices: Array<{ message: { content: string } }>;
+  };
+
+  const content = data.choices[0]?.message?.content;
+  if (!content) {
+    throw new Error('No content in response');
+  }
+
+  return content;
+}
+
 export const xaiProvider: LLMProvider = {
   name: 'xai',
 
   async classify(files: string[], apiKey: string, model?: string, toolName?: string): Promise<ClassificationResult> {
-    const response = await fetch(API_URL, {
-      method: 'POST',
-      headers: {
-        'Content-Type': 'application/json',
-        Authorization: `Bearer ${apiKey}`,
-      },
-      body: JSON.stringify({
-        model: model || DEFAULT_MODEL,
-        max_tokens: 256,
-        messages: [
-          {
-            role: 'user',
-            content: buildPrompt(files, toolName),
-          },
-        ],
-      }),
-    });
-
-    if (!response.ok) {
-      console.error('xAI API error: status', response.status);
-      throw new Error(`xAI API error: ${response.status}`);
-    }
-
-    const data = await response.json() as {
-      choices: Array<{ message: { content: string } }>;
-    };
-
-    const content = data.choices[0]?.message?.content;
-    if (!content) {
-      throw new Error('No content in response');
-    }
-
-    return parseClassificationResponse(content);
+    return parseClassificationResponse(await complete(buildPrompt(files, toolName), apiKey, model, 256));
+  },
+
+  async classifyBatch(items: ClassificationRequest[], apiKey: string, model?: string): Promise<ClassificationResult[]> {
+    const text = await complete(buildBatchPrompt(items), apiKey, model, batchMaxTokens(items.length));
+    return parseBatchClassificationResponse(text, items.length);
   },
 };
@@ -0,0 +1,157 @@
+import type { D1Database } from '@cloudflare/workers-types';
+import type { AuthContext } from '@lib/auth/middleware';
+import { checkForOverlaps, getSessionsUnderDirectories, getTeamLLMKey } from '@lib/db/queries';
+import type { ActiveSessionPaths } from '@lib/db/queries';
+import { classifyActivity, usesLLMClassification } from '@lib/llm';
+import { pathSegments } from '@lib/utils/paths';
+import type { ServerTiming } from '@lib/utils/timing';
+
+// Shared ancestors shallower than this (e.g. just 'src') are too broad to be worth reporting
+const MIN_SHARED_DIRECTORY_DEPTH = 2;
+
+type SessionOverlap = {
+  user_name: string;
+  device_name: string;
+  is_remote: boolean;
+  semantic_scope: string | null | undefined;
+  summary: string | null | undefined;
+  files: string[];
+  last_activity_at: string;
+  started_at: string;
+};
+
+export type OverlapCheckResult = {
+  has_overlaps: boolean;
+  // Exact file or semantic scope matches
+  overlaps: SessionOverlap[];
+  // Other sessions active in the same repo under a queried directory, or under
+  // the nearest directory shared with a queried file. `files` are that session's
+  // paths under `directory`.
+  directory_overlaps: (SessionOverlap & { directory: string })[];
+};
+
+/**
+ * Classify the files and find other users' active sessions that overlap them.
+ * Shared by /api/v1/check and the combined start-and-check in /api/v1/sessions/start.
+ */
+export async function runOverlapCheck(
+  db: D1Database,
+  team: AuthContext['team'],
+  userId: string,
+  options: {
+    files: string[];
+    directories?: string[];
+    // The checking session; directory overlaps are limited to its repo, and
+    // skipped without it
+    sessionId?: string;
+    encryptionKey?: string;
+    // Records classify/overlaps/paths phases for the Server-Timing header
+    timing?: ServerTiming;
+  }
+): Promise<OverlapCheckResult> {
+  const { files, directories = [], sessionId, encryptionKey, timing } = options;
+  const searched = searchDirectories(files, directories);
+  const timed = <T>(name: string, fn: () => Promise<T>): Promise<T> =>
+    timing ? timing.time(name, fn) : fn();
+
+  const [overlaps, underDirectories] = await Promise.all([
+    files.length > 0
+      ? timed('classify', () => classify(db, team, files, encryptionKey)).then((classification) =>
+          timed('overlaps', () => checkForOverlaps(db, team.id, userId, files, classification.scope))
+        )
+      : Promise.resolve([]),
+    sessionId
+      ? timed('paths', () => getSessionsUnderDirectories(db, team.id, userId, sessionId, searched.all))
+      : Promise.resolve(new Map<string, ActiveSessionPaths[]>()),
+  ]);
+
+  const directOverlapIds = new Set(overlaps.map((session) => session.id));
+
+  return {
+    has_overlaps: overlaps.length > 0,
+    overlaps: overlaps.map((session) => ({
+      user_name: session.user.name,
+      device_name: session.device.name,
+      is_remote: session.device.is_remote === 1,
+      semantic_scope: session.latest_activity?.semantic_scope,
+      summary: session.latest_activity?.summary,
+      files: session.latest_activity?.files ?? [],
+      last_activity_at: session.last_activity_at,
+      started_at: session.started_at,
+    })),
+    directory_overlaps: findDirectoryOverlaps(underDirectories, searched, directOverlapIds),
+  };
+}
+
+// Loads the encrypted API key only when the team classifies with an LLM
+async function classify(db: D1Database, team: AuthContext['team'], files: string[], encryptionKey?: string) {
+  const apiKey = usesLLMClassification(team, encryptionKey) ? await getTeamLLMKey(db, team.id) : null;
+  return classifyActivity({ ...team, llm_api_key_encrypted: apiKey }, files, encryptionKey);
+}
+
+type SearchedDirectories = {
+  // Queried directories, normalized
+  directories: string[];
+  // Each queried file's ancestors at MIN_SHARED_DIRECTORY_DEPTH or deeper, deepest first
+  ancestors: Map<string, string[]>;
+  // Every directory above, once
+  all: string[];
+};
+
+function searchDirectories(files: string[], directories: string[]): SearchedDirectories {
+  const ancestors = new Map<string, string[]>();
+  for (const file of files) {
+    const segments = pathSegments(file);
+    const candidates: string[] = [];
+    // The file itself doesn't count as a shared ancestor
+    for (let depth = segments.length - 1; depth >= MIN_SHARED_DIRECTORY_DEPTH; depth--) {
+      candidates.push(segments.slice(0, depth).join('/'));
+    }
+    ancestors.set(file, candidates);
+  }
+  const normalized = [...new Set(directories.map((directory) => pathSegments(directory).join('/')))];
+  return {
+    directories: normalized,
+    ancestors,
+    all: [...new Set([...normalized, ...[...ancestors.values()].flat()])],
+  };
+}
+
+/**
+ * Sessions under each queried directory, and under each file's deepest ancestor
+ * that has any. Sessions already reported as direct overlaps are left out.
+ */
+function findDirectoryOverlaps(
+  underDirectories: Map<string, ActiveSessionPaths[]>,
+  searched: SearchedDirectories,
+  excludeSessionIds: Set<string>
+): OverlapCheckResult['directory_overlaps'] {
+  const matched = new Set<string>();
+  for (const directory of searched.directories) {
+    if (underDirectories.has(directory)) matched.add(directory);
+  }
+  for (const candidates of searched.ancestors.values()) {
+    const nearest = candidates.find((directory) => underDirectories.has(directory));
+    if (nearest !== undefined) matched.add(nearest);
+  }
+
+  const result: OverlapCheckResult['directory_overlaps'] = [];
+  for (const directory of matched) {
+    for (const session of underDirectories.get(directory)!) {
+      if (excludeSessionIds.has(session.session_id)) continue;
+      result.push({
+        directory,
+        user_name: session.user_name,
+        device_name: session.device_name,
+        is_remote: session.is_remote,
+        semantic_scope: session.semantic_scope,
+        summary: session.summary,
+        files: session.paths,
+        last_activity_at: session.last_activity_at,
+        started_at: session.started_at,
+      });
+    }
+  }
+
+  return result.sort((a, b) => b.last_activity_at.localeCompare(a.last_activity_at));
+}
@@ -0,0 +1,45 @@
+import type { D1Database } from '@cloudflare/workers-types';
+import { acquireLease, markStaleSessions } from '@lib/db/queries';
+import { generateId } from '@lib/utils/id';
+
+// Marks idle sessions stale and ends abandoned ones. There's no cron on Pages,
+// so any API request (and every open stream) may trigger a sweep. A D1 lease
+// makes that at most one sweep per interval across all isolates: the lease is
+// held until it expires rather than released, so the next sweep can't start
+// sooner. Each isolate also only asks for the lease once per interval, so
+// requests in between cost nothing.
+
+const SWEEP_INTERVAL_SECONDS = 30;
+const LEASE_NAME = 'stale-sweeper';
+
+// Identifies this isolate as a lease holder
+const holder = generateId();
+
+let nextAttemptAt = 0;
+let running: Promise<void> | null = null;
+
+/**
+ * Sweep stale sessions if this isolate hasn't tried within the interval and
+ * the lease is free. Returns a promise to await or pass to ctx.waitUntil.
+ * Never rejects.
+ */
+export function maybeSweepStaleSessions(db: D1Database): Promise<void> {
+  if (running) return running;
+
+  const now = Date.now();
+  if (now < nextAttemptAt) return Promise.resolve();
+  nextAttemptAt = now + SWEEP_INTERVAL_SECONDS * 1000;
+
+  running = (async () => {
+    try {
+      if (await acquireLease(db, LEASE_NAME, holder, SWEEP_INTERVAL_SECONDS)) {
+        await markStaleSessions(db);
+      }
+    } catch (error) {
+      console.error('Stale session sweep failed:', error);
+    } finally {
+      running = null;
+    }
+  })();
+  return running;
+}
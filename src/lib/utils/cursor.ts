@@ -0,0 +1,39 @@
+// Opaque keyset pagination cursors
+
+export type Cursor = [sortValue: string, id: string];
+
+/**
+ * Encode the sort key of the last row on a page, e.g. [last_activity_at, id].
+ * Clients treat the result as opaque and pass it back as `cursor`.
+ */
+export function encodeCursor(values: Cursor): string {
+  const bytes = new TextEncoder().encode(JSON.stringify(values));
+  return btoa(String.fromCharCode(...bytes))
+    .replace(/\+/g, '-')
+    .replace(/\//g, '_')
+    .replace(/=+$/, '');
+}
+
+/**
+ * Decode a cursor produced by encodeCursor. Returns null for anything malformed,
+ * so callers can reject it with a 400.
+ */
+export function decodeCursor(cursor: string): Cursor | null {
+  try {
+    const base64 = cursor.replace(/-/g, '+').replace(/_/g, '/');
+    const binary = atob(base64 + '='.repeat((4 - (base64.length % 4)) % 4));
+    const bytes = Uint8Array.from(binary, (c) => c.charCodeAt(0));
+    const parsed = JSON.parse(new TextDecoder().decode(bytes));
+    if (
+      !Array.isArray(parsed) ||
+      parsed.length !== 2 ||
+      typeof parsed[0] !== 'string' ||
+      typeof parsed[1] !== 'string'
+    ) {
+      return null;
+    }
+    return [parsed[0], parsed[1]];
+  } catch {
+    return null;
+  }
+}
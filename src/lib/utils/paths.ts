@@ -0,0 +1,19 @@
+// Repo-relative path helpers for subtree overlap checks and insights
+
+/**
+ * Split a repo-relative path into segments, ignoring '.', empty segments and
+ * leading/trailing slashes, so 'src/billing/', './src/billing' and 'src/billing'
+ * all name the same directory.
+ */
+export function pathSegments(path: string): string[] {
+  return path.split('/').filter((segment) => segment !== '' && segment !== '.');
+}
+
+/**
+ * Directory containing a repo-relative file path, normalized like pathSegments;
+ * '.' for files at the repo root.
+ */
+export function parentDirectory(path: string): string {
+  const segments = pathSegments(path);
+  return segments.length > 1 ? segments.slice(0, -1).join('/') : '.';
+}
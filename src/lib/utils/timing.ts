@@ -0,0 +1,111 @@
+// Server-Timing instrumentation for plugin-facing API routes
+
+import type { D1Database, D1PreparedStatement } from '@cloudflare/workers-types';
+
+// The first request served by an isolate pays for Worker cold start
+let isolateWarm = false;
+
+/**
+ * Collects per-phase durations and D1 query counts for one request and renders
+ * them as a Server-Timing header, e.g.
+ *
+ *   principal;dur=0.4, classify;dur=212, overlaps;dur=18, d1;dur=17;desc="3", total;dur=231, cold;desc="1"
+ *
+ * `principal` is authentication (named so the plugin's log sanitizer, which
+ * redacts keys containing "auth", keeps it). `d1` carries the time spent in D1
+ * calls as `dur` and the number of statements executed as `desc`. Workers only
+ * advance the clock across I/O, so phases that are pure CPU report ~0.
+ */
+export class ServerTiming {
+  private readonly startedAt = Date.now();
+  private readonly cold = !isolateWarm;
+  private readonly phases = new Map<string, number>();
+  private d1Queries = 0;
+  private d1Ms = 0;
+
+  constructor() {
+    isolateWarm = true;
+  }
+
+  /**
+   * Time an async phase. Repeated phases with the same name accumulate.
+   */
+  async time<T>(name: string, fn: () => Promise<T>): Promise<T> {
+    const start = Date.now();
+    try {
+      return await fn();
+    } finally {
+      this.phases.set(name, (this.phases.get(name) ?? 0) + Date.now() - start);
+    }
+  }
+
+  /**
+   * Wrap a D1 binding so every statement executed through it is counted.
+   */
+  trackDb(db: D1Database): D1Database {
+    const statements = new WeakMap<object, D1PreparedStatement>();
+
+    const query = async <T>(count: number, fn: () => Promise<T>): Promise<T> => {
+      const start = Date.now();
+      try {
+        return await fn();
+      } finally {
+        this.d1Queries += count;
+        this.d1Ms += Date.now() - start;
+      }
+    };
+
+    const wrapStatement = (statement: D1PreparedStatement): D1PreparedStatement => {
+      const wrapped = new Proxy(statement, {
+        get(target, prop) {
+          if (prop === 'bind') {
+            return (...values: unknown[]) => wrapStatement(target.bind(...values));
+          }
+          if (prop === 'first' || prop === 'all' || prop === 'run' || prop === 'raw') {
+            return (...args: unknown[]) =>
+              query(1, () => (target[prop] as (...a: unknown[]) => Promise<unknown>)(...args));
+          }
+          const value = Reflect.get(target, prop, target);
+          return typeof value === 'function' ? value.bind(target) : value;
+        },
+      });
+      statements.set(wrapped, statement);
+      return wrapped;
+    };
+
+    return new Proxy(db, {
+      get(target, prop) {
+        if (prop === 'prepare') {
+          return (sql: string) => wrapStatement(target.prepare(sql));
+        }
+        if (prop === 'batch') {
+          return (batch: D1PreparedStatement[]) =>
+            query(batch.length, () => target.batch(batch.map((s) => statements.get(s) ?? s)));
+        }
+        const value = Reflect.get(target, prop, target);
+        return typeof value === 'function' ? value.bind(target) : value;
+      },
+    });
+  }
+
+  /** D1 statements executed through trackDb so far. */
+  get queryCount(): number {
+    return this.d1Queries;
+  }
+
+  header(): string {
+    const metrics = [...this.phases].map(([name, ms]) => `${name};dur=${ms}`);
+    metrics.push(`d1;dur=${this.d1Ms};desc="${this.d1Queries}"`);
+    metrics.push(`total;dur=${Date.now() - this.startedAt}`);
+    if (this.cold) metrics.push('cold;desc="1"');
+    return metrics.join(', ');
+  }
+
+  /**
+   * Attach the Server-Timing header to a response and return it.
+   */
+  apply(response: Response): Response {
+    response.headers.set('Server-Timing', this.header());
+    return response;
+  }
+}
@@ -0,0 +1,134 @@
+// Compact wire format for plugin requests.
+//
+// JSON request bodies may be gzip- or deflate-compressed (Content-Encoding),
+// and the heartbeat and check file lists may use per-session path interning:
+// the plugin numbers each path the first time it sends it in a session
+// (`path_defs: {"7": "src/a.ts"}`) and sends the number instead of the string
+// from then on. Both are advertised on every API response (see middleware.ts),
+// so the plugin only uses them against a server that understands them.
+
+import type { D1Database } from '@cloudflare/workers-types';
+import { z } from 'zod';
+import { errorResponse } from '@lib/auth/middleware';
+import { resolveSessionPaths } from '@lib/db/queries';
+
+const ACCEPTED_ENCODINGS: CompressionFormat[] = ['gzip', 'deflate'];
+const FEATURES = ['path-refs'];
+
+// Decompressed bodies larger than this are rejected rather than buffered
+const MAX_BODY_BYTES = 1_000_000;
+
+// The plugin resends every path in full when it sees this (status 409)
+export const UNKNOWN_PATH_REF_ERROR = 'Unknown path reference';
+
+// A file list entry: the path itself, or the number it was interned as
+export const PathListSchema = z.array(z.union([z.string(), z.number().int().nonnegative()]));
+
+export const PathDefsSchema = z
+  .record(z.string().regex(/^\d+$/), z.string().max(500))
+  .refine((defs) => Object.keys(defs).length <= 200, { message: 'at most 200 path_defs' })
+  .optional();
+
+class BodyError extends Error {
+  constructor(
+    message: string,
+    readonly status: number
+  ) {
+    super(message);
+  }
+}
+
+async function readLimited(stream: ReadableStream<Uint8Array>): Promise<string> {
+  const reader = stream.getReader();
+  const chunks: Uint8Array[] = [];
+  let size = 0;
+  for (;;) {
+    const { done, value } = await reader.read();
+    if (done) break;
+    size += value.byteLength;
+    if (size > MAX_BODY_BYTES) {
+      await reader.cancel();
+      throw new BodyError('Request body too large', 413);
+    }
+    chunks.push(value);
+  }
+  const bytes = new Uint8Array(size);
+  let offset = 0;
+  for (const chunk of chunks) {
+    bytes.set(chunk, offset);
+    offset += chunk.byteLength;
+  }
+  return new TextDecoder().decode(bytes);
+}
+
+/**
+ * Parse a JSON request body, decompressing it first if Content-Encoding says
+ * so. Returns the parsed value, or an error response to send instead.
+ */
+export async function readJsonBody(request: Request): Promise<{ body: unknown } | { error: Response }> {
+  const encoding = (request.headers.get('Content-Encoding') ?? 'identity').trim().toLowerCase();
+
+  try {
+    if (encoding === 'identity') {
+      return { body: await request.json() };
+    }
+    if (!ACCEPTED_ENCODINGS.includes(encoding as CompressionFormat)) {
+      throw new BodyError(`Unsupported Content-Encoding: ${encoding}`, 415);
+    }
+    if (!request.body) {
+      throw new BodyError('Invalid JSON body', 400);
+    }
+    const text = await readLimited(
+      request.body.pipeThrough(new DecompressionStream(encoding as CompressionFormat))
+    );
+    return { body: JSON.parse(text) };
+  } catch (error) {
+    if (error instanceof BodyError) {
+      return { error: errorResponse(error.message, error.status) };
+    }
+    // Malformed JSON or a corrupt compressed stream
+    return { error: errorResponse('Invalid JSON body', 400) };
+  }
+}
+
+/**
+ * Tell the plugin which request encodings and wire features this route accepts
+ * (Accept-Encoding on a response is the RFC 7694 way to advertise the former).
+ */
+export function advertiseWireFormat(response: Response): Response {
+  response.headers.set('Accept-Encoding', ACCEPTED_ENCODINGS.join(', '));
+  response.headers.set('X-Overlap-Features', FEATURES.join(', '));
+  return response;
+}
+
+/**
+ * Turn a file list that may contain interned path numbers back into paths,
+ * storing any new `path_defs` for the session first. Returns null if a number
+ * isn't known (the session's table was lost, or there's no session to look it
+ * up in); respond with UNKNOWN_PATH_REF_ERROR so the plugin resyncs.
+ */
+export async function resolvePaths(
+  db: D1Database,
+  sessionId: string | undefined,
+  userId: string,
+  files: (string | number)[],
+  pathDefs: Record<string, string> | undefined
+): Promise<string[] | null> {
+  const defs = new Map(Object.entries(pathDefs ?? {}).map(([ref, path]) => [Number(ref), path]));
+  const refs = [...new Set(files.filter((file): file is number => typeof file === 'number'))];
+  if (refs.length === 0 && defs.size === 0) {
+    return files as string[];
+  }
+  if (!sessionId) {
+    return null;
+  }
+
+  const paths = await resolveSessionPaths(db, sessionId, userId, defs, refs);
+  const resolved: string[] = [];
+  for (const file of files) {
+    const path = typeof file === 'number' ? paths.get(file) : file;
+    if (path === undefined) return null;
+    resolved.push(path);
+  }
+  return resolved;
+}
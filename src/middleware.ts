@@ -0,0 +1,31 @@
+import { defineMiddleware } from 'astro:middleware';
+
+// Any API request may run the stale-session sweep after responding; the
+// sweeper itself limits that to one sweep per interval across isolates.
+// Both helpers are imported lazily so the middleware adds nothing to the
+// modules a cold isolate evaluates before routing.
+export const onRequest = defineMiddleware(async (context, next) => {
+  if (!context.url.pathname.startsWith('/api/')) {
+    return next();
+  }
+
+  const runtime = context.locals.runtime;
+  const db = runtime?.env?.DB;
+  if (db) {
+    runtime.ctx.waitUntil(
+      import('@lib/stale-sweeper')
+        .then(({ maybeSweepStaleSessions }) => maybeSweepStaleSessions(db))
+        .catch((error) => console.error('Stale session sweep failed:', error))
+    );
+  }
+
+  // Every API response advertises the wire format, so the plugin's cached view
+  // of the server stays right whichever endpoint it last talked to
+  const [response, { advertiseWireFormat }] = await Promise.all([next(), import('@lib/utils/wire')]);
+  try {
+    advertiseWireFormat(response);
+  } catch {
+    // Redirects and some proxied responses have immutable headers
+  }
+  return response;
+});
@@ -1,13 +1,14 @@
 import type { APIContext } from 'astro';
 import type { SessionWithDetails } from '@lib/db/types';
 import { authenticateAny, errorResponse, successResponse } from '@lib/auth/middleware';
+import { decodeCursor } from '@lib/utils/cursor';
 import {
   getRecentActivity,
   getActivityByUser,
   getUserSessions,
-  markStaleSessions,
   cleanupExpiredTokens,
 } from '@lib/db/queries';
+import { maybeSweepStaleSessions } from '@lib/stale-sweeper';
 
 function formatSession(session: SessionWithDetails) {
   return {
@@ -51,6 +52,7 @@ export async function GET(context: APIContext) {
   const view = url.searchParams.get('view') || 'timeline';
   const limitParam = url.searchParams.get('limit');
   const offsetParam = url.searchParams.get('offset');
+  const cursorParam = url.searchParams.get('cursor');
   const userIdParam = url.searchParams.get('userId');
   const includeStaleParam = url.searchParams.get('includeStale');
 
@@ -59,11 +61,16 @@ export async function GET(context: APIContext) {
   const rawOffset = offsetParam ? parseInt(offsetParam, 10) : 0;
   const offset = Number.isNaN(rawOffset) || rawOffset < 0 ? 0 : rawOffset;
   const includeStale = includeStaleParam !== 'false';
+  const after = cursorParam ? decodeCursor(cursorParam) : undefined;
+  if (after === null) {
+    return errorResponse('Invalid cursor', 400);
+  }
 
   try {
-    // On-demand cleanup: mark stale sessions and clean up expired tokens
+    // On-demand cleanup: mark stale sessions (at most once per interval across
+    // isolates) and clean up expired tokens
     // This replaces the cron job since Workers doesn't support scheduled triggers in deploy button
-    await Promise.all([markStaleSessions(db), cleanupExpiredTokens(db)]);
+    await Promise.all([maybeSweepStaleSessions(db), cleanupExpiredTokens(db)]);
 
     // Handle different view modes
     if (view === 'byUser' && !userIdParam) {
@@ -77,6 +84,7 @@ export async function GET(context: APIContext) {
       const result = await getUserSessions(db, team.id, userIdParam, {
         limit,
         offset,
+        after,
         includeStale,
       });
       return successResponse({
@@ -85,6 +93,7 @@ export async function GET(context: APIContext) {
         limit: result.limit,
         offset: result.offset,
         hasMore: result.hasMore,
+        nextCursor: result.nextCursor,
       });
     }
 
@@ -92,6 +101,7 @@ export async function GET(context: APIContext) {
     const result = await getRecentActivity(db, team.id, {
       limit,
       offset,
+      after,
       includeStale,
     });
 
@@ -101,6 +111,7 @@ export async function GET(context: APIContext) {
       limit: result.limit,
       offset: result.offset,
       hasMore: result.hasMore,
+      nextCursor: result.nextCursor,
     });
   } catch (error) {
     console.error('Activity fetch error:', error);
@@ -0,0 +1,66 @@
+import type { APIContext } from 'astro';
+import { authenticateAny, errorResponse, successResponse } from '@lib/auth/middleware';
+import { searchActivity } from '@lib/db/queries';
+import { decodeCursor } from '@lib/utils/cursor';
+
+const DATE_PATTERN = /^\d{4}-\d{2}-\d{2}( \d{2}:\d{2}:\d{2})?$/;
+
+/**
+ * GET /api/v1/activity/search
+ * Full-text search over the team's activity summaries and semantic scopes.
+ *
+ * Query params:
+ * - q: Search terms (required); all must match, the last as a prefix
+ * - session_id / user_id / repo_id: Narrow to one session, user or repo
+ * - since / until: Only activity at or after / before this UTC datetime (YYYY-MM-DD[ HH:MM:SS])
+ * - limit: Max results (default 50, max 100)
+ * - cursor: Opaque keyset cursor from a previous response's nextCursor
+ */
+export async function GET(context: APIContext) {
+  const { request } = context;
+  const db = context.locals.runtime.env.DB;
+
+  // Authenticate (supports both web session and API tokens)
+  const authResult = await authenticateAny(request, db);
+  if (!authResult.success) {
+    return errorResponse(authResult.error, authResult.status);
+  }
+  const { team } = authResult.context;
+
+  // Parse query params
+  const url = new URL(request.url);
+  const query = url.searchParams.get('q')?.trim();
+  if (!query) {
+    return errorResponse('q is required', 400);
+  }
+  const since = url.searchParams.get('since') || undefined;
+  const until = url.searchParams.get('until') || undefined;
+  if ((since && !DATE_PATTERN.test(since)) || (until && !DATE_PATTERN.test(until))) {
+    return errorResponse('since and until must be YYYY-MM-DD or YYYY-MM-DD HH:MM:SS', 400);
+  }
+  const limitParam = url.searchParams.get('limit');
+  const rawLimit = limitParam ? parseInt(limitParam, 10) : 50;
+  const limit = Number.isNaN(rawLimit) ? 50 : Math.min(Math.max(rawLimit, 1), 100);
+  const cursorParam = url.searchParams.get('cursor');
+  const after = cursorParam ? decodeCursor(cursorParam) : undefined;
+  if (after === null) {
+    return errorResponse('Invalid cursor', 400);
+  }
+
+  try {
+    const { results, hasMore, nextCursor } = await searchActivity(db, team.id, query, {
+      sessionId: url.searchParams.get('session_id') || undefined,
+      userId: url.searchParams.get('user_id') || undefined,
+      repoId: url.searchParams.get('repo_id') || undefined,
+      since,
+      until,
+      limit,
+      after,
+    });
+
+    return successResponse({ results, hasMore, nextCursor });
+  } catch (error) {
+    console.error('Activity search error:', error);
+    return errorResponse('Failed to search activity', 500);
+  }
+}
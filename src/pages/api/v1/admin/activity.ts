@@ -0,0 +1,58 @@
+import type { APIContext } from 'astro';
+import { authenticateAny, requireAdmin, errorResponse, successResponse } from '@lib/auth/middleware';
+import { compactOldActivity } from '@lib/db/queries';
+
+/**
+ * DELETE /api/v1/admin/activity
+ * Compact old activity into per-session rollups (admin only).
+ *
+ * Each session keeps its latest activity row; everything older than the
+ * retention window is folded into activity_rollups and deleted.
+ *
+ * Query params:
+ * - days: Compact activity older than this many days (default 90)
+ */
+export async function DELETE(context: APIContext) {
+  const { request } = context;
+  const db = context.locals.runtime.env.DB;
+
+  // Authenticate and check admin role
+  const authResult = await authenticateAny(request, db);
+  if (!authResult.success) {
+    return errorResponse(authResult.error, authResult.status);
+  }
+
+  const adminCheck = requireAdmin(authResult.context);
+  if (!adminCheck.success) {
+    return errorResponse(adminCheck.error, adminCheck.status);
+  }
+
+  // Parse query params
+  const url = new URL(request.url);
+  const days = parseInt(url.searchParams.get('days') || '90', 10);
+
+  if (Number.isNaN(days) || days < 1 || days > 3650) {
+    return errorResponse('Days must be between 1 and 3650', 400);
+  }
+
+  try {
+    const countRows = () =>
+      db.prepare('SELECT COUNT(*) as count FROM activity').first<{ count: number }>();
+
+    const before = await countRows();
+    const result = await compactOldActivity(db, days);
+    const after = await countRows();
+
+    return successResponse({
+      days,
+      sessions_rolled_up: result.sessions,
+      deleted: result.deleted,
+      activity_rows_before: before?.count ?? 0,
+      activity_rows_after: after?.count ?? 0,
+      db_size_bytes: result.dbSizeBytes,
+    });
+  } catch (error) {
+    console.error('Failed to compact activity:', error);
+    return errorResponse('Failed to compact activity', 500);
+  }
+}
@@ -0,0 +1,118 @@
+import type { APIContext } from 'astro';
+import { authenticateAny, requireAdmin, errorResponse } from '@lib/auth/middleware';
+import { getExportPage, type ExportKind } from '@lib/db/queries';
+import { decodeCursor } from '@lib/utils/cursor';
+
+const PAGE_SIZE = 500;
+// Each page is one D1 query; stop well inside the per-invocation query limit and
+// let the client continue from the cursor in the end line
+const MAX_PAGES_PER_REQUEST = 40;
+
+const KINDS: ExportKind[] = ['sessions', 'activity'];
+const DATE_PATTERN = /^\d{4}-\d{2}-\d{2}( \d{2}:\d{2}:\d{2})?$/;
+
+/**
+ * GET /api/v1/admin/export
+ * Stream the team's sessions or activity as NDJSON (admin only).
+ *
+ * Rows are read one page at a time in ascending keyset order and written as
+ * they arrive, so memory stays flat however much history is exported. Besides
+ * `{"type":"session"|"activity",...}` rows the stream carries control lines:
+ * - `{"type":"checkpoint","cursor":...}` after each page
+ * - `{"type":"end","more":bool,"cursor":...}` last; `more` means the request
+ *   stopped at its page budget and the export continues from `cursor`
+ * - `{"type":"error","error":...}` if a page fails; resume from the last checkpoint
+ *
+ * The body is gzip-compressed when the request accepts it.
+ *
+ * Query params:
+ * - kind: `sessions` (ordered by started_at) or `activity` (ordered by created_at)
+ * - since: Only rows at or after this UTC datetime (`YYYY-MM-DD[ HH:MM:SS]`)
+ * - until: Only rows before this UTC datetime
+ * - cursor: Resume after the row a previous checkpoint or end line pointed at
+ */
+export async function GET(context: APIContext) {
+  const { request } = context;
+  const db = context.locals.runtime.env.DB;
+
+  // Authenticate and check admin role
+  const authResult = await authenticateAny(request, db);
+  if (!authResult.success) {
+    return errorResponse(authResult.error, authResult.status);
+  }
+
+  const adminCheck = requireAdmin(authResult.context);
+  if (!adminCheck.success) {
+    return errorResponse(adminCheck.error, adminCheck.status);
+  }
+
+  const { team } = authResult.context;
+
+  // Parse query params
+  const url = new URL(request.url);
+  const kind = url.searchParams.get('kind') as ExportKind | null;
+  if (!kind || !KINDS.includes(kind)) {
+    return errorResponse(`kind must be one of: ${KINDS.join(', ')}`, 400);
+  }
+  const since = url.searchParams.get('since') || undefined;
+  const until = url.searchParams.get('until') || undefined;
+  if ((since && !DATE_PATTERN.test(since)) || (until && !DATE_PATTERN.test(until))) {
+    return errorResponse('since and until must be YYYY-MM-DD or YYYY-MM-DD HH:MM:SS', 400);
+  }
+  const cursorParam = url.searchParams.get('cursor');
+  let after = cursorParam ? decodeCursor(cursorParam) : undefined;
+  if (after === null) {
+    return errorResponse('Invalid cursor', 400);
+  }
+
+  const recordType = kind === 'sessions' ? 'session' : 'activity';
+  const encoder = new TextEncoder();
+  let pages = 0;
+
+  const body = new ReadableStream<Uint8Array>({
+    // Called whenever the consumer wants more, so a slow reader pauses the queries
+    async pull(controller) {
+      const line = (value: unknown) => encoder.encode(JSON.stringify(value) + '\n');
+
+      try {
+        const { rows, hasMore, cursor } = await getExportPage(db, team.id, kind, {
+          after,
+          since,
+          until,
+          limit: PAGE_SIZE,
+        });
+        pages++;
+
+        const chunk = rows.map((row) => JSON.stringify({ type: recordType, ...row })).join('\n');
+        if (chunk) {
+          controller.enqueue(encoder.encode(chunk + '\n'));
+        }
+
+        if (!hasMore || pages >= MAX_PAGES_PER_REQUEST) {
+          controller.enqueue(line({ type: 'end', more: hasMore, cursor }));
+          controller.close();
+          return;
+        }
+
+        controller.enqueue(line({ type: 'checkpoint', cursor }));
+        after = decodeCursor(cursor as string) ?? undefined;
+      } catch (error) {
+        console.error('Export failed:', error);
+        controller.enqueue(line({ type: 'error', error: 'Failed to read export page' }));
+        controller.close();
+      }
+    },
+  });
+
+  const gzip = /\bgzip\b/.test(request.headers.get('Accept-Encoding') ?? '');
+
+  // encodeBody: 'manual' tells the Workers runtime the body is already compressed
+  return new Response(gzip ? body.pipeThrough(new CompressionStream('gzip')) : body, {
+    headers: {
+      'Content-Type': 'application/x-ndjson',
+      'Cache-Control': 'no-store',
+      ...(gzip ? { 'Content-Encoding': 'gzip' } : {}),
+    },
+    ...(gzip ? { encodeBody: 'manual' } : {}),
+  } as ResponseInit);
+}
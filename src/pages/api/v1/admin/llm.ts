@@ -3,6 +3,8 @@ import { z } from 'zod';
 import { authenticateAny, requireAdmin, isAdmin, errorResponse, successResponse } from '@lib/auth/middleware';
 import { updateTeamSettings, getTeam } from '@lib/db/queries';
 import { encrypt } from '@lib/utils/crypto';
+import { clearPrincipalCache } from '@lib/auth/principal-cache';
+import { readJsonBody } from '@lib/utils/wire';
 
 const UpdateLLMSchema = z.object({
   provider: z.enum(['heuristic', 'anthropic', 'openai', 'xai', 'google']),
@@ -59,12 +61,11 @@ export async function PUT(context: APIContext) {
   const { team } = authResult.context;
 
   // Parse body
-  let body: unknown;
-  try {
-    body = await request.json();
-  } catch {
-    return errorResponse('Invalid JSON body', 400);
+  const parsed = await readJsonBody(request);
+  if ('error' in parsed) {
+    return parsed.error;
   }
+  const { body } = parsed;
 
   const parseResult = UpdateLLMSchema.safeParse(body);
   if (!parseResult.success) {
@@ -88,6 +89,7 @@ export async function PUT(context: APIContext) {
       llm_model: input.model ?? null,
       llm_api_key_encrypted: encryptedApiKey,
     });
+    await clearPrincipalCache(context.locals.runtime.env.AUTH_CACHE);
 
     return successResponse({
       message: 'LLM settings updated successfully',
@@ -1,6 +1,9 @@
 import type { APIContext } from 'astro';
 import { authenticateAny, requireAdmin, errorResponse, successResponse } from '@lib/auth/middleware';
 import { getPluginLogs, getTeamUsers, deleteOldPluginLogs } from '@lib/db/queries';
+import { decodeCursor } from '@lib/utils/cursor';
+
+const DATE_PATTERN = /^\d{4}-\d{2}-\d{2}( \d{2}:\d{2}:\d{2})?$/;
 
 /**
  * GET /api/v1/admin/logs
@@ -9,8 +12,13 @@ import { getPluginLogs, getTeamUsers, deleteOldPluginLogs } from '@lib/db/querie
  * Query params:
  * - user_id: Filter by user ID
  * - level: Filter by log level (DEBUG, INFO, WARN, ERROR)
+ * - hook: Filter by hook name (e.g. Heartbeat)
+ * - session_id: Filter by plugin session ID
+ * - since / until: Only logs at or after / before this UTC datetime (YYYY-MM-DD[ HH:MM:SS])
+ * - q: Full-text search over message, data and error
  * - limit: Max results (default 100, max 500)
  * - offset: Pagination offset
+ * - cursor: Opaque keyset cursor from a previous response's nextCursor (preferred over offset)
  */
 export async function GET(context: APIContext) {
   const { request } = context;
@@ -33,16 +41,35 @@ export async function GET(context: APIContext) {
   const url = new URL(request.url);
   const userId = url.searchParams.get('user_id') || undefined;
   const level = url.searchParams.get('level') || undefined;
+  const hook = url.searchParams.get('hook') || undefined;
+  const sessionId = url.searchParams.get('session_id') || undefined;
+  const since = url.searchParams.get('since') || undefined;
+  const until = url.searchParams.get('until') || undefined;
+  const query = url.searchParams.get('q')?.trim() || undefined;
+  if ((since && !DATE_PATTERN.test(since)) || (until && !DATE_PATTERN.test(until))) {
+    return errorResponse('since and until must be YYYY-MM-DD or YYYY-MM-DD HH:MM:SS', 400);
+  }
   const limit = Math.min(parseInt(url.searchParams.get('limit') || '100', 10), 500);
   const offset = parseInt(url.searchParams.get('offset') || '0', 10);
+  const cursorParam = url.searchParams.get('cursor');
+  const after = cursorParam ? decodeCursor(cursorParam) : undefined;
+  if (after === null) {
+    return errorResponse('Invalid cursor', 400);
+  }
 
   try {
     // Get logs
-    const { logs, total } = await getPluginLogs(db, team.id, {
+    const { logs, total, hasMore, nextCursor } = await getPluginLogs(db, team.id, {
       userId,
       level,
+      hook,
+      sessionId,
+      since,
+      until,
+      query,
       limit,
       offset,
+      after,
     });
 
     // Get team users for filtering dropdown
@@ -53,7 +80,8 @@ export async function GET(context: APIContext) {
       total,
       limit,
       offset,
-      hasMore: offset + logs.length < total,
+      hasMore,
+      nextCursor,
       users: users.map((u) => ({ id: u.id, name: u.name })),
     });
   } catch (error) {
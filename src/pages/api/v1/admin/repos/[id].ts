@@ -1,6 +1,7 @@
 import type { APIContext } from 'astro';
 import { z } from 'zod';
 import { authenticateRequest, requireAdmin, errorResponse, successResponse } from '@lib/auth/middleware';
+import { readJsonBody } from '@lib/utils/wire';
 
 const UpdateRepoSchema = z.object({
   name: z.string().min(1).max(100).optional(),
@@ -24,12 +25,11 @@ export async function PUT(context: APIContext) {
   }
 
   // Parse body
-  let body: unknown;
-  try {
-    body = await request.json();
-  } catch {
-    return errorResponse('Invalid JSON body', 400);
+  const parsed = await readJsonBody(request);
+  if ('error' in parsed) {
+    return parsed.error;
   }
+  const { body } = parsed;
 
   const parseResult = UpdateRepoSchema.safeParse(body);
   if (!parseResult.success) {
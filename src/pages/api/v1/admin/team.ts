@@ -3,6 +3,7 @@ import { z } from 'zod';
 import { authenticateAny, requireAdmin, errorResponse, successResponse } from '@lib/auth/middleware';
 import { hashPassword } from '@lib/utils/crypto';
 import { getTeam } from '@lib/db/queries';
+import { readJsonBody } from '@lib/utils/wire';
 
 const UpdateTeamSchema = z.object({
   name: z.string().min(1).max(100).optional(),
@@ -65,12 +66,11 @@ export async function PUT(context: APIContext) {
   const { team } = authResult.context;
 
   // Parse body
-  let body: unknown;
-  try {
-    body = await request.json();
-  } catch {
-    return errorResponse('Invalid JSON body', 400);
+  const parsed = await readJsonBody(request);
+  if ('error' in parsed) {
+    return parsed.error;
   }
+  const { body } = parsed;
 
   const parseResult = UpdateTeamSchema.safeParse(body);
   if (!parseResult.success) {
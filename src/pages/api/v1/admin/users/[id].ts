@@ -1,7 +1,9 @@
 import type { APIContext } from 'astro';
 import { z } from 'zod';
 import { authenticateAny, requireAdmin, errorResponse, successResponse } from '@lib/auth/middleware';
-import { getUserById, deleteUser } from '@lib/db/queries';
+import { getTeam, getUserById, deleteUser } from '@lib/db/queries';
+import { invalidatePrincipal } from '@lib/auth/principal-cache';
+import { readJsonBody } from '@lib/utils/wire';
 
 const UpdateUserSchema = z.object({
   role: z.enum(['admin', 'member']).optional(),
@@ -26,12 +28,11 @@ export async function PUT(context: APIContext) {
   }
 
   // Parse body
-  let body: unknown;
-  try {
-    body = await request.json();
-  } catch {
-    return errorResponse('Invalid JSON body', 400);
+  const parsed = await readJsonBody(request);
+  if ('error' in parsed) {
+    return parsed.error;
   }
+  const { body } = parsed;
 
   const parseResult = UpdateUserSchema.safeParse(body);
   if (!parseResult.success) {
@@ -41,9 +42,9 @@ export async function PUT(context: APIContext) {
   const input = parseResult.data;
 
   try {
-    // Get user to update
-    const user = await getUserById(db, userId);
-    if (!user) {
+    // Get user to update, and the team token that keys their cached principal
+    const [user, team] = await Promise.all([getUserById(db, userId), getTeam(db)]);
+    if (!user || !team) {
       return errorResponse('User not found', 404);
     }
 
@@ -88,6 +89,13 @@ export async function PUT(context: APIContext) {
       .bind(...values)
       .run();
 
+    // Cached principals carry role and is_active, so deactivation and demotion apply at once
+    await invalidatePrincipal(
+      team.team_token,
+      user.user_token,
+      context.locals.runtime.env.AUTH_CACHE
+    );
+
     return successResponse({ message: 'User updated successfully' });
   } catch (error) {
     console.error('Update user error:', error);
@@ -117,9 +125,9 @@ export async function DELETE(context: APIContext) {
   }
 
   try {
-    // Get user to delete
-    const user = await getUserById(db, userId);
-    if (!user) {
+    // Get user to delete, and the team token that keys their cached principal
+    const [user, team] = await Promise.all([getUserById(db, userId), getTeam(db)]);
+    if (!user || !team) {
       return errorResponse('User not found', 404);
     }
 
@@ -135,6 +143,11 @@ export async function DELETE(context: APIContext) {
     }
 
     await deleteUser(db, userId);
+    await invalidatePrincipal(
+      team.team_token,
+      user.user_token,
+      context.locals.runtime.env.AUTH_CACHE
+    );
 
     return successResponse({ message: 'User removed successfully' });
   } catch (error) {
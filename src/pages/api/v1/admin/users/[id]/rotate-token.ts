@@ -1,15 +1,17 @@
 import type { APIContext } from 'astro';
 import { authenticateRequest, requireAdmin, errorResponse, successResponse } from '@lib/auth/middleware';
-import { getUserById } from '@lib/db/queries';
+import { getTeam, getUserById } from '@lib/db/queries';
 import { generateToken } from '@lib/utils/id';
+import { invalidatePrincipal } from '@lib/auth/principal-cache';
 
 export async function POST(context: APIContext) {
   const { request, params } = context;
   const userId = params.id as string;
   const db = context.locals.runtime.env.DB;
+  const authCache = context.locals.runtime.env.AUTH_CACHE;
 
   // Authenticate and require admin
-  const authResult = await authenticateRequest(request, db);
+  const authResult = await authenticateRequest(request, db, authCache);
   if (!authResult.success) {
     return errorResponse(authResult.error, authResult.status);
   }
@@ -20,9 +22,9 @@ export async function POST(context: APIContext) {
   }
 
   try {
-    // Get user
-    const user = await getUserById(db, userId);
-    if (!user) {
+    // Get user, and the team token that keys their cached principal
+    const [user, team] = await Promise.all([getUserById(db, userId), getTeam(db)]);
+    if (!user || !team) {
       return errorResponse('User not found', 404);
     }
 
@@ -34,6 +36,9 @@ export async function POST(context: APIContext) {
       .bind(newToken, userId)
       .run();
 
+    // The old token must stop authenticating immediately
+    await invalidatePrincipal(team.team_token, user.user_token, authCache);
+
     return successResponse({
       user_token: newToken,
       message: 'Token rotated successfully. User must update their plugin configuration.',
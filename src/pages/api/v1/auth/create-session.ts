@@ -2,6 +2,7 @@ import type { APIContext } from 'astro';
 import { z } from 'zod';
 import { errorResponse, successResponse } from '@lib/auth/middleware';
 import { getUserByToken, getTeam } from '@lib/db/queries';
+import { readJsonBody } from '@lib/utils/wire';
 
 const CreateSessionSchema = z.object({
   user_id: z.string(),
@@ -18,12 +19,11 @@ export async function POST(context: APIContext) {
   const db = context.locals.runtime.env.DB;
 
   // Parse body
-  let body: unknown;
-  try {
-    body = await request.json();
-  } catch {
-    return errorResponse('Invalid JSON body', 400);
+  const parsed = await readJsonBody(request);
+  if ('error' in parsed) {
+    return parsed.error;
   }
+  const { body } = parsed;
 
   const parseResult = CreateSessionSchema.safeParse(body);
   if (!parseResult.success) {
@@ -1,32 +1,54 @@
 import type { APIContext } from 'astro';
 import { z } from 'zod';
 import { authenticateRequest, errorResponse, successResponse } from '@lib/auth/middleware';
-import { checkForOverlaps } from '@lib/db/queries';
-import { classifyActivity } from '@lib/llm';
+import { runOverlapCheck } from '@lib/overlap';
+import { ServerTiming } from '@lib/utils/timing';
+import {
+  PathDefsSchema,
+  PathListSchema,
+  UNKNOWN_PATH_REF_ERROR,
+  readJsonBody,
+  resolvePaths,
+} from '@lib/utils/wire';
 
-const CheckSchema = z.object({
-  files: z.array(z.string()),
-});
+const CheckSchema = z
+  .object({
+    files: PathListSchema.default([]),
+    // The checking session, whose interned paths `files` may refer to
+    session_id: z.string().optional(),
+    path_defs: PathDefsSchema,
+    // Directories to check for other sessions active anywhere beneath them
+    directories: z.array(z.string()).default([]),
+  })
+  .refine((input) => input.files.length > 0 || input.directories.length > 0, {
+    message: 'files or directories is required',
+  });
 
 export async function POST(context: APIContext) {
+  const timing = new ServerTiming();
+  return timing.apply(await handleCheck(context, timing));
+}
+
+async function handleCheck(context: APIContext, timing: ServerTiming): Promise<Response> {
   const { request } = context;
-  const db = context.locals.runtime.env.DB;
+  const db = timing.trackDb(context.locals.runtime.env.DB);
   const encryptionKey = context.locals.runtime.env.TEAM_ENCRYPTION_KEY;
 
   // Authenticate
-  const authResult = await authenticateRequest(request, db);
+  const authResult = await timing.time('principal', () =>
+    authenticateRequest(request, db, context.locals.runtime.env.AUTH_CACHE)
+  );
   if (!authResult.success) {
     return errorResponse(authResult.error, authResult.status);
   }
   const { user, team } = authResult.context;
 
   // Parse body
-  let body: unknown;
-  try {
-    body = await request.json();
-  } catch {
-    return errorResponse('Invalid JSON body', 400);
+  const parsed = await readJsonBody(request);
+  if ('error' in parsed) {
+    return parsed.error;
   }
+  const { body } = parsed;
 
   const parseResult = CheckSchema.safeParse(body);
   if (!parseResult.success) {
@@ -36,31 +58,21 @@ export async function POST(context: APIContext) {
   const input = parseResult.data;
 
   try {
-    // Classify the files to get semantic scope
-    const classification = await classifyActivity(team, input.files, encryptionKey);
-
-    // Check for overlaps
-    const overlaps = await checkForOverlaps(
-      db,
-      team.id,
-      user.id,
-      input.files,
-      classification.scope
+    const files = await timing.time('paths', () =>
+      resolvePaths(db, input.session_id, user.id, input.files, input.path_defs)
     );
+    if (!files) {
+      return errorResponse(UNKNOWN_PATH_REF_ERROR, 409);
+    }
 
-    return successResponse({
-      has_overlaps: overlaps.length > 0,
-      overlaps: overlaps.map((session) => ({
-        user_name: session.user.name,
-        device_name: session.device.name,
-        is_remote: session.device.is_remote === 1,
-        semantic_scope: session.latest_activity?.semantic_scope,
-        summary: session.latest_activity?.summary,
-        files: session.latest_activity?.files ?? [],
-        last_activity_at: session.last_activity_at,
-        started_at: session.started_at,
-      })),
+    const result = await runOverlapCheck(db, team, user.id, {
+      files,
+      directories: input.directories,
+      sessionId: input.session_id,
+      encryptionKey,
+      timing,
     });
+    return successResponse(result);
   } catch (error) {
     console.error('Check overlaps error:', error);
     return errorResponse('Failed to check overlaps', 500);
@@ -0,0 +1,34 @@
+import type { APIContext } from 'astro';
+import { authenticateAny, errorResponse, successResponse } from '@lib/auth/middleware';
+import { getInsights } from '@lib/db/queries';
+
+const MAX_INSIGHTS_DAYS = 30;
+
+/**
+ * Team-wide overlap pairs, directory hotspots and hourly activity for the
+ * last `days` days (default 7), read from the heartbeat rollups.
+ */
+export async function GET(context: APIContext) {
+  const { request } = context;
+  const db = context.locals.runtime.env.DB;
+
+  // Authenticate (supports both web session and API tokens)
+  const authResult = await authenticateAny(request, db);
+  if (!authResult.success) {
+    return errorResponse(authResult.error, authResult.status);
+  }
+  const { team } = authResult.context;
+
+  const url = new URL(request.url);
+  const daysParam = url.searchParams.get('days');
+  const rawDays = daysParam ? parseInt(daysParam, 10) : 7;
+  const days = Number.isNaN(rawDays) ? 7 : Math.min(Math.max(rawDays, 1), MAX_INSIGHTS_DAYS);
+
+  try {
+    const insights = await getInsights(db, team.id, { days });
+    return successResponse({ days, ...insights });
+  } catch (error) {
+    console.error('Insights fetch error:', error);
+    return errorResponse('Failed to fetch insights', 500);
+  }
+}
@@ -3,6 +3,7 @@ import { z } from 'zod';
 import { errorResponse, successResponse } from '@lib/auth/middleware';
 import { getTeam, createUser } from '@lib/db/queries';
 import { generateId, generateToken } from '@lib/utils/id';
+import { readJsonBody } from '@lib/utils/wire';
 
 const JoinSchema = z.object({
   team_token: z.string().min(1),
@@ -15,12 +16,11 @@ export async function POST(context: APIContext) {
   const db = context.locals.runtime.env.DB;
 
   // Parse body
-  let body: unknown;
-  try {
-    body = await request.json();
-  } catch {
-    return errorResponse('Invalid JSON body', 400);
+  const parsed = await readJsonBody(request);
+  if ('error' in parsed) {
+    return parsed.error;
   }
+  const { body } = parsed;
 
   const parseResult = JoinSchema.safeParse(body);
   if (!parseResult.success) {
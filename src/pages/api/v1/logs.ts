@@ -3,6 +3,8 @@ import { z } from 'zod';
 import { authenticateRequest, errorResponse, successResponse } from '@lib/auth/middleware';
 import { createPluginLogsBatch } from '@lib/db/queries';
 import { generateId } from '@lib/utils/id';
+import { ServerTiming } from '@lib/utils/timing';
+import { readJsonBody } from '@lib/utils/wire';
 
 // Schema for a single log entry
 const LogEntrySchema = z.object({
@@ -29,23 +31,29 @@ const LogsSchema = z.object({
  * Receive logs from the plugin and store them in the database.
  */
 export async function POST(context: APIContext) {
+  const timing = new ServerTiming();
+  return timing.apply(await handleLogs(context, timing));
+}
+
+async function handleLogs(context: APIContext, timing: ServerTiming): Promise<Response> {
   const { request } = context;
-  const db = context.locals.runtime.env.DB;
+  const db = timing.trackDb(context.locals.runtime.env.DB);
 
   // Authenticate
-  const authResult = await authenticateRequest(request, db);
+  const authResult = await timing.time('principal', () =>
+    authenticateRequest(request, db, context.locals.runtime.env.AUTH_CACHE)
+  );
   if (!authResult.success) {
     return errorResponse(authResult.error, authResult.status);
   }
   const { user } = authResult.context;
 
   // Parse body
-  let body: unknown;
-  try {
-    body = await request.json();
-  } catch {
-    return errorResponse('Invalid JSON body', 400);
+  const parsed = await readJsonBody(request);
+  if ('error' in parsed) {
+    return parsed.error;
   }
+  const { body } = parsed;
 
   const parseResult = LogsSchema.safeParse(body);
   if (!parseResult.success) {
@@ -72,7 +80,7 @@ export async function POST(context: APIContext) {
     }));
 
     // Batch insert
-    await createPluginLogsBatch(db, dbLogs);
+    await timing.time('store', () => createPluginLogsBatch(db, dbLogs));
 
     return successResponse({ received: logs.length });
   } catch (error) {
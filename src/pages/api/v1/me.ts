@@ -1,5 +1,6 @@
 import type { APIContext } from 'astro';
 import { authenticateAny, errorResponse, successResponse } from '@lib/auth/middleware';
+import { getTeam, getUserById } from '@lib/db/queries';
 
 export async function GET(context: APIContext) {
   const { request } = context;
@@ -11,13 +12,11 @@ export async function GET(context: APIContext) {
     return errorResponse(authResult.error, authResult.status);
   }
 
-  const { user, team } = authResult.context;
-
-  // Get the user's token from the database
-  const userRecord = await db
-    .prepare('SELECT user_token FROM users WHERE id = ?')
-    .bind(user.id)
-    .first<{ user_token: string }>();
+  // The principal carries ids only; names and the user's token come from the database
+  const [user, team] = await Promise.all([getUserById(db, authResult.context.user.id), getTeam(db)]);
+  if (!user || !team) {
+    return errorResponse('User not found', 404);
+  }
 
   return successResponse({
     user: {
@@ -25,7 +24,7 @@ export async function GET(context: APIContext) {
       name: user.name,
       email: user.email,
       role: user.role,
-      user_token: userRecord?.user_token || null,
+      user_token: user.user_token,
     },
     team: {
       id: team.id,
@@ -1,6 +1,7 @@
 import type { APIContext } from 'astro';
 import type { SessionWithDetails } from '@lib/db/types';
 import { authenticateAny, errorResponse, successResponse } from '@lib/auth/middleware';
+import { decodeCursor } from '@lib/utils/cursor';
 import { getRepoActivity, getRepoBranches, getRepoUsers } from '@lib/db/queries';
 
 function formatSession(session: SessionWithDetails) {
@@ -59,6 +60,7 @@ export async function GET(context: APIContext) {
   const url = new URL(request.url);
   const limitParam = url.searchParams.get('limit');
   const offsetParam = url.searchParams.get('offset');
+  const cursorParam = url.searchParams.get('cursor');
   const includeStaleParam = url.searchParams.get('includeStale');
   const userId = url.searchParams.get('userId') || undefined;
   const branch = url.searchParams.get('branch') || undefined;
@@ -70,6 +72,10 @@ export async function GET(context: APIContext) {
   const rawOffset = offsetParam ? parseInt(offsetParam, 10) : 0;
   const offset = Number.isNaN(rawOffset) || rawOffset < 0 ? 0 : rawOffset;
   const includeStale = includeStaleParam !== 'false';
+  const after = cursorParam ? decodeCursor(cursorParam) : undefined;
+  if (after === null) {
+    return errorResponse('Invalid cursor', 400);
+  }
 
   try {
     // Fetch sessions, branches, and users in parallel
@@ -77,6 +83,7 @@ export async function GET(context: APIContext) {
       getRepoActivity(db, team.id, repoId, {
         limit,
         offset,
+        after,
         includeStale,
         userId,
         branch,
@@ -93,6 +100,7 @@ export async function GET(context: APIContext) {
       limit: result.limit,
       offset: result.offset,
       hasMore: result.hasMore,
+      nextCursor: result.nextCursor,
       filters: {
         branches,
         users,
@@ -0,0 +1,49 @@
+import type { APIContext } from 'astro';
+import { authenticateAny, errorResponse, successResponse } from '@lib/auth/middleware';
+import { getInsights } from '@lib/db/queries';
+
+const MAX_INSIGHTS_DAYS = 30;
+
+/**
+ * Overlap pairs, directory hotspots and hourly activity in one repo for the
+ * last `days` days (default 7), read from the heartbeat rollups.
+ */
+export async function GET(context: APIContext) {
+  const { request, params } = context;
+  const db = context.locals.runtime.env.DB;
+  const repoId = params.id;
+
+  if (!repoId) {
+    return errorResponse('Repo ID is required', 400);
+  }
+
+  // Authenticate
+  const authResult = await authenticateAny(request, db);
+  if (!authResult.success) {
+    return errorResponse(authResult.error, authResult.status);
+  }
+  const { team } = authResult.context;
+
+  // Verify repo belongs to team
+  const repo = await db
+    .prepare('SELECT id FROM repos WHERE id = ? AND team_id = ?')
+    .bind(repoId, team.id)
+    .first();
+
+  if (!repo) {
+    return errorResponse('Repository not found', 404);
+  }
+
+  const url = new URL(request.url);
+  const daysParam = url.searchParams.get('days');
+  const rawDays = daysParam ? parseInt(daysParam, 10) : 7;
+  const days = Number.isNaN(rawDays) ? 7 : Math.min(Math.max(rawDays, 1), MAX_INSIGHTS_DAYS);
+
+  try {
+    const insights = await getInsights(db, team.id, { repoId, days });
+    return successResponse({ days, ...insights });
+  } catch (error) {
+    console.error('Repo insights fetch error:', error);
+    return errorResponse('Failed to fetch repo insights', 500);
+  }
+}
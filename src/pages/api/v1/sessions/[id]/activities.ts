@@ -1,5 +1,6 @@
 import type { APIContext } from 'astro';
 import { authenticateAny, errorResponse, successResponse } from '@lib/auth/middleware';
+import { decodeCursor } from '@lib/utils/cursor';
 import { getSessionWithDetails, getSessionActivities } from '@lib/db/queries';
 
 export async function GET(context: APIContext) {
@@ -18,10 +19,15 @@ export async function GET(context: APIContext) {
   const url = new URL(request.url);
   const limitParam = url.searchParams.get('limit');
   const offsetParam = url.searchParams.get('offset');
+  const cursorParam = url.searchParams.get('cursor');
   const rawLimit = limitParam ? parseInt(limitParam, 10) : 50;
   const limit = Number.isNaN(rawLimit) ? 50 : Math.min(Math.max(rawLimit, 1), 100);
   const rawOffset = offsetParam ? parseInt(offsetParam, 10) : 0;
   const offset = Number.isNaN(rawOffset) || rawOffset < 0 ? 0 : rawOffset;
+  const after = cursorParam ? decodeCursor(cursorParam) : undefined;
+  if (after === null) {
+    return errorResponse('Invalid cursor', 400);
+  }
 
   try {
     // Verify session exists and belongs to this team
@@ -30,7 +36,7 @@ export async function GET(context: APIContext) {
       return errorResponse('Session not found', 404);
     }
 
-    const result = await getSessionActivities(db, sessionId, { limit, offset });
+    const result = await getSessionActivities(db, sessionId, { limit, offset, after });
 
     return successResponse({
       session: {
@@ -52,6 +58,7 @@ export async function GET(context: APIContext) {
       activities: result.activities,
       total: result.total,
       hasMore: result.hasMore,
+      nextCursor: result.nextCursor,
     });
   } catch (error) {
     console.error('Session activities error:', error);
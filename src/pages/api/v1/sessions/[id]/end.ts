@@ -8,7 +8,7 @@ export async function POST(context: APIContext) {
   const db = context.locals.runtime.env.DB;
 
   // Authenticate
-  const authResult = await authenticateRequest(request, db);
+  const authResult = await authenticateRequest(request, db, context.locals.runtime.env.AUTH_CACHE);
   if (!authResult.success) {
     return errorResponse(authResult.error, authResult.status);
   }
@@ -1,35 +1,83 @@
 import type { APIContext } from 'astro';
 import { z } from 'zod';
 import { authenticateRequest, errorResponse, successResponse } from '@lib/auth/middleware';
-import { getSessionById, createActivity } from '@lib/db/queries';
+import { getSessionById, indexActivePaths, recordActivity, recordInsights } from '@lib/db/queries';
 import { generateId } from '@lib/utils/id';
-import { classifyActivity } from '@lib/llm';
+import { classifyHeuristically, usesLLMClassification } from '@lib/llm';
+import { enqueueClassification } from '@lib/classification-queue';
+import { ServerTiming } from '@lib/utils/timing';
+import { parentDirectory, pathSegments } from '@lib/utils/paths';
+import {
+  PathDefsSchema,
+  PathListSchema,
+  UNKNOWN_PATH_REF_ERROR,
+  readJsonBody,
+  resolvePaths,
+} from '@lib/utils/wire';
 
 const HeartbeatSchema = z.object({
-  files: z.array(z.string()),
+  files: PathListSchema,
+  path_defs: PathDefsSchema,
   tool_name: z.string().optional(),
+  // Summary the plugin derived from the session transcript
+  context: z
+    .object({
+      intent: z.string().max(500).optional(),
+      tools: z.array(z.string().max(64)).max(20).optional(),
+    })
+    .optional(),
 });
 
+const MAX_SUMMARY_LENGTH = 300;
+
+/**
+ * Activity summary from the plugin's transcript context: the user's latest
+ * request plus the recent tool sequence, e.g. "Fix the login redirect · Read ×2 → Edit".
+ * Null without an intent, in which case classification provides the summary.
+ */
+function summarizeClientContext(context: z.infer<typeof HeartbeatSchema>['context']): string | null {
+  const intent = context?.intent?.replace(/[\x00-\x1f\x7f]/g, ' ').trim();
+  if (!intent) return null;
+
+  // Collapse runs of the same tool
+  const runs: { name: string; count: number }[] = [];
+  for (const name of context?.tools ?? []) {
+    const last = runs[runs.length - 1];
+    if (last?.name === name) last.count++;
+    else runs.push({ name, count: 1 });
+  }
+  const tools = runs.map(({ name, count }) => (count > 1 ? `${name} ×${count}` : name)).join(' → ');
+
+  const summary = tools ? `${intent} · ${tools}` : intent;
+  return summary.length > MAX_SUMMARY_LENGTH ? `${summary.slice(0, MAX_SUMMARY_LENGTH - 1)}…` : summary;
+}
+
 export async function POST(context: APIContext) {
+  const timing = new ServerTiming();
+  return timing.apply(await handleHeartbeat(context, timing));
+}
+
+async function handleHeartbeat(context: APIContext, timing: ServerTiming): Promise<Response> {
   const { request, params } = context;
   const sessionId = params.id as string;
-  const db = context.locals.runtime.env.DB;
+  const db = timing.trackDb(context.locals.runtime.env.DB);
   const encryptionKey = context.locals.runtime.env.TEAM_ENCRYPTION_KEY;
 
   // Authenticate
-  const authResult = await authenticateRequest(request, db);
+  const authResult = await timing.time('principal', () =>
+    authenticateRequest(request, db, context.locals.runtime.env.AUTH_CACHE)
+  );
   if (!authResult.success) {
     return errorResponse(authResult.error, authResult.status);
   }
   const { user, team } = authResult.context;
 
   // Parse body
-  let body: unknown;
-  try {
-    body = await request.json();
-  } catch {
-    return errorResponse('Invalid JSON body', 400);
+  const parsed = await readJsonBody(request);
+  if ('error' in parsed) {
+    return parsed.error;
   }
+  const { body } = parsed;
 
   const parseResult = HeartbeatSchema.safeParse(body);
   if (!parseResult.success) {
@@ -40,7 +88,7 @@ export async function POST(context: APIContext) {
 
   try {
     // Verify session exists and belongs to user
-    const session = await getSessionById(db, sessionId);
+    const session = await timing.time('session', () => getSessionById(db, sessionId));
     if (!session) {
       return errorResponse('Session not found', 404);
     }
@@ -71,34 +119,97 @@ export async function POST(context: APIContext) {
     //   });
     // }
 
-    // Sanitize file paths before LLM classification
-    const sanitizedFiles = input.files
+    const files = await timing.time('paths', () =>
+      resolvePaths(db, sessionId, user.id, input.files, input.path_defs)
+    );
+    if (!files) {
+      return errorResponse(UNKNOWN_PATH_REF_ERROR, 409);
+    }
+
+    // Sanitize file paths before classification
+    const sanitizedFiles = files
       .map(f => f.replace(/[\x00-\x1f\x7f]/g, '').substring(0, 500))
       .slice(0, 50);
 
-    // Classify the activity (pass tool_name for context)
-    const classification = await classifyActivity(
-      team,
-      sanitizedFiles,
-      encryptionKey,
-      input.tool_name
+    // Respond with the path heuristic; when the team uses an LLM, the activity
+    // is reclassified in the background (micro-batched with other heartbeats)
+    // after the response is sent. A summary derived from the transcript by the
+    // plugin replaces the heuristic one and makes the LLM call unnecessary.
+    const heuristic = await timing.time('classify', () =>
+      classifyHeuristically(sanitizedFiles, input.tool_name)
     );
+    const clientSummary = summarizeClientContext(input.context);
+    const classification = clientSummary ? { ...heuristic, summary: clientSummary } : heuristic;
+    const deferred = !clientSummary && usesLLMClassification(team, encryptionKey);
 
     const wasInactive = session.status !== 'active';
 
-    // Create activity record (also reactivates stale/ended sessions)
-    const activity = await createActivity(db, {
-      id: generateId(),
-      session_id: sessionId,
-      files: JSON.stringify(input.files),
-      semantic_scope: classification.scope,
-      summary: classification.summary,
-    });
+    // Record activity (also reactivates stale/ended sessions). Files are normalized
+    // so a repeat heartbeat on the same files merges into the latest activity row;
+    // a new summary from the plugin replaces that row's summary.
+    const recorded = await timing.time('record', () =>
+      recordActivity(
+        db,
+        {
+          id: generateId(),
+          session_id: sessionId,
+          files: JSON.stringify([...new Set(files)].sort()),
+          semantic_scope: classification.scope,
+          summary: classification.summary,
+        },
+        { clientSummary: clientSummary !== null }
+      )
+    );
+
+    // A merged heartbeat reuses the row's existing (possibly already final) classification
+    if (deferred && !recorded.merged) {
+      context.locals.runtime.ctx.waitUntil(
+        enqueueClassification(
+          context.locals.runtime.env.DB,
+          team,
+          {
+            activityId: recorded.activityId,
+            sessionId,
+            files: sanitizedFiles,
+            toolName: input.tool_name,
+            provisional: classification,
+          },
+          encryptionKey
+        )
+      );
+    }
+
+    // Keep this session's paths in the repo's active path index for subtree
+    // overlap checks. Best effort after the response, like the rollups below.
+    if (session.repo_id) {
+      const paths = [...new Set(sanitizedFiles.map((file) => pathSegments(file).join('/')))].filter(Boolean);
+      context.locals.runtime.ctx.waitUntil(
+        indexActivePaths(context.locals.runtime.env.DB, sessionId, session.repo_id, paths).catch((error) =>
+          console.error('Active path index update failed:', error)
+        )
+      );
+    }
+
+    // Insights rollups are analytics only: updated after the response, and a
+    // failure there doesn't fail the heartbeat
+    if (session.repo_id) {
+      context.locals.runtime.ctx.waitUntil(
+        recordInsights(context.locals.runtime.env.DB, {
+          teamId: team.id,
+          repoId: session.repo_id,
+          userId: user.id,
+          directories: [...new Set(sanitizedFiles.map(parentDirectory))],
+        }).catch((error) => console.error('Insights rollup failed:', error))
+      );
+    }
 
     return successResponse({
-      activity_id: activity.id,
-      semantic_scope: classification.scope,
-      summary: classification.summary,
+      activity_id: recorded.activityId,
+      merged: recorded.merged,
+      semantic_scope: recorded.semantic_scope,
+      summary: recorded.summary,
+      // The scope/summary may still be replaced by the LLM classification
+      provisional: deferred && !recorded.merged,
       reactivated: wasInactive,
     });
   } catch (error) {
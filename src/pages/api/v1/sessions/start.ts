@@ -1,8 +1,11 @@
 import type { APIContext } from 'astro';
 import { z } from 'zod';
 import { authenticateRequest, errorResponse, successResponse } from '@lib/auth/middleware';
-import { createSession, getOrCreateDevice, getOrCreateRepo } from '@lib/db/queries';
+import { startSession } from '@lib/db/queries';
+import { runOverlapCheck } from '@lib/overlap';
 import { generateId } from '@lib/utils/id';
+import { ServerTiming } from '@lib/utils/timing';
+import { readJsonBody } from '@lib/utils/wire';
 
 const StartSessionSchema = z.object({
   session_id: z.string().optional(), // Client can provide Claude Code session ID
@@ -13,26 +16,38 @@ const StartSessionSchema = z.object({
   remote_url: z.string().nullish(),
   branch: z.string().nullish(),
   worktree: z.string().nullish(),
+  // Optional: files about to be edited. When present, the overlap check runs in the
+  // same request and its result is returned as `check` (same shape as /api/v1/check).
+  check_files: z.array(z.string()).optional(),
+  // Background registration at SessionStart: hidden until the first heartbeat confirms it
+  speculative: z.boolean().optional(),
 });
 
 export async function POST(context: APIContext) {
+  const timing = new ServerTiming();
+  return timing.apply(await handleStart(context, timing));
+}
+
+async function handleStart(context: APIContext, timing: ServerTiming): Promise<Response> {
   const { request } = context;
-  const db = context.locals.runtime.env.DB;
+  const db = timing.trackDb(context.locals.runtime.env.DB);
+  const encryptionKey = context.locals.runtime.env.TEAM_ENCRYPTION_KEY;
 
   // Authenticate
-  const authResult = await authenticateRequest(request, db);
+  const authResult = await timing.time('principal', () =>
+    authenticateRequest(request, db, context.locals.runtime.env.AUTH_CACHE)
+  );
   if (!authResult.success) {
     return errorResponse(authResult.error, authResult.status);
   }
   const { user, team } = authResult.context;
 
   // Parse body
-  let body: unknown;
-  try {
-    body = await request.json();
-  } catch {
-    return errorResponse('Invalid JSON body', 400);
+  const parsed = await readJsonBody(request);
+  if ('error' in parsed) {
+    return parsed.error;
   }
+  const { body } = parsed;
 
   const parseResult = StartSessionSchema.safeParse(body);
   if (!parseResult.success) {
@@ -42,37 +57,37 @@ export async function POST(context: APIContext) {
   const input = parseResult.data;
 
   try {
-    // Get or create device
-    const device = await getOrCreateDevice(
-      db,
-      user.id,
-      input.hostname,
-      input.is_remote,
-      input.device_name
-    );
+    // Device upsert, repo get-or-create and session insert in one batched round trip
+    const started = await timing.time('start', () => startSession(db, {
+      sessionId: input.session_id ?? generateId(),
+      userId: user.id,
+      teamId: team.id,
+      hostname: input.hostname,
+      isRemote: input.is_remote,
+      deviceName: input.device_name,
+      repoName: input.repo_name ?? null,
+      remoteUrl: input.remote_url ?? null,
+      branch: input.branch ?? null,
+      worktree: input.worktree ?? null,
+      speculative: input.speculative ?? false,
+    }));
 
-    // Get or create repo if provided
-    let repoId: string | null = null;
-    if (input.repo_name) {
-      const repo = await getOrCreateRepo(db, team.id, input.remote_url ?? null, input.repo_name);
-      repoId = repo.id;
+    if (!started) {
+      return errorResponse('Session belongs to another user', 409);
     }
 
-    // Create session
-    const sessionId = input.session_id ?? generateId();
-    const session = await createSession(db, {
-      id: sessionId,
-      user_id: user.id,
-      device_id: device.id,
-      repo_id: repoId,
-      branch: input.branch ?? null,
-      worktree: input.worktree ?? null,
-    });
+    const check = input.check_files?.length
+      ? await runOverlapCheck(db, team, user.id, {
+          files: input.check_files,
+          sessionId: started.session_id,
+          encryptionKey,
+          timing,
+        })
+      : undefined;
 
     return successResponse({
-      session_id: session.id,
-      device_id: device.id,
-      repo_id: repoId,
+      ...started,
+      ...(check ? { check } : {}),
     }, 201);
   } catch (error) {
     console.error('Failed to start session:', error);
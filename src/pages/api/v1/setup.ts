@@ -5,6 +5,7 @@ import { getTeam, createTeam, createUser } from '@lib/db/queries';
 import { generateId, generateToken } from '@lib/utils/id';
 import { hashPassword } from '@lib/utils/crypto';
 import { ensureMigrated } from '@lib/db/migrate';
+import { readJsonBody } from '@lib/utils/wire';
 
 const SetupSchema = z.object({
   team_name: z.string().min(1).max(100),
@@ -44,12 +45,11 @@ export async function POST(context: APIContext) {
   }
 
   // Parse body
-  let body: unknown;
-  try {
-    body = await request.json();
-  } catch {
-    return errorResponse('Invalid JSON body', 400);
+  const parsed = await readJsonBody(request);
+  if ('error' in parsed) {
+    return parsed.error;
   }
+  const { body } = parsed;
 
   const parseResult = SetupSchema.safeParse(body);
   if (!parseResult.success) {
@@ -1,11 +1,12 @@
 import type { APIContext } from 'astro';
 import type { SessionWithDetails } from '@lib/db/types';
 import { authenticateAny, errorResponse } from '@lib/auth/middleware';
-import { getRecentActivity, markStaleSessions } from '@lib/db/queries';
+import { getRecentActivity } from '@lib/db/queries';
+import { maybeSweepStaleSessions } from '@lib/stale-sweeper';
+import { ServerTiming } from '@lib/utils/timing';
 
 const POLL_INTERVAL_MS = 1000; // Check for changes every 1 second
 const KEEPALIVE_INTERVAL_MS = 15000; // Send keepalive every 15 seconds
-const STALE_CHECK_INTERVAL_MS = 30000; // Check for stale sessions every 30 seconds
 
 function formatSession(session: SessionWithDetails) {
   return {
@@ -43,6 +44,9 @@ function sessionFingerprint(session: SessionWithDetails): string {
     session.last_activity_at,
     session.latest_activity?.id ?? '',
     session.latest_activity?.created_at ?? '',
+    // Changes when a provisional classification is replaced in the background
+    session.latest_activity?.semantic_scope ?? '',
+    session.latest_activity?.summary ?? '',
   ].join('|');
 }
 
@@ -74,43 +78,46 @@ export async function GET(context: APIContext) {
         encoder.encode(`event: connected\ndata: ${JSON.stringify({ team_id: team.id })}\n\n`)
       );
 
+      // Counts this connection's D1 statements, reported in keepalive comments
+      // (which EventSource ignores) so load tests can attribute D1 traffic
+      const timing = new ServerTiming();
+      const streamDb = timing.trackDb(db);
+
       // Snapshot-diff approach: track fingerprint of each session
       // so we detect ANY change (new activity, status change, new session, removed session)
       let knownSessions = new Map<string, string>(); // sessionId -> fingerprint
       let lastKeepalive = Date.now();
-      let lastStaleCheck = Date.now();
       let eventCounter = 0;
       let lastChangeSignature = ''; // lightweight change detection
 
       // Polling loop
       while (isActive) {
         try {
-          // Periodically mark stale sessions (not every poll — it's a write operation)
-          const now = Date.now();
-          if (now - lastStaleCheck > STALE_CHECK_INTERVAL_MS) {
-            await markStaleSessions(db);
-            lastStaleCheck = now;
-          }
+          // Sweep stale sessions if no isolate has this interval; usually a no-op
+          await maybeSweepStaleSessions(streamDb);
 
           // Lightweight change check: single-row query to detect if anything changed
-          const changeCheck = await db
+          const changeCheck = await streamDb
             .prepare(
-              `SELECT COUNT(*) as cnt, MAX(s.last_activity_at) as latest
+              `SELECT COUNT(*) as cnt, MAX(s.last_activity_at) as latest,
+                      SUM(s.classification_revision) as revision,
+                      (SELECT MAX(id) FROM change_feed) as feed
                FROM sessions s
                JOIN users u ON s.user_id = u.id
-               WHERE u.team_id = ? AND s.status IN ('active', 'stale')`
+               WHERE u.team_id = ? AND s.status IN ('active', 'stale') AND s.speculative = 0`
             )
             .bind(team.id)
-            .first<{ cnt: number; latest: string | null }>();
+            .first<{ cnt: number; latest: string | null; revision: number | null; feed: number | null }>();
 
-          const sig = `${changeCheck?.cnt ?? 0}|${changeCheck?.latest ?? ''}`;
+          // feed moves when the sweeper marks sessions stale or ended
+          const sig = `${changeCheck?.cnt ?? 0}|${changeCheck?.latest ?? ''}|${changeCheck?.revision ?? 0}|${changeCheck?.feed ?? 0}`;
 
           // Skip full query if nothing changed (after initial load)
           if (sig === lastChangeSignature && knownSessions.size > 0) {
             // No change — just send keepalive if needed
             const nowAfterCheck = Date.now();
             if (nowAfterCheck - lastKeepalive > KEEPALIVE_INTERVAL_MS) {
-              controller.enqueue(encoder.encode(': keepalive\n\n'));
+              controller.enqueue(encoder.encode(`: keepalive d1=${timing.queryCount}\n\n`));
               lastKeepalive = nowAfterCheck;
             }
             await new Promise((resolve) => setTimeout(resolve, POLL_INTERVAL_MS));
@@ -119,7 +126,7 @@ export async function GET(context: APIContext) {
           lastChangeSignature = sig;
 
           // Something changed — fetch full session data
-          const result = await getRecentActivity(db, team.id, { limit: 50 });
+          const result = await getRecentActivity(streamDb, team.id, { limit: 50 });
 
           // Build new snapshot
           const currentSessions = new Map<string, SessionWithDetails>();
@@ -152,7 +159,7 @@ export async function GET(context: APIContext) {
           // Send keepalive if needed
           const nowAfterPoll = Date.now();
           if (nowAfterPoll - lastKeepalive > KEEPALIVE_INTERVAL_MS) {
-            controller.enqueue(encoder.encode(': keepalive\n\n'));
+            controller.enqueue(encoder.encode(`: keepalive d1=${timing.queryCount}\n\n`));
             lastKeepalive = nowAfterPoll;
           }
 
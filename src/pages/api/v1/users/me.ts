@@ -1,6 +1,6 @@
 import type { APIContext } from 'astro';
 import { authenticateRequest, errorResponse, successResponse } from '@lib/auth/middleware';
-import { getActiveSessionsForUser } from '@lib/db/queries';
+import { getActiveSessionsForUser, getTeam, getUserById } from '@lib/db/queries';
 
 export async function GET(context: APIContext) {
   const { request } = context;
@@ -11,10 +11,17 @@ export async function GET(context: APIContext) {
   if (!authResult.success) {
     return errorResponse(authResult.error, authResult.status);
   }
-  const { user, team } = authResult.context;
+  const userId = authResult.context.user.id;
 
   try {
-    const activeSessions = await getActiveSessionsForUser(db, user.id);
+    const [user, team, activeSessions] = await Promise.all([
+      getUserById(db, userId),
+      getTeam(db),
+      getActiveSessionsForUser(db, userId),
+    ]);
+    if (!user || !team) {
+      return errorResponse('User not found', 404);
+    }
 
     return successResponse({
       user: {
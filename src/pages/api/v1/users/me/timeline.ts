@@ -1,5 +1,6 @@
 import type { APIContext } from 'astro';
 import { authenticateAny, errorResponse, successResponse } from '@lib/auth/middleware';
+import { decodeCursor, encodeCursor } from '@lib/utils/cursor';
 
 export async function GET(context: APIContext) {
   const { request } = context;
@@ -16,10 +17,22 @@ export async function GET(context: APIContext) {
   const url = new URL(request.url);
   const limitParam = url.searchParams.get('limit');
   const offsetParam = url.searchParams.get('offset');
+  const cursorParam = url.searchParams.get('cursor');
+  const updatedSinceParam = url.searchParams.get('updated_since');
   const rawLimit = limitParam ? parseInt(limitParam, 10) : 20;
   const limit = Number.isNaN(rawLimit) ? 20 : Math.min(Math.max(rawLimit, 1), 100);
   const rawOffset = offsetParam ? parseInt(offsetParam, 10) : 0;
   const offset = Number.isNaN(rawOffset) || rawOffset < 0 ? 0 : rawOffset;
+  // Keyset cursor on (started_at, id); takes precedence over offset
+  const after = cursorParam ? decodeCursor(cursorParam) : undefined;
+  if (after === null) {
+    return errorResponse('Invalid cursor', 400);
+  }
+  // Incremental sync: only sessions with activity or an end at/after this D1 datetime
+  if (updatedSinceParam !== null && !/^\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}$/.test(updatedSinceParam)) {
+    return errorResponse('Invalid updated_since', 400);
+  }
+  const updatedSince = updatedSinceParam ?? undefined;
 
   try {
     // Get user's sessions with activity (fetch limit+1 for hasMore check)
@@ -45,11 +58,19 @@ export async function GET(context: APIContext) {
         FROM sessions s
         JOIN devices d ON s.device_id = d.id
         LEFT JOIN repos r ON s.repo_id = r.id
-        WHERE s.user_id = ?
-        ORDER BY s.started_at DESC
+        WHERE s.user_id = ? AND s.speculative = 0${
+          updatedSince ? ' AND (s.last_activity_at >= ? OR s.ended_at >= ?)' : ''
+        }${after ? ' AND (s.started_at, s.id) < (?, ?)' : ''}
+        ORDER BY s.started_at DESC, s.id DESC
         LIMIT ? OFFSET ?`
       )
-      .bind(user.id, limit + 1, offset)
+      .bind(
+        user.id,
+        ...(updatedSince ? [updatedSince, updatedSince] : []),
+        ...(after ? [after[0], after[1]] : []),
+        limit + 1,
+        after ? 0 : offset
+      )
       .all();
 
     const hasMore = result.results.length > limit;
@@ -104,7 +125,11 @@ export async function GET(context: APIContext) {
       };
     });
 
-    return successResponse({ sessions, hasMore });
+    const lastRow = rows[rows.length - 1];
+    const nextCursor =
+      hasMore && lastRow ? encodeCursor([lastRow.started_at as string, lastRow.id as string]) : null;
+
+    return successResponse({ sessions, hasMore, nextCursor });
   } catch (error) {
     console.error('Timeline error:', error);
     return errorResponse('Failed to fetch timeline', 500);